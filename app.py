@@ -7,27 +7,52 @@ YouTube 뉴스 자막 수집 및 요약 시스템 웹 인터페이스
 """
 
 import streamlit as st
-import pandas as pd
 import sqlite3
 import os
 import time
 from datetime import datetime, timedelta, timezone
 import re
 import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-from db_handler import save_video_data, get_summaries_for_video, generate_report, get_all_channels, add_channel, delete_channel, search_channels_by_keyword, get_all_keywords, add_keyword, delete_keyword, search_videos_by_keyword, get_all_editorials, save_editorial, get_editorials_by_date_range, delete_editorial, initialize_db
+from db_handler import save_video_data, get_summaries_for_video, generate_report, get_all_channels, add_channel, delete_channel, search_channels_by_keyword, get_all_keywords, add_keyword, delete_keyword, search_videos_by_keyword, get_all_editorials, save_editorial, get_editorials_by_date_range, delete_editorial, ensure_schema
+from lazy_imports import lazy_import
+
+# pandas는 목록 페이지에서 처음 사용할 때 로드
+pd = lazy_import("pandas")
 
 # 프로젝트 모듈 임포트
 from config import load_config
-from youtube_handler import extract_video_id, get_info_by_url, get_video_transcript, extract_channel_handle, get_channel_info_by_handle
-from db_handler import save_video_data, get_summaries_for_video, generate_report, get_all_channels, add_channel, delete_channel, search_channels_by_keyword, get_all_keywords, add_keyword, delete_keyword, search_videos_by_keyword, get_all_editorials, save_editorial, get_editorials_by_date_range, delete_editorial
-from llm_handler import summarize_transcript, analyze_transcript_with_type, get_available_analysis_types
-from main import collect_data, run_scheduler
+from youtube_handler import extract_video_id, get_info_by_url, get_video_transcript_segments, extract_channel_handle, get_channel_info_by_handle
+from db_handler import save_video_data, get_summaries_for_video, generate_report, get_all_channels, add_channel, delete_channel, search_channels_by_keyword, get_all_keywords, add_keyword, delete_keyword, search_videos_by_keyword, get_all_editorials, save_editorial, get_editorials_by_date_range, delete_editorial, list_videos_page, list_editorials_page, get_stored_transcript, get_news_by_id
+from llm_handler import get_available_analysis_types, REPORT_STYLES
+from query_cache import cached_query
+from job_queue import JobQueue, JOB_ANALYZE, JOB_EDITORIAL, JOB_RSS_COLLECT, JOB_RSS_SYNC, FINISHED_STATUSES, analysis_key
+
+# 조회 함수는 DB 쓰기(세대 번호)가 바뀔 때까지 캐시된 결과 사용
+get_summaries_for_video = cached_query(get_summaries_for_video)
+generate_report = cached_query(generate_report)
+get_all_channels = cached_query(get_all_channels)
+get_all_keywords = cached_query(get_all_keywords)
+search_channels_by_keyword = cached_query(search_channels_by_keyword)
+search_videos_by_keyword = cached_query(search_videos_by_keyword)
+get_all_editorials = cached_query(get_all_editorials)
+get_editorials_by_date_range = cached_query(get_editorials_by_date_range)
+list_videos_page = cached_query(list_videos_page)
+list_editorials_page = cached_query(list_editorials_page)
+get_stored_transcript = cached_query(get_stored_transcript)
+get_news_by_id = cached_query(get_news_by_id)
 
 # 데이터베이스 파일 경로
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "youtube_news.db")
 
+# 앱 프로세스 안에서 분석/RSS 수집/사설 생성 작업을 처리할 워커 스레드 수 (0이면 별도 worker.py만 사용)
+APP_WORKER_THREADS = int(os.getenv("APP_WORKER_THREADS", "2"))
+
+# 작업 진행 상황 갱신 간격(초)
+JOB_POLL_SECONDS = 2
+
+# 스트리밍 중 화면을 다시 그리는 최소 간격(초) - 토큰마다 다시 그리면 긴 글에서 브라우저가 느려짐
+STREAM_RENDER_SECONDS = 0.1
+
 # 페이지 설정
 st.set_page_config(
     page_title="YouTube 자막 분석 시스템",
@@ -48,26 +73,224 @@ def sidebar_menu():
     
     menu = st.sidebar.radio(
         "메뉴 선택",
-        ["홈", "URL 처리", "채널 및 키워드 관리", "자막 분석", "키워드 분석", "저장된 분석 보기", "신규 콘텐츠 리포트", "저장된 리포트", "뉴스", "최신 영상 분석", "구글 로그인 및 최신 동영상"]
+        ["홈", "URL 처리", "채널 및 키워드 관리", "자막 분석", "키워드 분석", "저장된 분석 보기", "신규 콘텐츠 리포트", "저장된 리포트", "뉴스", "최신 영상 분석", "구글 로그인 및 최신 동영상", "내 작업"]
     )
+    
+    # 진행 중인 내 작업 수
+    active_jobs = get_job_queue().list_jobs(owner=current_job_owner(), active_only=True)
+    if active_jobs:
+        st.sidebar.caption(f"⏳ 진행 중인 내 작업: {len(active_jobs)}개")
     return menu
 
+@st.cache_resource(show_spinner=False)
+def initialize_databases():
+    """스키마 버전 확인/마이그레이션은 앱 프로세스당 한 번만 실행"""
+    ensure_schema()
+    from rss_collector import rss_collector
+    rss_collector.initialize_db()
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    """백그라운드 작업 큐 (프로세스당 한 번 초기화)"""
+    queue = JobQueue(DB_PATH)
+    queue.initialize_db()
+    return queue
+
+@st.cache_resource(show_spinner=False)
+def start_job_workers():
+    """오래 걸리는 작업을 처리할 워커 스레드 시작 (앱 프로세스당 한 번)"""
+    if APP_WORKER_THREADS <= 0:
+        return None
+    from worker import start_background_workers
+    return start_background_workers(DB_PATH, threads=APP_WORKER_THREADS)
+
+def current_job_owner():
+    """작업 요청자 (로그인 사용자 이메일, 없으면 브라우저 세션별 ID)"""
+    user_info = st.session_state.get('google_oauth_user_info') or {}
+    if user_info.get('email'):
+        return user_info['email']
+    if 'job_owner' not in st.session_state:
+        import uuid
+        st.session_state.job_owner = f"session:{uuid.uuid4().hex[:12]}"
+    return st.session_state.job_owner
+
+def submit_job(job_type, payload, idempotency_key=None):
+    """
+    작업을 큐에 등록합니다. 같은 키의 작업이 대기/실행 중이면 그 작업을 그대로 사용합니다.
+    :return: 작업 ID
+    """
+    return get_job_queue().enqueue(
+        job_type, payload, idempotency_key=idempotency_key, owner=current_job_owner(), revive=True
+    )
+
+def submit_analysis_jobs(video_id, analysis_types):
+    """동영상 분석 유형별 작업 등록"""
+    return [
+        submit_job(JOB_ANALYZE, {'video_id': video_id, 'analysis_type': analysis_type}, analysis_key(video_id, analysis_type))
+        for analysis_type in analysis_types
+    ]
+
+def stream_to(placeholder):
+    """
+    LLM 응답 조각을 이어 붙여 placeholder에 마크다운으로 그리는 on_token 함수를 만듭니다.
+    (생성이 끝나면 호출한 쪽에서 저장된 최종 결과로 다시 그림)
+    """
+    parts = []
+    last_render = [0.0]
+    
+    def on_token(delta):
+        parts.append(delta)
+        now = time.monotonic()
+        if now - last_render[0] >= STREAM_RENDER_SECONDS:
+            placeholder.markdown("".join(parts) + "▌")
+            last_render[0] = now
+    
+    return on_token
+
+JOB_LABELS = {
+    JOB_ANALYZE: "분석",
+    JOB_EDITORIAL: "사설 생성",
+    JOB_RSS_COLLECT: "RSS 수집",
+    JOB_RSS_SYNC: "메인 DB 동기화",
+}
+
+JOB_STATUS_ICONS = {
+    'queued': "🕐 대기 중",
+    'running': "⚙️ 실행 중",
+    'done': "✅ 완료",
+    'dead': "❌ 실패",
+    'cancelled': "🛑 취소됨",
+}
+
+def job_title(job):
+    """작업 목록에 표시할 제목"""
+    label = JOB_LABELS.get(job['job_type'], job['job_type'])
+    payload = job['payload']
+    if job['job_type'] == JOB_ANALYZE:
+        return f"{label} · {payload.get('analysis_type')} · {payload.get('video_id')}"
+    if job['job_type'] == JOB_RSS_COLLECT and payload.get('days_back'):
+        return f"{label} · 최근 {payload['days_back']}일"
+    if job['job_type'] == JOB_EDITORIAL:
+        return f"{label} · 최근 {payload.get('hours', 24)}시간 · {payload.get('style', 'basic')}"
+    return label
+
+def auto_refresh(func):
+    """작업 진행 상황을 주기적으로 다시 그림 (st.fragment를 지원하는 Streamlit에서만)"""
+    fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if fragment is None:
+        return func
+    return fragment(run_every=JOB_POLL_SECONDS)(func)
+
+@auto_refresh
+def render_jobs(job_ids=None, limit=10, active_only=False, key="jobs"):
+    """
+    작업 진행 상황 표시 (진행률, 결과/오류, 취소 버튼)
+    :param job_ids: 지정하면 이 작업들만, 아니면 내 최근 작업
+    """
+    queue = get_job_queue()
+    owner = current_job_owner()
+    if job_ids:
+        jobs = [job for job in (queue.get_job(job_id) for job_id in job_ids) if job]
+    else:
+        jobs = queue.list_jobs(owner=owner, limit=limit, active_only=active_only)
+    
+    if not jobs:
+        st.caption("표시할 작업이 없습니다.")
+        return
+    
+    for job in jobs:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            status = JOB_STATUS_ICONS.get(job['status'], job['status'])
+            if job['status'] == 'running' and job['cancel_requested']:
+                status = "🛑 취소 중"
+            st.markdown(f"**#{job['id']} {job_title(job)}** — {status}")
+            if job['status'] not in FINISHED_STATUSES:
+                st.progress(float(job['progress'] or 0), text=job['progress_message'] or "")
+            elif job['status'] == 'done' and job['result']:
+                st.caption(", ".join(f"{k}: {v}" for k, v in job['result'].items()))
+            elif job['status'] == 'dead' and job['last_error']:
+                st.caption(job['last_error'].splitlines()[0])
+        with col2:
+            # 다른 사용자가 먼저 요청한 같은 작업은 취소할 수 없음
+            if job['owner'] == owner and job['status'] not in FINISHED_STATUSES and not job['cancel_requested']:
+                if st.button("취소", key=f"{key}_cancel_{job['id']}"):
+                    queue.cancel(job['id'], owner=owner)
+                    st.toast(f"작업 #{job['id']} 취소를 요청했습니다.")
+    
+    if getattr(st, "fragment", None) is None and getattr(st, "experimental_fragment", None) is None:
+        st.button("🔄 진행 상황 새로고침", key=f"{key}_refresh")
+
+def jobs_page():
+    st.title("⏳ 내 작업")
+    st.caption("분석, RSS 수집, 사설 생성은 백그라운드에서 실행됩니다. 페이지를 이동하거나 새로고침해도 작업은 계속됩니다.")
+    if APP_WORKER_THREADS <= 0:
+        st.info("앱 내장 워커가 꺼져 있습니다. `python worker.py`로 워커를 실행해야 작업이 처리됩니다.")
+    
+    active_only = st.toggle("진행 중인 작업만", value=False)
+    render_jobs(limit=50, active_only=active_only, key="my_jobs")
+
+# RSS 수집기 조회 함수 (세대 번호 기반 캐시)
+@cached_query
+def get_rss_channels():
+    from rss_collector import rss_collector
+    return rss_collector.get_all_channels()
+
+@cached_query
+def get_rss_keywords():
+    from rss_collector import rss_collector
+    return rss_collector.get_all_keywords()
+
+@cached_query
+def get_rss_recent_videos(hours=24, limit=50):
+    from rss_collector import rss_collector
+    return rss_collector.get_recent_videos(hours=hours, limit=limit)
+
+@cached_query
+def get_rss_videos_by_date_range(start_date, end_date):
+    from rss_collector import rss_collector
+    return rss_collector.get_videos_by_date_range(start_date, end_date)
+
+@cached_query
+def search_rss_videos_by_keyword(keyword, hours=24):
+    from rss_collector import rss_collector
+    return rss_collector.search_videos_by_keyword(keyword, hours=hours)
+
+# 목록 페이지 크기
+PAGE_SIZE = 20
+
 # 비디오 목록 가져오기
-def get_videos_with_transcript(limit=50):
-    """자막이 있는 비디오 목록을 가져옵니다."""
-    conn = sqlite3.connect(DB_PATH)
-    query = """
-        SELECT v.id, v.title, v.channel_title, length(v.transcript) as transcript_length, 
-               v.published_at, v.view_count,
-               (SELECT COUNT(*) FROM summaries s WHERE s.video_id = v.id) as analysis_count
-        FROM videos v
-        WHERE v.transcript IS NOT NULL
-        ORDER BY v.published_at DESC
-        LIMIT ?
+def get_videos_with_transcript(limit=50, cursor=None):
+    """자막이 있는 비디오 목록을 가져옵니다. (자막 본문 제외)"""
+    page = list_videos_page(limit=limit, cursor=cursor)
+    return pd.DataFrame(page["items"], columns=["id", "title", "channel_id", "channel_title", "published_at", "view_count", "url", "analysis_count"])
+
+def paginate(key, fetch_page, page_size=PAGE_SIZE):
     """
-    df = pd.read_sql_query(query, conn, params=(limit,))
-    conn.close()
-    return df
+    키셋 페이지네이션 (이전/다음 버튼). 지나온 페이지의 커서를 세션에 쌓아 둡니다.
+    :param fetch_page: fetch_page(limit=, cursor=) -> {'items', 'next_cursor'}
+    :return: 현재 페이지 항목
+    """
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    page = fetch_page(limit=page_size, cursor=cursors[-1])
+    
+    col1, col2, col3 = st.columns([1, 1, 6])
+    with col1:
+        if st.button("◀ 이전", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("다음 ▶", key=f"{key}_next", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.rerun()
+    with col3:
+        st.caption(f"{len(cursors)} 페이지")
+    return page["items"]
+
+def paged_videos_with_transcript(key):
+    """페이지 단위 비디오 목록 (DataFrame)"""
+    items = paginate(key, list_videos_page)
+    return pd.DataFrame(items, columns=["id", "title", "channel_id", "channel_title", "published_at", "view_count", "url", "analysis_count"])
 
 # 새 URL 처리 페이지
 def url_processing_page():
@@ -131,9 +354,9 @@ def url_processing_page():
             status_text.text("자막 추출 중...")
             
             # 자막 추출
-            transcript, lang = get_video_transcript(video_id, credentials)
+            normalized, lang = get_video_transcript_segments(video_id, credentials)
             
-            if not transcript:
+            if not normalized:
                 st.error("해당 비디오에서 자막을 찾을 수 없습니다.")
                 return
             
@@ -141,7 +364,8 @@ def url_processing_page():
             status_text.text("데이터베이스에 저장 중...")
             
             # 데이터베이스에 저장
-            success = save_video_data(video_info, transcript)
+            transcript = normalized.text
+            success = save_video_data(video_info, transcript, normalized.to_bytes())
             
             if not success:
                 st.warning("비디오 정보가 이미 데이터베이스에 있습니다.")
@@ -162,47 +386,28 @@ def url_processing_page():
             with st.expander("자막 미리보기 (처음 500자)"):
                 st.text(transcript[:500] + "..." if len(transcript) > 500 else transcript)
             
-            # 분석 처리
+            # 분석은 백그라운드 작업으로 등록 (결과는 '저장된 분석 보기'에서 확인)
             if analysis_types:
-                st.subheader("분석 결과")
-                
-                for i, analysis_type in enumerate(analysis_types):
-                    progress_value = 50 + (i / len(analysis_types)) * 50
-                    progress_bar.progress(int(progress_value))
-                    status_text.text(f"{analysis_type} 분석 중...")
-                    
-                    with st.spinner(f"{analysis_type} 분석 중..."):
-                        start_time = time.time()
-                        
-                        if analysis_type == "summary":
-                            result = summarize_transcript(transcript, analysis_type=analysis_type)
-                        else:
-                            result = analyze_transcript_with_type(transcript, analysis_type)
-                        
-                        process_time = time.time() - start_time
-                        
-                        # 결과 표시
-                        st.subheader(f"{analysis_type} 결과 (처리 시간: {process_time:.2f}초)")
-                        st.markdown(result)
-                        
-                        # 데이터베이스에 저장
-                        from db_handler import save_summary_to_db
-                        save_summary_to_db(video_id, analysis_type, result)
+                st.session_state.url_analysis_jobs = submit_analysis_jobs(video_id, analysis_types)
             
             progress_bar.progress(100)
             status_text.text("처리 완료!")
-            st.success("✅ URL 처리 및 분석이 완료되었습니다!")
+            st.success("✅ 자막을 저장했습니다. 분석은 백그라운드에서 진행됩니다.")
             
         except Exception as e:
             st.error(f"처리 중 오류가 발생했습니다: {str(e)}")
             st.exception(e)
+    
+    if st.session_state.get('url_analysis_jobs'):
+        st.subheader("분석 작업")
+        render_jobs(job_ids=st.session_state.url_analysis_jobs, key="url_jobs")
 
 # 자막 분석 페이지
 def transcript_analysis_page(selected_video_id=None):
     st.title("저장된 비디오 자막 분석")
     
-    # 비디오 목록 가져오기
-    videos_df = get_videos_with_transcript()
+    # 비디오 목록 가져오기 (페이지 단위)
+    videos_df = paged_videos_with_transcript("analysis_videos")
     
     if videos_df.empty:
         st.warning("자막이 있는 비디오가 없습니다.")
@@ -238,7 +443,7 @@ def transcript_analysis_page(selected_video_id=None):
             st.write(f"**게시일:** {video_info['published_at']}")
         with col2:
             st.write(f"**조회수:** {video_info['view_count']:,}")
-            st.write(f"**자막 길이:** {video_info['transcript_length']:,}자")
+            st.write(f"**자막 길이:** {len(get_stored_transcript(selected_video) or ''):,}자")
             st.write(f"**현재 분석 수:** {video_info['analysis_count']}")
         
         # 이미 분석된 유형 확인
@@ -260,6 +465,10 @@ def transcript_analysis_page(selected_video_id=None):
             )
             
             force_reanalysis = st.checkbox("이미 분석된 유형도 다시 분석", value=False)
+            stream_now = st.checkbox(
+                "결과를 생성되는 대로 바로 보기", value=True,
+                help="끄면 백그라운드 작업으로 등록되어 페이지를 벗어나도 계속 진행됩니다."
+            )
             
             submitted = st.form_submit_button("분석 시작")
         
@@ -272,99 +481,94 @@ def transcript_analysis_page(selected_video_id=None):
                     st.warning("모든 선택한 분석 유형이 이미 존재합니다. 새 분석 유형을 선택하거나 '이미 분석된 유형도 다시 분석' 옵션을 체크하세요.")
                     return
             
-            # 자막 가져오기
-            conn = sqlite3.connect(DB_PATH)
-            cursor = conn.cursor()
-            cursor.execute("SELECT transcript FROM videos WHERE id = ?", (selected_video,))
-            transcript = cursor.fetchone()[0]
-            conn.close()
-            
-            # 분석 처리
-            progress_bar = st.progress(0)
-            status_placeholder = st.empty()
-            
-            for i, analysis_type in enumerate(filtered_types):
-                progress = int((i / len(filtered_types)) * 100)
-                progress_bar.progress(progress)
-                status_placeholder.text(f"{analysis_type} 분석 중...")
-                
-                with st.spinner(f"{analysis_type} 분석 중..."):
-                    start_time = time.time()
-                    
-                    if analysis_type == "summary":
-                        result = summarize_transcript(transcript, analysis_type=analysis_type)
-                    else:
-                        result = analyze_transcript_with_type(transcript, analysis_type)
-                    
-                    process_time = time.time() - start_time
-                    
-                    # 결과 표시
-                    st.subheader(f"{analysis_type} 결과 (처리 시간: {process_time:.2f}초)")
-                    st.markdown(result)
-                    
-                    # 데이터베이스에 저장
-                    from db_handler import save_summary_to_db
-                    save_summary_to_db(selected_video, analysis_type, result)
+            if stream_now:
+                stream_analyses(selected_video, video_info['title'], filtered_types)
+                return
             
-            progress_bar.progress(100)
-            status_placeholder.text("분석 완료!")
-            st.success("모든 분석이 완료되었습니다!")
+            # 분석은 백그라운드 작업으로 등록 (페이지를 벗어나도 계속 진행)
+            job_ids = submit_analysis_jobs(selected_video, filtered_types)
+            st.session_state[f"analysis_jobs_{selected_video}"] = job_ids
+            st.success(f"{len(job_ids)}개 분석 작업을 등록했습니다. 완료되면 '저장된 분석 보기'에서 결과를 확인할 수 있습니다.")
+        
+        if st.session_state.get(f"analysis_jobs_{selected_video}"):
+            st.subheader("분석 작업")
+            render_jobs(job_ids=st.session_state[f"analysis_jobs_{selected_video}"], key=f"analysis_jobs_{selected_video}")
+
+def stream_analyses(video_id, video_title, analysis_types):
+    """분석 유형별 결과를 생성되는 대로 표시하고, 끝난 분석만 저장된 결과로 다시 그림"""
+    from main import run_analysis
+    from cost_governor import BudgetExceeded
+    
+    transcript = get_stored_transcript(video_id)
+    if not transcript:
+        st.error("저장된 자막을 찾을 수 없습니다.")
+        return
+    
+    for analysis_type in analysis_types:
+        description = next((t["description"] for t in get_available_analysis_types() if t["code"] == analysis_type), analysis_type)
+        st.subheader(description)
+        placeholder = st.empty()
+        placeholder.caption("⏳ 자막 청크를 분석하는 중...")
+        try:
+            saved = run_analysis(video_id, video_title, transcript, analysis_type, on_token=stream_to(placeholder))
+        except BudgetExceeded as e:
+            placeholder.warning(f"💸 {e}")
+            continue
+        if saved:
+            placeholder.markdown(get_summaries_for_video(video_id).get(analysis_type, ""))
+        else:
+            placeholder.error(f"{description} 결과를 저장하지 못했습니다.")
 
 # 저장된 분석 보기 페이지
+def render_video_analyses(video_id, key):
+    """비디오 하나의 저장된 분석 표시 (펼쳤을 때만 조회)"""
+    summaries = get_summaries_for_video(video_id)
+    
+    if not summaries:
+        st.warning("이 비디오에 대한 분석 결과가 없습니다.")
+        return
+    
+    # 분석 유형 선택
+    summary_type = st.selectbox(
+        "분석 유형 선택",
+        options=list(summaries.keys()),
+        format_func=lambda x: next((t["description"] for t in get_available_analysis_types() if t["code"] == x), x),
+        key=f"{key}_type"
+    )
+    
+    if summary_type:
+        # 선택된 분석 표시
+        st.subheader(f"{summary_type} 결과")
+        st.markdown(summaries[summary_type])
+
 def view_analysis_page(selected_video_id=None):
     st.title("저장된 분석 보기")
     
-    # 비디오 목록 가져오기
-    videos_df = get_videos_with_transcript()
+    # URL 파라미터로 전달된 비디오는 바로 표시
+    if selected_video_id is not None:
+        st.info(f"선택된 비디오: {selected_video_id}")
+        st.markdown(f"[YouTube에서 보기](https://www.youtube.com/watch?v={selected_video_id})")
+        render_video_analyses(selected_video_id, f"view_{selected_video_id}_selected")
+        st.markdown("---")
     
-    if videos_df.empty:
+    # 비디오 목록 (페이지 단위, 분석은 펼친 항목만 조회)
+    videos = paginate("view_videos", list_videos_page)
+    
+    if not videos:
         st.warning("자막이 있는 비디오가 없습니다.")
         return
     
-    # 비디오 선택 (URL 파라미터로 전달된 비디오 ID가 있으면 사용)
-    if selected_video_id is not None and selected_video_id in videos_df["id"].tolist():
-        selected_video = selected_video_id
-        st.info(f"선택된 비디오: {videos_df[videos_df['id'] == selected_video]['title'].iloc[0]}")
-    else:
-        selected_video = st.selectbox(
-            "비디오 선택",
-            options=videos_df["id"].tolist(),
-            format_func=lambda x: f"{videos_df[videos_df['id'] == x]['title'].iloc[0]} ({videos_df[videos_df['id'] == x]['channel_title'].iloc[0]})"
-        )
-    
-    if selected_video:
-        # 선택된 비디오 정보 표시
-        video_info = videos_df[videos_df["id"] == selected_video].iloc[0]
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write(f"**제목:** {video_info['title']}")
-            st.write(f"**채널:** {video_info['channel_title']}")
-        with col2:
-            st.write(f"**게시일:** {video_info['published_at']}")
-            st.write(f"**조회수:** {video_info['view_count']:,}")
-        
-        # 영상 링크
-        st.markdown(f"[YouTube에서 보기](https://www.youtube.com/watch?v={selected_video})")
-        
-        # 저장된 분석 불러오기
-        summaries = get_summaries_for_video(selected_video)
-        
-        if not summaries:
-            st.warning("이 비디오에 대한 분석 결과가 없습니다.")
-            return
-        
-        # 분석 유형 선택
-        summary_type = st.selectbox(
-            "분석 유형 선택",
-            options=list(summaries.keys()),
-            format_func=lambda x: next((t["description"] for t in get_available_analysis_types() if t["code"] == x), x)
-        )
-        
-        if summary_type:
-            # 선택된 분석 표시
-            st.subheader(f"{summary_type} 결과")
-            st.markdown(summaries[summary_type])
+    for video in videos:
+        with st.container():
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(f"**{video['title']}**")
+                st.caption(f"채널: {video['channel_title']} | 게시일: {video['published_at'][:10]} | 조회수: {video['view_count']:,} | 분석: {video['analysis_count']}개 | [YouTube에서 보기](https://www.youtube.com/watch?v={video['id']})")
+            with col2:
+                expanded = st.toggle("분석 보기", key=f"view_open_{video['id']}", disabled=video['analysis_count'] == 0)
+            if expanded:
+                render_video_analyses(video['id'], f"view_{video['id']}")
+            st.markdown("---")
 
 # 홈 페이지
 def home_page():
@@ -413,7 +617,7 @@ def channel_keyword_management_page():
     
     # RSS 수집기 초기화
     from rss_collector import rss_collector
-    rss_collector.initialize_db()
+    initialize_databases()
     
     # 탭 구조
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -453,7 +657,7 @@ def channel_keyword_management_page():
         
         # 채널 목록 표시
         st.markdown("### 📋 등록된 RSS 채널")
-        channels = rss_collector.get_all_channels()
+        channels = get_rss_channels()
         
         if channels:
             for channel in channels:
@@ -495,7 +699,7 @@ def channel_keyword_management_page():
         
         # 키워드 목록 표시
         st.markdown("### 📋 등록된 키워드")
-        keywords = rss_collector.get_all_keywords()
+        keywords = get_rss_keywords()
         
         if keywords:
             for keyword in keywords:
@@ -555,41 +759,30 @@ def channel_keyword_management_page():
                 days_back = 7  # 기본값
                 st.info("🕐 최신 동영상만 수집합니다.")
         
-        # 수집 실행 버튼
+        # 수집 실행 버튼 (백그라운드 작업으로 실행, 같은 작업이 진행 중이면 그 작업을 표시)
         st.markdown("### 🚀 수집 실행")
         
+        sync_after_collect = st.checkbox("수집 후 메인 DB 동기화", value=True)
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             if st.button("🚀 RSS 수집 시작", key="start_rss_collection"):
-                if collection_type == "📅 특정 기간 동안":
-                    result = rss_collector.collect_channels_with_period(days_back)
-                else:
-                    result = rss_collector.collect_all_channels()
-                
-                if result['total_channels'] > 0:
-                    st.success(f"""
-                    📊 수집 결과:
-                    - 처리된 채널: {result['total_channels']}개
-                    - 발견된 비디오: {result['total_videos']}개
-                    - 새로 저장된 비디오: {result['new_videos']}개
-                    """)
-                    
-                    # 메인 DB 동기화
-                    if st.button("🔄 메인 DB 동기화", key="sync_main_db"):
-                        sync_result = rss_collector.sync_with_main_db()
-                        st.success(f"✅ 메인 DB 동기화 완료: {sync_result['synced_videos']}개 비디오 동기화됨")
+                payload = {
+                    'days_back': days_back if collection_type == "📅 특정 기간 동안" else None,
+                    'sync': sync_after_collect
+                }
+                st.session_state.rss_job_ids = [submit_job(JOB_RSS_COLLECT, payload, JOB_RSS_COLLECT)]
         
         with col2:
             if st.button("🔄 메인 DB 동기화", key="sync_main_db_standalone"):
-                sync_result = rss_collector.sync_with_main_db()
-                st.success(f"✅ 메인 DB 동기화 완료: {sync_result['synced_videos']}개 비디오 동기화됨")
+                st.session_state.rss_job_ids = [submit_job(JOB_RSS_SYNC, {}, JOB_RSS_SYNC)]
         
         with col3:
             if st.button("📊 수집 통계", key="collection_stats"):
-                channels = rss_collector.get_all_channels()
-                keywords = rss_collector.get_all_keywords()
-                recent_videos = rss_collector.get_recent_videos(hours=24)
+                channels = get_rss_channels()
+                keywords = get_rss_keywords()
+                recent_videos = get_rss_recent_videos(hours=24)
                 
                 st.info(f"""
                 📈 수집 통계:
@@ -598,6 +791,9 @@ def channel_keyword_management_page():
                 - 최근 24시간 수집: {len(recent_videos)}개 비디오
                 """)
         
+        if st.session_state.get('rss_job_ids'):
+            render_jobs(job_ids=st.session_state.rss_job_ids, key="rss_jobs")
+        
         # 수집 설정
         st.markdown("### ⚙️ 수집 설정")
         
@@ -647,7 +843,7 @@ def channel_keyword_management_page():
                     format_func=lambda x: f"최근 {x}시간" if x < 24 else f"최근 {x//24}일",
                     index=3
                 )
-                recent_videos = rss_collector.get_recent_videos(hours=time_range, limit=50)
+                recent_videos = get_rss_recent_videos(hours=time_range, limit=50)
             else:
                 # 날짜 범위 선택
                 col_a, col_b = st.columns(2)
@@ -667,7 +863,7 @@ def channel_keyword_management_page():
                 if start_date and end_date:
                     start_str = start_date.isoformat()
                     end_str = end_date.isoformat()
-                    recent_videos = rss_collector.get_videos_by_date_range(start_str, end_str)
+                    recent_videos = get_rss_videos_by_date_range(start_str, end_str)
                 else:
                     recent_videos = []
         
@@ -677,7 +873,7 @@ def channel_keyword_management_page():
         # selected_keywords 변수 초기화
         selected_keywords = []
         
-        keywords = rss_collector.get_all_keywords()
+        keywords = get_rss_keywords()
         if keywords:
             selected_keywords = st.multiselect(
                 "키워드 선택 (여러 개 선택 가능)",
@@ -689,7 +885,7 @@ def channel_keyword_management_page():
             if selected_keywords:
                 filtered_videos = []
                 for keyword in selected_keywords:
-                    keyword_videos = rss_collector.search_videos_by_keyword(keyword, hours=time_range if time_filter_type == "⏰ 최근 시간" else 24*7)
+                    keyword_videos = search_rss_videos_by_keyword(keyword, hours=time_range if time_filter_type == "⏰ 최근 시간" else 24*7)
                     filtered_videos.extend(keyword_videos)
                 
                 # 중복 제거
@@ -874,18 +1070,91 @@ def newspaper_section():
         st.markdown('<div class="sidebar">', unsafe_allow_html=True)
         st.markdown('<h3 class="sidebar-title">주요 뉴스</h3>', unsafe_allow_html=True)
         
-        # 데이터베이스에서 최신 뉴스 가져오기
-        editorials = get_all_editorials()
-        if editorials:
-            for editorial in editorials[:3]:
-                st.markdown(f"**{editorial['title']}**")
-                st.markdown(f"_{editorial['date']}_")
-                st.markdown("---")
+        # 데이터베이스에서 최신 뉴스 가져오기 (제목만)
+        editorials = list_editorials_page(limit=3)["items"]
+        for editorial in editorials:
+            st.markdown(f"**{editorial['title']}**")
+            st.markdown(f"_{editorial['created_at'][:10]}_")
+            st.markdown("---")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# 뉴스 페이지
+def news_page():
+    st.title("📰 뉴스 및 사설")
+    
+    # 경제 뉴스 사설 생성 (백그라운드 작업)
+    with st.expander("✍️ 최근 영상으로 경제 뉴스 사설 생성"):
+        with st.form("editorial_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                hours = st.slider("최근 몇 시간의 영상", min_value=6, max_value=168, value=24, step=6)
+                style = st.selectbox("스타일", list(REPORT_STYLES.keys()))
+            with col2:
+                word_count = st.slider("글자 수", min_value=500, max_value=3000, value=1000, step=100)
+                language = st.selectbox("언어", ["ko", "en"], format_func=lambda x: "한국어" if x == "ko" else "English")
+            stream_now = st.checkbox(
+                "사설을 생성되는 대로 바로 보기", value=True,
+                help="끄면 백그라운드 작업으로 등록되어 페이지를 벗어나도 계속 진행됩니다."
+            )
+            generate = st.form_submit_button("사설 생성")
+        if generate and stream_now:
+            from cost_governor import BudgetExceeded
+            from db_handler import generate_economic_news_from_recent_videos
+            placeholder = st.empty()
+            placeholder.caption("⏳ 최근 영상 자막을 모으는 중...")
+            try:
+                news = generate_economic_news_from_recent_videos(
+                    hours=hours, style=style, word_count=word_count, language=language,
+                    on_token=stream_to(placeholder)
+                )
+            except BudgetExceeded as e:
+                placeholder.warning(f"💸 {e}")
+            else:
+                if news:
+                    placeholder.markdown(news['content'])
+                    st.success(f"'{news['title']}' 사설을 저장했습니다.")
+                else:
+                    placeholder.error("사설을 생성하지 못했습니다. (최근 자막이 있는 영상이 없거나 LLM 호출 실패)")
+        elif generate:
+            payload = {'hours': hours, 'style': style, 'word_count': word_count, 'language': language}
+            key = f"{JOB_EDITORIAL}:{hours}:{style}:{word_count}:{language}"
+            st.session_state.editorial_job_ids = [submit_job(JOB_EDITORIAL, payload, key)]
+        if st.session_state.get('editorial_job_ids'):
+            render_jobs(job_ids=st.session_state.editorial_job_ids, key="editorial_jobs")
+    
+    news_types = {"전체": None, "사설": "editorial", "경제 뉴스": "economic"}
+    selected_type = st.radio("유형", list(news_types.keys()), horizontal=True)
+    news_type = news_types[selected_type]
+    
+    # 사설 목록 (페이지 단위, 본문은 펼친 항목만 조회)
+    editorials = paginate(
+        f"news_{news_type}",
+        lambda limit, cursor: list_editorials_page(limit=limit, cursor=cursor, news_type=news_type)
+    )
+    
+    if not editorials:
+        st.info("저장된 뉴스가 없습니다.")
+        return
+    
+    for editorial in editorials:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.markdown(f"**{editorial['title']}**")
+            keywords = ", ".join(editorial['keywords']) if editorial['keywords'] else "-"
+            st.caption(f"{editorial['created_at'][:16]} | {editorial['news_type']} | {editorial['style']} | 키워드: {keywords}")
+        with col2:
+            expanded = st.toggle("본문 보기", key=f"news_open_{editorial['id']}")
+        if expanded:
+            article = get_news_by_id(editorial['id'])
+            if article:
+                st.markdown(article['content'])
+            else:
+                st.warning("본문을 찾을 수 없습니다.")
+        st.markdown("---")
+
 # 메인 함수
 def main():
     # 세션 상태 초기화
@@ -893,8 +1162,9 @@ def main():
         st.session_state.google_oauth_authenticated = False
         st.session_state.google_oauth_user_info = None
     
-    # 데이터베이스 초기화
-    initialize_db()
+    # 데이터베이스 초기화와 백그라운드 워커 시작 (프로세스당 한 번)
+    initialize_databases()
+    start_job_workers()
     
     # 구성 파일 로드
     config = load_config()
@@ -956,6 +1226,8 @@ def main():
         latest_videos_analysis_page()
     elif menu == "구글 로그인 및 최신 동영상":
         google_login_latest_videos_page()
+    elif menu == "내 작업":
+        jobs_page()
 
 def google_login_latest_videos_page():
     """구글 로그인을 통한 최신 동영상 검색 페이지 - 개선된 버전"""
@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+분석용 컬럼형 아카이브 내보내기 (Parquet / Arrow IPC)
+운영 DB의 동영상(자막 제외), 요약, RSS 동영상, 뉴스, 종목 언급, 키워드를 월·채널별 파티션 파일로 증분 내보내기
+대시보드나 노트북은 운영 DB를 잠그지 않고 아카이브를 메모리 매핑으로 읽음
+사용법:
+  python archive_exporter.py --out archive                  # 지난 실행 이후 변경분만 추가
+  python archive_exporter.py --out archive --format arrow   # Arrow IPC 파일로 내보내기
+  python archive_exporter.py --out archive --full           # 처음부터 다시 내보내기
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_FILE = "_manifest.json"
+DEFAULT_BATCH_SIZE = 50000
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# 데이터셋 정의
+# select/source: 내보낼 컬럼과 테이블
+# watermark, key: 증분 내보내기 기준 (워터마크, 키) 순서. 지난 실행 이후 워터마크가 커진 행만 다시 읽음
+# month_column, channel_column: 파티션 경로 (month=YYYY-MM/channel=채널 ID)
+# unique_key, latest_by: 같은 행이 수정되어 다시 내보내진 경우 latest_by 기준 최신 행만 남김
+# snapshot: 작은 참조 테이블이나 행이 삭제·재생성되는 테이블은 매번 통째로 다시 씀 (파티션 컬럼이 있으면 파티션별로)
+DATASETS = {
+    "videos": {
+        "select": """id AS video_id, title, channel_id, channel_title, published_at, duration, view_count,
+                     url, created_at, length(transcript) AS transcript_chars""",
+        "source": "videos",
+        "watermark": "created_at",
+        "key": "rowid",
+        "columns": [("video_id", "string"), ("title", "string"), ("channel_id", "string"),
+                    ("channel_title", "string"), ("published_at", "string"), ("duration", "string"),
+                    ("view_count", "int64"), ("url", "string"), ("created_at", "string"),
+                    ("transcript_chars", "int64")],
+        "month_column": "published_at",
+        "channel_column": "channel_id",
+        "unique_key": ["video_id"],
+        "latest_by": "created_at",
+    },
+    "summaries": {
+        # 요약은 다시 분석하면 같은 행이 갱신되므로(created_at 변경) 갱신분도 다시 내보냄
+        "select": """s.id AS summary_id, s.video_id, s.summary_type, s.content, s.created_at,
+                     v.channel_id, v.published_at""",
+        "source": "summaries s LEFT JOIN videos v ON v.id = s.video_id",
+        "watermark": "s.created_at",
+        "key": "s.id",
+        "columns": [("summary_id", "int64"), ("video_id", "string"), ("summary_type", "string"),
+                    ("content", "string"), ("created_at", "string"), ("channel_id", "string"),
+                    ("published_at", "string")],
+        "month_column": "published_at",
+        "channel_column": "channel_id",
+        "unique_key": ["video_id", "summary_type"],
+        "latest_by": "created_at",
+    },
+    "rss_videos": {
+        "select": """video_id, channel_id, title, description, published_at, thumbnail_url, video_url,
+                     duration, view_count, like_count, collected_at""",
+        "source": "rss_videos",
+        "watermark": "collected_at",
+        "key": "id",
+        "columns": [("video_id", "string"), ("channel_id", "string"), ("title", "string"),
+                    ("description", "string"), ("published_at", "string"), ("thumbnail_url", "string"),
+                    ("video_url", "string"), ("duration", "string"), ("view_count", "int64"),
+                    ("like_count", "int64"), ("collected_at", "string")],
+        "month_column": "published_at",
+        "channel_column": "channel_id",
+        "unique_key": ["video_id"],
+        "latest_by": "collected_at",
+    },
+    "news": {
+        "select": """id AS news_id, title, content, news_type, created_at, video_ids, style, word_count,
+                     language, keywords""",
+        "source": "news",
+        "watermark": "created_at",
+        "key": "id",
+        "columns": [("news_id", "int64"), ("title", "string"), ("content", "string"), ("news_type", "string"),
+                    ("created_at", "string"), ("video_ids", "string"), ("style", "string"),
+                    ("word_count", "int64"), ("language", "string"), ("keywords", "string")],
+        "month_column": "created_at",
+    },
+    "stock_mentions": {
+        # 분석을 다시 저장하면 해당 분석의 언급을 지우고 새 id로 다시 넣으므로, 추가만 하면 중복·삭제된 행이 남음
+        "select": "id AS mention_id, analysis_id, video_id, company, ticker, context, outlook, published_at",
+        "source": "stock_mentions",
+        "columns": [("mention_id", "int64"), ("analysis_id", "int64"), ("video_id", "string"),
+                    ("company", "string"), ("ticker", "string"), ("context", "string"),
+                    ("outlook", "string"), ("published_at", "string")],
+        "month_column": "published_at",
+        "snapshot": True,
+    },
+    "extracted_keywords": {
+        "select": "id AS keyword_id, keyword, created_at",
+        "source": "extracted_keywords",
+        "watermark": "id",
+        "key": "id",
+        "columns": [("keyword_id", "int64"), ("keyword", "string"), ("created_at", "string")],
+        "month_column": "created_at",
+    },
+    "stock_aliases": {
+        "select": "alias, company, ticker",
+        "source": "stock_aliases",
+        "columns": [("alias", "string"), ("company", "string"), ("ticker", "string")],
+        "snapshot": True,
+    },
+}
+
+
+def _require_pyarrow():
+    """pyarrow 모듈 로드 (설치되어 있지 않으면 안내 메시지와 함께 ImportError)"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("아카이브 내보내기에는 pyarrow가 필요합니다: pip install pyarrow") from e
+    return pyarrow
+
+
+def _schema(pa, columns: List[Tuple[str, str]]):
+    types = {"string": pa.string(), "int64": pa.int64()}
+    return pa.schema([(name, types[type_name]) for name, type_name in columns])
+
+
+def _partition_value(value: Optional[str]) -> str:
+    """파일 경로에 쓸 수 있는 파티션 값"""
+    if not value:
+        return "unknown"
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(value))
+
+
+def _month(value: Optional[str]) -> str:
+    """'2024-05-03T10:00:00Z' → '2024-05'"""
+    if value and re.match(r'^\d{4}-\d{2}', value):
+        return value[:7]
+    return "unknown"
+
+
+class ArchiveExporter:
+    def __init__(self, db_path: str = "youtube_news.db", root: str = "archive", file_format: str = "parquet",
+                 batch_size: int = DEFAULT_BATCH_SIZE):
+        if file_format not in FORMATS:
+            raise ValueError(f"지원하지 않는 형식입니다: {file_format} ({', '.join(FORMATS)})")
+        self.db_path = db_path
+        self.root = root
+        self.file_format = file_format
+        self.batch_size = batch_size
+
+    def _connect(self) -> sqlite3.Connection:
+        # 읽기 전용으로 열고, 배치마다 짧은 조회만 실행해서 운영 DB 쓰기를 막지 않음
+        conn = sqlite3.connect(f"file:{os.path.abspath(self.db_path)}?mode=ro", uri=True, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def load_manifest(self) -> Dict:
+        """아카이브 매니페스트 (데이터셋별 워터마크, 행 수, 파일 수)"""
+        if not os.path.exists(self._manifest_path()):
+            return {"format": self.file_format, "datasets": {}}
+        with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict):
+        # 중간에 중단되어도 매니페스트가 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _write_file(self, pa, table, directory: str, name: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name + FORMATS[self.file_format])
+        # '.'으로 시작하는 파일은 pyarrow.dataset이 무시하므로 쓰다 만 파일이 읽히지 않음
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        if self.file_format == "parquet":
+            pa.parquet.write_table(table, tmp_path, compression="zstd")
+        else:
+            # Arrow IPC 파일은 압축하지 않아야 메모리 매핑으로 복사 없이 읽을 수 있음
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        os.replace(tmp_path, path)
+        return path
+
+    def _partition_dir(self, name: str, spec: Dict, row: Dict) -> str:
+        parts = [self.root, name]
+        if spec.get("month_column"):
+            parts.append(f"month={_month(row[spec['month_column']])}")
+        if spec.get("channel_column"):
+            parts.append(f"channel={_partition_value(row[spec['channel_column']])}")
+        return os.path.join(*parts)
+
+    def export_dataset(self, name: str, manifest: Dict, full: bool = False) -> Dict:
+        """
+        데이터셋 하나를 내보냅니다. 지난 워터마크 이후 추가·수정된 행만 새 파일로 추가합니다.
+        :return: {'rows': 이번에 내보낸 행 수, 'files': 새로 쓴 파일 수}
+        """
+        pa = _require_pyarrow()
+        spec = DATASETS[name]
+        schema = _schema(pa, spec["columns"])
+        column_names = [column for column, _ in spec["columns"]]
+        state = manifest["datasets"].get(name, {})
+        dataset_dir = os.path.join(self.root, name)
+
+        if full or spec.get("snapshot"):
+            shutil.rmtree(dataset_dir, ignore_errors=True)
+            state = {}
+
+        conn = self._connect()
+        try:
+            if spec.get("snapshot"):
+                partitions: Dict[str, List[Dict]] = {}
+                for row in conn.execute(f"SELECT {spec['select']} FROM {spec['source']}"):
+                    record = dict(row)
+                    partitions.setdefault(self._partition_dir(name, spec, record), []).append(record)
+                if not partitions:
+                    partitions[dataset_dir] = []
+                for directory, rows in partitions.items():
+                    self._write_file(pa, pa.Table.from_pylist(rows, schema=schema), directory, "snapshot")
+                total_rows = sum(len(rows) for rows in partitions.values())
+                manifest["datasets"][name] = {
+                    "total_rows": total_rows, "files": len(partitions), "updated_at": datetime.now().isoformat()
+                }
+                return {"rows": total_rows, "files": len(partitions)}
+
+            base_query = f"""
+                SELECT {spec['watermark']} AS _watermark, {spec['key']} AS _key, {spec['select']}
+                FROM {spec['source']}
+            """
+            order = f"ORDER BY {spec['watermark']}, {spec['key']} LIMIT ?"
+            first_query = f"{base_query} WHERE {spec['watermark']} IS NOT NULL {order}"
+            next_query = f"""{base_query}
+                WHERE {spec['watermark']} > ? OR ({spec['watermark']} = ? AND {spec['key']} > ?) {order}"""
+
+            exported_rows = 0
+            written_files = 0
+            while True:
+                if "watermark" in state:
+                    params = (state["watermark"], state["watermark"], state["last_key"], self.batch_size)
+                    batch = conn.execute(next_query, params).fetchall()
+                else:
+                    batch = conn.execute(first_query, (self.batch_size,)).fetchall()
+                if not batch:
+                    break
+
+                partitions: Dict[str, List[Dict]] = {}
+                for row in batch:
+                    record = dict(row)
+                    partitions.setdefault(self._partition_dir(name, spec, record), []).append(
+                        {column: record[column] for column in column_names}
+                    )
+
+                # 파일 이름은 배치 시작 위치로 정해서 중단 후 다시 실행해도 같은 파일을 덮어씀
+                file_name = f"part-{_partition_value(batch[0]['_watermark'])}-{batch[0]['_key']}"
+                for directory, rows in partitions.items():
+                    self._write_file(pa, pa.Table.from_pylist(rows, schema=schema), directory, file_name)
+                written_files += len(partitions)
+                exported_rows += len(batch)
+
+                # 배치마다 워터마크를 저장해서 중단되면 그 지점부터 이어서 내보냄
+                state.update({
+                    "watermark": batch[-1]["_watermark"],
+                    "last_key": batch[-1]["_key"],
+                    "total_rows": state.get("total_rows", 0) + len(batch),
+                    "files": state.get("files", 0) + len(partitions),
+                    "updated_at": datetime.now().isoformat(),
+                })
+                manifest["datasets"][name] = state
+                self._save_manifest(manifest)
+
+                if len(batch) < self.batch_size:
+                    break
+            return {"rows": exported_rows, "files": written_files}
+        finally:
+            conn.close()
+
+    def export(self, datasets: List[str] = None, full: bool = False) -> Dict[str, Dict]:
+        """
+        데이터셋들을 증분 내보내기
+        :param datasets: 내보낼 데이터셋 (기본: 전체)
+        :param full: 기존 파일과 워터마크를 지우고 처음부터 다시 내보내기
+        """
+        if full and not datasets:
+            shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+        manifest = self.load_manifest()
+        if manifest.get("format", self.file_format) != self.file_format:
+            raise ValueError(
+                f"아카이브가 {manifest['format']} 형식입니다. --format {manifest['format']}을 쓰거나 "
+                f"--datasets 없이 --full로 다시 내보내세요."
+            )
+        manifest["format"] = self.file_format
+
+        results = {}
+        for name in datasets or list(DATASETS):
+            try:
+                results[name] = self.export_dataset(name, manifest, full=full)
+            except sqlite3.OperationalError as e:
+                # 아직 만들어지지 않은 테이블(예: RSS 수집을 쓰지 않는 경우)은 건너뜀
+                print(f"⚠️ {name} 건너뜀: {e}")
+                results[name] = {"rows": 0, "files": 0, "error": str(e)}
+        self._save_manifest(manifest)
+        return results
+
+
+def open_dataset(root: str, name: str):
+    """
+    아카이브 데이터셋을 pyarrow.dataset으로 엽니다. (파일은 메모리 매핑으로 읽음)
+    month, channel 파티션 컬럼으로 필터링하면 해당 파일만 읽습니다.
+
+    사용 예:
+        import pyarrow.dataset as ds
+        videos = open_dataset("archive", "videos")
+        table = videos.to_table(filter=ds.field("month") >= "2024-01", columns=["video_id", "title"])
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    with open(os.path.join(root, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        file_format = json.load(f).get("format", "parquet")
+
+    return ds.dataset(
+        os.path.join(root, name),
+        format="ipc" if file_format == "arrow" else "parquet",
+        partitioning="hive",
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def read_dataset(root: str, name: str, columns: List[str] = None, filter=None, latest_only: bool = True):
+    """
+    아카이브 데이터셋을 pandas DataFrame으로 읽습니다.
+    :param latest_only: 수정되어 여러 번 내보내진 행은 최신 것만 남김 (DATASETS의 unique_key, latest_by 기준)
+    """
+    table = open_dataset(root, name).to_table(columns=columns, filter=filter)
+    df = table.to_pandas()
+    spec = DATASETS[name]
+    needed = spec.get("unique_key", []) + [spec.get("latest_by")]
+    if latest_only and spec.get("unique_key") and all(column in df.columns for column in needed):
+        df = df.sort_values(spec["latest_by"], kind="stable").drop_duplicates(subset=spec["unique_key"], keep="last")
+    return df
+
+
+def main():
+    """아카이브 내보내기 실행 함수"""
+    parser = argparse.ArgumentParser(description="분석용 Parquet/Arrow 아카이브 증분 내보내기")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    parser.add_argument("--out", default="archive", help="아카이브 디렉터리")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet", help="파일 형식")
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), help="내보낼 데이터셋 (기본: 전체)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="한 번에 읽을 행 수")
+    parser.add_argument("--full", action="store_true", help="처음부터 다시 내보내기")
+    parser.add_argument("--status", action="store_true", help="아카이브 현황만 출력")
+    args = parser.parse_args()
+
+    exporter = ArchiveExporter(args.db, args.out, args.format, args.batch_size)
+
+    if args.status:
+        manifest = exporter.load_manifest()
+        print(f"📦 아카이브: {args.out} ({manifest.get('format')})")
+        for name, state in manifest.get("datasets", {}).items():
+            print(f"  - {name}: {state.get('total_rows', 0)}행, 파일 {state.get('files', 0)}개, 갱신 {state.get('updated_at')}")
+        return
+
+    print(f"📦 아카이브 내보내기: {args.db} → {args.out} ({args.format})")
+    results = exporter.export(args.datasets, full=args.full)
+    for name, result in results.items():
+        print(f"  - {name}: {result['rows']}행, 새 파일 {result['files']}개")
+
+
+if __name__ == "__main__":
+    main()
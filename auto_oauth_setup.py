@@ -17,6 +17,8 @@ from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 
+from quota_ledger import quota_ledger
+
 class AutoOAuthSetup:
     def __init__(self):
         self.youtube_service = None
@@ -192,7 +194,7 @@ class AutoOAuthSetup:
             self.credentials = Credentials(access_token)
             
             # YouTube API 서비스 생성
-            self.youtube_service = build('youtube', 'v3', credentials=self.credentials)
+            self.youtube_service = quota_ledger.wrap(build('youtube', 'v3', credentials=self.credentials))
             
             # 테스트 API 호출
             request = self.youtube_service.channels().list(
@@ -240,7 +242,7 @@ class AutoOAuthSetup:
         """고급 자격 증명 테스트 및 저장"""
         try:
             # YouTube API 서비스 생성
-            self.youtube_service = build('youtube', 'v3', credentials=credentials)
+            self.youtube_service = quota_ledger.wrap(build('youtube', 'v3', credentials=credentials))
             
             # 테스트 API 호출
             request = self.youtube_service.channels().list(
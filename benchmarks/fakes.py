@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+벤치마크용 로컬 가짜 서비스
+fixtures/ 에 저장된 YouTube Data API, RSS, OpenAI 응답을 재생해 네트워크 없이 수집 경로를 실행
+응답은 요청 파라미터(채널 ID, 비디오 ID, 개수)에 맞게 ID만 바꿔서 돌려줌
+"""
+
+import copy
+import hashlib
+import json
+import os
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from unittest import mock
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str):
+    """fixture 파일 로드 (.json은 파싱, 그 외는 텍스트)"""
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f) if name.endswith('.json') else f.read()
+
+
+def derived_video_id(seed: str, index: int) -> str:
+    """재생목록/검색어와 순번으로 항상 같은 11자리 비디오 ID 생성"""
+    digest = hashlib.sha1(f"{seed}:{index}".encode('utf-8')).hexdigest()
+    return digest[:11]
+
+
+class FakeRequest:
+    def __init__(self, response, counter: Dict, endpoint: str):
+        self._response = response
+        self._counter = counter
+        self._endpoint = endpoint
+
+    def execute(self, *args, **kwargs):
+        self._counter[self._endpoint] = self._counter.get(self._endpoint, 0) + 1
+        return self._response
+
+
+class FakeYouTubeService:
+    """googleapiclient.discovery.build('youtube', 'v3') 대체"""
+
+    def __init__(self, now: datetime = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.calls: Dict[str, int] = {}
+        self._channels = load_fixture("youtube_channels_list.json")
+        self._playlist = load_fixture("youtube_playlist_items.json")
+        self._search = load_fixture("youtube_search_list.json")
+        self._videos = load_fixture("youtube_videos_list.json")
+        self._captions = load_fixture("youtube_captions_list.json")
+        self._srt = load_fixture("youtube_captions_download.srt")
+
+    def _resource(self, name: str, handlers: Dict):
+        counter = self.calls
+
+        class Resource:
+            pass
+
+        resource = Resource()
+        for method, handler in handlers.items():
+            setattr(resource, method,
+                    lambda _h=handler, _m=method, **kw: FakeRequest(_h(**kw), counter, f"{name}.{_m}"))
+        return resource
+
+    def _published(self, index: int) -> str:
+        return (self.now - timedelta(hours=index * 3 + 1)).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    # ----- 리소스 -----
+
+    def channels(self):
+        def list_(**kw):
+            response = copy.deepcopy(self._channels)
+            template = response["items"][0]
+            ids = kw.get("id", "").split(',') if kw.get("id") else [template["id"]]
+            items = []
+            for channel_id in ids:
+                item = copy.deepcopy(template)
+                item["id"] = channel_id
+                item["contentDetails"]["relatedPlaylists"]["uploads"] = "UU" + channel_id[2:]
+                items.append(item)
+            response["items"] = items
+            return response
+        return self._resource("channels", {"list": list_})
+
+    def playlistItems(self):
+        def list_(**kw):
+            response = copy.deepcopy(self._playlist)
+            template = response["items"][0]
+            playlist_id = kw.get("playlistId", "")
+            items = []
+            for i in range(kw.get("maxResults", 5)):
+                item = copy.deepcopy(template)
+                video_id = derived_video_id(playlist_id, i)
+                item["snippet"]["resourceId"]["videoId"] = video_id
+                item["snippet"]["channelId"] = item["snippet"]["videoOwnerChannelId"] = "UC" + playlist_id[2:]
+                item["snippet"]["position"] = i
+                item["contentDetails"] = {"videoId": video_id, "videoPublishedAt": self._published(i)}
+                items.append(item)
+            response["items"] = items
+            return response
+        return self._resource("playlistItems", {"list": list_})
+
+    def search(self):
+        def list_(**kw):
+            response = copy.deepcopy(self._search)
+            template = response["items"][0]
+            seed = f"{kw.get('q', '')}:{kw.get('channelId', '')}"
+            items = []
+            for i in range(kw.get("maxResults", 5)):
+                item = copy.deepcopy(template)
+                item["id"]["videoId"] = derived_video_id(seed, i)
+                item["snippet"]["publishedAt"] = item["snippet"]["publishTime"] = self._published(i)
+                if kw.get("channelId"):
+                    item["snippet"]["channelId"] = kw["channelId"]
+                items.append(item)
+            response["items"] = items
+            return response
+        return self._resource("search", {"list": list_})
+
+    def videos(self):
+        def list_(**kw):
+            response = copy.deepcopy(self._videos)
+            template = response["items"][0]
+            items = []
+            for video_id in kw.get("id", "").split(','):
+                item = copy.deepcopy(template)
+                item["id"] = video_id
+                item["snippet"]["publishedAt"] = self._published(0)
+                items.append(item)
+            response["items"] = items
+            return response
+        return self._resource("videos", {"list": list_})
+
+    def captions(self):
+        def list_(**kw):
+            response = copy.deepcopy(self._captions)
+            for item in response["items"]:
+                item["snippet"]["videoId"] = kw.get("videoId")
+            return response
+
+        def download(**kw):
+            return self._srt
+        return self._resource("captions", {"list": list_, "download": download})
+
+
+class FakeLLMClient:
+    """llm_client.chat / achat 대체 (응답 JSON fixture 재생)"""
+
+    def __init__(self):
+        self.calls = 0
+        self._text = load_fixture("openai_chat_text.json")
+        self._json = load_fixture("openai_chat_json.json")
+
+    def chat(self, **request):
+        self.calls += 1
+        wants_json = (request.get("response_format") or {}).get("type") == "json_object"
+        return copy.deepcopy(self._json if wants_json else self._text)
+
+    async def achat(self, **request):
+        return self.chat(**request)
+
+
+def fake_feedparser_parse(feedparser_module):
+    """RSS URL의 channel_id를 fixture 피드에 채워 넣어 로컬에서 파싱"""
+    template = load_fixture("rss_feed.xml")
+    original_parse = feedparser_module.parse
+
+    def parse(url, *args, **kwargs):
+        channel_id = url.split("channel_id=")[-1] if "channel_id=" in url else "UCxxxxxxxxxxxxxxxxxxxxxx"
+        body = template.replace("UCxxxxxxxxxxxxxxxxxxxxxx", channel_id)
+        body = body.replace("abcdefghijk", derived_video_id(channel_id, 0))
+        return original_parse(body)
+
+    return parse
+
+
+@contextmanager
+def offline_services(now: datetime = None):
+    """
+    YouTube API, OpenAI, RSS 호출을 fixture 재생으로 바꾸는 컨텍스트
+    :return: (FakeYouTubeService, FakeLLMClient) - 호출 수 확인용
+    """
+    import feedparser
+    import googleapiclient.discovery
+
+    import transcript_fetcher
+    from llm_client import llm_client
+
+    youtube = FakeYouTubeService(now)
+    llm = FakeLLMClient()
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(googleapiclient.discovery, "build", lambda *a, **k: youtube))
+        stack.enter_context(mock.patch.object(llm_client, "_api_key", "benchmark"))
+        stack.enter_context(mock.patch.object(llm_client, "chat", llm.chat))
+        stack.enter_context(mock.patch.object(llm_client, "achat", llm.achat))
+        stack.enter_context(mock.patch.object(feedparser, "parse", fake_feedparser_parse(feedparser)))
+        # timedtext는 실제 YouTube에 요청하므로 제외하고 디스크 캐시도 쓰지 않음
+        stack.enter_context(mock.patch.multiple(
+            transcript_fetcher.transcript_fetcher, backends=["captions_api"], cache_dir=None
+        ))
+        yield youtube, llm
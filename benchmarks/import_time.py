@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+모듈 import 시간 측정 (python -X importtime)
+각 진입점 모듈을 새 인터프리터에서 import 해서 누적 import 시간을 예산과 비교하고,
+가장 오래 걸린 하위 import를 보여줌. 예산을 넘으면 종료 코드 1
+사용법:
+  python benchmarks/import_time.py
+  python benchmarks/import_time.py --repeat 5 --output import_times.json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 모듈별 누적 import 시간 예산(ms)
+# 워커/CLI는 1초 안에 시작해야 하므로 무거운 라이브러리(httpx, googleapiclient.discovery, pandas)는 지연 로드
+IMPORT_BUDGETS_MS = {
+    "db_handler": 50,
+    "job_queue": 50,
+    "worker": 100,
+    "llm_handler": 150,
+    "youtube_handler": 250,
+    "main": 400,
+    "collect_and_summarize": 300,
+    # 워커/WebSub 수신에서도 import 하므로 streamlit은 화면에 표시할 때만 로드
+    "rss_collector": 250,
+    # streamlit 자체 import가 대부분을 차지
+    "app": 1500,
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str, workdir: str) -> Dict:
+    """
+    새 인터프리터에서 모듈 하나를 import 하고 -X importtime 출력을 분석합니다.
+    :return: {'cumulative_ms', 'wall_ms', 'imports': [(이름, self_ms, cumulative_ms, 깊이)]}
+    """
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    imports = []
+    cumulative_ms = None
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        imports.append((name, int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+        if name == module and depth == 0:
+            cumulative_ms = int(cumulative_us) / 1000
+
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ["import 실패"])[-1]
+
+    return {"cumulative_ms": cumulative_ms, "wall_ms": wall_ms, "imports": imports, "error": error}
+
+
+def slowest_imports(imports: List[tuple], top: int) -> List[Dict]:
+    """프로젝트 모듈 바로 아래에서 import 된 것 중 누적 시간이 긴 순서"""
+    direct = [item for item in imports if item[3] == 1]
+    direct.sort(key=lambda item: item[2], reverse=True)
+    return [{"module": name, "cumulative_ms": round(cum, 2)} for name, _, cum, _ in direct[:top]]
+
+
+def main():
+    """import 시간 측정 실행 함수"""
+    parser = argparse.ArgumentParser(description="진입점 모듈 import 시간 측정")
+    parser.add_argument("--modules", nargs="+", default=list(IMPORT_BUDGETS_MS), help="측정할 모듈")
+    parser.add_argument("--repeat", type=int, default=3, help="모듈당 측정 횟수 (최솟값 사용)")
+    parser.add_argument("--top", type=int, default=5, help="표시할 느린 하위 import 수")
+    parser.add_argument("--output", help="결과 JSON 경로")
+    args = parser.parse_args()
+
+    results = {}
+    over_budget = []
+    # import 중 파일을 만드는 모듈이 있어도 저장소를 건드리지 않도록 빈 작업 디렉터리에서 실행
+    with tempfile.TemporaryDirectory(prefix="yt_news_import_") as workdir:
+        for module in args.modules:
+            runs = [measure_import(module, workdir) for _ in range(args.repeat)]
+            best = min(runs, key=lambda r: r["cumulative_ms"] if r["cumulative_ms"] is not None else float("inf"))
+            budget = IMPORT_BUDGETS_MS.get(module)
+            created = sorted(os.listdir(workdir))
+
+            results[module] = {
+                "cumulative_ms": best["cumulative_ms"],
+                "wall_ms": round(min(r["wall_ms"] for r in runs), 2),
+                "budget_ms": budget,
+                "slowest": slowest_imports(best["imports"], args.top),
+                "files_created": created,
+                "error": best["error"],
+            }
+
+            if best["error"]:
+                status = f"❌ 오류: {best['error']}"
+                over_budget.append(module)
+            elif budget is not None and best["cumulative_ms"] > budget:
+                status = f"❌ 예산 초과 ({budget} ms)"
+                over_budget.append(module)
+            else:
+                status = "✅"
+            cumulative = f"{best['cumulative_ms']:.1f}" if best["cumulative_ms"] is not None else "-"
+            print(f"{module:<24} {cumulative:>9} ms (프로세스 {results[module]['wall_ms']:.0f} ms) {status}")
+            for item in results[module]["slowest"]:
+                print(f"    {item['module']:<32} {item['cumulative_ms']:>9.1f} ms")
+            if created:
+                print(f"    ⚠️ import 중 생성된 파일: {', '.join(created)}")
+                for name in created:
+                    path = os.path.join(workdir, name)
+                    if os.path.isfile(path):
+                        os.remove(path)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+    if over_budget:
+        print(f"\n예산 초과: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+OpenAI 호환 로컬 스텁 서버 (결정적 응답)
+POST /v1/chat/completions 요청의 메시지 해시로 항상 같은 응답을 만들어 돌려줌
+(response_format이 json_object이면 fixtures/openai_chat_json.json의 본문, 아니면 텍스트 fixture 본문 + 요청 해시)
+stream=true 요청은 같은 본문을 SSE 조각으로 나눠 보내고, stream_options.include_usage면 마지막에 usage 이벤트를 보냄
+LLM_PROVIDER=stub으로 실제 분석 경로를 네트워크 없이 실행하거나, --load-test로 한 이벤트 루프에서
+여러 영상의 분석을 동시에 수행하며 처리량을 측정
+사용법:
+  python benchmarks/llm_stub_server.py --port 8765                                  # 서버만 실행
+  LLM_PROVIDER=stub python main.py ...                                               # 다른 터미널에서
+  python benchmarks/llm_stub_server.py --load-test 50 --concurrency 20 --latency 0.2  # 부하 테스트
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from fakes import load_fixture
+
+DEFAULT_PORT = 8765
+
+# 스트리밍 응답 조각 크기(글자 수)
+STREAM_PIECE_CHARS = 4
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 3)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (클라이언트 연결 풀 재사용 확인용)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, request: Dict, completion_id: str, content: str, usage: Dict):
+        """SSE(chunked) 응답 - 조각 사이에 server.token_interval만큼 기다림"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_event(data: str):
+            payload = f"data: {data}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(payload):x}\r\n".encode('ascii') + payload + b"\r\n")
+            self.wfile.flush()
+
+        base = {"id": completion_id, "object": "chat.completion.chunk", "created": 0,
+                "model": request.get("model", "stub")}
+        pieces = [content[i:i + STREAM_PIECE_CHARS] for i in range(0, len(content), STREAM_PIECE_CHARS)]
+        for index, piece in enumerate(pieces):
+            if index and self.server.token_interval:
+                time.sleep(self.server.token_interval)
+            send_event(json.dumps(dict(base, choices=[{"index": 0, "delta": {"content": piece}, "finish_reason": None}]),
+                                  ensure_ascii=False))
+        send_event(json.dumps(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            send_event(json.dumps(dict(base, choices=[], usage=usage)))
+        send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip('/').endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"지원하지 않는 경로: {self.path}"}})
+            return
+        if not request.get("messages"):
+            self._send_json(400, {"error": {"message": "messages가 없습니다."}})
+            return
+
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+        digest = hashlib.sha256(json.dumps(request["messages"], ensure_ascii=False, sort_keys=True)
+                                .encode('utf-8')).hexdigest()
+        wants_json = (request.get("response_format") or {}).get("type") == "json_object"
+        template = server.json_response if wants_json else server.text_response
+        content = template["choices"][0]["message"]["content"]
+        if not wants_json:
+            content = f"{content}\n\n(stub {digest[:12]})"
+
+        prompt_tokens = sum(_approx_tokens(message.get("content") or "") for message in request["messages"])
+        completion_tokens = _approx_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        completion_id = f"chatcmpl-stub-{digest[:24]}"
+        if request.get("stream"):
+            self._send_stream(request, completion_id, content, usage)
+            return
+        self._send_json(200, {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": 0,
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+
+def make_server(port: int = DEFAULT_PORT, latency: float = 0.0, token_interval: float = 0.0) -> ThreadingHTTPServer:
+    """
+    스텁 서버 생성 (port=0이면 빈 포트 사용)
+    :param latency: 요청마다 응답 전에 기다리는 시간(초) - 실제 API 지연 흉내 (스트리밍이면 첫 토큰까지)
+    :param token_interval: 스트리밍 조각 사이 간격(초)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.token_interval = token_interval
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.text_response = load_fixture("openai_chat_text.json")
+    server.json_response = load_fixture("openai_chat_json.json")
+    return server
+
+
+def serve_in_thread(port: int = 0, latency: float = 0.0, token_interval: float = 0.0) -> ThreadingHTTPServer:
+    """백그라운드 스레드에서 스텁 서버 실행 (server.server_address[1]이 실제 포트, 끝나면 server.shutdown())"""
+    server = make_server(port, latency, token_interval)
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server
+
+
+def base_url_of(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+# ----- 부하 테스트 -----
+
+def _make_videos(count: int, transcript_length: int, seed: int) -> List[Dict]:
+    from synthetic_corpus import make_transcript
+
+    rng = random.Random(seed)
+    return [{'video_id': f"stub{i:07d}", 'title': f"부하 테스트 영상 {i + 1}",
+             'transcript': make_transcript(rng, transcript_length)} for i in range(count)]
+
+
+async def _analyze_all(videos: List[Dict], concurrency: int, analysis_types: List[str]) -> Dict[str, int]:
+    import llm_handler
+    from llm_client import llm_client
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = {}
+
+    async def analyze(video, analysis_type):
+        async with semaphore:
+            transcript = video['transcript']
+            if analysis_type == "economic_insights":
+                result = await llm_handler.aanalyze_transcript_for_economic_insights(
+                    transcript, video['video_id'], video['title'])
+            elif analysis_type == "detailed_summary":
+                result = await llm_handler.acreate_detailed_video_summary(
+                    transcript, video['video_id'], video['title'], f"https://www.youtube.com/watch?v={video['video_id']}")
+            elif analysis_type == "summary":
+                result = await llm_handler.asummarize_transcript(transcript)
+            else:
+                result = await llm_handler.aanalyze_transcript_with_type(transcript, analysis_type)
+            # 청크나 통합 요청이 실패해도 분석 함수는 대체 결과를 돌려주므로 본문으로 확인
+            if not result or (isinstance(result, str) and ("오류가 발생했습니다" in result or "실패:" in result)):
+                failures[analysis_type] = failures.get(analysis_type, 0) + 1
+
+    try:
+        await asyncio.gather(*(analyze(video, analysis_type)
+                               for video in videos for analysis_type in analysis_types))
+    finally:
+        await llm_client.aclose()
+    return failures
+
+
+def load_test(videos: int, concurrency: int, latency: float, analysis_types: List[str],
+              transcript_length: int = 30000, seed: int = 42) -> Dict:
+    """
+    스텁 서버를 띄우고 영상 여러 개의 분석을 한 이벤트 루프에서 동시에 실행
+    청크 결과 캐시와 LLM 사용량 기록은 임시 DB를 사용 (운영 DB와 이전 실행 결과에 영향받지 않음)
+    :return: 요청 수, 소요 시간, 처리량, 실패 수
+    """
+    server = serve_in_thread(0, latency)
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_BASE_URL"] = base_url_of(server)
+
+    from chunk_result_cache import chunk_result_cache
+    from cost_governor import cost_governor
+
+    workdir = tempfile.mkdtemp(prefix="llm_load_")
+    for store in (chunk_result_cache, cost_governor):
+        store.db_path = os.path.join(workdir, "llm_load.db")
+        store._initialized = False
+    try:
+        corpus = _make_videos(videos, transcript_length, seed)
+        started = time.perf_counter()
+        # 분석 함수의 진행 출력은 숨김
+        with contextlib.redirect_stdout(io.StringIO()):
+            failures = asyncio.run(_analyze_all(corpus, concurrency, analysis_types))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        server.server_close()
+        for name in os.listdir(workdir):
+            os.remove(os.path.join(workdir, name))
+        os.rmdir(workdir)
+
+    return {
+        'analyses': videos * len(analysis_types),
+        'requests': server.requests,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(server.requests / elapsed, 1) if elapsed else None,
+        'failures': failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 스텁 서버 / 동시 분석 부하 테스트")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="서버 포트")
+    parser.add_argument("--latency", type=float, default=0.0, help="요청당 응답 지연(초, 스트리밍이면 첫 토큰까지)")
+    parser.add_argument("--token-interval", type=float, default=0.0, help="스트리밍 조각 사이 간격(초)")
+    parser.add_argument("--load-test", type=int, metavar="N", help="영상 N개를 동시에 분석하는 부하 테스트 실행")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시에 진행할 분석 수 (부하 테스트)")
+    parser.add_argument("--types", nargs="+",
+                        default=["summary", "analysis_economic", "economic_insights", "detailed_summary"],
+                        help="분석 유형 (부하 테스트)")
+    parser.add_argument("--transcript-length", type=int, default=30000, help="영상당 자막 글자 수 (부하 테스트)")
+    args = parser.parse_args()
+
+    if args.load_test:
+        print(f"🚀 부하 테스트: 영상 {args.load_test}개 × {len(args.types)}개 분석, 동시 {args.concurrency}개, "
+              f"지연 {args.latency}초")
+        result = load_test(args.load_test, args.concurrency, args.latency, args.types, args.transcript_length)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+
+    server = make_server(args.port, args.latency, args.token_interval)
+    print(f"🤖 LLM 스텁 서버 실행 중: {base_url_of(server)} (LLM_PROVIDER=stub, 종료: Ctrl+C)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+오프라인 성능 벤치마크
+합성 DB와 fixture 재생(YouTube/RSS/OpenAI)으로 주요 경로의 실행 시간을 측정하고 JSON으로 저장
+사용법:
+  python benchmarks/run_benchmarks.py --output before.json
+  python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_corpus import add_corpus_arguments, generate_corpus, STOCKS, SUBJECTS
+
+# 이름 → (준비 함수, 매 반복 전에 DB를 원본으로 되돌릴지)
+# 준비 함수는 측정할 함수(인자 없음)를 반환하며, 준비 시간은 측정에 포함되지 않음
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, mutates_db: bool = False):
+    """벤치마크 등록 데코레이터"""
+    def decorator(prepare):
+        BENCHMARKS[name] = (prepare, mutates_db)
+        return prepare
+    return decorator
+
+
+class BenchContext:
+    """벤치마크 실행 환경 (작업 디렉터리, 합성 DB, 코퍼스 정보)"""
+
+    def __init__(self, workdir: str, db_path: str, pristine_path: str, corpus: Dict, e2e_channels: int):
+        self.workdir = workdir
+        self.db_path = db_path
+        self.pristine_path = pristine_path
+        self.corpus = corpus
+        self.e2e_channels = e2e_channels
+
+    def restore_db(self):
+        """변경을 일으키는 벤치마크 전에 원본 DB로 되돌림"""
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+        shutil.copyfile(self.pristine_path, self.db_path)
+        # 원본 DB에는 앞선 벤치마크에서 전역 인스턴스가 만든 테이블이 없으므로 다음 사용 때 다시 만들게 함
+        for module_name, instance_name in LAZY_SCHEMA_SINGLETONS:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                getattr(module, instance_name)._initialized = False
+        if "db_handler" in sys.modules:
+            sys.modules["db_handler"]._schema_checked.clear()
+
+
+# 테이블을 처음 쓸 때 한 번만 만드는 전역 인스턴스 (모듈 이름, 인스턴스 이름)
+LAZY_SCHEMA_SINGLETONS = [
+    ("channel_resolver", "channel_resolver"),
+    ("quota_ledger", "quota_ledger"),
+    ("cost_governor", "cost_governor"),
+    ("pending_transcripts", "pending_transcripts"),
+    ("chunk_result_cache", "chunk_result_cache"),
+]
+
+
+# ----- 벤치마크 -----
+
+@benchmark("generate_report")
+def bench_generate_report(ctx: BenchContext) -> Callable:
+    import db_handler
+    return lambda: db_handler.generate_report(hours=24 * 7)
+
+
+@benchmark("search_videos_by_keyword")
+def bench_search_videos_by_keyword(ctx: BenchContext) -> Callable:
+    import db_handler
+    return lambda: db_handler.search_videos_by_keyword(SUBJECTS[0], limit=50)
+
+
+@benchmark("youtube_search_videos_by_keyword")
+def bench_youtube_search(ctx: BenchContext) -> Callable:
+    from youtube_handler import search_videos_by_keyword
+    return lambda: search_videos_by_keyword(SUBJECTS[1], object(), max_results=50)
+
+
+@benchmark("get_latest_videos_by_stock")
+def bench_latest_videos_by_stock(ctx: BenchContext) -> Callable:
+    import db_handler
+    return lambda: db_handler.get_latest_videos_by_stock(STOCKS[0][0], hours=168, limit=10)
+
+
+@benchmark("fetch_channel_rss")
+def bench_fetch_channel_rss(ctx: BenchContext) -> Callable:
+    from rss_collector import YouTubeRSSCollector
+    collector = YouTubeRSSCollector(ctx.db_path)
+    channel_ids = ctx.corpus["channel_ids"]
+
+    def run():
+        for channel_id in channel_ids:
+            collector.fetch_channel_rss(
+                channel_id, f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}", days_back=3650
+            )
+    return run
+
+
+@benchmark("split_text_into_chunks")
+def bench_split_text_into_chunks(ctx: BenchContext) -> Callable:
+    import sqlite3
+    from llm_handler import split_text_into_chunks
+
+    conn = sqlite3.connect(ctx.db_path)
+    transcript = conn.execute("SELECT transcript FROM videos ORDER BY length(transcript) DESC LIMIT 1").fetchone()[0]
+    conn.close()
+    # 긴 영상(약 1시간 분량)에 해당하도록 늘림
+    text = (transcript + ' ') * max(1, 60000 // max(len(transcript), 1))
+    return lambda: split_text_into_chunks(text, max_tokens=8000)
+
+
+@benchmark("sync_with_main_db", mutates_db=True)
+def bench_sync_with_main_db(ctx: BenchContext) -> Callable:
+    from rss_collector import YouTubeRSSCollector
+    collector = YouTubeRSSCollector(ctx.db_path)
+    return collector.sync_with_main_db
+
+
+@benchmark("collect_data", mutates_db=True)
+def bench_collect_data(ctx: BenchContext) -> Callable:
+    import main
+
+    config = {
+        "channels": [f"https://www.youtube.com/channel/{cid}" for cid in ctx.corpus["channel_ids"][:ctx.e2e_channels]],
+        "keywords": SUBJECTS[:2],
+        "schedule_interval": 24,
+        "last_run": None,
+    }
+
+    def run():
+        with open(main.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False)
+        main.collect_data(["summary"], credentials=object())
+    return run
+
+
+# ----- 실행 -----
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+def time_benchmark(name: str, ctx: BenchContext, repeat: int, warmup: int) -> Dict:
+    """준비 → (워밍업) → repeat회 측정"""
+    prepare, mutates_db = BENCHMARKS[name]
+    if mutates_db:
+        ctx.restore_db()
+    fn = prepare(ctx)
+
+    samples = []
+    for i in range(warmup + repeat):
+        if mutates_db:
+            ctx.restore_db()
+        # 출력은 버리되 출력 포맷팅 비용은 측정에 포함
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+        if i >= warmup:
+            samples.append(elapsed)
+
+    return {
+        "runs": len(samples),
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "max": max(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "samples": samples,
+    }
+
+
+def print_results(results: Dict[str, Dict], baseline: Dict = None):
+    """결과 표 출력 (baseline이 있으면 중앙값 비교)"""
+    base = (baseline or {}).get("results", {})
+    width = max(len(name) for name in results)
+    header = f"{'벤치마크':<{width}} {'중앙값(ms)':>12} {'최소(ms)':>10} {'최대(ms)':>10}"
+    if base:
+        header += f" {'기준(ms)':>10} {'변화':>8}"
+    print("\n" + header)
+    for name, r in results.items():
+        line = f"{name:<{width}} {r['median'] * 1000:>12.2f} {r['min'] * 1000:>10.2f} {r['max'] * 1000:>10.2f}"
+        if name in base:
+            before = base[name]["median"]
+            line += f" {before * 1000:>10.2f} {(r['median'] / before - 1) * 100 if before else 0:>+7.1f}%"
+        print(line)
+
+
+def main():
+    """벤치마크 실행 함수"""
+    parser = argparse.ArgumentParser(description="YouTube 뉴스 파이프라인 오프라인 벤치마크")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="벤치마크당 측정 횟수")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 워밍업 횟수")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="실행할 벤치마크만 지정")
+    parser.add_argument("--e2e-channels", type=int, default=5, help="collect_data에서 수집할 채널 수")
+    parser.add_argument("--output", default="benchmark_results.json", help="결과 JSON 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--keep-workdir", action="store_true", help="작업 디렉터리(합성 DB) 유지")
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    # 상대 경로를 쓰는 모듈(할당량 장부, 실행 추적 등)이 작업 디렉터리의 DB를 쓰도록 먼저 이동
+    workdir = tempfile.mkdtemp(prefix="yt_news_bench_")
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+    logging.disable(logging.INFO)
+
+    try:
+        db_path = os.path.join(workdir, "youtube_news.db")
+        pristine_path = os.path.join(workdir, "pristine.db")
+        print(f"🧪 합성 DB 생성 중... ({workdir})")
+        with contextlib.redirect_stdout(io.StringIO()):
+            corpus = generate_corpus(
+                pristine_path,
+                channels=args.channels,
+                videos_per_channel=args.videos_per_channel,
+                transcript_chars=args.transcript_chars,
+                news=args.news,
+                rss_videos_per_channel=args.rss_videos_per_channel,
+                days=args.days,
+                seed=args.seed,
+            )
+        print(f"   {corpus['counts']} ({corpus['size_bytes'] / 1024 / 1024:.1f} MB)")
+
+        ctx = BenchContext(workdir, db_path, pristine_path, corpus, args.e2e_channels)
+        ctx.restore_db()
+
+        import db_handler
+        db_handler.DB_PATH = db_path
+
+        from fakes import offline_services
+
+        results = {}
+        with offline_services() as (youtube, llm):
+            for name in args.only or list(BENCHMARKS):
+                print(f"⏱️ {name} ...", end=" ", flush=True)
+                results[name] = time_benchmark(name, ctx, args.repeat, args.warmup)
+                print(f"{results[name]['median'] * 1000:.2f} ms")
+            fake_calls = {"youtube": dict(youtube.calls), "openai": llm.calls}
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "warmup": args.warmup,
+                "e2e_channels": args.e2e_channels,
+                "corpus": corpus["params"],
+                "corpus_counts": corpus["counts"],
+                "fake_calls": fake_calls,
+            },
+            "results": results,
+        }
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print_results(results, baseline)
+        print(f"\n💾 결과 저장: {output_path}")
+    finally:
+        os.chdir(original_cwd)
+        if args.keep_workdir:
+            print(f"📁 작업 디렉터리 유지: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+벤치마크용 합성 데이터베이스 생성기
+채널, 비디오(한국어 형태의 자막), 요약, 상세 분석, 뉴스, RSS 비디오를 지정한 규모로 생성
+같은 seed로 생성하면 항상 같은 데이터가 만들어짐
+사용법: python benchmarks/synthetic_corpus.py --db /tmp/bench.db --channels 20 --videos-per-channel 50
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 자막 문장 재료
+SUBJECTS = [
+    "코스피", "코스닥", "나스닥", "미국 국채 금리", "원 달러 환율", "국제 유가", "반도체 업종", "2차전지 업종",
+    "외국인 투자자", "기관 투자자", "개인 투자자", "연준", "한국은행", "소비자물가", "고용 지표", "수출 실적",
+]
+PREDICATES = [
+    "상승 마감했습니다", "하락 출발했습니다", "보합권에서 움직였습니다", "시장 예상치를 웃돌았습니다",
+    "변동성이 커지고 있습니다", "강한 매수세를 보였습니다", "차익 실현 매물이 나왔습니다",
+    "금리 인하 기대감을 키웠습니다", "경기 둔화 우려를 반영했습니다", "반등에 성공했습니다",
+]
+CONNECTIVES = ["오늘", "이번 주", "최근", "지난달", "장 초반", "장 막판", "그런데", "한편", "결국", "특히"]
+FILLERS = ["그러니까", "사실", "여러분", "자 그러면", "보시면", "말씀드린 것처럼", "중요한 건", "정리하면"]
+
+# 종목 (회사명, 티커, 영문명)
+STOCKS = [
+    ("삼성전자", "005930", "Samsung Electronics"),
+    ("SK하이닉스", "000660", "SK hynix"),
+    ("현대차", "005380", "Hyundai Motor"),
+    ("NAVER", "035420", "Naver"),
+    ("카카오", "035720", "Kakao"),
+    ("LG에너지솔루션", "373220", "LG Energy Solution"),
+    ("엔비디아", "NVDA", "NVIDIA"),
+    ("애플", "AAPL", "Apple"),
+    ("테슬라", "TSLA", "Tesla"),
+    ("마이크로소프트", "MSFT", "Microsoft"),
+]
+
+CORPUS_DEFAULTS = {
+    "channels": 20,
+    "videos_per_channel": 50,
+    "transcript_chars": 8000,
+    "news": 100,
+    "rss_videos_per_channel": 15,
+    "days": 30,
+    "seed": 42,
+}
+
+
+def make_video_id(rng: random.Random) -> str:
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    return ''.join(rng.choice(alphabet) for _ in range(11))
+
+
+def make_channel_id(rng: random.Random) -> str:
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    return "UC" + ''.join(rng.choice(alphabet) for _ in range(22))
+
+
+def make_sentence(rng: random.Random) -> str:
+    """경제 방송 자막 형태의 한국어 문장 하나"""
+    parts = [rng.choice(CONNECTIVES)]
+    if rng.random() < 0.4:
+        parts.append(rng.choice(FILLERS))
+    subject = rng.choice(SUBJECTS)
+    if rng.random() < 0.3:
+        subject = rng.choice(STOCKS)[0]
+    parts.append(f"{subject}{'는' if rng.random() < 0.5 else '이'}")
+    parts.append(rng.choice(PREDICATES))
+    return ' '.join(parts)
+
+
+def make_transcript(rng: random.Random, length: int) -> str:
+    """지정한 길이(글자 수) 근처의 자막 ('. '로 문장 구분)"""
+    sentences = []
+    total = 0
+    while total < length:
+        sentence = make_sentence(rng)
+        sentences.append(sentence)
+        total += len(sentence) + 2
+    return '. '.join(sentences) + '.'
+
+
+def make_detailed_analysis(rng: random.Random, title: str, video_id: str) -> Dict:
+    """create_detailed_video_summary 결과와 같은 구조의 분석 JSON"""
+    stocks = rng.sample(STOCKS, rng.randint(1, 4))
+    return {
+        "영상_제목": title,
+        "영상_URL": f"https://www.youtube.com/watch?v={video_id}",
+        "영상_내용_종합_요약": make_transcript(rng, 400),
+        "핵심_주제_및_논점": [rng.choice(SUBJECTS) for _ in range(3)],
+        "언급된_모든_주식_종목_상세_정보": [
+            {
+                "회사명": name,
+                "티커": ticker,
+                "언급된_맥락": make_sentence(rng),
+                "전망": rng.choice(["긍정적", "중립", "부정적"]),
+            }
+            for name, ticker, _ in stocks
+        ],
+        "경제_지표_및_동향_종합_분석": make_sentence(rng),
+        "핵심_키워드": rng.sample(SUBJECTS, 5),
+        "video_id": video_id,
+    }
+
+
+@contextmanager
+def using_db(db_path: str):
+    """db_handler 함수들이 잠시 db_path를 사용하도록 전환"""
+    import db_handler
+
+    original = db_handler.DB_PATH
+    db_handler.DB_PATH = db_path
+    try:
+        yield db_handler
+    finally:
+        db_handler.DB_PATH = original
+
+
+def create_schema(db_path: str):
+    """앱과 같은 스키마 생성 (db_handler, RSS 수집기)"""
+    from rss_collector import YouTubeRSSCollector
+
+    with using_db(db_path) as db_handler:
+        db_handler.initialize_db()
+    YouTubeRSSCollector(db_path).initialize_db()
+
+
+def generate_corpus(db_path: str, channels: int = 20, videos_per_channel: int = 50,
+                    transcript_chars: int = 8000, news: int = 100, rss_videos_per_channel: int = 15,
+                    days: int = 30, seed: int = 42) -> Dict:
+    """
+    합성 데이터베이스 생성
+    :return: 생성된 규모와 벤치마크에서 사용할 채널 ID 목록
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    create_schema(db_path)
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    channel_ids = []
+    counts = {"videos": 0, "summaries": 0, "video_analysis": 0, "news": 0, "rss_videos": 0}
+
+    for c in range(channels):
+        channel_id = make_channel_id(rng)
+        channel_title = f"{rng.choice(SUBJECTS)} 채널 {c + 1}"
+        channel_ids.append(channel_id)
+
+        cursor.execute(
+            "INSERT INTO channels (channel_id, title, handle, description, created_at) VALUES (?, ?, ?, ?, ?)",
+            (channel_id, channel_title, f"@bench{c + 1}", make_sentence(rng), now.isoformat())
+        )
+        cursor.execute('''
+            INSERT INTO rss_channels (channel_id, channel_handle, title, rss_url, is_active)
+            VALUES (?, ?, ?, ?, 1)
+        ''', (channel_id, f"@bench{c + 1}", channel_title,
+              f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"))
+
+        for _ in range(videos_per_channel):
+            video_id = make_video_id(rng)
+            published = now - timedelta(seconds=rng.randint(0, days * 86400))
+            created = published + timedelta(minutes=rng.randint(5, 600))
+            title = f"{make_sentence(rng)[:40]} | {channel_title}"
+            transcript = make_transcript(rng, int(transcript_chars * rng.uniform(0.5, 1.5)))
+
+            cursor.execute('''
+                INSERT INTO videos (id, title, channel_id, channel_title, published_at, duration,
+                                    view_count, transcript, url, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (video_id, title, channel_id, channel_title, published.isoformat(),
+                  f"PT{rng.randint(5, 40)}M{rng.randint(0, 59)}S", rng.randint(100, 500000), transcript,
+                  f"https://www.youtube.com/watch?v={video_id}", created.isoformat()))
+            counts["videos"] += 1
+
+            for summary_type in ("summary", "analysis_economic"):
+                if summary_type != "summary" and rng.random() < 0.5:
+                    continue
+                cursor.execute('''
+                    INSERT INTO summaries (video_id, summary_type, content, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (video_id, summary_type, make_transcript(rng, 1200), created.isoformat()))
+                counts["summaries"] += 1
+
+            if rng.random() < 0.8:
+                cursor.execute('''
+                    INSERT INTO video_analysis (video_id, video_title, video_url, analysis_type, analysis_data, created_at)
+                    VALUES (?, ?, ?, 'economic', ?, ?)
+                ''', (video_id, title, f"https://www.youtube.com/watch?v={video_id}",
+                      json.dumps(make_detailed_analysis(rng, title, video_id), ensure_ascii=False),
+                      created.isoformat()))
+                counts["video_analysis"] += 1
+
+        # 메인 DB에 아직 동기화되지 않은 RSS 비디오
+        for _ in range(rss_videos_per_channel):
+            video_id = make_video_id(rng)
+            published = now - timedelta(seconds=rng.randint(0, 7 * 86400))
+            cursor.execute('''
+                INSERT INTO rss_videos (video_id, channel_id, title, description, published_at,
+                                        thumbnail_url, video_url, duration)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (video_id, channel_id, make_sentence(rng)[:60], make_transcript(rng, 300),
+                  published.replace(tzinfo=None).isoformat(), f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                  f"https://www.youtube.com/watch?v={video_id}", ""))
+            counts["rss_videos"] += 1
+
+    for n in range(news):
+        created = now - timedelta(seconds=rng.randint(0, days * 86400))
+        cursor.execute('''
+            INSERT INTO news (title, content, news_type, created_at, video_ids, style, word_count, language, keywords)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (f"[사설] {make_sentence(rng)[:30]}", make_transcript(rng, 3000),
+              rng.choice(["editorial", "economic"]), created.isoformat(), json.dumps([]),
+              rng.choice(["basic", "editorial", "news"]), 1000, "ko",
+              json.dumps(rng.sample(SUBJECTS, 3), ensure_ascii=False)))
+        counts["news"] += 1
+
+    conn.commit()
+    conn.close()
+
+    # 분석 저장 시점과 같은 방식으로 주식 종목 언급 색인 생성
+    with using_db(db_path) as db_handler:
+        counts["stock_mentions"] = db_handler.rebuild_stock_mentions()
+
+    return {
+        "params": {
+            "channels": channels,
+            "videos_per_channel": videos_per_channel,
+            "transcript_chars": transcript_chars,
+            "news": news,
+            "rss_videos_per_channel": rss_videos_per_channel,
+            "days": days,
+            "seed": seed,
+        },
+        "counts": counts,
+        "channel_ids": channel_ids,
+        "size_bytes": os.path.getsize(db_path),
+    }
+
+
+def add_corpus_arguments(parser: argparse.ArgumentParser):
+    """코퍼스 규모 인자 (run_benchmarks.py와 공유)"""
+    parser.add_argument("--channels", type=int, default=CORPUS_DEFAULTS["channels"], help="채널 수")
+    parser.add_argument("--videos-per-channel", type=int, default=CORPUS_DEFAULTS["videos_per_channel"],
+                        help="채널당 비디오 수")
+    parser.add_argument("--transcript-chars", type=int, default=CORPUS_DEFAULTS["transcript_chars"],
+                        help="평균 자막 길이(글자)")
+    parser.add_argument("--news", type=int, default=CORPUS_DEFAULTS["news"], help="뉴스/사설 수")
+    parser.add_argument("--rss-videos-per-channel", type=int, default=CORPUS_DEFAULTS["rss_videos_per_channel"],
+                        help="채널당 동기화 대기 RSS 비디오 수")
+    parser.add_argument("--days", type=int, default=CORPUS_DEFAULTS["days"], help="발행일 분포 기간(일)")
+    parser.add_argument("--seed", type=int, default=CORPUS_DEFAULTS["seed"], help="난수 seed")
+
+
+def main():
+    """합성 DB 생성 CLI"""
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 데이터베이스 생성")
+    parser.add_argument("--db", required=True, help="생성할 데이터베이스 경로 (기존 파일은 덮어씀)")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    info = generate_corpus(
+        args.db,
+        channels=args.channels,
+        videos_per_channel=args.videos_per_channel,
+        transcript_chars=args.transcript_chars,
+        news=args.news,
+        rss_videos_per_channel=args.rss_videos_per_channel,
+        days=args.days,
+        seed=args.seed,
+    )
+    print(f"✅ 합성 DB 생성 완료: {args.db} ({info['size_bytes'] / 1024 / 1024:.1f} MB)")
+    for table, count in info["counts"].items():
+        print(f"  - {table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+자막 정규화
+SRT/VTT 자막을 한 줄씩 읽어 번호·타임스탬프·태그를 지우고, 자동 생성 자막에서
+다음 큐마다 반복되는 이전 줄(롤링 자막)을 제거해 깨끗한 본문을 만듦
+본문의 각 구간이 시작하는 위치는 (시작 ms, 본문 오프셋) 배열로 함께 보관해
+시간 표시 인용과 구간 경계를 고려한 청크 분할에 사용
+"""
+
+import html
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# 00:01:02,345 --> 00:01:04,000 (SRT) / 01:02.345 --> 01:04.000 align:start (VTT)
+TIMING_RE = re.compile(
+    r'^\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{1,3})'
+)
+TAG_RE = re.compile(r'<[^>]*>')
+# [음악], [박수], ♪ 처럼 말이 아닌 표시
+NON_SPEECH_RE = re.compile(r'\[[^\]]*\]|[♪♫]')
+
+# VTT 파일에서 큐가 아닌 블록
+VTT_BLOCKS = ("WEBVTT", "NOTE", "STYLE", "REGION")
+
+# 롤링 자막 중복을 찾을 때 비교하는 최근 단어 수
+OVERLAP_WINDOW = 64
+
+# 세그먼트 색인 직렬화 형식 (개수 + 시작 ms 배열 + 오프셋 배열, 리틀 엔디언 uint32)
+_INDEX_HEADER = struct.Struct('<I')
+
+
+def parse_timestamp(value: str) -> int:
+    """'HH:MM:SS,mmm' 또는 'MM:SS.mmm'을 밀리초로 변환"""
+    clock, _, millis = value.replace(',', '.').partition('.')
+    seconds = 0
+    for part in clock.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds * 1000 + int(millis.ljust(3, '0')[:3] or 0)
+
+
+def format_timestamp(ms: int) -> str:
+    """인용용 시간 표시 (1시간 미만은 MM:SS, 이상은 H:MM:SS)"""
+    seconds = ms // 1000
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+def is_caption_format(text: str) -> bool:
+    """SRT/VTT 형식 자막인지 (처음 몇 줄에 타임스탬프 줄이 있는지)"""
+    if not text:
+        return False
+    head = text.lstrip('﻿')[:2000]
+    return head.startswith("WEBVTT") or any(TIMING_RE.match(line) for line in head.splitlines()[:20])
+
+
+def clean_caption_line(line: str) -> str:
+    """태그·HTML 엔티티·말이 아닌 표시를 지운 한 줄"""
+    line = NON_SPEECH_RE.sub(' ', html.unescape(TAG_RE.sub('', line)))
+    return ' '.join(line.split())
+
+
+def _iter_lines(source: Union[str, bytes, Iterable[str]]) -> Iterator[str]:
+    if isinstance(source, bytes):
+        source = source.decode('utf-8', errors='replace')
+    if isinstance(source, str):
+        source = source.splitlines()
+    for line in source:
+        yield line.rstrip('\r\n').lstrip('﻿')
+
+
+def iter_cues(source: Union[str, bytes, Iterable[str]]) -> Iterator[Tuple[int, int, str]]:
+    """
+    SRT/VTT 자막을 한 줄씩 읽어 큐 단위로 반환 (파일 객체도 전체를 읽지 않고 처리)
+    :return: (시작 ms, 끝 ms, 정리된 텍스트) 반복자
+    """
+    timing = None
+    texts: List[str] = []
+    skip_block = False
+    # 큐 본문 안의 숫자만 있는 줄은 빈 줄 없이 시작한 다음 큐 번호일 수 있어 한 줄 보류
+    held = None
+
+    for line in _iter_lines(source):
+        # 큐는 완전히 빈 줄에서 끝남 (YouTube VTT는 큐 안에 공백만 있는 줄을 넣음)
+        if not line:
+            if held:
+                texts.append(held)
+            if timing and texts:
+                yield timing[0], timing[1], ' '.join(texts)
+            timing, texts, skip_block, held = None, [], False, None
+            continue
+        if skip_block:
+            continue
+
+        match = TIMING_RE.match(line)
+        if match:
+            # 빈 줄 없이 다음 큐가 시작되는 경우 (보류한 줄은 큐 번호)
+            if timing and texts:
+                yield timing[0], timing[1], ' '.join(texts)
+            timing, texts, held = (parse_timestamp(match.group(1)), parse_timestamp(match.group(2))), [], None
+        elif timing is None:
+            # 큐 번호/식별자는 무시하고 헤더·주석·스타일 블록은 통째로 건너뜀
+            if line.split(' ', 1)[0] in VTT_BLOCKS:
+                skip_block = True
+        else:
+            if held:
+                texts.append(held)
+                held = None
+            cleaned = clean_caption_line(line)
+            if cleaned.isdigit():
+                held = cleaned
+            elif cleaned:
+                texts.append(cleaned)
+
+    if held:
+        texts.append(held)
+    if timing and texts:
+        yield timing[0], timing[1], ' '.join(texts)
+
+
+class NormalizedTranscript:
+    """정리된 자막 본문과 세그먼트 색인 (시작 ms, 본문 오프셋)"""
+
+    __slots__ = ('text', 'starts', 'offsets')
+
+    def __init__(self, text: str = '', starts: Iterable[int] = (), offsets: Iterable[int] = ()):
+        self.text = text
+        self.starts = array('I', starts)
+        self.offsets = array('I', offsets)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def segment_at(self, offset: int) -> int:
+        """본문 오프셋이 속한 세그먼트 번호 (색인이 없으면 -1)"""
+        return bisect_right(self.offsets, offset) - 1
+
+    def time_at(self, offset: int) -> Optional[int]:
+        """본문 오프셋이 말해진 시각 (ms, 색인이 없으면 None)"""
+        index = self.segment_at(offset)
+        return self.starts[index] if index >= 0 else None
+
+    def segment_end(self, index: int) -> int:
+        """세그먼트의 본문 끝 오프셋"""
+        return self.offsets[index + 1] if index + 1 < len(self.offsets) else len(self.text)
+
+    def segments(self) -> Iterator[Tuple[int, str]]:
+        """(시작 ms, 세그먼트 텍스트) 반복자"""
+        for index, start in enumerate(self.starts):
+            yield start, self.text[self.offsets[index]:self.segment_end(index)].strip()
+
+    def to_bytes(self) -> bytes:
+        """세그먼트 색인 직렬화 (DB BLOB 저장용)"""
+        starts, offsets = array('I', self.starts), array('I', self.offsets)
+        if sys.byteorder == 'big':
+            starts.byteswap()
+            offsets.byteswap()
+        return _INDEX_HEADER.pack(len(offsets)) + starts.tobytes() + offsets.tobytes()
+
+    @classmethod
+    def from_bytes(cls, text: str, data: Optional[bytes]) -> 'NormalizedTranscript':
+        """저장된 본문과 색인 BLOB으로 복원 (색인이 없으면 본문만)"""
+        transcript = cls(text or '')
+        if not data:
+            return transcript
+        count = _INDEX_HEADER.unpack_from(data)[0]
+        size = _INDEX_HEADER.size
+        width = transcript.starts.itemsize * count
+        transcript.starts.frombytes(data[size:size + width])
+        transcript.offsets.frombytes(data[size + width:size + 2 * width])
+        if sys.byteorder == 'big':
+            transcript.starts.byteswap()
+            transcript.offsets.byteswap()
+        return transcript
+
+
+def normalize_cues(cues: Iterable[Tuple[int, int, str]]) -> NormalizedTranscript:
+    """
+    큐 목록을 하나의 본문으로 합침
+    각 큐의 앞부분이 직전까지의 본문 끝과 겹치면(롤링 자막, 반복 큐) 겹친 단어는 버리고 새 단어만 붙임
+    """
+    parts: List[str] = []
+    starts = array('I')
+    offsets = array('I')
+    recent = deque(maxlen=OVERLAP_WINDOW)
+    length = 0
+
+    for start_ms, _, text in cues:
+        words = text.split()
+        overlap = 0
+        recent_words = list(recent)
+        for size in range(min(len(recent_words), len(words)), 0, -1):
+            if recent_words[-size:] == words[:size]:
+                overlap = size
+                break
+        new_words = words[overlap:]
+        if not new_words:
+            continue
+
+        piece = ' '.join(new_words)
+        if parts:
+            length += 1  # 구분 공백
+        starts.append(start_ms)
+        offsets.append(length)
+        parts.append(piece)
+        length += len(piece)
+        recent.extend(new_words)
+
+    transcript = NormalizedTranscript(' '.join(parts))
+    transcript.starts, transcript.offsets = starts, offsets
+    return transcript
+
+
+def normalize_captions(source: Union[str, bytes, Iterable[str]]) -> NormalizedTranscript:
+    """
+    SRT/VTT 자막을 정규화 (이미 일반 텍스트면 그대로, 색인 없이 반환)
+    :param source: 자막 문자열/바이트 또는 줄 단위 반복자(파일 객체 등)
+    """
+    if isinstance(source, bytes):
+        source = source.decode('utf-8', errors='replace')
+    if isinstance(source, str) and not is_caption_format(source):
+        return NormalizedTranscript(' '.join(source.split()))
+    return normalize_cues(iter_cues(source))
+
+
+def normalize_segments(segments: Iterable[Dict]) -> NormalizedTranscript:
+    """timedtext 세그먼트({'text', 'start', 'duration'}, 초 단위)를 정규화"""
+    return normalize_cues(
+        (int(float(s['start']) * 1000), int((float(s['start']) + float(s.get('duration') or 0)) * 1000),
+         ' '.join(filter(None, (clean_caption_line(line) for line in str(s['text']).splitlines()))))
+        for s in segments
+    )
@@ -0,0 +1,386 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+채널 식별자(URL, @핸들, 사용자명, 채널 ID) → 채널 정보 변환기
+결과를 DB에 캐시하여 매 수집마다 반복되는 API 호출과 웹 스크래핑을 없앰
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# 성공 결과는 30일, 실패 결과(API가 정상 응답했지만 채널이 없는 경우)는 6시간 동안 캐시
+# API 오류(할당량 초과, 네트워크 오류)는 캐시하지 않음 - 다음 수집에서 다시 조회
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 6 * 3600
+
+# channels.list의 id 파라미터는 한 번에 최대 50개까지 허용
+MAX_IDS_PER_CALL = 50
+
+CHANNEL_ID_RE = re.compile(r'^UC[\w-]{22}$')
+
+# 스크래핑 시 하나의 정규식으로 한 번만 스캔 (canonical 링크는 <head>에 있어 가장 먼저 발견됨)
+SCRAPE_PATTERN = re.compile(
+    r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'
+    r'|"externalId":"(UC[\w-]{22})"'
+    r'|"channelId":"(UC[\w-]{22})"'
+    r'|data-channel-external-id="(UC[\w-]{22})"'
+    r'|channel_id=(UC[\w-]{22})'
+)
+SCRAPE_CHUNK_SIZE = 16 * 1024
+SCRAPE_OVERLAP = 128
+SCRAPE_MAX_BYTES = 2 * 1024 * 1024
+
+URL_PATTERNS = [
+    ('id', re.compile(r'youtube\.com/channel/(UC[\w-]{22})')),
+    ('handle', re.compile(r'youtube\.com/@([\w.-]+)')),
+    ('user', re.compile(r'youtube\.com/user/([\w.-]+)')),
+    ('custom', re.compile(r'youtube\.com/c/([\w.-]+)')),
+]
+
+
+def uploads_playlist_for(channel_id: str) -> str:
+    """채널 ID에서 업로드 재생목록 ID 계산 (UC... → UU...)"""
+    return 'UU' + channel_id[2:]
+
+
+class ChannelResolver:
+    def __init__(self, db_path: str = "youtube_news.db",
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 negative_ttl_seconds: int = DEFAULT_NEGATIVE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # 테이블은 처음 조회/저장할 때 생성 (모듈 import 시 DB를 건드리지 않음)
+        self._initialized = False
+
+    def initialize_db(self):
+        """변환 캐시 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS channel_resolver_cache (
+                identifier TEXT PRIMARY KEY,
+                channel_id TEXT,
+                uploads_playlist_id TEXT,
+                title TEXT,
+                custom_url TEXT,
+                resolved_via TEXT,
+                resolved_at TEXT,
+                expires_at TEXT
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+        self._initialized = True
+
+    def _ensure_db(self):
+        if not self._initialized:
+            self.initialize_db()
+
+    @staticmethod
+    def normalize_identifier(identifier: str) -> Optional[Tuple[str, str]]:
+        """
+        입력값을 (종류, 값) 형태로 정규화합니다.
+        종류: id, handle, user, custom
+        """
+        if not identifier:
+            return None
+
+        identifier = identifier.strip()
+        for kind, pattern in URL_PATTERNS:
+            match = pattern.search(identifier)
+            if match:
+                return kind, match.group(1)
+
+        if identifier.startswith('@'):
+            return 'handle', identifier[1:]
+        if CHANNEL_ID_RE.match(identifier):
+            return 'id', identifier
+        if re.match(r'^[\w.-]+$', identifier):
+            return 'handle', identifier
+
+        return None
+
+    @staticmethod
+    def cache_key(kind: str, value: str) -> str:
+        """캐시 키 생성 (채널 ID 외에는 대소문자 구분 없음)"""
+        return f"{kind}:{value if kind == 'id' else value.lower()}"
+
+    def get_cached(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        """캐시 조회. (캐시 적중 여부, 채널 정보 또는 실패 시 None) 반환"""
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM channel_resolver_cache
+            WHERE identifier = ? AND expires_at > ?
+        ''', (key, datetime.now().isoformat()))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return False, None
+        if not row['channel_id']:
+            return True, None
+        return True, self._row_to_info(row)
+
+    @staticmethod
+    def _row_to_info(row) -> Dict:
+        return {
+            'channel_id': row['channel_id'],
+            'uploads_playlist_id': row['uploads_playlist_id'],
+            'title': row['title'],
+            'custom_url': row['custom_url'],
+        }
+
+    def _store(self, key: str, info: Optional[Dict], resolved_via: str):
+        """변환 결과 저장 (채널이 없다는 응답은 짧은 TTL로 저장, API 오류 결과는 저장하지 말 것)"""
+        now = datetime.now()
+        ttl = self.ttl_seconds if info else self.negative_ttl_seconds
+        info = info or {}
+
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO channel_resolver_cache
+            (identifier, channel_id, uploads_playlist_id, title, custom_url, resolved_via, resolved_at, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            key,
+            info.get('channel_id'),
+            info.get('uploads_playlist_id'),
+            info.get('title'),
+            info.get('custom_url'),
+            resolved_via,
+            now.isoformat(),
+            (now + timedelta(seconds=ttl)).isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _item_to_info(item: Dict) -> Dict:
+        snippet = item.get('snippet', {})
+        uploads = item.get('contentDetails', {}).get('relatedPlaylists', {}).get('uploads')
+        return {
+            'channel_id': item['id'],
+            'uploads_playlist_id': uploads or uploads_playlist_for(item['id']),
+            'title': snippet.get('title'),
+            'custom_url': snippet.get('customUrl'),
+        }
+
+    def _resolve_ids_via_api(self, service, channel_ids: List[str]) -> Tuple[Dict[str, Dict], set]:
+        """
+        channels.list(id=...)로 최대 50개씩 일괄 조회
+        :return: ({채널 ID: 채널 정보}, 조회에 실패한 묶음의 채널 ID 집합)
+        """
+        results = {}
+        failed = set()
+        for start in range(0, len(channel_ids), MAX_IDS_PER_CALL):
+            batch = channel_ids[start:start + MAX_IDS_PER_CALL]
+            try:
+                response = service.channels().list(
+                    part="snippet,contentDetails",
+                    id=','.join(batch),
+                    maxResults=MAX_IDS_PER_CALL
+                ).execute()
+            except Exception as e:
+                print(f"❌ 채널 일괄 조회 실패: {e}")
+                failed.update(batch)
+                continue
+
+            for item in response.get('items', []):
+                results[item['id']] = self._item_to_info(item)
+        return results, failed
+
+    def _resolve_name_via_api(self, service, kind: str, value: str) -> Tuple[Optional[Dict], bool]:
+        """
+        channels.list(forHandle=...) 또는 forUsername으로 조회 (1 유닛)
+        :return: (채널 정보 또는 None, API가 정상 응답했는지 여부)
+        """
+        params = {'part': "snippet,contentDetails"}
+        if kind == 'user':
+            params['forUsername'] = value
+        else:
+            params['forHandle'] = f"@{value}"
+
+        try:
+            response = service.channels().list(**params).execute()
+        except Exception as e:
+            print(f"❌ 채널 조회 실패 ({kind}: {value}): {e}")
+            return None, False
+
+        items = response.get('items', [])
+        return (self._item_to_info(items[0]) if items else None), True
+
+    def scrape_channel_id(self, kind: str, value: str) -> Optional[str]:
+        """
+        채널 페이지를 스트리밍으로 읽으며 첫 번째 채널 ID가 나오는 즉시 중단합니다.
+        (API를 사용할 수 없을 때의 대체 경로)
+        """
+        import requests
+
+        paths = {'handle': f"@{value}", 'user': f"user/{value}", 'custom': f"c/{value}"}
+        url = f"https://www.youtube.com/{paths.get(kind, '@' + value)}"
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+
+        try:
+            with requests.get(url, timeout=10, headers=headers, stream=True) as resp:
+                if resp.status_code != 200:
+                    print(f"❌ 페이지 접속 실패: {resp.status_code} ({url})")
+                    return None
+
+                buffer = ''
+                read_bytes = 0
+                for chunk in resp.iter_content(chunk_size=SCRAPE_CHUNK_SIZE, decode_unicode=True):
+                    if not chunk:
+                        continue
+                    if isinstance(chunk, bytes):
+                        chunk = chunk.decode('utf-8', errors='ignore')
+                    read_bytes += len(chunk)
+                    buffer += chunk
+
+                    match = SCRAPE_PATTERN.search(buffer)
+                    if match:
+                        return next(group for group in match.groups() if group)
+
+                    # 청크 경계에 걸친 패턴을 위해 끝부분만 남김
+                    buffer = buffer[-SCRAPE_OVERLAP:]
+                    if read_bytes >= SCRAPE_MAX_BYTES:
+                        break
+        except Exception as e:
+            print(f"❌ 채널 페이지 스크래핑 실패 ({url}): {e}")
+
+        return None
+
+    def resolve_many(self, identifiers: List[str], service=None) -> Dict[str, Optional[Dict]]:
+        """
+        여러 채널 식별자를 한 번에 변환합니다.
+        :param identifiers: URL, @핸들, 사용자명 또는 채널 ID 목록
+        :param service: YouTube API 서비스 (없으면 스크래핑으로 대체)
+        :return: {입력 식별자: 채널 정보 또는 None}
+        """
+        results = {}
+        pending = {}  # cache_key -> (kind, value, [원래 식별자들])
+
+        for identifier in identifiers:
+            normalized = self.normalize_identifier(identifier)
+            if not normalized:
+                results[identifier] = None
+                continue
+
+            key = self.cache_key(*normalized)
+            if key in pending:
+                pending[key][2].append(identifier)
+                continue
+
+            hit, info = self.get_cached(key)
+            if hit:
+                results[identifier] = info
+            else:
+                pending[key] = (normalized[0], normalized[1], [identifier])
+
+        if not pending:
+            return results
+
+        # cache_key -> (채널 정보, 변환 경로, 캐시 여부)
+        resolved = {}
+
+        def from_channel_id(channel_id):
+            return {
+                'channel_id': channel_id,
+                'uploads_playlist_id': uploads_playlist_for(channel_id),
+                'title': None,
+                'custom_url': None,
+            }
+
+        # 1) 채널 ID는 50개씩 묶어서 조회 (서비스가 없으면 ID 자체로 충분)
+        id_keys = {key: value for key, (kind, value, _) in pending.items() if kind == 'id'}
+        if id_keys:
+            if service:
+                by_id, failed_ids = self._resolve_ids_via_api(service, list(id_keys.values()))
+                for key, channel_id in id_keys.items():
+                    if channel_id in failed_ids:
+                        # 조회 실패: 이번 수집은 ID로 계산한 정보로 진행하고 캐시하지 않음
+                        resolved[key] = (from_channel_id(channel_id), 'channel_id', False)
+                    else:
+                        resolved[key] = (by_id.get(channel_id), 'channels.list', True)
+            else:
+                for key, channel_id in id_keys.items():
+                    resolved[key] = (from_channel_id(channel_id), 'channel_id', True)
+
+        # 2) 핸들/사용자명은 forHandle/forUsername → 실패 시 스크래핑
+        for key, (kind, value, _) in pending.items():
+            if kind == 'id':
+                continue
+
+            info = None
+            via = 'scrape'
+            # 채널이 없다는 결과는 API가 정상 응답했을 때만 캐시
+            api_answered = False
+            if service:
+                info, api_answered = self._resolve_name_via_api(service, kind, value)
+                via = 'channels.list'
+
+            if not info:
+                channel_id = self.scrape_channel_id(kind, value)
+                if channel_id:
+                    via = 'scrape'
+                    info = dict(from_channel_id(channel_id), custom_url=f"@{value}" if kind == 'handle' else None)
+
+            resolved[key] = (info, via, bool(info) or api_answered)
+
+        for key, (info, via, cacheable) in resolved.items():
+            if cacheable:
+                self._store(key, info, via)
+            for identifier in pending[key][2]:
+                results[identifier] = info
+
+        resolved_count = sum(1 for info, _, _ in resolved.values() if info)
+        print(f"🔎 채널 식별자 변환: 신규 {resolved_count}/{len(resolved)}개 (나머지는 캐시 사용)")
+        return results
+
+    def resolve(self, identifier: str, service=None) -> Optional[Dict]:
+        """단일 채널 식별자 변환"""
+        return self.resolve_many([identifier], service).get(identifier)
+
+    def invalidate(self, identifier: str) -> bool:
+        """특정 식별자의 캐시 삭제"""
+        normalized = self.normalize_identifier(identifier)
+        if not normalized:
+            return False
+
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM channel_resolver_cache WHERE identifier = ?',
+                       (self.cache_key(*normalized),))
+        deleted = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def purge_expired(self) -> int:
+        """만료된 캐시 항목 정리"""
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM channel_resolver_cache WHERE expires_at <= ?',
+                       (datetime.now().isoformat(),))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+
+# 전역 인스턴스
+channel_resolver = ChannelResolver()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+청크별 LLM 결과 캐시
+청크 하나에 대한 LLM 요청(모델, 메시지, 생성 옵션)을 해시한 키로 응답 본문을 저장해
+자막이 일부만 바뀌어 다시 분석할 때 바뀌지 않은 청크는 LLM을 다시 호출하지 않음
+(청크 경계는 내용 기반이라 바뀌지 않은 부분의 청크 본문, 즉 요청이 그대로 유지됨)
+사용법: python chunk_result_cache.py [stats|purge --days N]
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+
+def request_key(**request) -> str:
+    """LLM 요청 전체(모델, 메시지, 생성 옵션)의 해시 (프롬프트나 옵션이 바뀌면 다른 키)"""
+    canonical = json.dumps(request, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ChunkResultCache:
+    def __init__(self, db_path: str = "youtube_news.db"):
+        self.db_path = db_path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.initialize_db()
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def initialize_db(self):
+        """청크 결과 캐시 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS chunk_results (
+                request_key TEXT PRIMARY KEY,
+                analysis_type TEXT,
+                model TEXT,
+                result TEXT NOT NULL,
+                created_at TEXT,
+                last_used_at TEXT,
+                hits INTEGER DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_chunk_results_last_used
+            ON chunk_results (last_used_at)
+        ''')
+
+        conn.commit()
+        conn.close()
+        self._initialized = True
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 본문 (없으면 None)"""
+        conn = self._connect()
+        row = conn.execute('SELECT result FROM chunk_results WHERE request_key = ?', (key,)).fetchone()
+        if row:
+            conn.execute('''
+                UPDATE chunk_results SET hits = hits + 1, last_used_at = ? WHERE request_key = ?
+            ''', (datetime.now().isoformat(), key))
+            conn.commit()
+        conn.close()
+        return row[0] if row else None
+
+    def put(self, key: str, result: str, analysis_type: str = None, model: str = None):
+        """응답 본문 저장 (성공한 응답만 저장할 것)"""
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO chunk_results
+                (request_key, analysis_type, model, result, created_at, last_used_at, hits)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        ''', (key, analysis_type, model, result, now, now))
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """분석 유형별 {'entries', 'hits'}"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT analysis_type, COUNT(*), COALESCE(SUM(hits), 0) FROM chunk_results GROUP BY analysis_type
+        ''').fetchall()
+        conn.close()
+        return {row[0] or 'unknown': {'entries': row[1], 'hits': row[2]} for row in rows}
+
+    def purge(self, older_than_days: int = 30) -> int:
+        """오래 사용되지 않은 항목 삭제"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        conn = self._connect()
+        cursor = conn.execute('DELETE FROM chunk_results WHERE last_used_at < ?', (cutoff,))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
+
+
+def main():
+    """청크 결과 캐시 CLI"""
+    parser = argparse.ArgumentParser(description="청크별 LLM 결과 캐시 관리")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    subparsers = parser.add_subparsers(dest="command", help="실행할 명령")
+
+    subparsers.add_parser("stats", help="분석 유형별 캐시 항목 수와 재사용 횟수")
+
+    purge_parser = subparsers.add_parser("purge", help="오래 사용되지 않은 항목 삭제")
+    purge_parser.add_argument("--days", type=int, default=30, help="마지막 사용 후 경과 일수")
+
+    args = parser.parse_args()
+    cache = ChunkResultCache(args.db)
+
+    if args.command == "purge":
+        print(f"🧹 {cache.purge(args.days)}개 항목을 삭제했습니다.")
+    else:
+        stats = cache.stats()
+        print(f"\n=== 청크 결과 캐시: {sum(s['entries'] for s in stats.values())}개 ===")
+        for analysis_type, s in sorted(stats.items()):
+            print(f"  - {analysis_type}: {s['entries']}개, 재사용 {s['hits']}회")
+
+
+# 전역 청크 결과 캐시 인스턴스
+chunk_result_cache = ChunkResultCache()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,27 @@ import sqlite3
 import os
 import time
 import argparse
+import logging
 from llm_handler import (
     summarize_transcript, 
     analyze_transcript_with_type, 
-    get_available_analysis_types
+    get_available_analysis_types,
+    estimate_cost,
+    num_tokens_from_string,
+    ANALYSIS_MODEL
 )
-from db_handler import save_summary_to_db, get_summaries_for_video
+from db_handler import (
+    save_summary_to_db,
+    get_summaries_for_video,
+    get_transcript_chunks,
+    find_stale_analyses,
+    ensure_schema
+)
+from prompt_registry import PROMPTS, prompt_version, registered_types, estimate_tokens
+from job_queue import JobQueue, JOB_ANALYZE, analysis_key
+from metrics import metrics
+from cost_governor import cost_governor, BudgetExceeded, ACTION_DEFER, print_run_spend
+from run_tracker import RunTracker, STAGE_SAVED, STAGE_DONE, ITEM_FAILED, RUN_COMPLETED, RUN_FAILED, RUN_INTERRUPTED
 
 # 데이터베이스 파일 경로
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "youtube_news.db")
@@ -37,34 +52,104 @@ def get_videos_with_transcript(limit=5):
     
     return videos
 
-def process_and_summarize(analysis_types=None, limit=3, save_to_db=True, force=False):
+def get_videos_by_ids(video_ids):
+    """지정한 비디오들을 주어진 순서대로 가져옵니다. (자막이 없는 비디오는 제외)"""
+    if not video_ids:
+        return []
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute(f'''
+        SELECT id, title, channel_title, transcript
+        FROM videos
+        WHERE transcript IS NOT NULL AND id IN ({','.join('?' for _ in video_ids)})
+    ''', list(video_ids))
+    rows = {row[0]: row for row in cursor.fetchall()}
+    conn.close()
+    
+    return [rows[video_id] for video_id in video_ids if video_id in rows]
+
+def process_and_summarize(analysis_types=None, limit=3, save_to_db=True, force=False, resume=False):
     """
     자막이 있는 비디오를 처리하고 요약 정보를 생성합니다.
+    처리 대상과 분석 유형별 완료 여부를 실행 체크포인트에 기록합니다.
     
     :param analysis_types: 수행할 분석 유형 목록 (지정하지 않으면 'summary'만 실행)
     :param limit: 처리할 비디오 수
     :param save_to_db: 결과를 데이터베이스에 저장할지 여부
     :param force: 이미 있는 분석도 다시 수행할지 여부
+    :param resume: 중단된 최근 실행을 같은 대상·옵션으로 이어서 처리
+                   (--force 실행이어도 이미 완료된 분석은 다시 하지 않음)
     """
     if analysis_types is None:
         analysis_types = ["summary"]
+    
+    tracker = RunTracker(DB_PATH) if save_to_db else None
+    run = None
+    if tracker:
+        run = tracker.resume_or_start(
+            "summarize",
+            {"analysis_types": analysis_types, "limit": limit, "force": force},
+            resume=resume
+        )
+        analysis_types = run["params"].get("analysis_types") or analysis_types
+        force = run["params"].get("force", force)
         
     print("\n=== 자막 요약 처리 시작 ===")
     print(f"처리할 분석 유형: {', '.join(analysis_types)}")
     
-    # 자막이 있는 비디오 가져오기
-    videos = get_videos_with_transcript(limit=limit)
+    # 자막이 있는 비디오 가져오기 (재개한 실행은 처음 선택한 비디오만 대상으로 함)
+    if run and run["discovery_done"]:
+        videos = get_videos_by_ids([item["video_id"] for item in tracker.pending_items(run["run_id"])])
+    else:
+        videos = get_videos_with_transcript(limit=run["params"].get("limit", limit) if run else limit)
+        if run:
+            tracker.add_items(run["run_id"], [{"video_id": video[0], "title": video[1]} for video in videos])
+            tracker.mark_discovery_done(run["run_id"])
     
     if not videos:
-        print("자막이 있는 비디오가 없습니다.")
+        print("처리할 비디오가 없습니다." if run and run["discovery_done"] else "자막이 있는 비디오가 없습니다.")
+        if run:
+            tracker.finish_run(run["run_id"], RUN_COMPLETED)
         return
     
-    # 각 비디오 처리
+    metrics_start = metrics.snapshot()
+    if run:
+        # 이 실행의 LLM 사용량에 실행별 토큰 예산 적용
+        cost_governor.begin_run(run["run_id"])
+    try:
+        _summarize_videos(videos, analysis_types, save_to_db, force, tracker, run["run_id"] if run else None)
+    except KeyboardInterrupt:
+        if run:
+            tracker.finish_run(run["run_id"], RUN_INTERRUPTED)
+            print(f"\n⏸️ 요약이 중단되었습니다. 'summarize --resume'으로 이어서 실행하세요. (실행 {run['run_id']})")
+        raise
+    finally:
+        metrics.print_summary(since=metrics_start, title="요약 실행 요약")
+        if run:
+            cost_governor.end_run()
+            print_run_spend(cost_governor, run["run_id"])
+    
+    if run:
+        remaining = tracker.pending_items(run["run_id"])
+        tracker.finish_run(run["run_id"], RUN_COMPLETED if not remaining else RUN_FAILED)
+        if remaining:
+            print(f"⚠️ 끝나지 않은 비디오 {len(remaining)}개가 남았습니다. --resume으로 다시 시도할 수 있습니다.")
+    
+    print("\n=== 자막 요약 처리 완료 ===")
+
+def _summarize_videos(videos, analysis_types, save_to_db, force, tracker=None, run_id=None):
+    """비디오별로 분석 유형을 수행하고 체크포인트에 진행 상태를 기록합니다."""
     for i, (video_id, title, channel, transcript) in enumerate(videos, 1):
         print(f"\n처리 중 {i}/{len(videos)}: {title}")
         print(f"채널: {channel}")
         print(f"자막 길이: {len(transcript)}자")
         
+        # 이 실행에서 이미 끝낸 분석 유형
+        item = tracker.get_item(run_id, video_id) if tracker else None
+        completed_types = set(item["completed_types"]) if item else set()
+        failed = []
+        
         try:
             # 기존 요약 정보 확인
             if not force:
@@ -72,8 +157,16 @@ def process_and_summarize(analysis_types=None, limit=3, save_to_db=True, force=F
             else:
                 existing_summaries = {}
             
+            # 저장된 자막 청크 (분석 유형마다 다시 나누지 않음)
+            chunk_rows = get_transcript_chunks(video_id)
+            chunks = [chunk['text'] for chunk in chunk_rows] or None
+            
             # 각 분석 유형별로 처리
             for analysis_type in analysis_types:
+                if analysis_type in completed_types:
+                    print(f"\n{analysis_type}는 이 실행에서 이미 완료되었습니다. 건너뜁니다.")
+                    continue
+                
                 # 이미 있는 분석은 건너뛰기 (강제 옵션이 아닌 경우)
                 if not force and analysis_type in existing_summaries:
                     print(f"\n{analysis_type}는 이미 존재합니다. 건너뜁니다. (강제 재생성하려면 --force 옵션 사용)")
@@ -82,10 +175,18 @@ def process_and_summarize(analysis_types=None, limit=3, save_to_db=True, force=F
                 print(f"\n{analysis_type} 생성 중...")
                 start_time = time.time()
                 
-                if analysis_type == "summary":
-                    result = summarize_transcript(transcript, analysis_type=analysis_type)
-                else:
-                    result = analyze_transcript_with_type(transcript, analysis_type)
+                try:
+                    # 예상 토큰 수로 예산 확인 (절약 모드면 더 싼 모델 사용)
+                    model = cost_governor.admit_analysis(analysis_type, ANALYSIS_MODEL, transcript, chunk_rows)
+                    if analysis_type == "summary":
+                        result = summarize_transcript(transcript, analysis_type=analysis_type, chunks=chunks, model=model)
+                    else:
+                        result = analyze_transcript_with_type(transcript, analysis_type, chunks, model=model)
+                except BudgetExceeded as e:
+                    print(f"💸 {analysis_type}: {e}")
+                    if e.action == ACTION_DEFER:
+                        failed.append(analysis_type)
+                    continue
                 
                 process_time = time.time() - start_time
                 print(f"{analysis_type} 완료 (처리 시간: {process_time:.2f}초)")
@@ -93,14 +194,95 @@ def process_and_summarize(analysis_types=None, limit=3, save_to_db=True, force=F
                 
                 # 데이터베이스에 결과 저장
                 if save_to_db:
-                    success = save_summary_to_db(video_id, analysis_type, result)
+                    # 더 싼 모델로 만든 분석은 버전 없이 저장 (recompute --stale 대상)
+                    version = prompt_version(analysis_type) if model == ANALYSIS_MODEL else None
+                    success = save_summary_to_db(video_id, analysis_type, result, version)
                     if success:
                         print(f"결과가 데이터베이스에 저장되었습니다.")
+                        if tracker:
+                            tracker.mark_type_done(run_id, video_id, analysis_type)
+                    else:
+                        failed.append(analysis_type)
             
         except Exception as e:
             print(f"오류 발생: {e}")
+            failed.append(str(e))
+        
+        if tracker:
+            if failed:
+                tracker.set_stage(run_id, video_id, STAGE_SAVED, ITEM_FAILED, error=', '.join(failed))
+            else:
+                tracker.set_stage(run_id, video_id, STAGE_DONE)
+
+def plan_stale_recompute(analysis_types=None, limit=None, budget_usd=None):
+    """
+    프롬프트 버전이 바뀐 저장된 분석만 골라 다시 수행할 계획과 예상 비용을 계산합니다.
     
-    print("\n=== 자막 요약 처리 완료 ===")
+    :param analysis_types: 확인할 분석 유형 (지정하지 않으면 등록된 모든 유형)
+    :param limit: 최대 분석 수
+    :param budget_usd: 예상 비용 상한 (넘는 분석은 계획에서 제외, 최신 비디오 우선)
+    :return: {'items': [...], 'skipped': 예산 초과로 제외한 수, 'prompt_tokens', 'completion_tokens', 'cost_usd'}
+    """
+    analysis_types = analysis_types or registered_types()
+    unknown = [analysis_type for analysis_type in analysis_types if analysis_type not in PROMPTS]
+    if unknown:
+        raise ValueError(f"프롬프트가 등록되지 않은 분석 유형: {', '.join(unknown)}")
+    
+    current_versions = {analysis_type: prompt_version(analysis_type) for analysis_type in analysis_types}
+    plan = {'items': [], 'skipped': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'cost_usd': 0.0}
+    for item in find_stale_analyses(current_versions, limit):
+        prompt_tokens, completion_tokens = estimate_tokens(
+            item['analysis_type'], item['transcript_tokens'], item['chunk_count'], num_tokens_from_string
+        )
+        cost = estimate_cost(PROMPTS[item['analysis_type']]['model'], prompt_tokens, completion_tokens)
+        if budget_usd is not None and plan['cost_usd'] + cost > budget_usd:
+            plan['skipped'] += 1
+            continue
+        item.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=cost)
+        plan['items'].append(item)
+        plan['prompt_tokens'] += prompt_tokens
+        plan['completion_tokens'] += completion_tokens
+        plan['cost_usd'] += cost
+    return plan
+
+def recompute_stale(analysis_types=None, limit=None, budget_usd=None, dry_run=False):
+    """
+    오래된 분석을 분석 작업으로 작업 큐에 넣습니다. (워커가 run_analysis로 다시 수행하고 새 버전을 기록)
+    
+    :param dry_run: 계획과 예상 비용만 출력
+    :return: 추가한 작업 수
+    """
+    plan = plan_stale_recompute(analysis_types, limit, budget_usd)
+    
+    print("\n=== 오래된 분석 재계산 계획 ===")
+    by_type = {}
+    for item in plan['items']:
+        counts = by_type.setdefault(item['analysis_type'], [0, 0.0])
+        counts[0] += 1
+        counts[1] += item['cost_usd']
+    for analysis_type, (count, cost) in sorted(by_type.items()):
+        print(f"  - {analysis_type} (버전 {prompt_version(analysis_type)}): {count}개, 예상 ${cost:.4f}")
+    print(f"합계: {len(plan['items'])}개, 프롬프트 약 {plan['prompt_tokens']:,}토큰, "
+          f"응답 최대 {plan['completion_tokens']:,}토큰, 예상 최대 ${plan['cost_usd']:.4f}")
+    if plan['skipped']:
+        print(f"⚠️ 예산을 넘어 제외한 분석: {plan['skipped']}개 (다음 실행에서 다시 계획됨)")
+    
+    if dry_run or not plan['items']:
+        return 0
+    
+    queue = JobQueue(DB_PATH)
+    queue.initialize_db()
+    for item in plan['items']:
+        # 새 수집 작업보다 뒤에 처리 (우선순위 -1), 같은 분석의 끝난 작업은 다시 대기열에 넣음
+        queue.enqueue(
+            JOB_ANALYZE,
+            {"video_id": item['video_id'], "analysis_type": item['analysis_type']},
+            idempotency_key=analysis_key(item['video_id'], item['analysis_type']),
+            priority=-1,
+            revive=True
+        )
+    print(f"📥 분석 작업 {len(plan['items'])}개를 추가했습니다. 'python worker.py --types analyze'로 처리하세요.")
+    return len(plan['items'])
 
 def show_video_summaries(video_id):
     """
@@ -149,16 +331,34 @@ def main():
     summarize_parser.add_argument("--limit", type=int, default=3, help="처리할 비디오 수 (기본값: 3)")
     summarize_parser.add_argument("--no-save", action="store_true", help="결과를 데이터베이스에 저장하지 않음")
     summarize_parser.add_argument("--force", action="store_true", help="이미 있는 분석도 다시 수행")
+    summarize_parser.add_argument("--resume", action="store_true", help="중단된 최근 실행을 이어서 처리")
+    summarize_parser.add_argument("--metrics-file", help="실행 후 Prometheus 형식 메트릭을 저장할 파일")
+    
+    # 실행 현황 보고서 명령
+    report_parser = subparsers.add_parser("report", help="실행 현황 및 멈춘/부분 처리 비디오 보고서")
+    report_parser.add_argument("--stuck-minutes", type=int, default=60, help="멈춤으로 볼 무진행 시간(분)")
     
     # 요약 정보 표시 명령
     show_parser = subparsers.add_parser("show", help="저장된 요약 정보 표시")
     show_parser.add_argument("video_id", help="표시할 비디오 ID")
     
+    # 프롬프트가 바뀐 분석 재계산 명령
+    recompute_parser = subparsers.add_parser("recompute", help="프롬프트/모델/청크 분할 방식이 바뀐 분석만 다시 수행")
+    recompute_parser.add_argument("--stale", action="store_true", required=True,
+                                  help="저장된 프롬프트 버전이 현재와 다른 분석만 대상으로 함")
+    recompute_parser.add_argument("--types", nargs="+", help="확인할 분석 유형 (기본: 전체)")
+    recompute_parser.add_argument("--limit", type=int, help="최대 분석 수")
+    recompute_parser.add_argument("--budget", type=float, help="예상 비용 상한 (USD)")
+    recompute_parser.add_argument("--dry-run", action="store_true", help="계획과 예상 비용만 출력")
+    
     # 사용 가능한 분석 유형 표시 명령
     types_parser = subparsers.add_parser("types", help="사용 가능한 분석 유형 표시")
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ensure_schema()
+    
     # 명령에 따라 다른 동작 수행
     if args.command == "summarize":
         # 분석 유형 처리
@@ -170,8 +370,16 @@ def main():
             analysis_types=analysis_types,
             limit=args.limit,
             save_to_db=not args.no_save,
-            force=args.force
+            force=args.force,
+            resume=args.resume
         )
+        if args.metrics_file:
+            metrics.write_file(args.metrics_file)
+    elif args.command == "report":
+        from run_tracker import print_run_report
+        print_run_report(RunTracker(DB_PATH), stuck_minutes=args.stuck_minutes)
+    elif args.command == "recompute":
+        recompute_stale(args.types, args.limit, args.budget, args.dry_run)
     elif args.command == "show":
         show_video_summaries(args.video_id)
     elif args.command == "types":
@@ -13,12 +13,9 @@ load_dotenv(dotenv_path=dotenv_path)
 # 구성 파일 경로
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "youtube_news_config.json")
 
-# OpenAI API Key
+# OpenAI API Key (없으면 get_openai_api_key 호출 시 안내)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-if not OPENAI_API_KEY:
-    print("경고: OpenAI API 키가 .env.local 또는 .env 파일에 설정되어 있지 않습니다.")
-
 def load_config():
     """구성 파일을 로드합니다."""
     if os.path.exists(CONFIG_FILE):
@@ -47,7 +44,7 @@ def get_openai_api_key():
     """OpenAI API 키를 반환합니다."""
     if not OPENAI_API_KEY:
         # 실제 운영 환경에서는 로깅 또는 더 강력한 오류 처리가 필요합니다.
-        print("오류: OpenAI API 키가 설정되어 있지 않습니다.")
+        print("오류: OpenAI API 키가 .env.local 또는 .env 파일에 설정되어 있지 않습니다.")
         return None
     return OPENAI_API_KEY
 
@@ -0,0 +1,409 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+LLM 비용 관리 (실행별/일별/분석 유형별 토큰 예산)
+분석과 LLM 호출 전에 예상 토큰 수(저장된 청크의 토큰 수 또는 tiktoken)로 예산을 확인하고,
+호출이 끝나면 응답의 실제 사용량과 예상 비용을 llm_spend 테이블에 기록함
+예산이 부족하면 멈추는 대신 단계적으로 줄임:
+  - 예산의 SOFT_LIMIT_RATIO를 넘으면 우선순위가 낮은 분석 유형은 건너뛰고, 나머지는 더 싼 모델로 수행
+  - 예산을 넘으면 우선순위가 낮은 유형은 건너뛰고, 나머지는 다음 예산 기간(다음 날 또는 다음 실행)으로 미룸
+환경 변수 (설정하지 않은 예산은 제한 없음):
+  LLM_RUN_TOKEN_BUDGET     수집/요약 실행 한 번의 토큰 예산
+  LLM_DAILY_TOKEN_BUDGET   하루(자정 기준) 토큰 예산
+  LLM_TYPE_TOKEN_BUDGETS   분석 유형별 하루 토큰 예산 (예: "analysis_complex=100000,detailed_summary=300000")
+  LLM_FALLBACK_MODELS      절약 모드에서 바꿔 쓸 모델 (예: "gpt-4o-mini=gpt-4.1-nano", 값을 비우면 바꾸지 않음)
+사용법: python cost_governor.py [status|report --days N]
+"""
+
+import argparse
+import os
+import sqlite3
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# 결정
+ACTION_RUN = "run"
+ACTION_FALLBACK = "fallback"   # 더 싼 모델로 수행
+ACTION_SKIP = "skip"           # 이번에는 수행하지 않음 (우선순위가 낮은 유형)
+ACTION_DEFER = "defer"         # 다음 예산 기간에 다시 시도
+
+# 예산 범위
+SCOPE_RUN = "run"
+SCOPE_DAY = "day"
+SCOPE_TYPE = "type"
+
+# 분석 유형별 우선순위 (작을수록 중요, 등록되지 않은 유형은 DEFAULT_PRIORITY)
+ANALYSIS_PRIORITY = {
+    "summary": 0,
+    "economic_news": 0,
+    "news_by_keywords": 0,
+    "economic_insights": 1,
+    "detailed_summary": 1,
+    "analysis_economic": 1,
+    "keyword_extraction": 1,
+    "analysis_simple": 2,
+    "analysis_complex": 2,
+}
+DEFAULT_PRIORITY = 2
+
+# 이 우선순위 이상인 유형은 예산이 부족하면 건너뜀
+LOW_PRIORITY = 2
+
+# 예산을 이 비율 이상 쓰면 절약 모드 (낮은 우선순위 건너뛰기, 더 싼 모델 사용)
+SOFT_LIMIT_RATIO = 0.8
+
+# 모델 → 절약 모드에서 대신 사용할 더 싼 모델 (LLM_FALLBACK_MODELS로 덮어씀)
+CHEAPER_MODELS = {
+    "gpt-4o": "gpt-4o-mini",
+    "gpt-4o-mini": "gpt-4.1-nano",
+}
+
+
+class BudgetExceeded(Exception):
+    """토큰 예산이 부족해 분석이나 LLM 호출을 수행하지 않음"""
+
+    def __init__(self, message: str, action: str = ACTION_DEFER, retry_after: float = None):
+        super().__init__(message)
+        self.action = action
+        self.retry_after = retry_after
+
+
+def priority_of(analysis_type: str) -> int:
+    return ANALYSIS_PRIORITY.get(analysis_type, DEFAULT_PRIORITY)
+
+
+def _env_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def parse_type_budgets(value: str) -> Dict[str, int]:
+    """"유형=토큰,유형=토큰" 형식의 분석 유형별 예산"""
+    budgets = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        analysis_type, tokens = item.split("=", 1)
+        budgets[analysis_type.strip()] = int(tokens)
+    return budgets
+
+
+def cheaper_model(model: str) -> Optional[str]:
+    """절약 모드에서 model 대신 사용할 더 싼 모델 (없으면 None)"""
+    models = dict(CHEAPER_MODELS)
+    for item in (os.getenv("LLM_FALLBACK_MODELS") or "").split(","):
+        if "=" not in item:
+            continue
+        source, target = item.split("=", 1)
+        models[source.strip()] = target.strip() or None
+    return models.get(model)
+
+
+def seconds_until_tomorrow(now: datetime = None) -> float:
+    """다음 일별 예산 기간(자정)까지 남은 시간(초)"""
+    now = now or datetime.now()
+    tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return (tomorrow - now).total_seconds()
+
+
+def predict_analysis_tokens(analysis_type: str, transcript: str, chunks: List[Dict] = None,
+                            count_tokens=None) -> int:
+    """
+    분석 한 번의 예상 토큰 수 (프롬프트 + 응답 상한)
+    :param chunks: 저장된 자막 청크 (token_count가 있으면 자막을 다시 세지 않음)
+    :param count_tokens: 토큰 계산 함수 (기본값은 llm_handler.num_tokens_from_string)
+    """
+    from prompt_registry import PROMPTS, estimate_tokens
+
+    if analysis_type not in PROMPTS:
+        return 0
+    if count_tokens is None:
+        from llm_handler import num_tokens_from_string as count_tokens
+    transcript_tokens = sum(chunk.get('token_count') or 0 for chunk in chunks or []) or count_tokens(transcript or "")
+    prompt_tokens, completion_tokens = estimate_tokens(analysis_type, transcript_tokens, len(chunks or []) or 1,
+                                                       count_tokens)
+    return prompt_tokens + completion_tokens
+
+
+class CostGovernor:
+    def __init__(self, db_path: str = "youtube_news.db", run_budget: int = None, daily_budget: int = None,
+                 type_budgets: Dict[str, int] = None):
+        """
+        설정하지 않은 예산은 확인할 때 환경 변수에서 읽음 (.env 로드 이후)
+        :param run_budget: 실행 한 번의 토큰 예산
+        :param daily_budget: 하루 토큰 예산
+        :param type_budgets: 분석 유형별 하루 토큰 예산
+        """
+        self.db_path = db_path
+        self.run_budget = run_budget
+        self.daily_budget = daily_budget
+        self.type_budgets = type_budgets
+        # 실행은 스레드(컨텍스트)별 - 스케줄러는 요약 실행과 채널 처리를 다른 스레드에서 동시에 수행하고,
+        # 비동기 분석은 사용량 기록을 asyncio.to_thread로 넘기므로 컨텍스트 변수로 전달
+        self._run_id = ContextVar(f"cost_governor_run_{id(self)}", default=None)
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.initialize_db()
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def initialize_db(self):
+        """LLM 사용량 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS llm_spend (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                day TEXT NOT NULL,
+                run_id TEXT,
+                analysis_type TEXT,
+                model TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                cached_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                cost_usd REAL DEFAULT 0
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_spend_day ON llm_spend (day, analysis_type)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_llm_spend_run ON llm_spend (run_id)')
+
+        conn.commit()
+        conn.close()
+        self._initialized = True
+
+    # ----- 예산 -----
+
+    @property
+    def run_id(self) -> Optional[str]:
+        """현재 스레드에서 진행 중인 실행 ID"""
+        return self._run_id.get()
+
+    def begin_run(self, run_id: str):
+        """실행 시작 (end_run까지 이 스레드의 LLM 사용량을 실행에 기록하고 실행 예산 적용)"""
+        self._run_id.set(run_id)
+
+    def end_run(self):
+        self._run_id.set(None)
+
+    def budgets(self, analysis_type: str = None) -> Dict[str, int]:
+        """지금 적용되는 예산 {범위: 토큰} (실행 예산은 실행 중일 때만)"""
+        budgets = {}
+        run_budget = self.run_budget or _env_int("LLM_RUN_TOKEN_BUDGET")
+        if run_budget and self.run_id:
+            budgets[SCOPE_RUN] = run_budget
+        daily_budget = self.daily_budget or _env_int("LLM_DAILY_TOKEN_BUDGET")
+        if daily_budget:
+            budgets[SCOPE_DAY] = daily_budget
+        type_budgets = self.type_budgets if self.type_budgets is not None \
+            else parse_type_budgets(os.getenv("LLM_TYPE_TOKEN_BUDGETS"))
+        if analysis_type in type_budgets:
+            budgets[SCOPE_TYPE] = type_budgets[analysis_type]
+        return budgets
+
+    def enabled(self, analysis_type: str = None) -> bool:
+        """확인할 예산이 있는지 (없으면 예상 토큰 수를 계산할 필요 없음)"""
+        return bool(self.budgets(analysis_type))
+
+    def usage(self, analysis_type: str = None) -> Dict[str, int]:
+        """오늘/현재 실행/분석 유형(오늘)의 사용 토큰 수"""
+        today = datetime.now().date().isoformat()
+        conn = self._connect()
+        cursor = conn.cursor()
+        total = 'COALESCE(SUM(prompt_tokens + completion_tokens), 0)'
+        usage = {SCOPE_DAY: cursor.execute(f'SELECT {total} FROM llm_spend WHERE day = ?', (today,)).fetchone()[0]}
+        if self.run_id:
+            usage[SCOPE_RUN] = cursor.execute(f'SELECT {total} FROM llm_spend WHERE run_id = ?',
+                                              (self.run_id,)).fetchone()[0]
+        if analysis_type:
+            usage[SCOPE_TYPE] = cursor.execute(f'SELECT {total} FROM llm_spend WHERE day = ? AND analysis_type = ?',
+                                               (today, analysis_type)).fetchone()[0]
+        conn.close()
+        return usage
+
+    def _pressure(self, analysis_type: str, predicted_tokens: int):
+        """(예산, 사용량, 예산을 넘는 범위, 절약 구간에 들어가는 범위)"""
+        budgets = self.budgets(analysis_type)
+        if not budgets:
+            return budgets, {}, [], []
+        usage = self.usage(analysis_type)
+        over = [scope for scope, limit in budgets.items() if usage.get(scope, 0) + predicted_tokens > limit]
+        tight = [scope for scope, limit in budgets.items()
+                 if scope not in over and usage.get(scope, 0) + predicted_tokens > limit * SOFT_LIMIT_RATIO]
+        return budgets, usage, over, tight
+
+    def decide(self, analysis_type: str, predicted_tokens: int, model: str = None, hard_only: bool = False) -> Dict:
+        """
+        예상 토큰 수로 분석(또는 호출)을 어떻게 수행할지 결정
+        :param model: 지정하면 절약 모드에서 더 싼 모델로 바꿀 수 있는지 확인
+        :param hard_only: 예산을 넘을 때만 막음 (절약 구간은 통과)
+        :return: {'action', 'model', 'scopes': 예산이 부족한 범위, 'reason', 'retry_after'}
+        """
+        decision = {'action': ACTION_RUN, 'model': model, 'scopes': [], 'reason': None, 'retry_after': None}
+        budgets, usage, over, tight = self._pressure(analysis_type, predicted_tokens)
+        scopes = over or ([] if hard_only else tight)
+        if not scopes:
+            return decision
+
+        summary = ", ".join(f"{scope} {usage.get(scope, 0):,}+{predicted_tokens:,}/{budgets[scope]:,}"
+                            for scope in scopes)
+        decision['scopes'] = scopes
+        if priority_of(analysis_type) >= LOW_PRIORITY:
+            decision.update(action=ACTION_SKIP, reason=f"예산 부족으로 우선순위가 낮은 분석 생략 ({summary})")
+        elif over:
+            # 실행 예산만 부족하면 다음 실행에서, 일별/유형별 예산이 부족하면 내일 다시 시도
+            retry_after = seconds_until_tomorrow() if set(over) - {SCOPE_RUN} else None
+            decision.update(action=ACTION_DEFER, retry_after=retry_after,
+                            reason=f"예산 초과로 다음 {'예산 기간' if retry_after else '실행'}으로 미룸 ({summary})")
+        elif cheaper_model(model):
+            decision.update(action=ACTION_FALLBACK, model=cheaper_model(model),
+                            reason=f"예산 절약을 위해 {cheaper_model(model)} 사용 ({summary})")
+        return decision
+
+    def admit(self, analysis_type: str, model: str, predicted_tokens: int) -> str:
+        """
+        분석 하나를 시작하기 전 확인
+        :return: 사용할 모델 (절약 모드면 더 싼 모델)
+        :raises BudgetExceeded: 건너뛰거나 미뤄야 하는 경우
+        """
+        from metrics import metrics
+
+        decision = self.decide(analysis_type, predicted_tokens, model)
+        metrics.inc("llm_budget_decisions_total", analysis_type=analysis_type, action=decision['action'])
+        if decision['action'] in (ACTION_SKIP, ACTION_DEFER):
+            raise BudgetExceeded(decision['reason'], decision['action'], decision['retry_after'])
+        if decision['action'] == ACTION_FALLBACK:
+            print(f"💸 {analysis_type}: {decision['reason']}")
+        return decision['model']
+
+    def admit_analysis(self, analysis_type: str, model: str, transcript: str, chunks: List[Dict] = None) -> str:
+        """
+        admit과 같지만 예상 토큰 수를 자막/청크로 직접 계산 (적용되는 예산이 없으면 계산하지 않음)
+        :param chunks: 저장된 자막 청크 (db_handler.get_transcript_chunks 결과)
+        """
+        if not self.enabled(analysis_type):
+            return model
+        return self.admit(analysis_type, model, predict_analysis_tokens(analysis_type, transcript, chunks))
+
+    def check(self, analysis_type: str, predicted_tokens: int):
+        """
+        LLM 호출 한 번 직전 확인 (예산을 넘을 때만 막음, 절약 모드는 분석을 시작할 때 admit에서 결정)
+        :raises BudgetExceeded: 예산을 넘는 경우
+        """
+        decision = self.decide(analysis_type, predicted_tokens, hard_only=True)
+        if decision['action'] in (ACTION_SKIP, ACTION_DEFER):
+            raise BudgetExceeded(decision['reason'], decision['action'], decision['retry_after'])
+
+    # ----- 사용량 기록 -----
+
+    def record(self, analysis_type: str, model: str, prompt_tokens: int, completion_tokens: int,
+               cached_tokens: int = 0, cost_usd: float = 0.0):
+        """응답의 실제 사용량 기록"""
+        now = datetime.now()
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO llm_spend (created_at, day, run_id, analysis_type, model,
+                                   prompt_tokens, cached_tokens, completion_tokens, cost_usd)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (now.isoformat(), now.date().isoformat(), self.run_id, analysis_type, model,
+              prompt_tokens, cached_tokens, completion_tokens, cost_usd))
+        conn.commit()
+        conn.close()
+
+    def report(self, days: int = 7, run_id: str = None) -> List[Dict]:
+        """
+        날짜/분석 유형/모델별 사용량
+        :param run_id: 지정하면 그 실행의 사용량만
+        :return: [{'day', 'analysis_type', 'model', 'calls', 'prompt_tokens', 'cached_tokens', 'completion_tokens', 'cost_usd'}]
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        if run_id:
+            where, params = 'run_id = ?', (run_id,)
+        else:
+            where, params = 'day >= ?', ((datetime.now().date() - timedelta(days=days - 1)).isoformat(),)
+        rows = conn.execute(f'''
+            SELECT day, analysis_type, model, COUNT(*) AS calls,
+                   SUM(prompt_tokens) AS prompt_tokens, SUM(cached_tokens) AS cached_tokens,
+                   SUM(completion_tokens) AS completion_tokens, SUM(cost_usd) AS cost_usd
+            FROM llm_spend WHERE {where}
+            GROUP BY day, analysis_type, model
+            ORDER BY day DESC, cost_usd DESC
+        ''', params).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+
+def print_status(governor: "CostGovernor"):
+    """오늘 사용량과 설정된 예산"""
+    type_budgets = governor.type_budgets if governor.type_budgets is not None \
+        else parse_type_budgets(os.getenv("LLM_TYPE_TOKEN_BUDGETS"))
+    usage = governor.usage()
+    daily_budget = governor.budgets().get(SCOPE_DAY)
+    print(f"\n=== 오늘 LLM 토큰 사용량: {usage[SCOPE_DAY]:,}"
+          f"{f' / {daily_budget:,} ({usage[SCOPE_DAY] / daily_budget:.0%})' if daily_budget else ' (일별 예산 없음)'} ===")
+    run_budget = governor.run_budget or _env_int("LLM_RUN_TOKEN_BUDGET")
+    print(f"  - 실행별 예산: {f'{run_budget:,}' if run_budget else '없음'}")
+    for analysis_type, limit in sorted(type_budgets.items()):
+        used = governor.usage(analysis_type)[SCOPE_TYPE]
+        print(f"  - {analysis_type}: {used:,} / {limit:,} ({used / limit:.0%})")
+
+
+def print_report(rows: List[Dict], title: str):
+    """사용량 보고서 출력 (날짜별 합계와 분석 유형/모델별 내역)"""
+    print(f"\n=== {title} ===")
+    if not rows:
+        print("기록된 사용량이 없습니다.")
+        return
+    for day in sorted({row['day'] for row in rows}, reverse=True):
+        day_rows = [row for row in rows if row['day'] == day]
+        tokens = sum(row['prompt_tokens'] + row['completion_tokens'] for row in day_rows)
+        print(f"\n{day}: {tokens:,} 토큰, ${sum(row['cost_usd'] for row in day_rows):.4f}")
+        for row in day_rows:
+            print(f"  - {row['analysis_type']} ({row['model']}): 호출 {row['calls']}회, "
+                  f"프롬프트 {row['prompt_tokens']:,} (캐시 {row['cached_tokens']:,}), "
+                  f"응답 {row['completion_tokens']:,}, ${row['cost_usd']:.4f}")
+    total_tokens = sum(row['prompt_tokens'] + row['completion_tokens'] for row in rows)
+    print(f"\n합계: {total_tokens:,} 토큰, ${sum(row['cost_usd'] for row in rows):.4f}")
+
+
+def print_run_spend(governor: "CostGovernor", run_id: str):
+    """실행 한 번의 사용량 한 줄 요약"""
+    rows = governor.report(run_id=run_id)
+    tokens = sum(row['prompt_tokens'] + row['completion_tokens'] for row in rows)
+    print(f"💸 이 실행의 LLM 사용량: {tokens:,} 토큰, ${sum(row['cost_usd'] for row in rows):.4f} "
+          f"(자세히: python cost_governor.py report --run {run_id})")
+
+
+def main():
+    """LLM 비용 관리 CLI"""
+    parser = argparse.ArgumentParser(description="LLM 토큰 예산과 사용량 보고서")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    subparsers = parser.add_subparsers(dest="command", help="실행할 명령")
+
+    subparsers.add_parser("status", help="오늘 사용량과 설정된 예산")
+
+    report_parser = subparsers.add_parser("report", help="날짜/분석 유형/모델별 사용량과 비용")
+    report_parser.add_argument("--days", type=int, default=7, help="최근 일수")
+    report_parser.add_argument("--run", help="실행 ID (지정하면 그 실행의 사용량만)")
+
+    args = parser.parse_args()
+    governor = CostGovernor(args.db)
+
+    if args.command == "report":
+        title = f"실행 {args.run} LLM 사용량" if args.run else f"최근 {args.days}일 LLM 사용량"
+        print_report(governor.report(args.days, args.run), title)
+    else:
+        print_status(governor)
+
+
+# 전역 비용 관리 인스턴스
+cost_governor = CostGovernor()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,120 @@ import sqlite3
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 import os
+import re
 import json
+import functools
+
+from metrics import metrics
 
 # 데이터베이스 파일 경로 (프로젝트 루트에 저장)
 DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "youtube_news.db")
 
+# 스키마 버전 (initialize_db의 테이블/인덱스를 바꾸면 올림, PRAGMA user_version에 기록)
+SCHEMA_VERSION = 5
+
+# 빠진 분석을 이어서 수행하다 실패한 비디오의 재시도 간격과 최대 시도 횟수
+ANALYSIS_RETRY_BASE_MINUTES = 60
+ANALYSIS_RETRY_MAX_ATTEMPTS = 3
+
+# 기본 주식 종목 별칭 (정식 회사명, 티커, 다른 이름들)
+DEFAULT_STOCK_ALIASES = [
+    ("삼성전자", "005930", ["Samsung Electronics", "삼성전자우", "삼전"]),
+    ("SK하이닉스", "000660", ["SK Hynix", "하이닉스"]),
+    ("LG에너지솔루션", "373220", ["LG Energy Solution", "엘지에너지솔루션"]),
+    ("현대차", "005380", ["Hyundai Motor", "현대자동차"]),
+    ("NAVER", "035420", ["네이버", "Naver"]),
+    ("카카오", "035720", ["Kakao"]),
+    ("셀트리온", "068270", ["Celltrion"]),
+    ("POSCO홀딩스", "005490", ["포스코홀딩스", "포스코", "POSCO Holdings"]),
+    ("삼성바이오로직스", "207940", ["Samsung Biologics", "삼성바이오"]),
+    ("기아", "000270", ["Kia", "기아차"]),
+    ("애플", "AAPL", ["Apple"]),
+    ("엔비디아", "NVDA", ["NVIDIA", "Nvidia"]),
+    ("테슬라", "TSLA", ["Tesla"]),
+    ("마이크로소프트", "MSFT", ["Microsoft"]),
+    ("알파벳", "GOOGL", ["Alphabet", "구글", "Google", "GOOG"]),
+    ("아마존", "AMZN", ["Amazon"]),
+    ("메타", "META", ["Meta Platforms", "페이스북", "Facebook"]),
+    ("TSMC", "TSM", ["대만반도체", "Taiwan Semiconductor"]),
+]
+
+def _alias_key(name: str) -> str:
+    """별칭 비교용 키 (공백 제거, 소문자)"""
+    return re.sub(r'\s+', '', str(name or '')).lower()
+
+def _clean_ticker(ticker) -> Optional[str]:
+    """LLM이 돌려준 티커 정리 ('005930.KS', 'KRX:005930', 'NVDA (추정)' 등)"""
+    if not ticker or not isinstance(ticker, str):
+        return None
+    ticker = re.sub(r'\(?\s*추정\s*\)?', '', ticker).strip().upper()
+    ticker = re.sub(r'^(KRX|KOSPI|KOSDAQ|NASDAQ|NYSE)\s*:\s*', '', ticker)
+    ticker = re.sub(r'\.(KS|KQ)$', '', ticker)
+    if not ticker or ticker in ('정보 없음', 'N/A', '-'):
+        return None
+    return ticker
+
+# 이 프로세스에서 일어난 쓰기 횟수 (같은 프로세스의 조회 캐시는 DB를 다시 읽지 않고 바로 무효화)
+_process_writes = 0
+
+def bump_generation(db_path: str = None) -> int:
+    """
+    데이터 변경 세대 번호를 올립니다. 조회 캐시(query_cache)는 세대가 바뀌면 다시 조회합니다.
+
+    :param db_path: 데이터베이스 경로 (기본값: DB_PATH)
+    :return: 새 세대 번호
+    """
+    global _process_writes
+    _process_writes += 1
+    try:
+        conn = sqlite3.connect(db_path or DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS db_generation (id INTEGER PRIMARY KEY CHECK (id = 1), generation INTEGER NOT NULL)")
+        cursor.execute("""
+            INSERT INTO db_generation (id, generation) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE SET generation = generation + 1
+        """)
+        cursor.execute("SELECT generation FROM db_generation WHERE id = 1")
+        generation = cursor.fetchone()[0]
+        conn.commit()
+        conn.close()
+        return generation
+    except sqlite3.Error as e:
+        print(f"세대 번호 갱신 중 오류 발생: {e}")
+        return 0
+
+def get_generation(db_path: str = None) -> int:
+    """
+    현재 데이터 변경 세대 번호를 반환합니다. (다른 프로세스의 쓰기도 반영)
+
+    :param db_path: 데이터베이스 경로 (기본값: DB_PATH)
+    :return: 세대 번호 (아직 쓰기가 없으면 0)
+    """
+    try:
+        conn = sqlite3.connect(db_path or DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute("SELECT generation FROM db_generation WHERE id = 1")
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else 0
+    except sqlite3.OperationalError:
+        return 0
+
+def get_process_writes() -> int:
+    """이 프로세스에서 세대 번호를 올린 횟수"""
+    return _process_writes
+
+def invalidates_cache(func):
+    """쓰기 함수 실행 후 세대 번호를 올리는 데코레이터"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            bump_generation()
+    return wrapper
+
+@metrics.timed('db_query_seconds', function=True)
 def initialize_db():
     """데이터베이스와 테이블을 초기화합니다."""
     conn = sqlite3.connect(DB_PATH)
@@ -22,10 +131,17 @@ def initialize_db():
             view_count INTEGER NOT NULL,
             transcript TEXT,
             url TEXT NOT NULL,
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            transcript_index BLOB
         )
     """)
     
+    # 자막 세그먼트 색인 열 추가 (스키마 2) - 기존 SRT 자막은 아래에서 정규화
+    cursor.execute("PRAGMA table_info(videos)")
+    needs_transcript_normalize = 'transcript_index' not in [column[1] for column in cursor.fetchall()]
+    if needs_transcript_normalize:
+        cursor.execute("ALTER TABLE videos ADD COLUMN transcript_index BLOB")
+    
     # 요약 정보를 저장하는 테이블 추가
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS summaries (
@@ -34,6 +150,7 @@ def initialize_db():
             summary_type TEXT NOT NULL,
             content TEXT NOT NULL,
             created_at TEXT NOT NULL,
+            prompt_version TEXT,
             FOREIGN KEY (video_id) REFERENCES videos (id),
             UNIQUE (video_id, summary_type)
         )
@@ -85,18 +202,156 @@ def initialize_db():
             UNIQUE (keyword)
         )
     """)
-    
+
+    # 상세 분석(JSON)을 저장하는 테이블 추가
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS video_analysis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id TEXT NOT NULL,
+            video_title TEXT,
+            video_url TEXT,
+            analysis_type TEXT NOT NULL,
+            analysis_data TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            prompt_version TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_video_analysis_video ON video_analysis (video_id, analysis_type)")
+
+    # 분석을 만든 프롬프트 버전 열 추가 (스키마 4) - 기존 분석은 버전이 없어 오래된 것으로 취급
+    for table in ("summaries", "video_analysis"):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if 'prompt_version' not in [column[1] for column in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN prompt_version TEXT")
+
+    # 목록 페이지네이션용 인덱스 (최신순 키셋)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_videos_published ON videos (published_at, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_news_created ON news (created_at, id)")
+
+    # 주식 종목 별칭 테이블 (삼성전자 ↔ 005930 ↔ Samsung Electronics)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_aliases (
+            alias TEXT PRIMARY KEY,
+            company TEXT NOT NULL,
+            ticker TEXT
+        )
+    """)
+    for company, ticker, aliases in DEFAULT_STOCK_ALIASES:
+        for alias in [company, ticker] + aliases:
+            cursor.execute("INSERT OR IGNORE INTO stock_aliases (alias, company, ticker) VALUES (?, ?, ?)",
+                           (_alias_key(alias), company, ticker))
+
+    # 분석에서 언급된 주식 종목 색인 (분석 저장 시 채움)
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_mentions'")
+    needs_backfill = cursor.fetchone() is None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stock_mentions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            analysis_id INTEGER NOT NULL,
+            video_id TEXT NOT NULL,
+            company TEXT NOT NULL,
+            ticker TEXT,
+            context TEXT,
+            outlook TEXT,
+            published_at TEXT NOT NULL,
+            FOREIGN KEY (analysis_id) REFERENCES video_analysis (id),
+            UNIQUE (analysis_id, company)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_mentions_company ON stock_mentions (company, published_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_mentions_ticker ON stock_mentions (ticker, published_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_stock_mentions_analysis ON stock_mentions (analysis_id)")
+
+    # 수집 시 한 번 계산한 자막 청크 (모든 분석이 같은 청크를 읽음, 본문은 videos.transcript의 오프셋)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transcript_chunks (
+            video_id TEXT NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            start_offset INTEGER NOT NULL,
+            end_offset INTEGER NOT NULL,
+            token_count INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            start_ms INTEGER,
+            end_ms INTEGER,
+            chunker TEXT NOT NULL,
+            PRIMARY KEY (video_id, chunk_index),
+            FOREIGN KEY (video_id) REFERENCES videos (id)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transcript_chunks_hash ON transcript_chunks (content_hash)")
+
+    # 분석 실패 기록 (빠진 분석을 매 실행마다 다시 시도하지 않도록 백오프)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS analysis_attempts (
+            video_id TEXT PRIMARY KEY,
+            failed_types TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_attempt_at TEXT,
+            next_attempt_at TEXT,
+            FOREIGN KEY (video_id) REFERENCES videos (id)
+        )
+    """)
+
+    # 데이터 변경 세대 번호 (UI 조회 캐시 무효화용)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS db_generation (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO db_generation (id, generation) VALUES (1, 0)")
+
+    cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
     conn.close()
+
+    # 색인 테이블이 새로 생겼으면 기존 분석 결과로 한 번 채움
+    if needs_backfill:
+        rebuild_stock_mentions()
+    if needs_transcript_normalize:
+        normalize_stored_transcripts()
+    _schema_checked.add(DB_PATH)
     print(f"데이터베이스 초기화 완료: {DB_PATH}")
 
-def save_video_data(video_data: Dict[str, Any], transcript: Optional[str] = None):
+# 이 프로세스에서 스키마 버전을 확인한 DB 경로
+_schema_checked = set()
+
+def ensure_schema() -> bool:
+    """
+    스키마 버전을 확인하고 오래된 경우에만 initialize_db()를 실행합니다.
+    CLI, 워커, 앱 시작 시 한 번 호출합니다. (같은 프로세스에서 다시 호출하면 바로 반환)
+
+    :return: 초기화(마이그레이션)를 실행했는지 여부
+    """
+    if DB_PATH in _schema_checked:
+        return False
+    conn = sqlite3.connect(DB_PATH)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    conn.close()
+    if version >= SCHEMA_VERSION:
+        _schema_checked.add(DB_PATH)
+        return False
+    initialize_db()
+    return True
+
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
+def save_video_data(video_data: Dict[str, Any], transcript: Optional[str] = None,
+                    segment_index: Optional[bytes] = None):
     """
     비디오 정보와 자막을 데이터베이스에 저장합니다.
+    SRT/VTT 형식 자막이 들어오면 정규화한 본문과 세그먼트 색인으로 저장합니다.
     
     :param video_data: YouTube API에서 가져온 비디오 정보 (snippet, statistics 등 포함)
     :param transcript: 비디오 자막 (없으면 None)
+    :param segment_index: 정규화된 자막의 세그먼트 색인 (NormalizedTranscript.to_bytes())
     """
+    from caption_normalizer import is_caption_format, normalize_captions
+
+    if transcript and segment_index is None and is_caption_format(transcript):
+        normalized = normalize_captions(transcript)
+        transcript, segment_index = normalized.text, normalized.to_bytes()
+
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
@@ -143,8 +398,8 @@ def save_video_data(video_data: Dict[str, Any], transcript: Optional[str] = None
         cursor.execute("""
             INSERT INTO videos (
                 id, title, channel_id, channel_title, published_at,
-                duration, view_count, transcript, url, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                duration, view_count, transcript, url, created_at, transcript_index
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             video_id,
             title,
@@ -155,19 +410,29 @@ def save_video_data(video_data: Dict[str, Any], transcript: Optional[str] = None
             view_count,
             transcript,
             f"https://www.youtube.com/watch?v={video_id}",
-            datetime.now().isoformat()
+            datetime.now().isoformat(),
+            segment_index
         ))
         
         conn.commit()
         conn.close()
         print(f"비디오 ID {video_id}를 데이터베이스에 저장했습니다.")
-        return True
     except Exception as e:
         print(f"비디오 데이터 저장 중 오류 발생: {e}")
         conn.rollback()
         conn.close()
         return False
+    
+    # 자막 청크는 저장할 때 한 번만 계산 (실패해도 분석 시 다시 계산하므로 저장은 성공으로 처리)
+    if transcript:
+        try:
+            from caption_normalizer import NormalizedTranscript
+            save_transcript_chunks(video_id, NormalizedTranscript.from_bytes(transcript, segment_index))
+        except Exception as e:
+            print(f"비디오 ID {video_id}의 자막 청크 계산 중 오류 발생: {e}")
+    return True
 
+@metrics.timed('db_query_seconds', function=True)
 def get_video_data(video_id: str) -> Optional[Dict[str, Any]]:
     """
     비디오 ID로 저장된 데이터를 조회합니다.
@@ -197,13 +462,16 @@ def get_video_data(video_id: str) -> Optional[Dict[str, Any]]:
         "created_at": row[9]
     }
 
-def save_summary_to_db(video_id: str, summary_type: str, content: str) -> bool:
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
+def save_summary_to_db(video_id: str, summary_type: str, content: str, prompt_version: str = None) -> bool:
     """
     비디오 요약 정보를 데이터베이스에 저장합니다.
     
     :param video_id: 비디오 ID
     :param summary_type: 요약 유형 (summary, analysis_economic, analysis_simple, analysis_complex 등)
     :param content: 요약 또는 분석 내용
+    :param prompt_version: 분석에 사용한 프롬프트 버전 (prompt_registry.prompt_version)
     :return: 성공 여부
     """
     conn = sqlite3.connect(DB_PATH)
@@ -226,16 +494,16 @@ def save_summary_to_db(video_id: str, summary_type: str, content: str) -> bool:
             # 기존 요약 업데이트
             cursor.execute("""
                 UPDATE summaries 
-                SET content = ?, created_at = ? 
+                SET content = ?, created_at = ?, prompt_version = ? 
                 WHERE video_id = ? AND summary_type = ?
-            """, (content, datetime.now().isoformat(), video_id, summary_type))
+            """, (content, datetime.now().isoformat(), prompt_version, video_id, summary_type))
             print(f"비디오 ID {video_id}의 {summary_type} 요약이 업데이트되었습니다.")
         else:
             # 새 요약 삽입
             cursor.execute("""
-                INSERT INTO summaries (video_id, summary_type, content, created_at)
-                VALUES (?, ?, ?, ?)
-            """, (video_id, summary_type, content, datetime.now().isoformat()))
+                INSERT INTO summaries (video_id, summary_type, content, created_at, prompt_version)
+                VALUES (?, ?, ?, ?, ?)
+            """, (video_id, summary_type, content, datetime.now().isoformat(), prompt_version))
             print(f"비디오 ID {video_id}의 {summary_type} 요약이 저장되었습니다.")
         
         conn.commit()
@@ -247,6 +515,7 @@ def save_summary_to_db(video_id: str, summary_type: str, content: str) -> bool:
         conn.close()
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def get_summaries_for_video(video_id: str) -> Dict[str, str]:
     """
     비디오 ID에 대한 모든 요약/분석 정보를 가져옵니다.
@@ -268,6 +537,7 @@ def get_summaries_for_video(video_id: str) -> Dict[str, str]:
     
     return {row[0]: row[1] for row in results}
 
+@metrics.timed('db_query_seconds', function=True)
 def get_new_videos_since(since_timestamp: str, limit: int = 50) -> List[Dict[str, Any]]:
     """
     특정 시간 이후에 추가된 새로운 비디오 목록을 가져옵니다.
@@ -296,6 +566,7 @@ def get_new_videos_since(since_timestamp: str, limit: int = 50) -> List[Dict[str
     
     return results
 
+@metrics.timed('db_query_seconds', function=True)
 def get_videos_by_channel(channel_id: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     특정 채널의 비디오 목록을 가져옵니다.
@@ -324,6 +595,7 @@ def get_videos_by_channel(channel_id: str, limit: int = 10) -> List[Dict[str, An
     
     return results
 
+@metrics.timed('db_query_seconds', function=True)
 def get_videos_by_keyword(keyword: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
     제목에 특정 키워드가 포함된 비디오 목록을 가져옵니다.
@@ -352,6 +624,204 @@ def get_videos_by_keyword(keyword: str, limit: int = 10) -> List[Dict[str, Any]]
     
     return results
 
+def _keyset_page(rows: List[sqlite3.Row], limit: int, sort_column: str) -> Dict[str, Any]:
+    """limit + 1개 조회 결과를 한 페이지와 다음 페이지 커서로 나눔"""
+    items = [dict(row) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = (items[-1][sort_column], items[-1]['id'])
+    return {'items': items, 'next_cursor': next_cursor}
+
+@metrics.timed('db_query_seconds', function=True)
+def list_videos_page(limit: int = 20, cursor: Optional[tuple] = None, transcript_only: bool = True) -> Dict[str, Any]:
+    """
+    비디오 목록을 최신순 키셋 페이지네이션으로 가져옵니다.
+    자막/요약 본문은 포함하지 않으며, 필요할 때 get_stored_transcript / get_summaries_for_video로 조회합니다.
+    
+    :param limit: 페이지 크기
+    :param cursor: 이전 페이지의 next_cursor (published_at, id). None이면 첫 페이지
+    :param transcript_only: 자막이 있는 비디오만 조회할지 여부
+    :return: {'items': 비디오 목록, 'next_cursor': 다음 페이지 커서 (마지막 페이지면 None)}
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+    
+    conditions = []
+    params: List[Any] = []
+    if transcript_only:
+        conditions.append("transcript IS NOT NULL")
+    if cursor:
+        conditions.append("(published_at, id) < (?, ?)")
+        params.extend(cursor)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    cur.execute(f"""
+        SELECT id, title, channel_id, channel_title, published_at, view_count, url
+        FROM videos
+        {where}
+        ORDER BY published_at DESC, id DESC
+        LIMIT ?
+    """, params + [limit + 1])
+    page = _keyset_page(cur.fetchall(), limit, 'published_at')
+    
+    # 분석 수는 이 페이지의 비디오에 대해서만 한 번에 집계
+    video_ids = [item['id'] for item in page['items']]
+    counts = {}
+    if video_ids:
+        cur.execute(f"""
+            SELECT video_id, COUNT(*) FROM summaries
+            WHERE video_id IN ({','.join('?' * len(video_ids))})
+            GROUP BY video_id
+        """, video_ids)
+        counts = dict(cur.fetchall())
+    for item in page['items']:
+        item['analysis_count'] = counts.get(item['id'], 0)
+    
+    conn.close()
+    return page
+
+@metrics.timed('db_query_seconds', function=True)
+def get_stored_transcript(video_id: str) -> Optional[str]:
+    """
+    저장된 비디오 자막을 가져옵니다.
+    
+    :param video_id: 비디오 ID
+    :return: 자막 (없으면 None)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT transcript FROM videos WHERE id = ?", (video_id,))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] if row else None
+
+@metrics.timed('db_query_seconds', function=True)
+def get_transcript_segments(video_id: str) -> Optional['NormalizedTranscript']:
+    """
+    저장된 자막 본문과 세그먼트 색인(시작 ms, 본문 오프셋)을 가져옵니다.
+    시간 표시 인용이나 구간 경계를 고려한 청크 분할에 사용합니다.
+    
+    :param video_id: 비디오 ID
+    :return: NormalizedTranscript (자막이 없으면 None, 색인이 없으면 본문만)
+    """
+    from caption_normalizer import NormalizedTranscript
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT transcript, transcript_index FROM videos WHERE id = ?", (video_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if not row or not row[0]:
+        return None
+    return NormalizedTranscript.from_bytes(row[0], row[1])
+
+@invalidates_cache
+def normalize_stored_transcripts(batch_size: int = 200) -> int:
+    """
+    SRT/VTT 그대로 저장된 기존 자막을 정규화된 본문과 세그먼트 색인으로 바꿉니다.
+    
+    :return: 정규화한 비디오 수
+    """
+    from caption_normalizer import is_caption_format, normalize_captions
+
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    normalized_count = 0
+    last_id = ''
+    while True:
+        cursor.execute("""
+            SELECT id, transcript FROM videos
+            WHERE id > ? AND transcript IS NOT NULL AND transcript_index IS NULL
+            ORDER BY id LIMIT ?
+        """, (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for video_id, transcript in rows:
+            if is_caption_format(transcript):
+                normalized = normalize_captions(transcript)
+                cursor.execute("UPDATE videos SET transcript = ?, transcript_index = ? WHERE id = ?",
+                               (normalized.text, normalized.to_bytes(), video_id))
+                cursor.execute("DELETE FROM transcript_chunks WHERE video_id = ?", (video_id,))
+                normalized_count += 1
+        conn.commit()
+        last_id = rows[-1][0]
+    conn.close()
+    if normalized_count:
+        print(f"저장된 자막 {normalized_count}개를 정규화했습니다.")
+    return normalized_count
+
+def save_transcript_chunks(video_id: str, transcript: Optional['NormalizedTranscript'] = None,
+                           max_tokens: int = None) -> List[Dict[str, Any]]:
+    """
+    자막을 청크로 나누어 transcript_chunks에 저장합니다. (기존 청크는 교체)
+    
+    :param transcript: 정규화된 자막 (없으면 저장된 자막 사용)
+    :param max_tokens: 청크 최대 토큰 수 (기본값 CHUNK_MAX_TOKENS)
+    :return: 청크 목록 (본문 포함), 자막이 없으면 빈 목록
+    """
+    from transcript_chunker import CHUNK_MAX_TOKENS, build_chunks, chunker_id
+
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    transcript = transcript or get_transcript_segments(video_id)
+    if not transcript or not transcript.text:
+        return []
+    
+    with metrics.timer('transcript_chunking_seconds'):
+        chunks = build_chunks(transcript, max_tokens)
+    
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM transcript_chunks WHERE video_id = ?", (video_id,))
+    cursor.executemany("""
+        INSERT INTO transcript_chunks (
+            video_id, chunk_index, start_offset, end_offset, token_count,
+            content_hash, start_ms, end_ms, chunker
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [(video_id, chunk['chunk_index'], chunk['start_offset'], chunk['end_offset'], chunk['token_count'],
+           chunk['content_hash'], chunk['start_ms'], chunk['end_ms'], chunker_id(max_tokens)) for chunk in chunks])
+    conn.commit()
+    conn.close()
+    return chunks
+
+@metrics.timed('db_query_seconds', function=True)
+def get_transcript_chunks(video_id: str, max_tokens: int = None) -> List[Dict[str, Any]]:
+    """
+    저장된 자막 청크를 본문과 함께 가져옵니다.
+    청크가 없거나 분할 방식이 바뀌었으면 이때 한 번 계산해 저장합니다.
+    
+    :param video_id: 비디오 ID
+    :param max_tokens: 청크 최대 토큰 수 (기본값 CHUNK_MAX_TOKENS)
+    :return: [{'chunk_index', 'start_offset', 'end_offset', 'token_count', 'content_hash', 'start_ms', 'end_ms', 'text'}]
+    """
+    from transcript_chunker import CHUNK_MAX_TOKENS, chunker_id
+
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("SELECT transcript FROM videos WHERE id = ?", (video_id,))
+    row = cursor.fetchone()
+    cursor.execute("""
+        SELECT chunk_index, start_offset, end_offset, token_count, content_hash, start_ms, end_ms, chunker
+        FROM transcript_chunks WHERE video_id = ? ORDER BY chunk_index
+    """, (video_id,))
+    chunks = [dict(chunk) for chunk in cursor.fetchall()]
+    conn.close()
+    
+    if not row or not row['transcript']:
+        return []
+    if not chunks or any(chunk['chunker'] != chunker_id(max_tokens) for chunk in chunks):
+        return save_transcript_chunks(video_id, max_tokens=max_tokens)
+    
+    transcript = row['transcript']
+    for chunk in chunks:
+        del chunk['chunker']
+        chunk['text'] = transcript[chunk['start_offset']:chunk['end_offset']]
+    return chunks
+
+@metrics.timed('db_query_seconds', function=True)
 def generate_report(since_timestamp: str = None, hours: int = 12) -> Dict[str, Any]:
     """
     특정 기간 내의 새로운 콘텐츠에 대한 리포트를 생성합니다.
@@ -445,6 +915,7 @@ def generate_report(since_timestamp: str = None, hours: int = 12) -> Dict[str, A
     
     return report_data
 
+@metrics.timed('db_query_seconds', function=True)
 def get_all_channels() -> List[Dict[str, Any]]:
     """
     저장된 모든 채널 목록을 가져옵니다.
@@ -466,6 +937,8 @@ def get_all_channels() -> List[Dict[str, Any]]:
     
     return results
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def add_channel(channel_id: str, title: str, handle: str = None, description: str = None) -> bool:
     """
     새 채널을 추가합니다.
@@ -503,6 +976,8 @@ def add_channel(channel_id: str, title: str, handle: str = None, description: st
         conn.close()
         return False
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def delete_channel(channel_id: str) -> bool:
     """
     채널을 삭제합니다.
@@ -534,6 +1009,7 @@ def delete_channel(channel_id: str) -> bool:
         conn.close()
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def search_channels_by_keyword(keyword: str) -> List[Dict[str, Any]]:
     """
     키워드로 채널을 검색합니다.
@@ -557,6 +1033,7 @@ def search_channels_by_keyword(keyword: str) -> List[Dict[str, Any]]:
     
     return results
 
+@metrics.timed('db_query_seconds', function=True)
 def get_all_keywords() -> List[Dict[str, Any]]:
     """
     저장된 모든 키워드 목록을 가져옵니다.
@@ -578,6 +1055,8 @@ def get_all_keywords() -> List[Dict[str, Any]]:
     
     return results
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def add_keyword(keyword: str) -> bool:
     """
     새 키워드를 추가합니다.
@@ -612,6 +1091,8 @@ def add_keyword(keyword: str) -> bool:
         conn.close()
         return False
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def delete_keyword(keyword_id: int) -> bool:
     """
     키워드를 삭제합니다.
@@ -643,6 +1124,7 @@ def delete_keyword(keyword_id: int) -> bool:
         conn.close()
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def search_videos_by_keyword(keyword: str, limit: int = 50) -> List[Dict[str, Any]]:
     """
     제목이나 자막에 특정 키워드가 포함된 비디오 목록을 가져옵니다.
@@ -671,6 +1153,7 @@ def search_videos_by_keyword(keyword: str, limit: int = 50) -> List[Dict[str, An
     
     return results
 
+@metrics.timed('db_query_seconds', function=True)
 def is_video_in_db(video_id: str) -> bool:
     """
     비디오 ID가 데이터베이스에 있는지 확인합니다.
@@ -685,6 +1168,107 @@ def is_video_in_db(video_id: str) -> bool:
     conn.close()
     return result
 
+# 상세 분석 유형 → video_analysis 테이블의 analysis_type
+DETAILED_ANALYSIS_STORAGE = {
+    "economic_insights": "analysis_economic",
+    "detailed_summary": "economic",
+}
+
+@metrics.timed('db_query_seconds', function=True)
+def get_missing_analysis_types(video_id: str, analysis_types: List[str]) -> List[str]:
+    """
+    비디오에 아직 저장되지 않은 분석 유형을 반환합니다.
+    (저장 도중 중단되어 비디오만 있고 분석이 빠진 경우를 찾기 위함)
+
+    :param video_id: 비디오 ID
+    :param analysis_types: 확인할 분석 유형 목록 (summaries 유형 또는 상세 분석 유형)
+    :return: 저장되지 않은 분석 유형 목록
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT summary_type FROM summaries WHERE video_id = ?", (video_id,))
+    existing = {row[0] for row in cursor.fetchall()}
+
+    try:
+        cursor.execute("SELECT analysis_type FROM video_analysis WHERE video_id = ?", (video_id,))
+        existing_detailed = {row[0] for row in cursor.fetchall()}
+    except sqlite3.OperationalError:
+        existing_detailed = set()
+
+    conn.close()
+
+    missing = []
+    for analysis_type in analysis_types:
+        if analysis_type in DETAILED_ANALYSIS_STORAGE:
+            if DETAILED_ANALYSIS_STORAGE[analysis_type] not in existing_detailed:
+                missing.append(analysis_type)
+        elif analysis_type not in existing:
+            missing.append(analysis_type)
+    return missing
+
+def record_analysis_failure(video_id: str, failed_types: List[str]) -> Dict[str, Any]:
+    """
+    분석 실패를 기록하고 다음 재시도 시각을 계산합니다. (시도마다 간격을 두 배로 늘림)
+
+    :param video_id: 비디오 ID
+    :param failed_types: 실패한 분석 유형 목록
+    :return: 시도 횟수(attempts)와 다음 재시도 시각(next_attempt_at)
+    """
+    now = datetime.now(timezone.utc)
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT attempts FROM analysis_attempts WHERE video_id = ?", (video_id,))
+    row = cursor.fetchone()
+    attempts = (row[0] if row else 0) + 1
+    next_attempt = now + timedelta(minutes=ANALYSIS_RETRY_BASE_MINUTES * (2 ** (attempts - 1)))
+    cursor.execute("""
+        INSERT INTO analysis_attempts (video_id, failed_types, attempts, last_attempt_at, next_attempt_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(video_id) DO UPDATE SET
+            failed_types = excluded.failed_types,
+            attempts = excluded.attempts,
+            last_attempt_at = excluded.last_attempt_at,
+            next_attempt_at = excluded.next_attempt_at
+    """, (video_id, json.dumps(failed_types), attempts, now.isoformat(), next_attempt.isoformat()))
+    conn.commit()
+    conn.close()
+    return {'attempts': attempts, 'next_attempt_at': next_attempt.isoformat()}
+
+def should_retry_analysis(video_id: str) -> bool:
+    """
+    빠진 분석을 지금 다시 시도해도 되는지 확인합니다.
+    실패 기록이 없거나 재시도 시각이 지났으면 True, 최대 시도 횟수를 넘었으면 False
+
+    :param video_id: 비디오 ID
+    :return: 재시도 가능 여부
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("SELECT attempts, next_attempt_at FROM analysis_attempts WHERE video_id = ?", (video_id,))
+    row = cursor.fetchone()
+    conn.close()
+    if row is None:
+        return True
+    attempts, next_attempt_at = row
+    if attempts >= ANALYSIS_RETRY_MAX_ATTEMPTS:
+        return False
+    return datetime.fromisoformat(next_attempt_at) <= datetime.now(timezone.utc)
+
+def clear_analysis_failures(video_id: str) -> bool:
+    """
+    모든 분석이 저장된 비디오의 실패 기록을 지웁니다.
+
+    :param video_id: 비디오 ID
+    :return: 지운 기록이 있었는지 여부
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM analysis_attempts WHERE video_id = ?", (video_id,))
+    conn.commit()
+    conn.close()
+    return cursor.rowcount > 0
+
 def analyze_video(video_id: str, analysis_type: str) -> bool:
     """
     비디오를 분석하고 결과를 데이터베이스에 저장합니다.
@@ -694,6 +1278,7 @@ def analyze_video(video_id: str, analysis_type: str) -> bool:
     :return: 성공 여부
     """
     from llm_handler import summarize_transcript, analyze_transcript_with_type
+    from prompt_registry import prompt_version
     
     try:
         # 비디오 정보 가져오기
@@ -708,20 +1293,67 @@ def analyze_video(video_id: str, analysis_type: str) -> bool:
             return False
         
         transcript = result[0]
+        chunks = [chunk['text'] for chunk in get_transcript_chunks(video_id)] or None
         
         # 분석 수행
         if analysis_type == "summary":
-            result_text = summarize_transcript(transcript, analysis_type=analysis_type)
+            result_text = summarize_transcript(transcript, analysis_type=analysis_type, chunks=chunks)
         else:
-            result_text = analyze_transcript_with_type(transcript, analysis_type)
+            result_text = analyze_transcript_with_type(transcript, analysis_type, chunks)
         
         # 결과 저장
-        return save_summary_to_db(video_id, analysis_type, result_text)
+        return save_summary_to_db(video_id, analysis_type, result_text, prompt_version(analysis_type))
     
     except Exception as e:
         print(f"비디오 분석 중 오류 발생: {e}")
         return False
 
+@metrics.timed('db_query_seconds', function=True)
+def find_stale_analyses(current_versions: Dict[str, str], limit: int = None) -> List[Dict[str, Any]]:
+    """
+    현재 프롬프트 버전과 다른(또는 버전이 없는) 저장된 분석을 찾습니다. (최신 비디오부터)
+    없는 분석은 찾지 않습니다. (get_missing_analysis_types로 처리)
+
+    :param current_versions: 분석 유형 → 현재 프롬프트 버전
+    :param limit: 최대 개수
+    :return: [{'video_id', 'title', 'analysis_type', 'prompt_version', 'transcript_tokens', 'chunk_count'}]
+             transcript_tokens는 저장된 청크의 토큰 수 합 (청크가 없으면 글자 수 / 3)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+
+    stale = []
+    for analysis_type, version in current_versions.items():
+        if analysis_type in DETAILED_ANALYSIS_STORAGE:
+            table, type_column, stored_type = "video_analysis", "analysis_type", DETAILED_ANALYSIS_STORAGE[analysis_type]
+        else:
+            table, type_column, stored_type = "summaries", "summary_type", analysis_type
+        cursor.execute(f"""
+            SELECT DISTINCT a.video_id, v.title, v.published_at, a.prompt_version,
+                   COALESCE(c.tokens, LENGTH(v.transcript) / 3) AS transcript_tokens,
+                   COALESCE(c.chunk_count, 1) AS chunk_count
+            FROM {table} a
+            JOIN videos v ON v.id = a.video_id
+            LEFT JOIN (
+                SELECT video_id, SUM(token_count) AS tokens, COUNT(*) AS chunk_count
+                FROM transcript_chunks GROUP BY video_id
+            ) c ON c.video_id = a.video_id
+            WHERE a.{type_column} = ?
+              AND (a.prompt_version IS NULL OR a.prompt_version != ?)
+              AND v.transcript IS NOT NULL AND v.transcript != ''
+        """, (stored_type, version))
+        for row in cursor.fetchall():
+            entry = dict(row)
+            entry['analysis_type'] = analysis_type
+            stale.append(entry)
+    conn.close()
+
+    stale.sort(key=lambda entry: entry['published_at'] or '', reverse=True)
+    return stale[:limit] if limit else stale
+
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def save_news_article(title: str, content: str, news_type: str = "economic", video_ids: List[str] = None, style: str = "basic", word_count: int = 1000, language: str = "ko", keywords: List[str] = None) -> bool:
     """
     뉴스 사설을 데이터베이스에 저장합니다.
@@ -795,6 +1427,7 @@ def get_field_type(field_name: str) -> str:
     else:
         return 'TEXT'
 
+@metrics.timed('db_query_seconds', function=True)
 def get_latest_news(news_type: str = None, limit: int = 10) -> List[Dict[str, Any]]:
     """
     최신 뉴스 사설을 가져옵니다.
@@ -877,6 +1510,7 @@ def get_latest_news(news_type: str = None, limit: int = 10) -> List[Dict[str, An
         conn.close()
         return []
 
+@metrics.timed('db_query_seconds', function=True)
 def get_news_by_id(news_id: int) -> Optional[Dict[str, Any]]:
     """
     특정 ID의 뉴스 사설을 가져옵니다.
@@ -947,7 +1581,8 @@ def get_news_by_id(news_id: int) -> Optional[Dict[str, Any]]:
         conn.close()
         return None
 
-def generate_economic_news_from_recent_videos(hours: int = 24, style: str = "basic", word_count: int = 1000, language: str = "ko") -> Optional[Dict[str, Any]]:
+def generate_economic_news_from_recent_videos(hours: int = 24, style: str = "basic", word_count: int = 1000, language: str = "ko",
+                                              on_token=None) -> Optional[Dict[str, Any]]:
     """
     최근 지정된 시간 내의 비디오 자막을 사용하여 경제 뉴스 사설을 생성합니다.
     
@@ -955,8 +1590,11 @@ def generate_economic_news_from_recent_videos(hours: int = 24, style: str = "bas
     :param style: 리포트 스타일 (basic, concise, editorial, news, research)
     :param word_count: 원하는 글자수 (대략적인 값)
     :param language: 언어 선택 (ko: 한국어, en: 영어)
+    :param on_token: 사설 본문 조각을 생성되는 대로 받을 함수 (저장은 생성이 끝난 뒤 한 번)
     :return: 생성된 뉴스 사설 정보 (성공한 경우) 또는 None (실패한 경우)
+    :raises BudgetExceeded: 토큰 예산이 부족해 사설 생성을 미뤄야 하는 경우
     """
+    from cost_governor import BudgetExceeded
     from llm_handler import generate_economic_news
     
     conn = sqlite3.connect(DB_PATH)
@@ -1000,7 +1638,8 @@ def generate_economic_news_from_recent_videos(hours: int = 24, style: str = "bas
             transcripts, 
             style=style, 
             word_count=word_count, 
-            language=language
+            language=language,
+            on_token=on_token
         )
         
         # 제목 추출 (첫 번째 줄을 제목으로 사용)
@@ -1023,6 +1662,10 @@ def generate_economic_news_from_recent_videos(hours: int = 24, style: str = "bas
             }
         else:
             return None
+    except BudgetExceeded:
+        # 예산 부족은 호출한 쪽에서 미루거나 알릴 수 있도록 그대로 전달
+        conn.close()
+        raise
     except Exception as e:
         print(f"경제 뉴스 사설 생성 중 오류 발생: {e}")
         conn.close()
@@ -1085,6 +1728,8 @@ def extract_keywords_from_recent_videos(hours: int = 24, max_keywords: int = 15)
         conn.close()
         return []
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def save_extracted_keywords(keywords: List[str]) -> bool:
     """
     추출된 키워드를 데이터베이스에 저장합니다.
@@ -1121,6 +1766,7 @@ def save_extracted_keywords(keywords: List[str]) -> bool:
         conn.close()
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def get_all_extracted_keywords(limit: int = 50) -> List[Dict[str, Any]]:
     """
     저장된 모든 추출된 키워드를 가져옵니다.
@@ -1157,7 +1803,8 @@ def get_all_extracted_keywords(limit: int = 50) -> List[Dict[str, Any]]:
         conn.close()
         return []
 
-def generate_news_by_keywords(keywords: List[str], hours: int = 24, style: str = "basic", word_count: int = 1000, language: str = "ko") -> Optional[Dict[str, Any]]:
+def generate_news_by_keywords(keywords: List[str], hours: int = 24, style: str = "basic", word_count: int = 1000, language: str = "ko",
+                              on_token=None) -> Optional[Dict[str, Any]]:
     """
     선택된 키워드에 초점을 맞춰 경제 뉴스 사설을 생성합니다.
     
@@ -1166,8 +1813,11 @@ def generate_news_by_keywords(keywords: List[str], hours: int = 24, style: str =
     :param style: 리포트 스타일 (basic, concise, editorial, news, research)
     :param word_count: 원하는 글자수 (대략적인 값)
     :param language: 언어 선택 (ko: 한국어, en: 영어)
+    :param on_token: 사설 본문 조각을 생성되는 대로 받을 함수 (저장은 생성이 끝난 뒤 한 번)
     :return: 생성된 뉴스 사설 정보 (성공한 경우) 또는 None (실패한 경우)
+    :raises BudgetExceeded: 토큰 예산이 부족해 사설 생성을 미뤄야 하는 경우
     """
+    from cost_governor import BudgetExceeded
     from llm_handler import generate_news_by_keywords
     
     if not keywords:
@@ -1212,11 +1862,13 @@ def generate_news_by_keywords(keywords: List[str], hours: int = 24, style: str =
         
         # 키워드 기반 뉴스 사설 생성
         news_content = generate_news_by_keywords(
-            transcripts,
             keywords,
+            hours=hours,
+            subtitles=transcripts,
             style=style,
             word_count=word_count,
-            language=language
+            language=language,
+            on_token=on_token
         )
         
         # 제목 추출 (첫 번째 줄을 제목으로 사용)
@@ -1251,11 +1903,15 @@ def generate_news_by_keywords(keywords: List[str], hours: int = 24, style: str =
             }
         else:
             return None
+    except BudgetExceeded:
+        # 예산 부족은 호출한 쪽에서 미루거나 알릴 수 있도록 그대로 전달
+        raise
     except Exception as e:
         print(f"키워드 기반 뉴스 사설 생성 중 오류 발생: {e}")
         return None
 
 # 채널별 최신 영상 분석 정보를 가져오는 함수
+@metrics.timed('db_query_seconds', function=True)
 def get_latest_videos_analysis_by_channel(channel_id: str, hours: int = 72, limit: int = 10) -> List[Dict[str, Any]]:
     """
     특정 채널의 최신 영상들에 대한 분석 정보를 가져옵니다.
@@ -1326,6 +1982,7 @@ def get_latest_videos_analysis_by_channel(channel_id: str, hours: int = 72, limi
         return []
 
 # 키워드별 최신 영상 분석 정보를 가져오는 함수
+@metrics.timed('db_query_seconds', function=True)
 def get_latest_videos_analysis_by_keyword(keyword: str, hours: int = 72, limit: int = 10) -> List[Dict[str, Any]]:
     """
     특정 키워드를 포함하는 최신 영상들에 대한 분석 정보를 가져옵니다.
@@ -1393,13 +2050,231 @@ def get_latest_videos_analysis_by_keyword(keyword: str, hours: int = 72, limit:
         print(traceback.format_exc())
         return []
 
+def _to_utc_text(timestamp: Optional[str]) -> str:
+    """비교 가능한 UTC 문자열로 변환 ('Z', '+09:00', 시간대 없음 모두 처리)"""
+    try:
+        parsed = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        parsed = datetime.now(timezone.utc)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _extract_stock_entries(analysis_data: Any) -> List[Dict[str, Any]]:
+    """
+    분석 JSON에서 주식 종목 목록을 찾습니다.
+    상세 분석은 '언급된_모든_주식_종목_상세_정보', 경제 분석은 키 이름이 일정하지 않아 '주식_종목'이 들어간 목록을 사용합니다.
+    """
+    if not isinstance(analysis_data, dict):
+        return []
+    entries = analysis_data.get('언급된_모든_주식_종목_상세_정보')
+    if not isinstance(entries, list):
+        entries = next((value for key, value in analysis_data.items()
+                        if isinstance(value, list) and '주식' in key and '종목' in key), [])
+    return [entry for entry in entries if isinstance(entry, dict) and entry.get('회사명')]
+
+def _entry_text(entry: Dict[str, Any], *prefixes: str) -> Optional[str]:
+    """'언급된_맥락' / '언급된 내용'처럼 키 이름이 조금씩 다른 값을 찾음"""
+    for key, value in entry.items():
+        if any(key.replace(' ', '_').startswith(prefix) for prefix in prefixes):
+            return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    return None
+
+def _resolve_stock(cursor, name: Optional[str], ticker: Optional[str] = None, learn: bool = False):
+    """
+    회사명/티커를 별칭 테이블로 정규화합니다.
+
+    :param learn: True면 처음 보는 종목의 이름과 티커를 별칭으로 등록
+    :return: (정식 회사명, 티커, 별칭 테이블에서 찾았는지 여부)
+    """
+    ticker = _clean_ticker(ticker)
+    for key in (_alias_key(name), _alias_key(ticker)):
+        if not key:
+            continue
+        cursor.execute("SELECT company, ticker FROM stock_aliases WHERE alias = ?", (key,))
+        row = cursor.fetchone()
+        if row:
+            return row[0], row[1] or ticker, True
+
+    company = str(name or ticker or '').strip()
+    if learn and company:
+        for alias in (company, ticker):
+            if alias:
+                cursor.execute("INSERT OR IGNORE INTO stock_aliases (alias, company, ticker) VALUES (?, ?, ?)",
+                               (_alias_key(alias), company, ticker))
+    return company, ticker, False
+
+def _index_stock_mentions(cursor, analysis_id: int, video_id: str, analysis_data: Any, published_at: str) -> int:
+    """분석 하나의 주식 종목 언급을 stock_mentions에 기록하고 기록한 수를 반환합니다."""
+    cursor.execute("DELETE FROM stock_mentions WHERE analysis_id = ?", (analysis_id,))
+    count = 0
+    for entry in _extract_stock_entries(analysis_data):
+        company, ticker, _ = _resolve_stock(cursor, entry.get('회사명'), entry.get('티커') or entry.get('티커_심볼'),
+                                            learn=True)
+        if not company:
+            continue
+        cursor.execute("""
+            INSERT OR IGNORE INTO stock_mentions
+                (analysis_id, video_id, company, ticker, context, outlook, published_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (analysis_id, video_id, company, ticker,
+              _entry_text(entry, '언급된'), _entry_text(entry, '전망'), _to_utc_text(published_at)))
+        count += cursor.rowcount
+    return count
+
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
+def save_video_analysis(video_id: str, analysis_type: str, analysis_data: Dict[str, Any],
+                        video_title: str = None, video_url: str = None, prompt_version: str = None) -> bool:
+    """
+    상세 분석 JSON을 video_analysis에 저장하고 주식 종목 언급을 색인합니다.
+    같은 비디오/유형의 이전 분석은 새 분석으로 교체합니다.
+
+    :param video_id: 비디오 ID
+    :param analysis_type: 분석 유형 (economic: 상세 분석, analysis_economic: 경제 분석)
+    :param analysis_data: 분석 결과 (dict)
+    :param video_title: 비디오 제목 (없으면 videos 테이블에서 조회)
+    :param video_url: 비디오 URL (없으면 videos 테이블에서 조회)
+    :param prompt_version: 분석에 사용한 프롬프트 버전 (prompt_registry.prompt_version)
+    :return: 성공 여부
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute("SELECT title, url, published_at FROM videos WHERE id = ?", (video_id,))
+        video = cursor.fetchone()
+        created_at = datetime.now().isoformat()
+        published_at = video[2] if video else datetime.now(timezone.utc).isoformat()
+
+        cursor.execute("SELECT id FROM video_analysis WHERE video_id = ? AND analysis_type = ?",
+                       (video_id, analysis_type))
+        for (old_id,) in cursor.fetchall():
+            cursor.execute("DELETE FROM stock_mentions WHERE analysis_id = ?", (old_id,))
+            cursor.execute("DELETE FROM video_analysis WHERE id = ?", (old_id,))
+
+        cursor.execute("""
+            INSERT INTO video_analysis (video_id, video_title, video_url, analysis_type, analysis_data, created_at,
+                                        prompt_version)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            video_id,
+            video_title or (video[0] if video else None),
+            video_url or (video[1] if video else f"https://www.youtube.com/watch?v={video_id}"),
+            analysis_type,
+            json.dumps(analysis_data, ensure_ascii=False),
+            created_at,
+            prompt_version
+        ))
+        mentions = _index_stock_mentions(cursor, cursor.lastrowid, video_id, analysis_data, published_at)
+
+        conn.commit()
+        conn.close()
+        if mentions:
+            print(f"비디오 ID {video_id}의 주식 종목 언급 {mentions}개를 색인했습니다.")
+        return True
+    except Exception as e:
+        print(f"분석 결과 저장 중 오류 발생: {e}")
+        conn.rollback()
+        conn.close()
+        return False
+
+def save_analysis(video_id: str, analysis_type: str, analysis_data: Dict[str, Any],
+                  prompt_version: str = None) -> bool:
+    """
+    경제 분석 결과를 저장합니다.
+
+    :param video_id: 비디오 ID
+    :param analysis_type: 분석 유형 (analysis_economic 등)
+    :param analysis_data: 분석 결과 (dict)
+    :param prompt_version: 분석에 사용한 프롬프트 버전
+    :return: 성공 여부
+    """
+    return save_video_analysis(video_id, analysis_type, analysis_data, prompt_version=prompt_version)
+
+def save_detailed_video_analysis(video_id: str, video_title: str, video_url: str,
+                                 analysis_data: Dict[str, Any], prompt_version: str = None) -> bool:
+    """
+    상세 영상 분석 결과를 저장합니다.
+
+    :param video_id: 비디오 ID
+    :param video_title: 비디오 제목
+    :param video_url: 비디오 URL
+    :param analysis_data: create_detailed_video_summary 결과
+    :param prompt_version: 분석에 사용한 프롬프트 버전
+    :return: 성공 여부
+    """
+    return save_video_analysis(video_id, 'economic', analysis_data, video_title, video_url, prompt_version)
+
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
+def rebuild_stock_mentions() -> int:
+    """
+    저장된 모든 분석 결과로 stock_mentions를 다시 만듭니다.
+    (색인 도입 이전 데이터나 별칭을 추가한 뒤에 사용)
+
+    :return: 색인한 종목 언급 수
+    """
+    conn = sqlite3.connect(DB_PATH)
+    cursor = conn.cursor()
+
+    cursor.execute("""
+        SELECT va.id, va.video_id, va.analysis_data, COALESCE(v.published_at, va.created_at)
+        FROM video_analysis va
+        LEFT JOIN videos v ON va.video_id = v.id
+    """)
+    rows = cursor.fetchall()
+
+    cursor.execute("DELETE FROM stock_mentions")
+    total = 0
+    for analysis_id, video_id, analysis_data, published_at in rows:
+        try:
+            data = json.loads(analysis_data) if isinstance(analysis_data, str) else analysis_data
+        except json.JSONDecodeError:
+            continue
+        total += _index_stock_mentions(cursor, analysis_id, video_id, data, published_at)
+
+    conn.commit()
+    conn.close()
+    if rows:
+        print(f"분석 {len(rows)}개에서 주식 종목 언급 {total}개를 색인했습니다.")
+    return total
+
+@invalidates_cache
+def add_stock_alias(company: str, ticker: str = None, aliases: List[str] = None) -> bool:
+    """
+    주식 종목 별칭을 추가합니다. (이미 있는 별칭은 새 종목으로 바꿈)
+
+    :param company: 정식 회사명
+    :param ticker: 티커
+    :param aliases: 다른 이름 목록 (영문명, 약칭 등)
+    :return: 성공 여부
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        ticker = _clean_ticker(ticker)
+        for alias in [company, ticker] + list(aliases or []):
+            if alias:
+                cursor.execute("INSERT OR REPLACE INTO stock_aliases (alias, company, ticker) VALUES (?, ?, ?)",
+                               (_alias_key(alias), company, ticker))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"주식 종목 별칭 추가 중 오류 발생: {e}")
+        return False
+
 # 주식 종목별 최신 영상 분석 정보를 가져오는 함수
+@metrics.timed('db_query_seconds', function=True)
 def get_latest_videos_by_stock(stock_name: str, hours: int = 168, limit: int = 10) -> List[Dict[str, Any]]:
     """
     특정 주식 종목이 언급된 최신 영상들을 가져옵니다.
+    종목명/티커/영문명은 별칭 테이블로 정규화한 뒤 stock_mentions 색인에서 찾고,
+    별칭에 없는 이름은 회사명/티커 부분 일치로 찾습니다.
     
     :param stock_name: 주식 종목명 또는 티커
-    :param hours: 최근 몇 시간 이내의 영상을 가져올지 (기본값: 168시간/7일)
+    :param hours: 최근 몇 시간 이내에 게시된 영상을 가져올지 (기본값: 168시간/7일)
     :param limit: 최대 결과 수 (기본값: 10)
     :return: 주식 종목이 언급된 최신 영상 목록
     """
@@ -1407,65 +2282,61 @@ def get_latest_videos_by_stock(stock_name: str, hours: int = 168, limit: int = 1
         conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        # 디버깅을 위해 video_analysis 테이블의 총 레코드 수 확인
-        cursor.execute("SELECT COUNT(*) FROM video_analysis")
-        total_analysis = cursor.fetchone()[0]
-        print(f"video_analysis 테이블의 총 레코드 수: {total_analysis}")
-        
-        # 모든 분석 데이터를 조회 (시간 제한 없이)
-        cursor.execute("""
-            SELECT va.video_id, va.video_title, va.video_url, va.analysis_data, va.created_at
-            FROM video_analysis va
-            JOIN videos v ON va.video_id = v.id
-            ORDER BY va.created_at DESC
-        """)
-        
-        results = cursor.fetchall()
-        print(f"분석 데이터 {len(results)}개를 가져왔습니다.")
-        conn.close()
-        
-        # 특정 주식 종목이 언급된 영상 필터링
+
+        company, ticker, known = _resolve_stock(cursor, stock_name, stock_name)
+        since = _to_utc_text((datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat())
+
+        query = """
+            SELECT sm.video_id, sm.company, sm.ticker, sm.published_at,
+                   va.video_title, va.video_url, va.analysis_data, va.created_at
+            FROM stock_mentions sm
+            JOIN video_analysis va ON va.id = sm.analysis_id
+            WHERE ({}) AND sm.published_at >= ?
+            ORDER BY sm.published_at DESC, va.analysis_type = 'economic' DESC
+        """
+        if known:
+            cursor.execute(query.format("sm.company = ? OR sm.ticker = ?"), (company, ticker, since))
+        else:
+            # 입력의 %, _ 는 와일드카드가 아닌 글자로 검색 (예: "S&P_500")
+            escaped = stock_name.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            pattern = f"%{escaped}%"
+            cursor.execute(query.format("sm.company LIKE ? ESCAPE '\\' OR sm.ticker LIKE ? ESCAPE '\\'"),
+                           (pattern, pattern, since))
+
         stock_videos = []
-        for result in results:
-            result_dict = dict(result)
-            
-            # 분석 데이터 파싱
+        seen = set()
+        for row in cursor.fetchall():
+            # 한 영상에 분석이 여러 개 있으면 상세 분석을 우선 사용
+            if row['video_id'] in seen:
+                continue
+            seen.add(row['video_id'])
+
             try:
-                analysis_data = json.loads(result_dict['analysis_data']) if isinstance(result_dict['analysis_data'], str) else result_dict['analysis_data']
-                
-                # 주식 종목 정보 확인
-                if '언급된_모든_주식_종목_상세_정보' in analysis_data and isinstance(analysis_data['언급된_모든_주식_종목_상세_정보'], list):
-                    stock_info = analysis_data['언급된_모든_주식_종목_상세_정보']
-                    
-                    # 주식 종목명 또는 티커가 일치하는지 확인
-                    for stock in stock_info:
-                        if ('회사명' in stock and stock_name.lower() in stock['회사명'].lower()) or \
-                           ('티커' in stock and stock_name.lower() in stock['티커'].lower()):
-                            # 해당 종목 정보를 맨 앞으로 이동
-                            matched_stock = stock
-                            filtered_stocks = [matched_stock] + [s for s in stock_info if s != matched_stock]
-                            
-                            # 결과 추가
-                            video_data = {
-                                'video_id': result_dict['video_id'],
-                                'title': result_dict['video_title'],
-                                'url': result_dict['video_url'],
-                                'created_at': result_dict['created_at'],
-                                'analysis_data': analysis_data,
-                                'stock_info': filtered_stocks
-                            }
-                            stock_videos.append(video_data)
-                            print(f"영상 '{result_dict['video_title']}'에서 '{stock_name}' 주식 종목이 언급되었습니다.")
-                            break
-            except Exception as e:
-                print(f"분석 데이터 파싱 중 오류 발생: {e}")
+                analysis_data = json.loads(row['analysis_data'])
+            except (TypeError, json.JSONDecodeError):
                 continue
-        
+
+            # 해당 종목 정보를 맨 앞으로 이동
+            stock_info = _extract_stock_entries(analysis_data)
+            matched = [s for s in stock_info
+                       if _resolve_stock(cursor, s.get('회사명'), s.get('티커'))[0] == row['company']]
+            filtered_stocks = matched[:1] + [s for s in stock_info if s not in matched[:1]]
+
+            stock_videos.append({
+                'video_id': row['video_id'],
+                'title': row['video_title'],
+                'url': row['video_url'],
+                'published_at': row['published_at'],
+                'created_at': row['created_at'],
+                'analysis_data': analysis_data,
+                'stock_info': filtered_stocks
+            })
+            if len(stock_videos) >= limit:
+                break
+
+        conn.close()
         print(f"총 {len(stock_videos)}개의 영상에서 '{stock_name}' 주식 종목이 언급되었습니다.")
-        
-        # 최대 결과 수로 제한
-        return stock_videos[:limit]
+        return stock_videos
     
     except Exception as e:
         print(f"주식 종목별 최신 영상 분석 정보 조회 중 오류 발생: {e}")
@@ -1474,6 +2345,7 @@ def get_latest_videos_by_stock(stock_name: str, hours: int = 168, limit: int = 1
         return []
 
 # 비디오 상세 분석 정보를 가져오는 함수
+@metrics.timed('db_query_seconds', function=True)
 def get_detailed_video_analysis(video_id: str) -> Optional[Dict[str, Any]]:
     """
     특정 비디오의 상세 분석 정보를 가져옵니다.
@@ -1506,10 +2378,54 @@ def get_detailed_video_analysis(video_id: str) -> Optional[Dict[str, Any]]:
         print(f"비디오 상세 분석 정보 조회 중 오류 발생: {e}")
         return None
 
-# 데이터베이스 초기화 (모듈 로드 시 실행)
-initialize_db()
-
 # Editorial 관련 함수들 추가
+@metrics.timed('db_query_seconds', function=True)
+def list_editorials_page(limit: int = 20, cursor: Optional[tuple] = None, news_type: str = None) -> Dict[str, Any]:
+    """
+    뉴스/사설 목록을 최신순 키셋 페이지네이션으로 가져옵니다. (본문 제외, 본문은 get_news_by_id로 조회)
+    
+    :param limit: 페이지 크기
+    :param cursor: 이전 페이지의 next_cursor (created_at, id). None이면 첫 페이지
+    :param news_type: 뉴스 유형 필터 (None이면 전체)
+    :return: {'items': 사설 목록, 'next_cursor': 다음 페이지 커서 (마지막 페이지면 None)}
+    """
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cur = conn.cursor()
+        
+        conditions = []
+        params: List[Any] = []
+        if news_type:
+            conditions.append("news_type = ?")
+            params.append(news_type)
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        cur.execute(f"""
+            SELECT id, title, news_type, created_at, style, word_count, language, keywords
+            FROM news
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, params + [limit + 1])
+        page = _keyset_page(cur.fetchall(), limit, 'created_at')
+        conn.close()
+        
+        for item in page['items']:
+            try:
+                item['keywords'] = json.loads(item['keywords']) if item['keywords'] else []
+            except (TypeError, json.JSONDecodeError):
+                item['keywords'] = []
+        return page
+    
+    except Exception as e:
+        print(f"사설 목록 조회 중 오류 발생: {e}")
+        return {'items': [], 'next_cursor': None}
+
+@metrics.timed('db_query_seconds', function=True)
 def get_all_editorials() -> List[Dict[str, Any]]:
     """
     모든 editorial(사설) 목록을 가져옵니다.
@@ -1557,6 +2473,8 @@ def get_all_editorials() -> List[Dict[str, Any]]:
         print(f"Editorial 목록 조회 중 오류 발생: {e}")
         return []
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def save_editorial(title: str, content: str, news_type: str = "editorial", video_ids: List[str] = None, style: str = "basic", word_count: int = 1000, language: str = "ko", keywords: List[str] = None) -> bool:
     """
     Editorial을 데이터베이스에 저장합니다.
@@ -1596,6 +2514,7 @@ def save_editorial(title: str, content: str, news_type: str = "editorial", video
         print(f"Editorial 저장 중 오류 발생: {e}")
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def get_editorials_by_date_range(start_date: str, end_date: str) -> List[Dict[str, Any]]:
     """
     특정 날짜 범위의 editorial을 가져옵니다.
@@ -1646,6 +2565,8 @@ def get_editorials_by_date_range(start_date: str, end_date: str) -> List[Dict[st
         print(f"날짜 범위 editorial 조회 중 오류 발생: {e}")
         return []
 
+@invalidates_cache
+@metrics.timed('db_query_seconds', function=True)
 def delete_editorial(editorial_id: int) -> bool:
     """
     Editorial을 삭제합니다.
@@ -1673,6 +2594,7 @@ def delete_editorial(editorial_id: int) -> bool:
         print(f"Editorial 삭제 중 오류 발생: {e}")
         return False
 
+@metrics.timed('db_query_seconds', function=True)
 def is_video_processed(video_id: str) -> bool:
     """
     비디오가 이미 처리되었는지 확인합니다.
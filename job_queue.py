@@ -0,0 +1,456 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+SQLite 기반 영속 작업 큐
+메타데이터 조회, 자막 조회, 분석, 사설 생성 작업을 여러 워커 프로세스가 나누어 처리
+(리스/가시성 타임아웃, 지수 백오프 재시도, 멱등성 키 지원)
+웹 인터페이스에서 요청한 작업은 요청자(owner), 진행률, 취소 요청을 함께 기록해 화면에서 조회
+"""
+
+import json
+import random
+import socket
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# 작업 유형
+JOB_FETCH_METADATA = "fetch_metadata"
+JOB_FETCH_TRANSCRIPT = "fetch_transcript"
+JOB_ANALYZE = "analyze"
+JOB_EDITORIAL = "editorial"
+JOB_RSS_COLLECT = "rss_collect"
+JOB_RSS_SYNC = "rss_sync"
+JOB_TYPES = [JOB_FETCH_METADATA, JOB_FETCH_TRANSCRIPT, JOB_ANALYZE, JOB_EDITORIAL, JOB_RSS_COLLECT, JOB_RSS_SYNC]
+
+# 끝난 상태 (더 이상 실행되지 않음)
+FINISHED_STATUSES = ('done', 'dead', 'cancelled')
+
+# 기존 jobs 테이블에 없으면 추가하는 컬럼
+PROGRESS_COLUMNS = {
+    'owner': 'TEXT',
+    'progress': 'REAL DEFAULT 0',
+    'progress_message': 'TEXT',
+    'cancel_requested': 'INTEGER DEFAULT 0',
+}
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 3600
+
+
+def analysis_key(video_id: str, analysis_type: str) -> str:
+    """분석 작업 멱등성 키 (같은 동영상·분석 유형은 한 번만 큐에 들어감)"""
+    return f"{JOB_ANALYZE}:{video_id}:{analysis_type}"
+
+
+def default_worker_id() -> str:
+    """호스트명과 PID로 워커 식별자 생성"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    def __init__(self, db_path: str = "youtube_news.db", lease_seconds: int = DEFAULT_LEASE_SECONDS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+
+    def _connect(self) -> sqlite3.Connection:
+        # 여러 프로세스가 같은 DB 파일을 공유하므로 잠금 대기 시간을 넉넉히 줌
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def initialize_db(self):
+        """작업 큐 테이블 초기화"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        # 동시 읽기/쓰기를 위해 WAL 모드 사용
+        cursor.execute('PRAGMA journal_mode=WAL')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_type TEXT NOT NULL,
+                payload TEXT,
+                idempotency_key TEXT UNIQUE,
+                status TEXT DEFAULT 'queued',
+                priority INTEGER DEFAULT 0,
+                attempts INTEGER DEFAULT 0,
+                max_attempts INTEGER DEFAULT 5,
+                available_at TEXT NOT NULL,
+                lease_owner TEXT,
+                lease_expires_at TEXT,
+                last_error TEXT,
+                result TEXT,
+                owner TEXT,
+                progress REAL DEFAULT 0,
+                progress_message TEXT,
+                cancel_requested INTEGER DEFAULT 0,
+                created_at TEXT,
+                updated_at TEXT
+            )
+        ''')
+
+        # 이전 버전 테이블에 진행률/취소 컬럼 추가
+        cursor.execute("PRAGMA table_info(jobs)")
+        columns = [row[1] for row in cursor.fetchall()]
+        for column, column_type in PROGRESS_COLUMNS.items():
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_claim
+            ON jobs (status, job_type, available_at)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_jobs_owner
+            ON jobs (owner, id)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def enqueue(self, job_type: str, payload: Dict = None, idempotency_key: str = None,
+                priority: int = 0, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                delay_seconds: int = 0, owner: str = None, revive: bool = False) -> Optional[int]:
+        """
+        작업 추가. 같은 멱등성 키의 작업이 이미 있으면 새로 만들지 않고 기존 ID를 반환합니다.
+        :param owner: 작업을 요청한 사용자 (웹 인터페이스의 "내 작업" 목록에 사용)
+        :param revive: 같은 키의 작업이 이미 끝났으면(완료·실패·취소) 다시 대기열에 넣음.
+                       실행 중이거나 대기 중이면 그 작업을 그대로 사용 (같은 키의 작업은 동시에 하나만 실행)
+        :return: 작업 ID
+        """
+        now = datetime.now()
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT OR IGNORE INTO jobs
+                (job_type, payload, idempotency_key, priority, max_attempts, available_at, owner, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                job_type,
+                json.dumps(payload or {}, ensure_ascii=False),
+                idempotency_key,
+                priority,
+                max_attempts,
+                (now + timedelta(seconds=delay_seconds)).isoformat(),
+                owner,
+                now.isoformat(),
+                now.isoformat()
+            ))
+
+            if cursor.rowcount > 0:
+                job_id = cursor.lastrowid
+            else:
+                cursor.execute('SELECT id, status FROM jobs WHERE idempotency_key = ?', (idempotency_key,))
+                row = cursor.fetchone()
+                job_id = row['id'] if row else None
+                if row and revive and row['status'] in FINISHED_STATUSES:
+                    cursor.execute('''
+                        UPDATE jobs
+                        SET status = 'queued', attempts = 0, available_at = ?, progress = 0,
+                            progress_message = NULL, cancel_requested = 0, last_error = NULL, result = NULL,
+                            owner = COALESCE(?, owner), updated_at = ?
+                        WHERE id = ?
+                    ''', (now.isoformat(), owner, now.isoformat(), job_id))
+
+            conn.commit()
+            return job_id
+        finally:
+            conn.close()
+
+    def claim(self, worker_id: str, job_types: List[str] = None) -> Optional[Dict]:
+        """
+        실행할 작업 하나를 리스와 함께 가져옴.
+        리스가 만료된 실행 중 작업(워커가 죽은 경우)도 다시 가져올 수 있습니다.
+        """
+        now = datetime.now()
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            # 쓰기 잠금을 먼저 잡아 두 워커가 같은 작업을 가져가지 않도록 함
+            cursor.execute('BEGIN IMMEDIATE')
+
+            type_filter = ''
+            params = [now.isoformat(), now.isoformat()]
+            if job_types:
+                type_filter = f"AND job_type IN ({','.join('?' for _ in job_types)})"
+                params.extend(job_types)
+
+            cursor.execute(f'''
+                SELECT * FROM jobs
+                WHERE ((status = 'queued' AND available_at <= ?)
+                       OR (status = 'running' AND lease_expires_at <= ?))
+                {type_filter}
+                ORDER BY priority DESC, available_at ASC
+                LIMIT 1
+            ''', params)
+            row = cursor.fetchone()
+            if not row:
+                conn.commit()
+                return None
+
+            lease_expires_at = (now + timedelta(seconds=self.lease_seconds)).isoformat()
+            if row['cancel_requested']:
+                # 실행 중 취소 요청을 받은 뒤 워커가 죽은 작업은 다시 실행하지 않음
+                cursor.execute('''
+                    UPDATE jobs SET status = 'cancelled', lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                    WHERE id = ?
+                ''', (now.isoformat(), row['id']))
+                conn.commit()
+                return None
+
+            cursor.execute('''
+                UPDATE jobs
+                SET status = 'running', lease_owner = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+            ''', (worker_id, lease_expires_at, now.isoformat(), row['id']))
+            conn.commit()
+
+            job = dict(row)
+            job['payload'] = json.loads(job['payload'] or '{}')
+            job['attempts'] += 1
+            job['lease_owner'] = worker_id
+            job['lease_expires_at'] = lease_expires_at
+            return job
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """실행이 오래 걸리는 작업의 리스 연장. 리스를 잃었으면 False"""
+        now = datetime.now()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET lease_expires_at = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        ''', ((now + timedelta(seconds=self.lease_seconds)).isoformat(), now.isoformat(), job_id, worker_id))
+        extended = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return extended
+
+    def update_progress(self, job_id: int, worker_id: str, progress: float, message: str = None) -> bool:
+        """
+        실행 중 작업의 진행률(0~1) 기록. 리스도 함께 연장합니다.
+        :return: 계속 실행해도 되면 True, 취소 요청을 받았거나 리스를 잃었으면 False
+        """
+        now = datetime.now()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs SET progress = ?, progress_message = ?, lease_expires_at = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        ''', (max(0.0, min(float(progress), 1.0)), message,
+              (now + timedelta(seconds=self.lease_seconds)).isoformat(), now.isoformat(), job_id, worker_id))
+        updated = cursor.rowcount > 0
+        cursor.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,))
+        row = cursor.fetchone()
+        conn.commit()
+        conn.close()
+        return updated and not (row and row['cancel_requested'])
+
+    def cancel(self, job_id: int, owner: str = None) -> Optional[str]:
+        """
+        작업 취소. 대기 중인 작업은 바로 취소되고, 실행 중인 작업은 워커가 다음 진행률 보고 때 중단합니다.
+        :param owner: 지정하면 이 사용자가 요청한 작업만 취소
+        :return: 변경된 상태 ('cancelled', 'cancelling'), 끝난 작업이면 현재 상태, 없으면 None
+        """
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            query = 'SELECT status FROM jobs WHERE id = ?'
+            params = [job_id]
+            if owner is not None:
+                query += ' AND owner = ?'
+                params.append(owner)
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+            if not row:
+                conn.commit()
+                return None
+
+            if row['status'] == 'queued':
+                cursor.execute('''
+                    UPDATE jobs SET status = 'cancelled', cancel_requested = 1, updated_at = ?
+                    WHERE id = ?
+                ''', (now, job_id))
+                status = 'cancelled'
+            elif row['status'] == 'running':
+                cursor.execute('UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ?', (now, job_id))
+                status = 'cancelling'
+            else:
+                status = row['status']
+            conn.commit()
+            return status
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def mark_cancelled(self, job_id: int, worker_id: str) -> bool:
+        """취소 요청을 받고 중단한 작업을 cancelled 상태로"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs
+            SET status = 'cancelled', lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', (datetime.now().isoformat(), job_id, worker_id))
+        updated = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return updated
+
+    def complete(self, job_id: int, worker_id: str, result: Dict = None) -> bool:
+        """작업 완료 처리"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE jobs
+            SET status = 'done', result = ?, last_error = NULL, progress = 1,
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ?
+        ''', (json.dumps(result, ensure_ascii=False) if result is not None else None,
+              datetime.now().isoformat(), job_id, worker_id))
+        updated = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return updated
+
+    @staticmethod
+    def backoff_seconds(attempts: int) -> float:
+        """재시도 대기 시간 (지수 백오프 + 지터)"""
+        delay = min(BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)), BACKOFF_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+    def fail(self, job_id: int, worker_id: str, error: str, retry_after: float = None) -> str:
+        """
+        작업 실패 처리. 재시도 횟수가 남았으면 백오프 후 다시 대기열로, 아니면 dead 상태로.
+        :return: 변경된 상태 ('queued' 또는 'dead')
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?',
+                       (job_id, worker_id))
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return 'lost'
+
+        now = datetime.now()
+        if row['attempts'] >= row['max_attempts']:
+            status = 'dead'
+            available_at = now
+        else:
+            status = 'queued'
+            delay = retry_after if retry_after is not None else self.backoff_seconds(row['attempts'])
+            available_at = now + timedelta(seconds=delay)
+
+        cursor.execute('''
+            UPDATE jobs
+            SET status = ?, last_error = ?, available_at = ?,
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE id = ?
+        ''', (status, str(error)[:2000], available_at.isoformat(), now.isoformat(), job_id))
+        conn.commit()
+        conn.close()
+        return status
+
+    def retry_dead(self, job_type: str = None) -> int:
+        """dead 상태 작업을 다시 대기열로 (시도 횟수 초기화)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        query = '''
+            UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ?
+            WHERE status = 'dead'
+        '''
+        now = datetime.now().isoformat()
+        params = [now, now]
+        if job_type:
+            query += ' AND job_type = ?'
+            params.append(job_type)
+        cursor.execute(query, params)
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return count
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """작업 조회"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        return self._row_to_job(row)
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'] or '{}')
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def list_jobs(self, owner: str = None, limit: int = 20, active_only: bool = False) -> List[Dict]:
+        """
+        최근 작업 목록 (최신순)
+        :param owner: 지정하면 이 사용자가 요청한 작업만
+        :param active_only: 대기 중이거나 실행 중인 작업만
+        """
+        conditions = []
+        params = []
+        if owner is not None:
+            conditions.append('owner = ?')
+            params.append(owner)
+        if active_only:
+            conditions.append(f"status NOT IN ({','.join('?' for _ in FINISHED_STATUSES)})")
+            params.extend(FINISHED_STATUSES)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT * FROM jobs {where} ORDER BY id DESC LIMIT ?', params + [limit])
+        jobs = [self._row_to_job(row) for row in cursor.fetchall()]
+        conn.close()
+        return jobs
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """작업 유형·상태별 개수"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT job_type, status, COUNT(*) AS count
+            FROM jobs
+            GROUP BY job_type, status
+        ''')
+        stats = {}
+        for row in cursor.fetchall():
+            stats.setdefault(row['job_type'], {})[row['status']] = row['count']
+        conn.close()
+        return stats
+
+    def purge_done(self, older_than_days: int = 7) -> int:
+        """완료(또는 취소)된 오래된 작업 정리 (멱등성 키도 함께 해제됨)"""
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM jobs WHERE status IN ('done', 'cancelled') AND updated_at < ?", (cutoff,))
+        count = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return count
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+무거운 모듈 지연 로드
+httpx, tiktoken, googleapiclient.discovery, pandas처럼 로드가 오래 걸리는 모듈을
+처음 사용할 때 로드해서 CLI, 워커, Streamlit 시작 시간을 줄임
+"""
+
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """
+    처음 속성에 접근할 때 실제로 로드되는 모듈을 반환합니다. (importlib.util.LazyLoader)
+    모듈이 설치되어 있지 않으면 바로 ModuleNotFoundError가 발생합니다.
+
+    :param name: 모듈 이름 (예: "httpx", "googleapiclient.discovery")
+    :return: 모듈 객체
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    # 상위 패키지 속성으로도 접근할 수 있게 등록 (googleapiclient.discovery.build 형태)
+    parent, _, child = name.rpartition('.')
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    return module
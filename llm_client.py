@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+LLM 클라이언트 (OpenAI 호환 Chat Completions API)
+openai SDK 대신 httpx로 /chat/completions를 직접 호출하고, 동기/비동기 인터페이스가 각각
+keep-alive 연결 풀을 공유함 (연결 수 제한이 동시 요청 수의 상한 역할)
+제공자(엔드포인트, API 키 환경 변수)를 등록해 바꿀 수 있어 로컬 스텁 서버
+(benchmarks/llm_stub_server.py)로 네트워크 없이 분석 경로를 실행하고 부하 테스트할 수 있음
+stream_chat은 응답을 SSE(stream=true)로 받아 조각이 도착하는 대로 돌려줌
+환경 변수: LLM_PROVIDER(openai, stub), LLM_BASE_URL, LLM_TIMEOUT, LLM_CONNECT_TIMEOUT, LLM_MAX_CONNECTIONS
+"""
+
+import asyncio
+import json
+import os
+import threading
+from typing import Dict, Iterator, Optional
+
+from lazy_imports import lazy_import
+
+# httpx는 처음 요청할 때 로드
+httpx = lazy_import("httpx")
+
+DEFAULT_PROVIDER = "openai"
+
+# 요청 제한 시간(초) - 응답 생성이 긴 통합 요청 기준, 연결은 짧게
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+# 연결 풀 크기 (클라이언트 하나당, 동기/비동기 각각)
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE = 10
+
+# 이름 → {'base_url', 'api_key_env'} (api_key_env가 None이면 인증 없이 호출)
+PROVIDERS: Dict[str, Dict] = {}
+
+
+def register_provider(name: str, base_url: str, api_key_env: Optional[str] = None):
+    """
+    OpenAI 호환 엔드포인트 등록
+    :param base_url: /chat/completions 앞까지의 URL (예: https://api.openai.com/v1)
+    :param api_key_env: API 키를 읽을 환경 변수 이름
+    """
+    PROVIDERS[name] = {'base_url': base_url.rstrip('/'), 'api_key_env': api_key_env}
+
+
+register_provider("openai", "https://api.openai.com/v1", "OPENAI_API_KEY")
+register_provider("stub", "http://127.0.0.1:8765/v1")
+
+
+class LLMError(Exception):
+    """LLM API 호출 실패 (HTTP 오류 응답 또는 연결/시간 초과)"""
+
+    def __init__(self, message: str, status_code: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class LLMClient:
+    def __init__(self, provider: str = None, base_url: str = None, api_key: str = None,
+                 timeout: float = None, connect_timeout: float = None, max_connections: int = None):
+        """
+        설정하지 않은 값은 처음 요청할 때 환경 변수와 등록된 제공자에서 읽음 (.env 로드 이후)
+        :param provider: 등록된 제공자 이름 (기본값은 LLM_PROVIDER, 없으면 openai)
+        :param base_url: 제공자의 엔드포인트 대신 사용할 URL
+        """
+        self._provider = provider
+        self._base_url = base_url
+        self._api_key = api_key
+        self._timeout = timeout
+        self._connect_timeout = connect_timeout
+        self._max_connections = max_connections
+        self._lock = threading.Lock()
+        self._client = None
+        # AsyncClient는 만든 이벤트 루프에서만 쓸 수 있으므로 루프와 함께 보관
+        self._async_client = None
+        self._async_loop = None
+
+    # ----- 설정 -----
+
+    @property
+    def provider(self) -> Dict:
+        name = self._provider or os.getenv("LLM_PROVIDER") or DEFAULT_PROVIDER
+        if name not in PROVIDERS:
+            raise ValueError(f"알 수 없는 LLM 제공자: {name} (등록된 제공자: {', '.join(PROVIDERS)})")
+        return PROVIDERS[name]
+
+    @property
+    def base_url(self) -> str:
+        return (self._base_url or os.getenv("LLM_BASE_URL") or self.provider['base_url']).rstrip('/')
+
+    @property
+    def api_key(self) -> Optional[str]:
+        if self._api_key:
+            return self._api_key
+        api_key_env = self.provider['api_key_env']
+        return os.getenv(api_key_env) if api_key_env else None
+
+    def is_configured(self) -> bool:
+        """호출할 수 있는지 (API 키가 필요한 제공자는 키가 있을 때만 True)"""
+        return bool(self.api_key) or self.provider['api_key_env'] is None
+
+    def _client_options(self) -> Dict:
+        max_connections = self._max_connections or int(os.getenv("LLM_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS))
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        return {
+            'base_url': self.base_url,
+            'headers': headers,
+            # 풀에서 연결을 기다리는 시간은 제한하지 않음 (동시 요청이 풀 크기를 넘으면 대기열처럼 동작)
+            'timeout': httpx.Timeout(
+                self._timeout or _env_float("LLM_TIMEOUT", DEFAULT_TIMEOUT),
+                connect=self._connect_timeout or _env_float("LLM_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT),
+                pool=None,
+            ),
+            'limits': httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=min(DEFAULT_MAX_KEEPALIVE, max_connections)),
+        }
+
+    # ----- 연결 풀 -----
+
+    def _sync_client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_options())
+            return self._client
+
+    def _current_async_client(self):
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            # 이전 루프의 클라이언트는 그 루프가 끝나면 쓸 수 없으므로 새로 만듦
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            self._async_loop = loop
+        return self._async_client
+
+    def close(self):
+        """동기 연결 풀 닫기"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """현재 이벤트 루프의 비동기 연결 풀 닫기"""
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.aclose()
+        self._async_client = None
+        self._async_loop = None
+
+    # ----- 요청 -----
+
+    @staticmethod
+    def _result(response) -> Dict:
+        if response.status_code >= 400:
+            try:
+                message = response.json()['error']['message']
+            except Exception:
+                message = response.text[:200]
+            retry_after = response.headers.get("retry-after")
+            raise LLMError(f"LLM API 오류 {response.status_code}: {message}", response.status_code,
+                           float(retry_after) if retry_after and retry_after.isdigit() else None)
+        return response.json()
+
+    def chat(self, **request) -> Dict:
+        """
+        Chat Completions 요청 (동기)
+        :param request: model, messages, temperature, max_tokens, response_format 등 요청 본문
+        :return: 응답 JSON (choices, usage 등)
+        """
+        try:
+            response = self._sync_client().post("/chat/completions", json=request)
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 연결 오류: {e}") from e
+        return self._result(response)
+
+    def stream_chat(self, **request) -> Iterator[Dict]:
+        """
+        Chat Completions 스트리밍 요청 (동기, SSE)
+        마지막 이벤트에 usage가 오도록 stream_options.include_usage를 함께 보냄
+        :return: 이벤트 JSON 반복자 (choices[0].delta.content에 본문 조각)
+        """
+        body = dict(request, stream=True, stream_options={"include_usage": True})
+        try:
+            with self._sync_client().stream("POST", "/chat/completions", json=body) as response:
+                if response.status_code >= 400:
+                    response.read()
+                    self._result(response)
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    yield json.loads(data)
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 연결 오류: {e}") from e
+
+    async def achat(self, **request) -> Dict:
+        """Chat Completions 요청 (비동기, 같은 이벤트 루프의 요청끼리 연결 풀 공유)"""
+        try:
+            response = await self._current_async_client().post("/chat/completions", json=request)
+        except httpx.HTTPError as e:
+            raise LLMError(f"LLM API 연결 오류: {e}") from e
+        return self._result(response)
+
+
+# 전역 LLM 클라이언트 인스턴스
+llm_client = LLMClient()
@@ -1,24 +1,36 @@
 import os
-import openai
 from config import get_openai_api_key
 from typing import Dict, Any, List, Optional, Set
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
 import time
-import tiktoken
 import logging
+import functools
 
-# 환경 변수 로드
-load_dotenv()
+from caption_normalizer import NormalizedTranscript
+from chunk_result_cache import chunk_result_cache, request_key
+from cost_governor import BudgetExceeded, cost_governor
+from lazy_imports import lazy_import
+from llm_client import llm_client
+from metrics import metrics
+from prompt_registry import DEFAULT_COMPLETION_TOKENS, register_prompt
+from transcript_chunker import CHUNK_MAX_TOKENS, build_chunks
 
-# OpenAI API 키 설정
-openai.api_key = os.getenv("OPENAI_API_KEY")
+# tiktoken은 로드가 오래 걸리므로 처음 토큰을 셀 때 로드
+# (환경 변수는 config 모듈이 .env.local / .env에서 로드)
+tiktoken = lazy_import("tiktoken")
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 비동기 분석에서 분석 하나가 동시에 보내는 청크 요청 수 (전체 동시 요청 수는 llm_client 연결 풀 크기로 제한)
+ANALYSIS_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+def _llm_configured() -> bool:
+    """LLM을 호출할 수 있는지 확인합니다. (API 키가 필요한 제공자는 키가 있으면 True)"""
+    return llm_client.is_configured()
+
 # 분석 유형별 시스템 프롬프트 정의
 SYSTEM_PROMPTS = {
     "summary": "당신은 영상 자막을 효과적으로 요약하는 전문가입니다. 핵심 내용만 간결하게 요약해주세요.",
@@ -43,210 +55,564 @@ LANGUAGE_INSTRUCTIONS = {
     "en": "Please write in English."
 }
 
-# 토큰 계산 함수
-def num_tokens_from_string(string: str, model: str = "gpt-4o-mini") -> int:
-    """문자열의 토큰 수를 반환합니다."""
+# 자막 요약/분석에 사용하는 모델
+ANALYSIS_MODEL = "gpt-4o-mini"
+
+# 분석 유형별 분석 요청 (analyze_transcript_with_type)
+ANALYSIS_PROMPTS = {
+    "analysis_economic": "이 내용의 경제적 의미와 시장에 미치는 영향을 분석해주세요.",
+    "analysis_simple": "이 내용의 핵심 요점과 중요성을 간단히 설명해주세요.",
+    "analysis_complex": "이 내용의 다양한 측면(사회적, 경제적, 정치적, 문화적)을 종합적으로 분석하고 잠재적 영향을 평가해주세요."
+}
+
+# 청크별 요청과 통합 요청 템플릿
+# 프롬프트는 "고정 지시문 → 가변 데이터(제목, 자막, 부분 결과)" 순서로 구성 (앞부분이 같은 요청끼리
+# 제공자 측 프롬프트 캐시를 공유하므로 가변 데이터를 지시문 앞이나 중간에 넣지 않음)
+SUMMARY_CHUNK_PROMPT = "다음 자막을 {analysis_type}해주세요:\n\n{chunk}"
+SUMMARY_COMBINE_PROMPT = "다음은 긴 자막을 여러 부분으로 나누어 {analysis_type}한 내용입니다. 이 모든 요약을 통합하여 하나의 일관된 최종 결과를 생성해주세요:\n\n{combined}"
+ANALYSIS_CHUNK_PROMPT = "{prompt}\n\n다음 자막을 분석해주세요:\n\n{chunk}"
+ANALYSIS_COMBINE_PROMPT = "{prompt}\n\n다음은 긴 자막을 여러 부분으로 나누어 분석한 내용입니다. 이 모든 분석을 통합하여 하나의 일관된 최종 분석을 생성해주세요:\n\n{combined}"
+
+# 경제 인사이트 분석 (JSON 응답)
+ECONOMIC_INSIGHTS_SYSTEM_PROMPT = "당신은 경제 및 주식 시장 분석 전문가입니다. 주어진 텍스트에서 경제 및 주식 관련 정보를 정확하게 추출하여 구조화된 형식으로 제공합니다."
+ECONOMIC_INSIGHTS_CHUNK_PROMPT = """YouTube 영상의 자막을 분석하여 다음 항목에 대한 정보를 추출해주세요:
+
+1. 경제 및 주식 시장 관련 주요 내용 요약 (500자 이내)
+2. 언급된 경제 지표나 이벤트 (bullet points)
+3. 언급된 주식 종목 및 관련 정보 (회사명, 티커, 언급된 내용)
+4. 시장 전망이나 예측 정보
+5. 투자 전략이나 조언 (있는 경우)
+
+각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
+
+영상 제목: {video_title}
+
+자막:
+{chunk}"""
+ECONOMIC_INSIGHTS_COMBINE_SYSTEM_PROMPT = "당신은 경제 및 주식 시장 분석 전문가입니다. 여러 분석 결과를 통합하여 종합적이고 일관된 분석 보고서를 작성합니다."
+ECONOMIC_INSIGHTS_COMBINE_PROMPT = """YouTube 영상의 자막을 여러 부분으로 나누어 분석한 결과를 통합하여 다음 항목에 대한 종합적인 분석을 제공해주세요:
+
+1. 경제 및 주식 시장 관련 주요 내용 종합 요약 (800자 이내)
+2. 언급된 모든 경제 지표나 이벤트 (중복 제거)
+3. 언급된 모든 주식 종목 및 관련 정보 (회사명, 티커, 언급된 내용 종합)
+4. 종합적인 시장 전망이나 예측 정보
+5. 투자 전략이나 조언 (있는 경우)
+6. 핵심 키워드 (5-10개)
+
+각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
+
+영상 제목: {video_title}
+
+부분별 분석 결과:
+{analysis_results}"""
+
+# 상세 영상 요약 (JSON 응답)
+DETAILED_SUMMARY_SYSTEM_PROMPT = "당신은 경제 및 주식 시장 분석 전문가입니다. 주어진 텍스트에서 경제 및 주식 관련 정보를 상세하게 추출하여 구조화된 형식으로 제공합니다."
+DETAILED_SUMMARY_CHUNK_PROMPT = """YouTube 영상의 자막을 분석하여 다음 항목에 대한 상세 정보를 추출해주세요:
+
+1. 영상 내용 요약 (500자 이내)
+2. 핵심 주제 및 논점 (bullet points)
+3. 언급된 주식 종목 상세 정보:
+   - 회사명
+   - 티커 심볼 (추정 가능한 경우)
+   - 언급된 맥락 및 내용
+   - 전망/예측 (있는 경우)
+4. 경제 지표 및 동향 분석
+5. 전문가 의견이나 인용구 (있는 경우)
+
+각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
+
+영상 제목: {video_title}
+
+자막:
+{chunk}"""
+DETAILED_SUMMARY_COMBINE_SYSTEM_PROMPT = "당신은 경제 및 주식 시장 분석 전문가입니다. 여러 분석 결과를 통합하여 종합적이고 상세한 분석 보고서를 작성합니다."
+DETAILED_SUMMARY_COMBINE_PROMPT = """YouTube 영상의 자막을 여러 부분으로 나누어 분석한 결과를 통합하여 다음 항목에 대한 종합적인 상세 요약을 제공해주세요:
+
+1. 영상 제목 (아래 제목 그대로)
+2. 영상 URL (아래 URL 그대로)
+3. 영상 내용 종합 요약 (1000자 이내, 풍부한 정보 포함)
+4. 핵심 주제 및 논점 (중복 제거, 중요도순)
+5. 언급된 모든 주식 종목 상세 정보 (알파벳 순서로 정렬):
+   - 회사명
+   - 티커 심볼 (추정 가능한 경우)
+   - 언급된 맥락 및 내용
+   - 전망/예측 (있는 경우)
+6. 경제 지표 및 동향 종합 분석
+7. 투자 전략이나 시사점
+8. 전문가 의견이나 인용구 (있는 경우)
+9. 핵심 키워드 (5-10개)
+
+각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
+주식 종목 정보는 가능한 한 상세하게 제공하고, 티커 심볼이 확실하지 않은 경우 '추정'이라고 표시해주세요.
+
+영상 제목: {video_title}
+영상 URL: {video_url}
+
+부분별 분석 결과:
+{analysis_results}"""
+
+# 저장된 분석에 기록하는 프롬프트 버전 (위 템플릿이나 아래 옵션을 바꾸면 해당 유형의 기존 분석이 오래된 것으로 표시됨)
+register_prompt("summary", ANALYSIS_MODEL, SYSTEM_PROMPTS["summary"], SUMMARY_CHUNK_PROMPT, SUMMARY_COMBINE_PROMPT,
+                max_tokens=1500, temperature=0.3)
+for _analysis_type, _prompt in ANALYSIS_PROMPTS.items():
+    register_prompt(_analysis_type, ANALYSIS_MODEL, SYSTEM_PROMPTS[_analysis_type], ANALYSIS_CHUNK_PROMPT,
+                    ANALYSIS_COMBINE_PROMPT, _prompt, max_tokens=1500, temperature=0.3)
+register_prompt("economic_insights", ANALYSIS_MODEL, ECONOMIC_INSIGHTS_SYSTEM_PROMPT, ECONOMIC_INSIGHTS_CHUNK_PROMPT,
+                ECONOMIC_INSIGHTS_COMBINE_SYSTEM_PROMPT, ECONOMIC_INSIGHTS_COMBINE_PROMPT,
+                temperature=0.2, combine_temperature=0.3, response_format="json_object")
+register_prompt("detailed_summary", ANALYSIS_MODEL, DETAILED_SUMMARY_SYSTEM_PROMPT, DETAILED_SUMMARY_CHUNK_PROMPT,
+                DETAILED_SUMMARY_COMBINE_SYSTEM_PROMPT, DETAILED_SUMMARY_COMBINE_PROMPT,
+                temperature=0.2, combine_temperature=0.3, response_format="json_object")
+
+# 모델별 가격 (USD / 1M 토큰)
+MODEL_PRICES = {
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "cached_input": 1.25, "output": 10.00},
+    "gpt-4.1-nano": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+}
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """토큰 사용량으로 예상 비용(USD) 계산 (가격을 모르는 모델은 0, cached_tokens는 프롬프트 캐시 적중분)"""
+    prices = MODEL_PRICES.get(model)
+    if not prices:
+        return 0.0
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    return ((prompt_tokens - cached_tokens) * prices["input"]
+            + cached_tokens * prices.get("cached_input", prices["input"])
+            + completion_tokens * prices["output"]) / 1_000_000
+
+def _usage_of(response: Dict) -> tuple:
+    """응답의 (프롬프트 토큰, 완료 토큰)"""
+    usage = response.get("usage") or {}
+    return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+
+def _cached_tokens_of(response: Dict) -> int:
+    """응답의 프롬프트 캐시 적중 토큰 수 (usage.prompt_tokens_details.cached_tokens, 없으면 0)"""
+    details = (response.get("usage") or {}).get("prompt_tokens_details") or {}
+    return details.get("cached_tokens", 0) or 0
+
+def _record_completion(analysis_type: str, model: str, elapsed: float, response: Optional[Dict]):
+    """LLM 호출 한 번의 지연 시간, 토큰 수, 비용을 분석 유형별로 기록합니다. (response가 None이면 실패)"""
+    metrics.observe("llm_request_seconds", elapsed, analysis_type=analysis_type, model=model)
+    if response is None:
+        metrics.inc("llm_requests_total", analysis_type=analysis_type, model=model, result="error")
+        return
+    
+    metrics.inc("llm_requests_total", analysis_type=analysis_type, model=model, result="ok")
+    prompt_tokens, completion_tokens = _usage_of(response)
+    cached_tokens = _cached_tokens_of(response)
+    metrics.inc("llm_tokens_total", prompt_tokens, analysis_type=analysis_type, model=model, kind="prompt")
+    metrics.inc("llm_tokens_total", cached_tokens, analysis_type=analysis_type, model=model, kind="cached")
+    metrics.inc("llm_tokens_total", completion_tokens, analysis_type=analysis_type, model=model, kind="completion")
+    cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+    metrics.inc("llm_cost_usd_total", cost, analysis_type=analysis_type, model=model)
+    # 예산 확인에 쓰는 실제 사용량
+    cost_governor.record(analysis_type, model, prompt_tokens, completion_tokens, cached_tokens, cost)
+
+def _check_budget(analysis_type: str, request: Dict):
+    """요청 한 번의 예상 토큰 수(프롬프트 + 응답 상한)가 예산 안인지 확인합니다. (넘으면 BudgetExceeded)"""
+    if not cost_governor.enabled(analysis_type):
+        return
+    prompt_tokens = sum(num_tokens_from_string(message.get("content") or "", request.get("model", ANALYSIS_MODEL))
+                        for message in request.get("messages", []))
+    cost_governor.check(analysis_type, prompt_tokens + (request.get("max_tokens") or DEFAULT_COMPLETION_TOKENS))
+
+def _chat_completion(analysis_type: str, **kwargs) -> Dict:
+    """LLM 호출 한 번을 실행하고 지연 시간, 토큰 수, 비용을 기록합니다. (kwargs는 Chat Completions 요청 본문)"""
+    _check_budget(analysis_type, kwargs)
+    model = kwargs.get("model", "unknown")
+    started = time.perf_counter()
     try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(string))
-    except Exception as e:
-        logger.error(f"토큰 계산 오류: {e}")
-        # 근사치로 글자 수 / 3 반환
-        return len(string) // 3
+        response = llm_client.chat(**kwargs)
+    except Exception:
+        _record_completion(analysis_type, model, time.perf_counter() - started, None)
+        raise
+    _record_completion(analysis_type, model, time.perf_counter() - started, response)
+    return response
 
-# 문자열 청크로 분할
-def split_text_into_chunks(text, max_tokens=8000):
-    """텍스트를 최대 토큰 수에 맞게 청크로 분할합니다."""
-    chunks = []
-    current_chunk = ""
-    current_tokens = 0
-    
-    # 문장 단위로 분할
-    sentences = text.split('. ')
-    
-    for sentence in sentences:
-        # 마침표 추가
-        if not sentence.endswith('.'):
-            sentence += '.'
-        
-        # 토큰 수 계산
-        sentence_tokens = num_tokens_from_string(sentence)
-        
-        # 청크가 최대 토큰 수를 초과하면 새 청크 시작
-        if current_tokens + sentence_tokens > max_tokens:
-            chunks.append(current_chunk)
-            current_chunk = sentence
-            current_tokens = sentence_tokens
-        else:
-            current_chunk += " " + sentence if current_chunk else sentence
-            current_tokens += sentence_tokens
+async def _achat_completion(analysis_type: str, **kwargs) -> Dict:
+    """_chat_completion의 비동기 버전 (예산 확인과 사용량 기록은 이벤트 루프를 막지 않도록 스레드에서)"""
+    await asyncio.to_thread(_check_budget, analysis_type, kwargs)
+    model = kwargs.get("model", "unknown")
+    started = time.perf_counter()
+    try:
+        response = await llm_client.achat(**kwargs)
+    except Exception:
+        _record_completion(analysis_type, model, time.perf_counter() - started, None)
+        raise
+    await asyncio.to_thread(_record_completion, analysis_type, model, time.perf_counter() - started, response)
+    return response
+
+def _stream_completion(analysis_type: str, on_token, **kwargs) -> Dict:
+    """
+    스트리밍 LLM 호출. 본문 조각이 도착할 때마다 on_token으로 넘기고 첫 토큰까지 걸린 시간(TTFT)도 기록합니다.
     
-    # 마지막 청크 추가
-    if current_chunk:
-        chunks.append(current_chunk)
+    :param on_token: 본문 조각(str)을 받는 함수
+    :return: _chat_completion과 같은 형태의 응답 (choices[0].message.content, usage)
+    """
+    _check_budget(analysis_type, kwargs)
+    model = kwargs.get("model", "unknown")
+    started = time.perf_counter()
+    parts = []
+    usage = {}
+    try:
+        for event in llm_client.stream_chat(**kwargs):
+            usage = event.get("usage") or usage
+            for choice in event.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if not delta:
+                    continue
+                if not parts:
+                    metrics.observe("llm_time_to_first_token_seconds", time.perf_counter() - started,
+                                    analysis_type=analysis_type, model=model)
+                parts.append(delta)
+                on_token(delta)
+    except Exception:
+        _record_completion(analysis_type, model, time.perf_counter() - started, None)
+        raise
+    response = {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}], "usage": usage}
+    _record_completion(analysis_type, model, time.perf_counter() - started, response)
+    return response
+
+def _message_content(response: Dict) -> str:
+    """응답 본문"""
+    return response["choices"][0]["message"]["content"] or ""
+
+def _cached_chunk_result(analysis_type: str, key: str) -> Optional[str]:
+    """청크 요청의 캐시된 응답 본문 (없으면 None, 적중 여부 기록)"""
+    cached = chunk_result_cache.get(key)
+    metrics.inc("llm_chunk_cache_total", analysis_type=analysis_type, result="hit" if cached is not None else "miss")
+    return cached
+
+def _chunk_completion(analysis_type: str, parse=None, on_token=None, **kwargs):
+    """
+    청크 하나에 대한 LLM 호출. 같은 요청의 결과가 캐시에 있으면 호출하지 않고 재사용합니다.
     
-    return chunks
+    :param parse: 응답 본문 검증/변환 함수 (예외가 나면 캐시하지 않음)
+    :param on_token: 지정하면 응답을 스트리밍으로 받아 조각마다 호출 (캐시 적중 시 본문 전체로 한 번)
+    :return: 응답 본문 (parse가 있으면 parse 결과)
+    """
+    key = request_key(**kwargs)
+    cached = _cached_chunk_result(analysis_type, key)
+    if cached is not None:
+        if on_token:
+            on_token(cached)
+        return parse(cached) if parse else cached
 
-def summarize_transcript(transcript: str, max_length: int = 1500, analysis_type: str = "summary") -> str:
+    if on_token:
+        response = _stream_completion(analysis_type, on_token, **kwargs)
+    else:
+        response = _chat_completion(analysis_type, **kwargs)
+    content = _message_content(response).strip()
+    parsed = parse(content) if parse else content
+    chunk_result_cache.put(key, content, analysis_type, kwargs.get("model"))
+    return parsed
+
+async def _achunk_completion(analysis_type: str, parse=None, **kwargs):
+    """_chunk_completion의 비동기 버전 (캐시 조회/저장은 이벤트 루프를 막지 않도록 스레드에서)"""
+    key = request_key(**kwargs)
+    cached = await asyncio.to_thread(_cached_chunk_result, analysis_type, key)
+    if cached is not None:
+        return parse(cached) if parse else cached
+
+    content = _message_content(await _achat_completion(analysis_type, **kwargs)).strip()
+    parsed = parse(content) if parse else content
+    await asyncio.to_thread(chunk_result_cache.put, key, content, analysis_type, kwargs.get("model"))
+    return parsed
+
+# ----- 분석 단계 실행 -----
+# 분석 함수는 LLM 호출 묶음을 yield하고 결과 목록(실패한 호출은 예외 객체)을 돌려받는 제너레이터로 작성되어
+# 동기 실행(한 번에 하나씩)과 비동기 실행(묶음 안의 호출을 동시에)이 같은 분석 로직을 공유함
+
+def _llm_call(analysis_type: str, cache: bool = False, parse=None, stream: bool = False, **request) -> Dict:
     """
-    GPT-4o-mini를 사용하여 자막을 요약합니다.
+    분석 단계가 yield하는 LLM 호출 하나
     
-    :param transcript: 요약할 자막 텍스트
-    :param max_length: 요약 최대 길이 (토큰 기준)
-    :param analysis_type: 분석 유형 (summary, analysis_economic, analysis_simple, analysis_complex 등)
-    :return: 요약된 텍스트
+    :param cache: 청크 결과 캐시 사용 여부 (청크별 요청만)
+    :param parse: 캐시하는 요청의 응답 본문 검증/변환 함수
+    :param stream: 최종 결과가 되는 호출 (동기 실행에 on_token이 있으면 스트리밍으로 받음)
+    :param request: Chat Completions 요청 본문
     """
+    return {'analysis_type': analysis_type, 'cache': cache, 'parse': parse, 'stream': stream, 'request': request}
+
+def _run_call(call: Dict, on_token=None):
+    on_token = on_token if call['stream'] else None
+    if call['cache']:
+        return _chunk_completion(call['analysis_type'], call['parse'], on_token, **call['request'])
+    if on_token:
+        return _message_content(_stream_completion(call['analysis_type'], on_token, **call['request'])).strip()
+    return _message_content(_chat_completion(call['analysis_type'], **call['request'])).strip()
+
+async def _arun_call(call: Dict):
+    if call['cache']:
+        return await _achunk_completion(call['analysis_type'], call['parse'], **call['request'])
+    return _message_content(await _achat_completion(call['analysis_type'], **call['request'])).strip()
+
+def _raise_budget_exceeded(results: List):
+    """예산 초과는 실패한 청크처럼 넘기지 않고 분석 전체를 멈춤 (나머지 호출도 같은 예산을 씀)"""
+    for result in results:
+        if isinstance(result, BudgetExceeded):
+            raise result
+
+def _run_call_safely(call: Dict, on_token=None):
+    try:
+        return _run_call(call, on_token)
+    except Exception as e:
+        return e
+
+def _run_steps(steps, on_token=None):
+    """
+    분석 단계를 순서대로 실행 (동기)
+    on_token이 있으면(화면에 바로 표시하는 경우) 최종 결과가 되는 호출을 스트리밍하고,
+    첫 토큰까지 기다리는 시간을 줄이도록 같은 묶음의 청크 요청은 스레드로 동시에 보냄
+    """
+    try:
+        calls = next(steps)
+        while True:
+            if on_token and len(calls) > 1:
+                with ThreadPoolExecutor(max_workers=min(ANALYSIS_CONCURRENCY, len(calls))) as executor:
+                    results = list(executor.map(lambda call: _run_call_safely(call, on_token), calls))
+            else:
+                results = [_run_call_safely(call, on_token) for call in calls]
+            _raise_budget_exceeded(results)
+            calls = steps.send(results)
+    except StopIteration as stop:
+        return stop.value
+
+async def _arun_steps(steps, concurrency: int = None):
+    """분석 단계를 실행하되 같은 묶음의 호출은 동시에 보냄 (비동기)"""
+    semaphore = asyncio.Semaphore(concurrency or ANALYSIS_CONCURRENCY)
+
+    async def run(call):
+        async with semaphore:
+            return await _arun_call(call)
+
+    try:
+        calls = next(steps)
+        while True:
+            results = list(await asyncio.gather(*(run(call) for call in calls), return_exceptions=True))
+            _raise_budget_exceeded(results)
+            calls = steps.send(results)
+    except StopIteration as stop:
+        return stop.value
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model: str):
+    """모델의 토크나이저 (불러오지 못하면 None, 오류는 모델별로 한 번만 기록)"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.error(f"토큰 계산 오류: {e}")
+        return None
+
+# 토큰 계산 함수
+def num_tokens_from_string(string: str, model: str = "gpt-4o-mini") -> int:
+    """문자열의 토큰 수를 반환합니다."""
+    encoding = _encoding_for(model)
+    if encoding is None:
+        # 근사치로 글자 수 / 3 반환
+        return len(string) // 3
+    return len(encoding.encode(string))
+
+# 문자열 청크로 분할
+def split_text_into_chunks(text, max_tokens=CHUNK_MAX_TOKENS):
+    """텍스트를 문장 경계에서 최대 토큰 수에 맞게 청크로 분할합니다. (저장된 청크가 없는 텍스트용)"""
+    return [chunk['text'] for chunk in build_chunks(NormalizedTranscript(text), max_tokens)]
+
+def _summary_steps(transcript: str, analysis_type: str, chunks: Optional[List[str]], model: str = None):
+    """자막 요약 단계: 청크별 요약 → (청크가 여러 개면) 통합"""
+    model = model or ANALYSIS_MODEL
     if not transcript:
         return "자막이 없어 요약을 생성할 수 없습니다."
     
-    if not openai.api_key:
+    if not _llm_configured():
         return "OpenAI API 키가 설정되지 않아 요약을 생성할 수 없습니다."
     
     # 시스템 프롬프트 선택 (기본값은 summary)
     system_prompt = SYSTEM_PROMPTS.get(analysis_type, SYSTEM_PROMPTS["summary"])
     
-    # 자막을 청크로 나눕니다. (각 청크는 약 10,000자 내외)
-    chunk_size = 10000
-    chunks = [transcript[i:i+chunk_size] for i in range(0, len(transcript), chunk_size)]
-    
-    # 청크별 요약 생성
-    chunk_summaries = []
+    # 자막을 청크로 나눕니다. (저장된 청크가 있으면 그대로 사용)
+    chunks = chunks or split_text_into_chunks(transcript)
     
+    # 청크별 요약 요청
+    # 청크 위치(i/N)는 넣지 않음 (앞쪽 청크가 바뀌어도 나머지 청크의 요청이 그대로여야 캐시됨)
+    calls = []
     for i, chunk in enumerate(chunks):
         print(f"자막 청크 {i+1}/{len(chunks)} 처리 중 (길이: {len(chunk)}자)...")
-        
-        try:
-            # GPT-4o-mini 모델 사용
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"다음 자막을 {analysis_type}해주세요:\n\n{chunk}\n\n이 자막은 전체 자막의 {i+1}/{len(chunks)} 부분입니다."}
-                ],
-                max_tokens=1500,
-                temperature=0.3
-            )
-            chunk_summary = response.choices[0].message["content"].strip()
-            chunk_summaries.append(chunk_summary)
-            print(f"청크 {i+1} 요약 완료 (요약 길이: {len(chunk_summary)}자)")
-            
-        except Exception as e:
-            print(f"청크 {i+1} 요약 중 오류 발생: {e}")
-            chunk_summaries.append(f"[청크 {i+1} 요약 실패: {str(e)}]")
+        calls.append(_llm_call(
+            analysis_type, cache=True, stream=len(chunks) == 1,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": SUMMARY_CHUNK_PROMPT.format(analysis_type=analysis_type, chunk=chunk)}
+            ],
+            max_tokens=1500,
+            temperature=0.3
+        ))
+    
+    chunk_summaries = []
+    for i, result in enumerate((yield calls)):
+        if isinstance(result, Exception):
+            print(f"청크 {i+1} 요약 중 오류 발생: {result}")
+            chunk_summaries.append(f"[청크 {i+1} 요약 실패: {str(result)}]")
+        else:
+            chunk_summaries.append(result)
+            print(f"청크 {i+1} 요약 완료 (요약 길이: {len(result)}자)")
     
     # 전체 요약 생성 (청크별 요약을 통합)
     if len(chunks) > 1:
-        try:
-            print("모든 청크 요약을 통합하는 중...")
-            combined_summary = "\n\n".join(chunk_summaries)
-            
-            final_response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"다음은 긴 자막을 여러 부분으로 나누어 {analysis_type}한 내용입니다. 이 모든 요약을 통합하여 하나의 일관된 최종 결과를 생성해주세요:\n\n{combined_summary}"}
-                ],
-                max_tokens=1500,
-                temperature=0.3
-            )
-            return final_response.choices[0].message["content"].strip()
-        except Exception as e:
-            print(f"최종 요약 통합 중 오류 발생: {e}")
-            return "요약 통합 중 오류가 발생했습니다: " + str(e) + "\n\n각 부분 요약:\n" + "\n\n".join(chunk_summaries)
+        print("모든 청크 요약을 통합하는 중...")
+        combined_summary = "\n\n".join(chunk_summaries)
+        
+        final_summary, = yield [_llm_call(
+            analysis_type, stream=True,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": SUMMARY_COMBINE_PROMPT.format(analysis_type=analysis_type, combined=combined_summary)}
+            ],
+            max_tokens=1500,
+            temperature=0.3
+        )]
+        if isinstance(final_summary, Exception):
+            print(f"최종 요약 통합 중 오류 발생: {final_summary}")
+            return "요약 통합 중 오류가 발생했습니다: " + str(final_summary) + "\n\n각 부분 요약:\n" + "\n\n".join(chunk_summaries)
+        return final_summary
     
     # 청크가 하나뿐이면 해당 요약 반환
     return chunk_summaries[0] if chunk_summaries else "요약을 생성할 수 없습니다."
 
-def analyze_transcript(transcript: str, prompt: str, analysis_type: str = "analysis_simple") -> str:
+def summarize_transcript(transcript: str, max_length: int = 1500, analysis_type: str = "summary",
+                         chunks: Optional[List[str]] = None, on_token=None, model: str = None) -> str:
     """
-    GPT-4o-mini를 사용하여 자막을 분석합니다.
+    GPT-4o-mini를 사용하여 자막을 요약합니다.
     
-    :param transcript: 분석할 자막 텍스트
-    :param prompt: 분석을 위한 프롬프트
-    :param analysis_type: 분석 유형 (analysis_economic, analysis_simple, analysis_complex 등)
-    :return: 분석 결과
+    :param transcript: 요약할 자막 텍스트
+    :param max_length: 요약 최대 길이 (토큰 기준)
+    :param analysis_type: 분석 유형 (summary, analysis_economic, analysis_simple, analysis_complex 등)
+    :param chunks: 저장된 자막 청크 본문 (없으면 자막을 분할)
+    :param on_token: 최종 요약의 본문 조각을 생성되는 대로 받을 함수 (스트리밍 표시용)
+    :param model: 사용할 모델 (기본값은 ANALYSIS_MODEL, 예산이 부족하면 더 싼 모델)
+    :return: 요약된 텍스트
+    """
+    return _run_steps(_summary_steps(transcript, analysis_type, chunks, model), on_token)
+
+async def asummarize_transcript(transcript: str, max_length: int = 1500, analysis_type: str = "summary",
+                                chunks: Optional[List[str]] = None, concurrency: int = None, model: str = None) -> str:
+    """
+    summarize_transcript의 비동기 버전 (청크별 요약 요청을 동시에 보냄)
+    
+    :param concurrency: 동시에 보낼 청크 요청 수 (기본값은 ANALYSIS_CONCURRENCY)
     """
+    return await _arun_steps(_summary_steps(transcript, analysis_type, chunks, model), concurrency)
+
+def _analysis_steps(transcript: str, prompt: str, analysis_type: str, chunks: Optional[List[str]],
+                    model: str = None):
+    """자막 분석 단계: 청크별 분석 → (청크가 여러 개면) 통합"""
+    model = model or ANALYSIS_MODEL
     if not transcript:
         return "자막이 없어 분석을 생성할 수 없습니다."
     
-    if not openai.api_key:
+    if not _llm_configured():
         return "OpenAI API 키가 설정되지 않아 분석을 생성할 수 없습니다."
     
     # 시스템 프롬프트 선택
     system_prompt = SYSTEM_PROMPTS.get(analysis_type, SYSTEM_PROMPTS["analysis_simple"])
     
-    # 자막을 청크로 나눕니다. (각 청크는 약 10,000자 내외)
-    chunk_size = 10000
-    chunks = [transcript[i:i+chunk_size] for i in range(0, len(transcript), chunk_size)]
-    
-    # 청크별 분석 생성
-    chunk_analyses = []
+    # 자막을 청크로 나눕니다. (저장된 청크가 있으면 그대로 사용)
+    chunks = chunks or split_text_into_chunks(transcript)
     
+    # 청크별 분석 요청
+    calls = []
     for i, chunk in enumerate(chunks):
         print(f"자막 청크 {i+1}/{len(chunks)} 분석 중 (길이: {len(chunk)}자)...")
-        
-        try:
-            # GPT-4o-mini 모델 사용
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"다음 자막을 분석해주세요:\n\n{chunk}\n\n{prompt}\n\n이 자막은 전체 자막의 {i+1}/{len(chunks)} 부분입니다."}
-                ],
-                max_tokens=1500,
-                temperature=0.3
-            )
-            chunk_analysis = response.choices[0].message["content"].strip()
-            chunk_analyses.append(chunk_analysis)
-            print(f"청크 {i+1} 분석 완료 (분석 길이: {len(chunk_analysis)}자)")
-            
-        except Exception as e:
-            print(f"청크 {i+1} 분석 중 오류 발생: {e}")
-            chunk_analyses.append(f"[청크 {i+1} 분석 실패: {str(e)}]")
+        calls.append(_llm_call(
+            analysis_type, cache=True, stream=len(chunks) == 1,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": ANALYSIS_CHUNK_PROMPT.format(chunk=chunk, prompt=prompt)}
+            ],
+            max_tokens=1500,
+            temperature=0.3
+        ))
+    
+    chunk_analyses = []
+    for i, result in enumerate((yield calls)):
+        if isinstance(result, Exception):
+            print(f"청크 {i+1} 분석 중 오류 발생: {result}")
+            chunk_analyses.append(f"[청크 {i+1} 분석 실패: {str(result)}]")
+        else:
+            chunk_analyses.append(result)
+            print(f"청크 {i+1} 분석 완료 (분석 길이: {len(result)}자)")
     
     # 전체 분석 생성 (청크별 분석을 통합)
     if len(chunks) > 1:
-        try:
-            print("모든 청크 분석을 통합하는 중...")
-            combined_analysis = "\n\n".join(chunk_analyses)
-            
-            final_response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"다음은 긴 자막을 여러 부분으로 나누어 분석한 내용입니다. 이 모든 분석을 통합하여 하나의 일관된 최종 분석을 생성해주세요:\n\n{combined_analysis}\n\n{prompt}"}
-                ],
-                max_tokens=1500,
-                temperature=0.3
-            )
-            return final_response.choices[0].message["content"].strip()
-        except Exception as e:
-            print(f"최종 분석 통합 중 오류 발생: {e}")
-            return "분석 통합 중 오류가 발생했습니다: " + str(e) + "\n\n각 부분 분석:\n" + "\n\n".join(chunk_analyses)
+        print("모든 청크 분석을 통합하는 중...")
+        combined_analysis = "\n\n".join(chunk_analyses)
+        
+        final_analysis, = yield [_llm_call(
+            analysis_type, stream=True,
+            model=model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": ANALYSIS_COMBINE_PROMPT.format(combined=combined_analysis, prompt=prompt)}
+            ],
+            max_tokens=1500,
+            temperature=0.3
+        )]
+        if isinstance(final_analysis, Exception):
+            print(f"최종 분석 통합 중 오류 발생: {final_analysis}")
+            return "분석 통합 중 오류가 발생했습니다: " + str(final_analysis) + "\n\n각 부분 분석:\n" + "\n\n".join(chunk_analyses)
+        return final_analysis
     
     # 청크가 하나뿐이면 해당 분석 반환
     return chunk_analyses[0] if chunk_analyses else "분석을 생성할 수 없습니다."
 
-def analyze_transcript_with_type(transcript: str, analysis_type: str) -> str:
+def analyze_transcript(transcript: str, prompt: str, analysis_type: str = "analysis_simple",
+                       chunks: Optional[List[str]] = None, on_token=None, model: str = None) -> str:
+    """
+    GPT-4o-mini를 사용하여 자막을 분석합니다.
+    
+    :param transcript: 분석할 자막 텍스트
+    :param prompt: 분석을 위한 프롬프트
+    :param analysis_type: 분석 유형 (analysis_economic, analysis_simple, analysis_complex 등)
+    :param chunks: 저장된 자막 청크 본문 (없으면 자막을 분할)
+    :param on_token: 최종 분석의 본문 조각을 생성되는 대로 받을 함수 (스트리밍 표시용)
+    :param model: 사용할 모델 (기본값은 ANALYSIS_MODEL)
+    :return: 분석 결과
+    """
+    return _run_steps(_analysis_steps(transcript, prompt, analysis_type, chunks, model), on_token)
+
+async def aanalyze_transcript(transcript: str, prompt: str, analysis_type: str = "analysis_simple",
+                              chunks: Optional[List[str]] = None, concurrency: int = None, model: str = None) -> str:
+    """analyze_transcript의 비동기 버전 (청크별 분석 요청을 동시에 보냄)"""
+    return await _arun_steps(_analysis_steps(transcript, prompt, analysis_type, chunks, model), concurrency)
+
+def analyze_transcript_with_type(transcript: str, analysis_type: str, chunks: Optional[List[str]] = None,
+                                 on_token=None, model: str = None) -> str:
     """
     지정된 분석 유형에 따라 자막을 분석합니다.
     
     :param transcript: 분석할 자막 텍스트
     :param analysis_type: 분석 유형 (analysis_economic, analysis_simple, analysis_complex)
+    :param chunks: 저장된 자막 청크 본문 (없으면 자막을 분할)
+    :param on_token: 최종 분석의 본문 조각을 생성되는 대로 받을 함수 (스트리밍 표시용)
+    :param model: 사용할 모델 (기본값은 ANALYSIS_MODEL)
     :return: 분석 결과
     """
-    # 분석 유형별 기본 프롬프트
-    prompts = {
-        "analysis_economic": "이 내용의 경제적 의미와 시장에 미치는 영향을 분석해주세요.",
-        "analysis_simple": "이 내용의 핵심 요점과 중요성을 간단히 설명해주세요.",
-        "analysis_complex": "이 내용의 다양한 측면(사회적, 경제적, 정치적, 문화적)을 종합적으로 분석하고 잠재적 영향을 평가해주세요."
-    }
-    
     # 해당 분석 유형에 맞는 프롬프트 선택
-    prompt = prompts.get(analysis_type, prompts["analysis_simple"])
+    prompt = ANALYSIS_PROMPTS.get(analysis_type, ANALYSIS_PROMPTS["analysis_simple"])
     
     # 분석 수행
-    return analyze_transcript(transcript, prompt, analysis_type)
+    return analyze_transcript(transcript, prompt, analysis_type, chunks, on_token, model)
+
+async def aanalyze_transcript_with_type(transcript: str, analysis_type: str, chunks: Optional[List[str]] = None,
+                                        concurrency: int = None, model: str = None) -> str:
+    """analyze_transcript_with_type의 비동기 버전"""
+    prompt = ANALYSIS_PROMPTS.get(analysis_type, ANALYSIS_PROMPTS["analysis_simple"])
+    return await aanalyze_transcript(transcript, prompt, analysis_type, chunks, concurrency, model)
 
 def get_available_analysis_types() -> List[Dict[str, str]]:
     """
@@ -261,7 +627,8 @@ def get_available_analysis_types() -> List[Dict[str, str]]:
         {"code": "analysis_complex", "description": "복합 분석: 다양한 관점에서의 종합적 분석"}
     ] 
 
-def generate_economic_news(transcripts: List[str], style: str = "basic", word_count: int = 1000, language: str = "ko") -> str:
+def generate_economic_news(transcripts: List[str], style: str = "basic", word_count: int = 1000, language: str = "ko",
+                           on_token=None) -> str:
     """
     여러 영상의 자막을 기반으로 경제 전문가가 작성한 것 같은 경제/주식 전망 사설을 생성합니다.
     
@@ -269,12 +636,13 @@ def generate_economic_news(transcripts: List[str], style: str = "basic", word_co
     :param style: 리포트 스타일 (basic, concise, editorial, news, research)
     :param word_count: 원하는 글자수 (대략적인 값)
     :param language: 언어 선택 (ko: 한국어, en: 영어)
+    :param on_token: 사설 본문 조각을 생성되는 대로 받을 함수 (지정하면 스트리밍으로 요청)
     :return: 경제/주식 전망 사설
     """
     if not transcripts:
         return "분석할 자막이 없어 경제 뉴스를 생성할 수 없습니다."
     
-    if not openai.api_key:
+    if not _llm_configured():
         return "OpenAI API 키가 설정되지 않아 경제 뉴스를 생성할 수 없습니다."
     
     # 자막들을 통합하고 길이 제한을 위해 각 자막에서 일부만 사용
@@ -302,18 +670,25 @@ def generate_economic_news(transcripts: List[str], style: str = "basic", word_co
     # 글자수 안내
     tokens_instruction = f"약 {word_count}자 정도로 작성해주세요."
     
+    request = dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"다음은 여러 경제 관련 유튜브 영상의 자막입니다. 이 내용을 바탕으로 작성해주세요.\n\n{combined_text}\n\n{tokens_instruction}"}
+        ],
+        max_tokens=int(word_count * 1.5),  # 원하는 글자수의 약 1.5배 토큰으로 설정
+        temperature=0.7  # 더 창의적인 결과를 위해 온도 조정
+    )
+    
     try:
         # GPT-4o-mini 모델 사용
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"다음은 여러 경제 관련 유튜브 영상의 자막입니다. 이 내용을 바탕으로 {tokens_instruction}\n\n{combined_text}"}
-            ],
-            max_tokens=int(word_count * 1.5),  # 원하는 글자수의 약 1.5배 토큰으로 설정
-            temperature=0.7  # 더 창의적인 결과를 위해 온도 조정
-        )
-        return response.choices[0].message["content"].strip()
+        if on_token:
+            response = _stream_completion("economic_news", on_token, **request)
+        else:
+            response = _chat_completion("economic_news", **request)
+        return _message_content(response).strip()
+    except BudgetExceeded:
+        raise
     except Exception as e:
         print(f"경제 뉴스 생성 중 오류 발생: {e}")
         return f"경제 뉴스 생성 중 오류가 발생했습니다: {str(e)}"
@@ -329,7 +704,7 @@ def extract_keywords_from_transcripts(transcripts: List[str], max_keywords: int
     if not transcripts:
         return []
     
-    if not openai.api_key:
+    if not _llm_configured():
         return []
     
     # 자막들을 통합하고 길이 제한을 위해 각 자막에서 일부만 사용
@@ -349,18 +724,19 @@ def extract_keywords_from_transcripts(transcripts: List[str], max_keywords: int
         # 키워드 추출 프롬프트
         system_prompt = "당신은 텍스트에서 핵심 키워드를 추출하는 전문가입니다. 주어진 텍스트에서 가장 중요하고 관련성 높은 경제/주식 관련 키워드를 추출해주세요."
         
-        response = openai.ChatCompletion.create(
+        response = _chat_completion(
+            "keyword_extraction",
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"다음 자막에서 중요한 경제/주식 관련 키워드를 {max_keywords}개 추출해주세요. 쉼표로 구분된 목록으로 키워드만 반환해주세요. 키워드는 되도록 명사 형태로 1-3단어 정도로 간결하게 표현해주세요.\n\n{combined_text}"}
+                {"role": "user", "content": f"다음 자막에서 중요한 경제/주식 관련 키워드를 추출해주세요. 쉼표로 구분된 목록으로 키워드만 반환해주세요. 키워드는 되도록 명사 형태로 1-3단어 정도로 간결하게 표현해주세요.\n\n{combined_text}\n\n키워드 수: {max_keywords}개"}
             ],
             max_tokens=300,
             temperature=0.3
         )
         
         # 결과에서 키워드 추출
-        keywords_text = response.choices[0].message["content"].strip()
+        keywords_text = _message_content(response).strip()
         
         # 결과 파싱 (쉼표로 구분된 키워드 목록 가정)
         keywords = []
@@ -380,8 +756,9 @@ def extract_keywords_from_transcripts(transcripts: List[str], max_keywords: int
         print(f"키워드 추출 중 오류 발생: {e}")
         return []
 
-def generate_news_by_keywords(keywords, hours=24, subtitles=None, style="editorial", word_count=1000, language="ko"):
-    """키워드와 자막을 기반으로 뉴스 사설을 생성합니다."""
+def generate_news_by_keywords(keywords, hours=24, subtitles=None, style="editorial", word_count=1000, language="ko",
+                              on_token=None):
+    """키워드와 자막을 기반으로 뉴스 사설을 생성합니다. (on_token을 지정하면 본문 조각을 생성되는 대로 전달)"""
     if not keywords:
         logger.warning("키워드가 지정되지 않았습니다.")
         return None
@@ -405,97 +782,79 @@ def generate_news_by_keywords(keywords, hours=24, subtitles=None, style="editori
     # 언어 설정
     language_prompt = "한국어로 작성하세요." if language == "ko" else "영어로 작성하세요."
     
-    # 프롬프트 생성
-    prompt = f"""
-    다음 키워드에 초점을 맞춰 경제 및 주식 시장 전망에 대한 뉴스 사설을 작성해주세요: {keywords_str}
-    
-    {style_prompt}
-    
-    글자수는 약 {word_count}자로 작성하세요.
-    {language_prompt}
-    
-    다음 형식으로 작성해주세요:
-    1. 제목: 눈길을 끌고 내용을 잘 반영하는 제목
-    2. 본문: 도입부, 핵심 내용, 결론을 포함한 완성된 사설
-    
-    제목은 굵은 글씨(마크다운 형식)로 표시하고, 그 아래에 본문을 작성해주세요.
-    """
+    # 프롬프트 생성 (고정 지시문 → 스타일/언어 → 키워드, 글자수 순서)
+    prompt = f"""아래 키워드에 초점을 맞춰 경제 및 주식 시장 전망에 대한 뉴스 사설을 작성해주세요.
+
+다음 형식으로 작성해주세요:
+1. 제목: 눈길을 끌고 내용을 잘 반영하는 제목
+2. 본문: 도입부, 핵심 내용, 결론을 포함한 완성된 사설
+
+제목은 굵은 글씨(마크다운 형식)로 표시하고, 그 아래에 본문을 작성해주세요.
+
+{style_prompt}
+{language_prompt}
+
+키워드: {keywords_str}
+글자수: 약 {word_count}자"""
+    
+    request = dict(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "당신은 경제 및 주식 시장 전문 저널리스트입니다. 주어진 키워드를 바탕으로 통찰력 있고 분석적인 경제/주식 관련 뉴스 사설을 작성합니다."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7
+    )
     
     try:
         # GPT-4o-mini로 뉴스 생성 요청
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 경제 및 주식 시장 전문 저널리스트입니다. 주어진 키워드를 바탕으로 통찰력 있고 분석적인 경제/주식 관련 뉴스 사설을 작성합니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
+        if on_token:
+            response = _stream_completion("news_by_keywords", on_token, **request)
+        else:
+            response = _chat_completion("news_by_keywords", **request)
         
         # 생성된 뉴스 사설 반환
-        return response.choices[0].message.content
+        return _message_content(response)
         
+    except BudgetExceeded:
+        raise
     except Exception as e:
         logger.error(f"뉴스 생성 중 오류 발생: {e}")
         return None
 
-def analyze_transcript_for_economic_insights(transcript, video_id, video_title):
-    """자막을 분석하여 경제 및 주식 관련 인사이트를 추출합니다."""
+def _economic_insights_steps(transcript, video_id, video_title, chunks, model=None):
+    """경제 인사이트 단계: 청크별 JSON 분석 → 통합 (실패한 청크는 건너뜀)"""
+    model = model or ANALYSIS_MODEL
     if not transcript or len(transcript.strip()) == 0:
         logger.warning(f"비디오 ID {video_id}의 자막이 비어 있습니다.")
         return None
     
-    # 최대 토큰 수 설정
-    max_tokens = 8000
-    
-    # 자막을 청크로 분할
-    chunks = split_text_into_chunks(transcript, max_tokens)
+    # 자막을 청크로 분할 (저장된 청크가 있으면 그대로 사용)
+    chunks = chunks or split_text_into_chunks(transcript)
     logger.info(f"비디오 ID {video_id}의 자막이 {len(chunks)}개 청크로 분할되었습니다.")
     
-    # 각 청크에 대한 분석 결과 저장
-    analysis_results = []
-    
+    calls = []
     for i, chunk in enumerate(chunks):
         print(f"자막 청크 {i+1}/{len(chunks)} 분석 중 (길이: {len(chunk)}자)...")
-        
-        # 프롬프트 생성
-        prompt = f"""
-        다음은 YouTube 영상 '{video_title}'의 자막입니다:
-        
-        {chunk}
-        
-        이 자막을 분석하여 다음 항목에 대한 정보를 추출해주세요:
-        
-        1. 경제 및 주식 시장 관련 주요 내용 요약 (500자 이내)
-        2. 언급된 경제 지표나 이벤트 (bullet points)
-        3. 언급된 주식 종목 및 관련 정보 (회사명, 티커, 언급된 내용)
-        4. 시장 전망이나 예측 정보
-        5. 투자 전략이나 조언 (있는 경우)
-        
-        각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
-        """
-        
-        try:
-            # GPT-4o-mini로 분석 요청
-            response = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 경제 및 주식 시장 분석 전문가입니다. 주어진 텍스트에서 경제 및 주식 관련 정보를 정확하게 추출하여 구조화된 형식으로 제공합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"}
-            )
-            
-            # 응답 추출 및 파싱
-            result = response.choices[0].message.content
-            analysis_chunk = json.loads(result)
-            analysis_results.append(analysis_chunk)
-            print(f"청크 {i+1} 분석 완료 (분석 길이: {len(result)}자)")
-            
-        except Exception as e:
-            logger.error(f"청크 {i+1} 분석 중 오류 발생: {e}")
+        calls.append(_llm_call(
+            "economic_insights", cache=True, parse=json.loads,
+            model=model,
+            messages=[
+                {"role": "system", "content": ECONOMIC_INSIGHTS_SYSTEM_PROMPT},
+                {"role": "user", "content": ECONOMIC_INSIGHTS_CHUNK_PROMPT.format(video_title=video_title, chunk=chunk)}
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        ))
+    
+    # 각 청크에 대한 분석 결과 저장
+    analysis_results = []
+    for i, result in enumerate((yield calls)):
+        if isinstance(result, Exception):
+            logger.error(f"청크 {i+1} 분석 중 오류 발생: {result}")
             continue
+        analysis_results.append(result)
+        print(f"청크 {i+1} 분석 완료")
     
     # 분석 결과가 없으면 None 반환
     if not analysis_results:
@@ -504,107 +863,73 @@ def analyze_transcript_for_economic_insights(transcript, video_id, video_title):
     # 모든 청크의 분석 결과 통합
     print("모든 청크 분석을 통합하는 중...")
     
+    # 통합 프롬프트 생성
+    integration_prompt = ECONOMIC_INSIGHTS_COMBINE_PROMPT.format(
+        video_title=video_title, analysis_results=json.dumps(analysis_results, ensure_ascii=False, indent=2)
+    )
+    integration_content, = yield [_llm_call(
+        "economic_insights",
+        model=model,
+        messages=[
+            {"role": "system", "content": ECONOMIC_INSIGHTS_COMBINE_SYSTEM_PROMPT},
+            {"role": "user", "content": integration_prompt}
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )]
+    
     try:
-        # 통합 프롬프트 생성
-        integration_prompt = f"""
-        다음은 YouTube 영상 '{video_title}'의 자막을 여러 부분으로 나누어 분석한 결과입니다:
-        
-        {json.dumps(analysis_results, ensure_ascii=False, indent=2)}
-        
-        이 분석 결과들을 통합하여 다음 항목에 대한 종합적인 분석을 제공해주세요:
-        
-        1. 경제 및 주식 시장 관련 주요 내용 종합 요약 (800자 이내)
-        2. 언급된 모든 경제 지표나 이벤트 (중복 제거)
-        3. 언급된 모든 주식 종목 및 관련 정보 (회사명, 티커, 언급된 내용 종합)
-        4. 종합적인 시장 전망이나 예측 정보
-        5. 투자 전략이나 조언 (있는 경우)
-        6. 핵심 키워드 (5-10개)
-        
-        각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
-        """
-        
-        # GPT-4o-mini로 통합 분석 요청
-        integration_response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 경제 및 주식 시장 분석 전문가입니다. 여러 분석 결과를 통합하여 종합적이고 일관된 분석 보고서를 작성합니다."},
-                {"role": "user", "content": integration_prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-        
-        # 통합 분석 결과 추출 및 파싱
-        integrated_result = json.loads(integration_response.choices[0].message.content)
-        
-        return integrated_result
-        
+        if isinstance(integration_content, Exception):
+            raise integration_content
+        # 통합 분석 결과 파싱
+        return json.loads(integration_content)
     except Exception as e:
         logger.error(f"분석 결과 통합 중 오류 발생: {e}")
         # 오류 발생 시 첫 번째 분석 결과 반환
         return analysis_results[0] if analysis_results else None
 
-def create_detailed_video_summary(transcript, video_id, video_title, video_url):
-    """자막을 분석하여 영상의 상세 요약 및 주식 정보를 추출합니다."""
+def analyze_transcript_for_economic_insights(transcript, video_id, video_title, chunks=None, model=None):
+    """자막을 분석하여 경제 및 주식 관련 인사이트를 추출합니다."""
+    return _run_steps(_economic_insights_steps(transcript, video_id, video_title, chunks, model))
+
+async def aanalyze_transcript_for_economic_insights(transcript, video_id, video_title, chunks=None, concurrency=None,
+                                                    model=None):
+    """analyze_transcript_for_economic_insights의 비동기 버전"""
+    return await _arun_steps(_economic_insights_steps(transcript, video_id, video_title, chunks, model), concurrency)
+
+def _detailed_summary_steps(transcript, video_id, video_title, video_url, chunks, model=None):
+    """상세 요약 단계: 청크별 JSON 분석 → 통합 (실패한 청크는 건너뜀)"""
+    model = model or ANALYSIS_MODEL
     if not transcript or len(transcript.strip()) == 0:
         logger.warning(f"비디오 ID {video_id}의 자막이 비어 있습니다.")
         return None
     
-    # 최대 토큰 수 설정
-    max_tokens = 8000
-    
-    # 자막을 청크로 분할
-    chunks = split_text_into_chunks(transcript, max_tokens)
+    # 자막을 청크로 분할 (저장된 청크가 있으면 그대로 사용)
+    chunks = chunks or split_text_into_chunks(transcript)
     logger.info(f"비디오 ID {video_id}의 자막이 {len(chunks)}개 청크로 분할되었습니다.")
     
-    # 각 청크에 대한 분석 결과 저장
-    analysis_results = []
-    
+    calls = []
     for i, chunk in enumerate(chunks):
         print(f"자막 청크 {i+1}/{len(chunks)} 분석 중 (길이: {len(chunk)}자)...")
-        
-        # 프롬프트 생성
-        prompt = f"""
-        다음은 YouTube 영상 '{video_title}'의 자막입니다:
-        
-        {chunk}
-        
-        이 자막을 분석하여 다음 항목에 대한 상세 정보를 추출해주세요:
-        
-        1. 영상 내용 요약 (500자 이내)
-        2. 핵심 주제 및 논점 (bullet points)
-        3. 언급된 주식 종목 상세 정보:
-           - 회사명
-           - 티커 심볼 (추정 가능한 경우)
-           - 언급된 맥락 및 내용
-           - 전망/예측 (있는 경우)
-        4. 경제 지표 및 동향 분석
-        5. 전문가 의견이나 인용구 (있는 경우)
-        
-        각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
-        """
-        
-        try:
-            # GPT-4o-mini로 분석 요청
-            response = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 경제 및 주식 시장 분석 전문가입니다. 주어진 텍스트에서 경제 및 주식 관련 정보를 상세하게 추출하여 구조화된 형식으로 제공합니다."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"}
-            )
-            
-            # 응답 추출 및 파싱
-            result = response.choices[0].message.content
-            analysis_chunk = json.loads(result)
-            analysis_results.append(analysis_chunk)
-            print(f"청크 {i+1} 분석 완료 (분석 길이: {len(result)}자)")
-            
-        except Exception as e:
-            logger.error(f"청크 {i+1} 분석 중 오류 발생: {e}")
+        calls.append(_llm_call(
+            "detailed_summary", cache=True, parse=json.loads,
+            model=model,
+            messages=[
+                {"role": "system", "content": DETAILED_SUMMARY_SYSTEM_PROMPT},
+                {"role": "user", "content": DETAILED_SUMMARY_CHUNK_PROMPT.format(video_title=video_title, chunk=chunk)}
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        ))
+    
+    # 각 청크에 대한 분석 결과 저장
+    analysis_results = []
+    for i, result in enumerate((yield calls)):
+        if isinstance(result, Exception):
+            logger.error(f"청크 {i+1} 분석 중 오류 발생: {result}")
             continue
+        analysis_results.append(result)
+        print(f"청크 {i+1} 분석 완료")
     
     # 분석 결과가 없으면 None 반환
     if not analysis_results:
@@ -613,46 +938,26 @@ def create_detailed_video_summary(transcript, video_id, video_title, video_url):
     # 모든 청크의 분석 결과 통합
     print("모든 청크 분석을 통합하는 중...")
     
+    # 통합 프롬프트 생성
+    integration_prompt = DETAILED_SUMMARY_COMBINE_PROMPT.format(
+        video_title=video_title, video_url=video_url, analysis_results=json.dumps(analysis_results, ensure_ascii=False, indent=2)
+    )
+    integration_content, = yield [_llm_call(
+        "detailed_summary",
+        model=model,
+        messages=[
+            {"role": "system", "content": DETAILED_SUMMARY_COMBINE_SYSTEM_PROMPT},
+            {"role": "user", "content": integration_prompt}
+        ],
+        temperature=0.3,
+        response_format={"type": "json_object"}
+    )]
+    
     try:
-        # 통합 프롬프트 생성
-        integration_prompt = f"""
-        다음은 YouTube 영상 '{video_title}'(URL: {video_url})의 자막을 여러 부분으로 나누어 분석한 결과입니다:
-        
-        {json.dumps(analysis_results, ensure_ascii=False, indent=2)}
-        
-        이 분석 결과들을 통합하여 다음 항목에 대한 종합적인 상세 요약을 제공해주세요:
-        
-        1. 영상 제목: '{video_title}'
-        2. 영상 URL: {video_url}
-        3. 영상 내용 종합 요약 (1000자 이내, 풍부한 정보 포함)
-        4. 핵심 주제 및 논점 (중복 제거, 중요도순)
-        5. 언급된 모든 주식 종목 상세 정보 (알파벳 순서로 정렬):
-           - 회사명
-           - 티커 심볼 (추정 가능한 경우)
-           - 언급된 맥락 및 내용
-           - 전망/예측 (있는 경우)
-        6. 경제 지표 및 동향 종합 분석
-        7. 투자 전략이나 시사점
-        8. 전문가 의견이나 인용구 (있는 경우)
-        9. 핵심 키워드 (5-10개)
-        
-        각 항목을 명확하게 구분하여 JSON 형식으로 응답해주세요. 정보가 없는 항목은 "정보 없음"이라고 표시해주세요.
-        주식 종목 정보는 가능한 한 상세하게 제공하고, 티커 심볼이 확실하지 않은 경우 '추정'이라고 표시해주세요.
-        """
-        
-        # GPT-4o-mini로 통합 분석 요청
-        integration_response = openai.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 경제 및 주식 시장 분석 전문가입니다. 여러 분석 결과를 통합하여 종합적이고 상세한 분석 보고서를 작성합니다."},
-                {"role": "user", "content": integration_prompt}
-            ],
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
-        
-        # 통합 분석 결과 추출 및 파싱
-        integrated_result = json.loads(integration_response.choices[0].message.content)
+        if isinstance(integration_content, Exception):
+            raise integration_content
+        # 통합 분석 결과 파싱
+        integrated_result = json.loads(integration_content)
         integrated_result["video_id"] = video_id
         integrated_result["analyzed_at"] = datetime.now().isoformat()
         
@@ -665,4 +970,14 @@ def create_detailed_video_summary(transcript, video_id, video_title, video_url):
         if first_result:
             first_result["video_id"] = video_id
             first_result["analyzed_at"] = datetime.now().isoformat()
-        return first_result 
\ No newline at end of file
+        return first_result
+
+def create_detailed_video_summary(transcript, video_id, video_title, video_url, chunks=None, model=None):
+    """자막을 분석하여 영상의 상세 요약 및 주식 정보를 추출합니다."""
+    return _run_steps(_detailed_summary_steps(transcript, video_id, video_title, video_url, chunks, model))
+
+async def acreate_detailed_video_summary(transcript, video_id, video_title, video_url, chunks=None, concurrency=None,
+                                         model=None):
+    """create_detailed_video_summary의 비동기 버전"""
+    return await _arun_steps(_detailed_summary_steps(transcript, video_id, video_title, video_url, chunks, model),
+                             concurrency)
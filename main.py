@@ -12,26 +12,57 @@ import json
 import time
 import traceback
 from datetime import datetime, timedelta, timezone
-import schedule
 import threading
 import argparse
+import logging
 
 from config import load_config, save_config
 from youtube_handler import (
-    get_info_by_url,
+    get_youtube_service,
     search_videos_by_keyword,
+    get_videos_from_uploads_playlist,
     get_video_info,
-    get_video_transcript,
+    get_video_transcript_segments,
     get_latest_videos_from_channel
 )
 from db_handler import (
+    DB_PATH,
     initialize_db,
+    ensure_schema,
     save_video_data,
     analyze_video,
     generate_report,
     is_video_in_db,
     generate_economic_news_from_recent_videos,
-    is_video_processed
+    is_video_processed,
+    get_missing_analysis_types,
+    get_video_data,
+    record_analysis_failure,
+    should_retry_analysis,
+    clear_analysis_failures
+)
+from channel_resolver import channel_resolver
+from transcript_fetcher import transcript_fetcher
+from pending_transcripts import pending_transcripts
+from quota_ledger import quota_ledger
+from job_queue import JOB_FETCH_METADATA, JOB_ANALYZE, analysis_key
+from metrics import metrics, start_http_server
+from cost_governor import cost_governor, BudgetExceeded, ACTION_DEFER, print_run_spend
+from run_tracker import (
+    RunTracker,
+    STAGE_DISCOVERED,
+    STAGE_METADATA,
+    STAGE_TRANSCRIPT,
+    STAGE_SAVED,
+    STAGE_DONE,
+    ITEM_OK,
+    ITEM_SKIPPED,
+    ITEM_MISSING,
+    ITEM_FAILED,
+    RUN_COMPLETED,
+    RUN_FAILED,
+    RUN_INTERRUPTED,
+    print_run_report
 )
 from llm_handler import summarize_transcript, analyze_transcript, analyze_transcript_with_type, analyze_transcript_for_economic_insights, create_detailed_video_summary
 
@@ -79,256 +110,502 @@ def add_keyword(keyword):
     else:
         print(f"키워드 '{keyword}'은(는) 이미 모니터링 중입니다.")
 
-def process_video(video_id, video_info, transcript, analysis_types=None):
-    """비디오 처리 및 분석 함수"""
-    from db_handler import save_video_data, save_summary_to_db
-    from llm_handler import summarize_transcript, analyze_transcript_with_type, analyze_transcript_for_economic_insights, create_detailed_video_summary
+# 요약/분석 유형 외에 항상 수행하는 상세 분석 유형
+DETAILED_ANALYSIS_TYPES = ["economic_insights", "detailed_summary"]
+
+def run_analysis(video_id, video_title, transcript, analysis_type, on_token=None):
+    """
+    비디오 하나에 대해 분석 유형 하나를 수행하고 저장합니다.
+    :param on_token: 요약/분석 유형의 최종 결과 본문 조각을 생성되는 대로 받을 함수 (저장은 끝난 뒤 한 번)
+    :return: 저장 성공 여부
+    :raises BudgetExceeded: 토큰 예산이 부족해 건너뛰거나(action=skip) 미뤄야 하는(action=defer) 경우
+    """
+    from db_handler import save_summary_to_db, get_transcript_chunks
+    from llm_handler import ANALYSIS_MODEL, summarize_transcript, analyze_transcript_with_type, analyze_transcript_for_economic_insights, create_detailed_video_summary
+    from prompt_registry import prompt_version
+    
+    # 저장할 때 계산해 둔 청크 사용 (저장되지 않은 자막이면 LLM 함수가 직접 분할)
+    chunk_rows = get_transcript_chunks(video_id)
+    chunks = [chunk['text'] for chunk in chunk_rows] or None
+    
+    # 예상 토큰 수로 예산 확인 (절약 모드면 더 싼 모델 사용)
+    model = cost_governor.admit_analysis(analysis_type, ANALYSIS_MODEL, transcript, chunk_rows)
+    
+    # 분석에 사용하는 프롬프트 버전 (저장된 분석에 기록해 프롬프트가 바뀌면 다시 수행)
+    # 더 싼 모델로 만든 분석은 버전 없이 저장해 recompute --stale로 나중에 다시 수행
+    version = prompt_version(analysis_type) if model == ANALYSIS_MODEL else None
+    
+    # 경제 분석
+    if analysis_type == "economic_insights":
+        economic_analysis = analyze_transcript_for_economic_insights(transcript, video_id, video_title, chunks, model)
+        if not economic_analysis:
+            return False
+        from db_handler import save_analysis
+        save_analysis(video_id, 'analysis_economic', economic_analysis, version)
+        print(f"비디오 ID {video_id}의 경제 분석이 저장되었습니다.")
+        return True
+    
+    # 상세 영상 분석
+    if analysis_type == "detailed_summary":
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        detailed_analysis = create_detailed_video_summary(transcript, video_id, video_title, video_url, chunks, model)
+        if not detailed_analysis:
+            return False
+        from db_handler import save_detailed_video_analysis
+        save_detailed_video_analysis(video_id, video_title, video_url, detailed_analysis, version)
+        print(f"비디오 ID {video_id}의 상세 분석이 저장되었습니다.")
+        return True
+    
+    # 요약 생성
+    if analysis_type == "summary":
+        summary = summarize_transcript(transcript, analysis_type=analysis_type, chunks=chunks, on_token=on_token,
+                                       model=model)
+    else:
+        summary = analyze_transcript_with_type(transcript, analysis_type, chunks, on_token, model)
+    
+    # 데이터베이스에 저장
+    return save_summary_to_db(video_id, analysis_type, summary, version)
+
+def complete_analyses(video_id, video_title, transcript, analysis_types, tracker=None, run_id=None):
+    """
+    아직 저장되지 않은 분석 유형만 수행합니다. (이미 저장된 분석은 다시 호출하지 않음)
+    :param tracker: 지정하면 분석 유형별 완료를 실행 체크포인트에 기록
+    :return: 실패한 분석 유형 목록 (예산 때문에 미룬 유형 포함, 건너뛴 유형은 제외)
+    """
+    failed = []
+    for analysis_type in get_missing_analysis_types(video_id, analysis_types):
+        try:
+            if run_analysis(video_id, video_title, transcript, analysis_type):
+                if tracker:
+                    tracker.mark_type_done(run_id, video_id, analysis_type)
+                continue
+            failed.append(analysis_type)
+        except BudgetExceeded as e:
+            print(f"💸 비디오 ID {video_id}의 {analysis_type} 분석: {e}")
+            if e.action == ACTION_DEFER:
+                failed.append(analysis_type)
+        except Exception as e:
+            print(f"비디오 ID {video_id}의 {analysis_type} 분석 중 오류 발생: {e}")
+            failed.append(analysis_type)
+    return failed
+
+def process_video(video_id, video_info, transcript, analysis_types=None, tracker=None, run_id=None,
+                  segment_index=None):
+    """
+    비디오 처리 및 분석 함수
+    :param segment_index: 정규화된 자막의 세그먼트 색인 (자막과 함께 저장)
+    :return: 모든 분석이 저장되었는지 여부
+    """
+    from db_handler import save_video_data
     
     try:
         # 데이터베이스에 저장
-        if not save_video_data(video_info, transcript):
+        if not save_video_data(video_info, transcript, segment_index):
             print(f"비디오 ID {video_id}는 이미 데이터베이스에 있습니다.")
+        if tracker:
+            tracker.set_stage(run_id, video_id, STAGE_SAVED)
         
         # 분석 유형이 없으면 기본값 사용
         if not analysis_types:
             analysis_types = ["summary"]
         
-        # 각 분석 유형에 대해 처리
-        for analysis_type in analysis_types:
-            try:
-                # 요약 생성
-                if analysis_type == "summary":
-                    summary = summarize_transcript(transcript, analysis_type=analysis_type)
-                else:
-                    summary = analyze_transcript_with_type(transcript, analysis_type)
-                
-                # 데이터베이스에 저장
-                save_summary_to_db(video_id, analysis_type, summary)
-                
-            except Exception as e:
-                print(f"비디오 ID {video_id}의 {analysis_type} 분석 중 오류 발생: {e}")
+        # 요청한 분석 유형 + 경제 및 주식 관련 상세 분석 수행
+        failed = complete_analyses(video_id, video_info.get('title', ''), transcript,
+                                   list(analysis_types) + DETAILED_ANALYSIS_TYPES, tracker, run_id)
         
-        # 경제 및 주식 관련 상세 분석 수행
-        try:
-            # 경제 분석
-            economic_analysis = analyze_transcript_for_economic_insights(transcript, video_id, video_info.get('title', ''))
-            if economic_analysis:
-                from db_handler import save_analysis
-                save_analysis(video_id, 'analysis_economic', economic_analysis)
-                print(f"비디오 ID {video_id}의 경제 분석이 저장되었습니다.")
-            
-            # 상세 영상 분석
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-            detailed_analysis = create_detailed_video_summary(transcript, video_id, video_info.get('title', ''), video_url)
-            if detailed_analysis:
-                from db_handler import save_detailed_video_analysis
-                save_detailed_video_analysis(video_id, video_info.get('title', ''), video_url, detailed_analysis)
-                print(f"비디오 ID {video_id}의 상세 분석이 저장되었습니다.")
-                
-        except Exception as e:
-            print(f"비디오 ID {video_id}의 상세 분석 중 오류 발생: {e}")
+        # 실패한 분석은 다음 실행에서 바로 다시 시도하지 않도록 백오프 기록
+        if failed:
+            retry = record_analysis_failure(video_id, failed)
+            print(f"비디오 ID {video_id}의 분석 실패 {retry['attempts']}회째, 다음 재시도 {retry['next_attempt_at']}")
+        else:
+            clear_analysis_failures(video_id)
+        if tracker:
+            if failed:
+                tracker.set_stage(run_id, video_id, STAGE_SAVED, ITEM_FAILED,
+                                  error=f"분석 실패: {', '.join(failed)}")
+            else:
+                tracker.set_stage(run_id, video_id, STAGE_DONE)
         
-        return True
+        return not failed
         
     except Exception as e:
         print(f"비디오 ID {video_id} 처리 중 오류 발생: {e}")
+        if tracker:
+            tracker.set_stage(run_id, video_id, STAGE_SAVED, ITEM_FAILED, error=str(e))
         return False
 
-def collect_data(analysis_types=None, credentials=None):
-    """채널 및 키워드에서 데이터를 수집합니다."""
-    if analysis_types is None:
-        analysis_types = ["summary"]  # 기본 분석 유형
+def is_recent_video(video, days=7):
+    """발행일이 지정한 일수 이내인지 확인합니다."""
+    published_at = video.get("published_at")
+    if not published_at:
+        return True
+    
+    # 발행일을 datetime 객체로 변환 (문자열인 경우)
+    if isinstance(published_at, str):
+        # ISO 형식 문자열을 datetime으로 변환
+        if 'Z' in published_at:
+            published_at = published_at.replace('Z', '+00:00')
+        published_date = datetime.fromisoformat(published_at)
+    else:
+        # 이미 datetime 객체인 경우
+        published_date = published_at
+    
+    # published_date가 timezone-naive인 경우 UTC로 가정하여 timezone-aware로 변환
+    if published_date.tzinfo is None:
+        published_date = published_date.replace(tzinfo=timezone.utc)
+    
+    # 현재 시간을 timezone-aware로 생성 (UTC 기준)
+    return (datetime.now(timezone.utc) - published_date).days <= days
+
+def process_video_candidates(videos, analysis_types, credentials, job_queue=None, tracker=None, run_id=None):
+    """
+    검색된 비디오 목록 중 새 비디오만 골라 상세 정보/자막을 가져와 분석합니다.
+    이미 저장된 비디오라도 빠진 분석이 있으면 저장된 자막으로 마저 분석합니다.
+    (1주일 이내 비디오만, 분석이 실패했던 비디오는 재시도 시각이 지났고 최대 시도 횟수 이내일 때만)
+    :param job_queue: 지정하면 직접 처리하지 않고 작업 큐에 메타데이터 조회 작업을 추가
+    :param tracker: 지정하면 비디오별 처리 단계를 실행 체크포인트(run_id)에 기록
+    :return: 처리(또는 큐에 추가)한 비디오 수
+    """
+    all_types = list(analysis_types or ["summary"]) + DETAILED_ANALYSIS_TYPES
+    processed = 0
+    
+    # 직접 처리하는 경우 새 비디오의 자막을 작업자 풀에서 미리 받아 캐시에 저장
+    # (자막 대기열에서 재확인 시각이 되지 않은 비디오는 제외)
+    if job_queue is None:
+        new_ids = []
+        for video in videos:
+            video_id = video.get("video_id")
+            if (not video_id or not is_recent_video(video) or is_video_in_db(video_id)
+                    or not pending_transcripts.should_check(video_id)):
+                continue
+            if pending_transcripts.get(video_id):
+                # 재확인 시각이 된 비디오는 "자막 없음" 캐시와 관계없이 다시 조회
+                transcript_fetcher.invalidate(video_id)
+            new_ids.append(video_id)
+        if len(new_ids) > 1:
+            transcript_fetcher.fetch_many(new_ids, credentials)
+    
+    for video in videos:
+        video_id = video.get("video_id")  # youtube_handler에서 반환하는 키 이름
+        video_title = video.get("title")
         
-    if credentials is None:
-        print("오류: OAuth2 인증 정보가 필요합니다.")
-        return
+        # 이미 데이터베이스에 있는지 확인
+        if is_video_in_db(video_id):
+            missing = get_missing_analysis_types(video_id, all_types)
+            if not missing:
+                print(f"비디오 '{video_title}' (ID: {video_id})는 이미 데이터베이스에 있으므로 건너뜁니다.")
+                if tracker:
+                    tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_SKIPPED)
+                continue
+            
+            # 오래된 비디오나 분석이 계속 실패한 비디오는 다시 분석하지 않음
+            if not is_recent_video(video):
+                print(f"비디오 '{video_title}' (ID: {video_id})는 1주일 이전에 발행되어 빠진 분석을 건너뜁니다.")
+                if tracker:
+                    tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_SKIPPED, error="오래된 비디오")
+                continue
+            if not should_retry_analysis(video_id):
+                print(f"비디오 '{video_title}' (ID: {video_id})는 분석 재시도 대기 중이거나 최대 시도 횟수를 넘어 건너뜁니다.")
+                if tracker:
+                    tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_SKIPPED, error="분석 재시도 대기 중")
+                continue
+            
+            # 비디오만 저장되고 분석이 끝나지 않은 경우 (이전 실행이 중단됨)
+            print(f"비디오 '{video_title}' (ID: {video_id})의 빠진 분석을 이어서 수행합니다: {', '.join(missing)}")
+            if job_queue is not None:
+                for analysis_type in missing:
+                    job_queue.enqueue(
+                        JOB_ANALYZE,
+                        {"video_id": video_id, "analysis_type": analysis_type},
+                        idempotency_key=analysis_key(video_id, analysis_type)
+                    )
+                processed += 1
+                continue
+            
+            stored = get_video_data(video_id)
+            if stored and stored.get('transcript'):
+                if process_video(video_id, stored, stored['transcript'], analysis_types, tracker, run_id):
+                    processed += 1
+                continue
         
-    print(f"\n=== 데이터 수집 시작: {datetime.now().isoformat()} ===")
-    print(f"수행할 분석 유형: {', '.join(analysis_types)}")
+        # 1주일 이내인지 확인
+        if not is_recent_video(video):
+            print(f"비디오 '{video_title}' (ID: {video_id})는 1주일 이전에 발행되어 건너뜁니다.")
+            if tracker:
+                tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_SKIPPED)
+            continue
+        
+        # 자막이 없던 비디오는 재확인 시각이 될 때까지 API를 호출하지 않음
+        # (작업 큐 모드에서는 자막 조회 작업이 대기열의 재확인 시각에 맞춰 스스로 다시 시도)
+        if not pending_transcripts.should_check(video_id):
+            waiting = pending_transcripts.get(video_id)
+            print(f"비디오 '{video_title}' (ID: {video_id})는 자막 대기 중이므로 건너뜁니다. "
+                  f"({waiting['status']}, 다음 확인 {waiting['next_check_at']})")
+            if tracker:
+                tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_SKIPPED, error="자막 대기 중")
+            continue
+        
+        # 작업 큐 모드: 워커가 메타데이터 → 자막 → 분석 순으로 처리
+        if job_queue is not None:
+            job_queue.enqueue(
+                JOB_FETCH_METADATA,
+                {"video_id": video_id, "analysis_types": analysis_types},
+                idempotency_key=f"{JOB_FETCH_METADATA}:{video_id}"
+            )
+            if tracker:
+                tracker.set_stage(run_id, video_id, STAGE_DONE, ITEM_OK, error="작업 큐에 위임")
+            processed += 1
+            continue
+        
+        print(f"비디오 처리 중: '{video_title}' (ID: {video_id})")
+        
+        # 비디오 상세 정보 가져오기 (재개한 실행이나 자막 재확인이면 저장된 정보 재사용)
+        item = tracker.get_item(run_id, video_id) if tracker else None
+        video_info = item['payload'].get('video_info') if item else None
+        if not video_info:
+            waiting = pending_transcripts.get(video_id)
+            video_info = waiting['video_info'] if waiting else None
+        if not video_info:
+            video_info = get_video_info(video_id, credentials)
+            if not video_info:
+                print(f"비디오 ID {video_id}에서 상세 정보를 가져오지 못했습니다.")
+                if tracker:
+                    tracker.set_stage(run_id, video_id, STAGE_DISCOVERED, ITEM_FAILED, error="상세 정보 조회 실패")
+                continue
+            if tracker:
+                tracker.set_stage(run_id, video_id, STAGE_METADATA,
+                                  payload=dict(item['payload'] if item else video, video_info=video_info))
+        
+        # 자막 가져오기
+        normalized, lang = get_video_transcript_segments(video_id, credentials)
+        if not normalized:
+            # 자막 대기열에 올려 백오프 간격으로만 다시 확인 (이번 실행에서는 더 시도하지 않음)
+            waiting = pending_transcripts.record_missing(video_id, video_info, video.get("published_at"))
+            print(f"비디오 ID {video_id}에서 자막을 찾을 수 없습니다. "
+                  f"({waiting['status']}, 다음 확인 {waiting['next_check_at']})")
+            if tracker:
+                tracker.set_stage(run_id, video_id, STAGE_METADATA, ITEM_MISSING, error="자막 없음 - 자막 대기열에 추가")
+            continue
+        pending_transcripts.resolve(video_id)
+        if tracker:
+            tracker.set_stage(run_id, video_id, STAGE_TRANSCRIPT)
+        
+        # 비디오 처리 및 분석
+        if process_video(video_id, video_info, normalized.text, analysis_types, tracker, run_id,
+                         segment_index=normalized.to_bytes()):
+            processed += 1
+    
+    return processed
+
+def discover_channel_videos(channel_url, credentials, channel_info=None):
+    """
+    채널의 최신 비디오 목록을 조회합니다.
+    :param channel_info: 미리 변환된 채널 정보 (없으면 캐시된 변환기로 조회)
+    :return: (채널 ID, 비디오 목록), 채널을 찾지 못하면 (None, [])
+    """
+    # 채널 정보 가져오기
+    if channel_info is None:
+        channel_info = channel_resolver.resolve(channel_url, service=get_youtube_service(credentials))
+    if not channel_info:
+        print(f"채널 URL {channel_url}에서 정보를 가져오지 못했습니다.")
+        return None, []
+        
+    channel_id = channel_info.get("channel_id")
+    channel_title = channel_info.get("title") or channel_id
+    
+    # 채널 업로드 재생목록에서 최신 비디오 조회 (1 유닛), 재생목록을 모르면 검색 (100 유닛)
+    # (quota_ledger.plan_collection과 같은 기준: UC로 시작하는 채널 ID는 업로드 재생목록 ID가 UU...)
+    uploads_playlist_id = channel_info.get("uploads_playlist_id")
+    if not uploads_playlist_id and (channel_id or "").startswith("UC"):
+        uploads_playlist_id = "UU" + channel_id[2:]
+    if uploads_playlist_id:
+        videos = get_videos_from_uploads_playlist(uploads_playlist_id, credentials, max_results=15)
+    else:
+        videos = search_videos_by_keyword("", credentials, channel_id=channel_id, max_results=15)
+    if not videos:
+        print(f"채널 '{channel_title}'에서 비디오를 찾지 못했습니다.")
+    return channel_id, videos or []
+
+def discover_keyword_videos(keyword, credentials):
+    """키워드로 비디오를 검색합니다."""
+    videos = search_videos_by_keyword(keyword, credentials, max_results=10)
+    if not videos:
+        print(f"키워드 '{keyword}'로 비디오를 찾지 못했습니다.")
+    return videos or []
+
+def collect_channel(channel_url, analysis_types, credentials, channel_info=None, job_queue=None):
+    """
+    채널 하나의 최신 비디오를 수집합니다.
+    :param channel_info: 미리 변환된 채널 정보 (없으면 캐시된 변환기로 조회)
+    :return: 채널 ID, 발견한 비디오 목록, 처리 수 (채널을 찾지 못하면 None)
+    """
+    print(f"\n>> 채널 처리 중: {channel_url}")
+    channel_id, videos = discover_channel_videos(channel_url, credentials, channel_info)
+    if channel_id is None:
+        return None
+    if not videos:
+        return {"channel_id": channel_id, "videos": [], "processed": 0}
+    
+    processed = process_video_candidates(videos, analysis_types, credentials, job_queue)
+    return {"channel_id": channel_id, "videos": videos, "processed": processed}
+
+def collect_keyword(keyword, analysis_types, credentials, job_queue=None):
+    """
+    키워드 하나로 비디오를 검색해 수집합니다.
+    :return: 처리한 비디오 수
+    """
+    print(f"\n>> 키워드 처리 중: '{keyword}'")
     
-    # 시작 시간 기록
-    start_time = datetime.now().isoformat()
+    # 키워드로 비디오 검색
+    videos = discover_keyword_videos(keyword, credentials)
+    if not videos:
+        return 0
     
+    return process_video_candidates(videos, analysis_types, credentials, job_queue)
+
+def discover_run_videos(tracker, run, credentials):
+    """
+    실행에 포함될 비디오를 채널/키워드별로 발견해 체크포인트에 기록합니다.
+    재개한 실행에서는 이미 발견을 마친 채널/키워드를 다시 조회하지 않습니다.
+    :return: 모든 채널/키워드의 발견을 마쳤는지 여부 (실패하거나 건너뛴 소스는 재개할 때 다시 시도)
+    """
+    run_id = run["run_id"]
     config = load_config()
     
-    # 마지막 실행 시간 업데이트
-    config["last_run"] = datetime.now().isoformat()
-    save_config(config)
+    # 채널 URL을 한 번에 채널 ID로 변환 (캐시된 항목은 API 호출 없음)
+    pending_channels = [url for url in config["channels"] if not tracker.is_source_done(run_id, f"channel:{url}")]
+    resolved_channels = channel_resolver.resolve_many(
+        pending_channels, service=get_youtube_service(credentials)
+    ) if pending_channels else {}
+    
+    # 남은 할당량으로 수집 계획 수립 (예산을 넘는 채널 검색과 키워드 검색은 건너뜀)
+    # RSS 피드 수집은 rss_collector가 따로 맡으므로 여기서는 재생목록/검색 중에서만 고름
+    pending_keywords = [kw for kw in config["keywords"] if not tracker.is_source_done(run_id, f"keyword:{kw}")]
+    plan = quota_ledger.plan_collection(
+        [info for info in resolved_channels.values() if info],
+        pending_keywords,
+        allow_rss=False
+    )
+    print(f"📊 수집 계획: 예상 {plan['total_units']} units / 남은 할당량 {plan['budget']} units")
+    if plan["skipped_channels"]:
+        print(f"⚠️ 할당량 부족으로 건너뛸 채널: {', '.join(plan['skipped_channels'])}")
+    if plan["skipped_keywords"]:
+        print(f"⚠️ 할당량 부족으로 건너뛸 키워드: {', '.join(plan['skipped_keywords'])}")
     
     # 채널 처리
-    for channel_url in config["channels"]:
+    for channel_url in pending_channels:
+        print(f"\n>> 채널 처리 중: {channel_url}")
         try:
-            print(f"\n>> 채널 처리 중: {channel_url}")
-            # 채널 정보 가져오기
-            channel_info = get_info_by_url(channel_url, credentials)
+            channel_info = resolved_channels.get(channel_url)
             if not channel_info:
                 print(f"채널 URL {channel_url}에서 정보를 가져오지 못했습니다.")
                 continue
-                
-            channel_id = channel_info.get("id")
-            channel_title = channel_info.get("title")
-            
-            # 채널에서 비디오 검색
-            videos = search_videos_by_keyword("", credentials, channel_id=channel_id, max_results=15)
-            if not videos:
-                print(f"채널 '{channel_title}'에서 비디오를 찾지 못했습니다.")
+            if channel_info.get("channel_id") in plan["skipped_channels"]:
                 continue
-                
-            # 비디오 처리
-            for video in videos:
-                video_id = video.get("video_id")  # youtube_handler에서 반환하는 키 이름
-                video_title = video.get("title")
-                
-                # 이미 데이터베이스에 있는지 확인
-                if is_video_in_db(video_id):
-                    print(f"비디오 '{video_title}' (ID: {video_id})는 이미 데이터베이스에 있으므로 건너뜁니다.")
-                    continue
-                
-                # 발행일 확인 (1주일 이내인지)
-                published_at = video.get("published_at")
-                
-                # 발행일을 datetime 객체로 변환 (문자열인 경우)
-                if isinstance(published_at, str):
-                    # ISO 형식 문자열을 datetime으로 변환
-                    if 'Z' in published_at:
-                        published_at = published_at.replace('Z', '+00:00')
-                    published_date = datetime.fromisoformat(published_at)
-                else:
-                    # 이미 datetime 객체인 경우
-                    published_date = published_at
-                
-                # 현재 시간을 timezone-aware로 생성 (UTC 기준)
-                now = datetime.now(timezone.utc)
-                
-                # published_date가 timezone-naive인 경우 UTC로 가정하여 timezone-aware로 변환
-                if published_date.tzinfo is None:
-                    published_date = published_date.replace(tzinfo=timezone.utc)
-                
-                # 1주일 이내인지 확인
-                if (now - published_date).days > 7:
-                    print(f"비디오 '{video_title}' (ID: {video_id})는 1주일 이전에 발행되어 건너뜁니다.")
-                    continue
-                
-                print(f"비디오 처리 중: '{video_title}' (ID: {video_id})")
-                
-                # 비디오 상세 정보 가져오기
-                video_info = get_video_info(video_id, credentials)
-                if not video_info:
-                    print(f"비디오 ID {video_id}에서 상세 정보를 가져오지 못했습니다.")
-                    continue
-                
-                # 자막 가져오기
-                transcript, lang = get_video_transcript(video_id, credentials)
-                if not transcript:
-                    print(f"비디오 ID {video_id}에서 자막을 찾을 수 없습니다.")
-                    continue
-                
-                # 비디오 처리 및 분석
-                process_video(video_id, video_info, transcript, analysis_types)
-                
+            _, videos = discover_channel_videos(channel_url, credentials, channel_info)
+            tracker.add_items(run_id, videos)
+            tracker.mark_source_done(run_id, f"channel:{channel_url}", len(videos))
         except Exception as e:
             print(f"채널 {channel_url} 처리 중 오류 발생: {e}")
             traceback.print_exc()
     
-    # 키워드 처리
-    for keyword in config["keywords"]:
+    # 키워드 처리 (할당량 부족으로 건너뛴 채널/키워드는 재개할 때 다시 시도)
+    for keyword in pending_keywords:
+        if keyword in plan["skipped_keywords"]:
+            continue
+        print(f"\n>> 키워드 처리 중: '{keyword}'")
         try:
-            print(f"\n>> 키워드 처리 중: '{keyword}'")
-            
-            # 키워드로 비디오 검색
-            videos = search_videos_by_keyword(keyword, credentials, max_results=10)
-            if not videos:
-                print(f"키워드 '{keyword}'로 비디오를 찾지 못했습니다.")
-                continue
-            
-            # 비디오 처리
-            for video in videos:
-                video_id = video.get("video_id")
-                video_title = video.get("title")
-                
-                # 이미 데이터베이스에 있는지 확인
-                if is_video_in_db(video_id):
-                    print(f"비디오 '{video_title}' (ID: {video_id})는 이미 데이터베이스에 있으므로 건너뜁니다.")
-                    continue
-                
-                # 발행일 확인 (1주일 이내인지)
-                published_at = video.get("published_at")
-                
-                # 발행일을 datetime 객체로 변환 (문자열인 경우)
-                if isinstance(published_at, str):
-                    # ISO 형식 문자열을 datetime으로 변환
-                    if 'Z' in published_at:
-                        published_at = published_at.replace('Z', '+00:00')
-                    published_date = datetime.fromisoformat(published_at)
-                else:
-                    # 이미 datetime 객체인 경우
-                    published_date = published_at
-                
-                # 현재 시간을 timezone-aware로 생성 (UTC 기준)
-                now = datetime.now(timezone.utc)
-                
-                # published_date가 timezone-naive인 경우 UTC로 가정하여 timezone-aware로 변환
-                if published_date.tzinfo is None:
-                    published_date = published_date.replace(tzinfo=timezone.utc)
-                
-                # 1주일 이내인지 확인
-                if (now - published_date).days > 7:
-                    print(f"비디오 '{video_title}' (ID: {video_id})는 1주일 이전에 발행되어 건너뜁니다.")
-                    continue
-                
-                print(f"비디오 처리 중: '{video_title}' (ID: {video_id})")
-                
-                # 비디오 상세 정보 가져오기
-                video_info = get_video_info(video_id, credentials)
-                if not video_info:
-                    print(f"비디오 ID {video_id}에서 상세 정보를 가져오지 못했습니다.")
-                    continue
-                
-                # 자막 가져오기
-                transcript, lang = get_video_transcript(video_id, credentials)
-                if not transcript:
-                    print(f"비디오 ID {video_id}에서 자막을 찾을 수 없습니다.")
-                    continue
-                
-                # 비디오 처리 및 분석
-                process_video(video_id, video_info, transcript, analysis_types)
-                
+            videos = discover_keyword_videos(keyword, credentials)
+            tracker.add_items(run_id, videos)
+            tracker.mark_source_done(run_id, f"keyword:{keyword}", len(videos))
         except Exception as e:
             print(f"키워드 '{keyword}' 처리 중 오류 발생: {e}")
             traceback.print_exc()
     
-    print(f"\n=== 데이터 수집 완료: {datetime.now().isoformat()} ===")
+    # 변환 실패, 오류, 할당량 부족으로 남은 소스가 없을 때만 발견 완료로 기록
+    unfinished = [f"channel:{url}" for url in pending_channels] + [f"keyword:{kw}" for kw in pending_keywords]
+    unfinished = [source for source in unfinished if not tracker.is_source_done(run_id, source)]
+    if unfinished:
+        print(f"⚠️ 발견을 마치지 못한 채널/키워드 {len(unfinished)}개는 --resume으로 다시 시도합니다.")
+        return False
+    tracker.mark_discovery_done(run_id)
+    return True
 
-def run_scheduler(analysis_types=None, credentials=None):
-    """스케줄러를 실행합니다."""
+def collect_data(analysis_types=None, credentials=None, job_queue=None, resume=False):
+    """
+    채널 및 키워드에서 데이터를 수집합니다.
+    발견한 비디오와 단계별 진행 상태를 실행 체크포인트에 기록하므로
+    중단되더라도 resume=True로 다시 실행하면 멈춘 지점부터 이어서 처리합니다.
+    :param job_queue: 지정하면 비디오 처리를 작업 큐에 맡기고 발견만 수행
+    :param resume: 완료되지 않은 가장 최근 실행을 이어서 처리
+    """
+    if analysis_types is None:
+        analysis_types = ["summary"]  # 기본 분석 유형
+        
     if credentials is None:
         print("오류: OAuth2 인증 정보가 필요합니다.")
         return
+    
+    tracker = RunTracker(DB_PATH)
+    run = tracker.resume_or_start("collect", {"analysis_types": analysis_types}, resume=resume)
+    run_id = run["run_id"]
+    analysis_types = run["params"].get("analysis_types") or analysis_types
         
+    print(f"\n=== 데이터 수집 시작: {datetime.now().isoformat()} (실행 {run_id}) ===")
+    print(f"수행할 분석 유형: {', '.join(analysis_types)}")
+    
     config = load_config()
-    interval = config.get("schedule_interval", 24)  # 기본값: 24시간
     
-    def scheduled_job():
-        try:
-            print(f"\n=== 스케줄된 작업 시작: {datetime.now().isoformat()} ===")
-            collect_data(analysis_types, credentials)
-            print(f"=== 스케줄된 작업 완료: {datetime.now().isoformat()} ===")
-        except Exception as e:
-            print(f"스케줄된 작업 중 오류 발생: {e}")
-            traceback.print_exc()
+    # 마지막 실행 시간 업데이트
+    config["last_run"] = datetime.now().isoformat()
+    save_config(config)
     
-    # 즉시 한 번 실행
-    scheduled_job()
+    metrics_start = metrics.snapshot()
+    # 이 실행의 LLM 사용량에 실행별 토큰 예산 적용
+    cost_governor.begin_run(run_id)
+    try:
+        discovery_done = bool(run["discovery_done"]) or discover_run_videos(tracker, run, credentials)
+        
+        # 끝나지 않은 비디오만 발견 순서대로 처리
+        pending = tracker.pending_items(run_id)
+        print(f"\n>> 처리할 비디오: {len(pending)}개")
+        process_video_candidates([item["payload"] for item in pending], analysis_types, credentials,
+                                 job_queue, tracker=tracker, run_id=run_id)
+    except KeyboardInterrupt:
+        tracker.finish_run(run_id, RUN_INTERRUPTED)
+        print(f"\n⏸️ 수집이 중단되었습니다. 'python main.py --collect --resume'으로 이어서 실행하세요. (실행 {run_id})")
+        raise
+    except Exception:
+        tracker.finish_run(run_id, RUN_FAILED)
+        raise
+    finally:
+        # 단계별 소요 시간 요약 (어디서 시간이 쓰였는지 확인)
+        metrics.print_summary(since=metrics_start, title=f"수집 실행 요약 ({run_id})")
+        cost_governor.end_run()
+        print_run_spend(cost_governor, run_id)
     
-    # 스케줄 설정
-    schedule.every(interval).hours.do(scheduled_job)
+    remaining = tracker.pending_items(run_id)
+    tracker.finish_run(run_id, RUN_COMPLETED if not remaining and discovery_done else RUN_FAILED)
+    if remaining:
+        print(f"⚠️ 끝나지 않은 비디오 {len(remaining)}개가 남았습니다. --resume으로 다시 시도할 수 있습니다.")
     
-    print(f"스케줄러가 시작되었습니다. {interval}시간마다 실행됩니다.")
+    print(f"\n=== 데이터 수집 완료: {datetime.now().isoformat()} ===")
+
+def run_scheduler(analysis_types=None, credentials=None, max_workers=2, use_job_queue=False):
+    """
+    스케줄러 데몬을 실행합니다.
+    채널/키워드/분석/사설 작업을 각자의 주기로 분산 실행합니다.
+    use_job_queue가 True이면 비디오 처리는 작업 큐를 통해 worker.py가 수행합니다.
+    """
+    if credentials is None:
+        print("오류: OAuth2 인증 정보가 필요합니다.")
+        return
+    
+    from scheduler_daemon import create_collection_daemon
     
-    # 스케줄러 실행
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # 1분마다 체크
+    daemon = create_collection_daemon(credentials, analysis_types, max_workers=max_workers,
+                                      use_job_queue=use_job_queue)
+    daemon.run()
 
 def test():
     """테스트 함수"""
@@ -358,21 +635,50 @@ def main():
     parser.add_argument("--test", action="store_true", help="테스트 모드 실행")
     parser.add_argument("--collect", action="store_true", help="데이터 수집 실행")
     parser.add_argument("--schedule", action="store_true", help="스케줄러 실행")
+    parser.add_argument("--max-workers", type=int, default=2, help="스케줄러가 동시에 실행할 작업 수 (--schedule과 함께 사용)")
+    parser.add_argument("--use-job-queue", action="store_true",
+                        help="발견한 비디오 처리를 작업 큐에 맡김 (worker.py가 처리, --schedule과 함께 사용)")
     parser.add_argument("--analysis-types", nargs="+", default=["summary"], help="분석 유형 지정")
+    parser.add_argument("--resume", action="store_true", help="중단된 최근 수집 실행을 이어서 처리 (--collect와 함께 사용)")
+    parser.add_argument("--report", action="store_true", help="실행 현황 및 멈춘/부분 처리 비디오 보고서")
+    parser.add_argument("--metrics-file", help="실행 후 Prometheus 형식 메트릭을 저장할 파일")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus /metrics 엔드포인트 포트")
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ensure_schema()
+    
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    
     if args.test:
         test()
-    elif args.collect:
-        print("OAuth2 인증이 필요합니다. Streamlit 앱에서 로그인 후 사용해주세요.")
-    elif args.schedule:
-        print("OAuth2 인증이 필요합니다. Streamlit 앱에서 로그인 후 사용해주세요.")
+    elif args.report:
+        print_run_report(RunTracker(DB_PATH))
+    elif args.collect or args.schedule:
+        from worker import load_saved_credentials
+        credentials = load_saved_credentials()
+        if credentials is None:
+            print("OAuth2 인증이 필요합니다. Streamlit 앱에서 로그인 후 사용해주세요.")
+            return
+        try:
+            if args.collect:
+                collect_data(args.analysis_types, credentials, resume=args.resume)
+            else:
+                run_scheduler(args.analysis_types, credentials, max_workers=args.max_workers,
+                              use_job_queue=args.use_job_queue)
+        finally:
+            if args.metrics_file:
+                metrics.write_file(args.metrics_file)
     else:
         print("사용법:")
         print("  python main.py --test     # 테스트 실행")
         print("  python main.py --collect  # 데이터 수집 실행 (OAuth2 필요)")
+        print("  python main.py --collect --resume # 중단된 수집 이어서 실행")
+        print("  python main.py --report   # 실행 현황 및 멈춘/부분 처리 비디오 보고서")
         print("  python main.py --schedule # 스케줄러 실행 (OAuth2 필요)")
+        print("  python main.py --schedule --use-job-queue --max-workers 4 # 비디오 처리는 worker.py에 맡김")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
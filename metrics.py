@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+파이프라인 계측 (카운터, 히스토그램, 타이머)
+YouTube API, 자막 다운로드, LLM 호출, DB 쿼리, RSS 조회 시간을 기록해
+Prometheus 텍스트 형식(파일 또는 HTTP 엔드포인트)과 실행별 요약 표로 보여줌
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# 초 단위 지연 시간 버킷 (DB 쿼리 ~ LLM 호출까지)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# 기본 메트릭 설명 (Prometheus HELP)
+METRIC_HELP = {
+    'youtube_api_request_seconds': 'YouTube Data API 요청 시간 (엔드포인트별)',
+    'youtube_api_requests_total': 'YouTube Data API 요청 수 (엔드포인트/결과별)',
+    'transcript_fetch_seconds': '자막 다운로드 시간',
+    'llm_request_seconds': 'LLM 요청 시간 (분석 유형/모델별)',
+    'llm_requests_total': 'LLM 요청 수 (분석 유형/모델/결과별)',
+    'llm_tokens_total': 'LLM 토큰 사용량 (분석 유형/모델/종류별, cached는 프롬프트 캐시 적중분)',
+    'llm_cost_usd_total': 'LLM 예상 비용 USD (분석 유형/모델별)',
+    'llm_time_to_first_token_seconds': '스트리밍 LLM 요청의 첫 토큰까지 걸린 시간 (분석 유형/모델별)',
+    'llm_chunk_cache_total': '청크별 LLM 결과 캐시 조회 수 (분석 유형/적중 여부별)',
+    'llm_budget_decisions_total': '토큰 예산 확인 결과 (분석 유형/결정별: run, fallback, skip, defer)',
+    'db_query_seconds': 'db_handler 함수별 SQLite 처리 시간',
+    'rss_fetch_seconds': 'RSS 피드 조회 시간',
+    'rss_fetch_total': 'RSS 피드 조회 수 (HTTP 상태별)',
+    'job_seconds': '작업 큐 작업 처리 시간 (작업 유형별)',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Dict = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """프로세스 내 메트릭 저장소 (스레드 안전)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict]] = {}
+
+    # ----- 기록 -----
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """카운터 증가"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """히스토그램에 값 하나 기록"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist['buckets'][i] += 1
+                    break
+            hist['sum'] += value
+            hist['count'] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """with 블록 실행 시간을 히스토그램에 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels):
+        """
+        함수 실행 시간을 기록하는 데코레이터.
+        라벨 값이 함수이면 반환값으로 라벨을 정하고, 예외가 나면 "error"로 기록합니다.
+        라벨 function=True를 주면 함수 이름을 라벨로 사용합니다.
+        """
+        def decorator(func):
+            static = {k: (func.__name__ if v is True else v) for k, v in labels.items() if not callable(v)}
+            dynamic = {k: v for k, v in labels.items() if callable(v)}
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    self.observe(name, time.perf_counter() - started,
+                                 **static, **{k: 'error' for k in dynamic})
+                    raise
+                self.observe(name, time.perf_counter() - started,
+                             **static, **{k: fn(result) for k, fn in dynamic.items()})
+                return result
+
+            return wrapper
+        return decorator
+
+    # ----- 조회 -----
+
+    def snapshot(self) -> Dict:
+        """현재 값 복사본 (실행 시작 시점을 저장해 두었다가 요약에서 차이만 보기 위함)"""
+        with self._lock:
+            return {
+                'counters': {name: dict(series) for name, series in self._counters.items()},
+                'histograms': {
+                    name: {key: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                           for key, h in series.items()}
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def reset(self):
+        """모든 메트릭 초기화"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식으로 변환"""
+        snap = self.snapshot()
+        lines = []
+
+        for name in sorted(snap['counters']):
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(snap['counters'][name].items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(snap['histograms']):
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for key, hist in sorted(snap['histograms'][name].items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, hist['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(key, {'le': _format_value(bound)})} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, {'le': '+Inf'})} {hist['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path: str):
+        """Prometheus 텍스트 파일로 저장 (node_exporter textfile collector 등에서 읽음)"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def _quantile(self, buckets: List[int], count: int, q: float) -> Optional[float]:
+        """버킷 안에서 선형 보간한 분위수 추정값"""
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for bound, bucket_count in zip(self.buckets, buckets):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        return self.buckets[-1]
+
+    def summary_rows(self, since: Dict = None) -> Dict[str, List[Dict]]:
+        """
+        요약 표 데이터. since(스냅샷)을 주면 그 이후 증가분만 계산합니다.
+        :return: {'timings': [...], 'counters': [...]}
+        """
+        snap = self.snapshot()
+        since = since or {'counters': {}, 'histograms': {}}
+
+        timings = []
+        for name, series in snap['histograms'].items():
+            for key, hist in series.items():
+                base = since['histograms'].get(name, {}).get(key)
+                buckets = list(hist['buckets'])
+                count, total = hist['count'], hist['sum']
+                if base:
+                    buckets = [a - b for a, b in zip(buckets, base['buckets'])]
+                    count -= base['count']
+                    total -= base['sum']
+                if count <= 0:
+                    continue
+                timings.append({
+                    'name': name,
+                    'labels': dict(key),
+                    'count': count,
+                    'total': total,
+                    'avg': total / count,
+                    'p95': self._quantile(buckets, count, 0.95),
+                })
+
+        counters = []
+        for name, series in snap['counters'].items():
+            for key, value in series.items():
+                value -= since['counters'].get(name, {}).get(key, 0)
+                if value:
+                    counters.append({'name': name, 'labels': dict(key), 'value': value})
+
+        timings.sort(key=lambda row: row['total'], reverse=True)
+        counters.sort(key=lambda row: (row['name'], sorted(row['labels'].items())))
+        return {'timings': timings, 'counters': counters}
+
+    def print_summary(self, since: Dict = None, title: str = "실행 요약"):
+        """시간이 많이 걸린 단계부터 요약 표 출력"""
+        rows = self.summary_rows(since)
+        if not rows['timings'] and not rows['counters']:
+            return
+
+        def label_text(labels):
+            return ','.join(f"{k}={v}" for k, v in labels.items()) or '-'
+
+        print(f"\n=== ⏱️ {title} ===")
+        if rows['timings']:
+            width = max(len(f"{r['name']} {label_text(r['labels'])}") for r in rows['timings'])
+            print(f"{'단계':<{width}} {'횟수':>7} {'합계(초)':>10} {'평균(초)':>10} {'p95(초)':>10}")
+            for r in rows['timings']:
+                stage = f"{r['name']} {label_text(r['labels'])}"
+                print(f"{stage:<{width}} {r['count']:>7} {r['total']:>10.2f} {r['avg']:>10.3f} {r['p95']:>10.3f}")
+        if rows['counters']:
+            print()
+            for r in rows['counters']:
+                value = f"{r['value']:.6g}" if not float(r['value']).is_integer() else str(int(r['value']))
+                print(f"  {r['name']} {label_text(r['labels'])}: {value}")
+
+
+def _make_handler(registry: MetricsRegistry):
+    # http.server는 import 비용이 커서 엔드포인트를 띄울 때만 로드
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = registry.render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 스크랩 요청마다 로그를 남기지 않음
+            pass
+
+    return MetricsHandler
+
+
+def start_http_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = None):
+    """백그라운드 스레드에서 /metrics 엔드포인트 제공"""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((host, port), _make_handler(registry or metrics))
+    thread = threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http")
+    thread.start()
+    print(f"📈 메트릭 엔드포인트: http://{host}:{port}/metrics")
+    return server
+
+
+# 전역 메트릭 저장소
+metrics = MetricsRegistry()
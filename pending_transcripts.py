@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+자막 대기열 (자막이 없는 비디오의 재확인 일정)
+자막이 없던 비디오를 지수 백오프 간격으로만 다시 확인하고, 발행 후 일정 기간이 지나면 포기해
+같은 비디오에 매 실행마다 상세 정보/자막 API 할당량을 쓰지 않도록 함
+사용법: python pending_transcripts.py [list|retry VIDEO_ID|purge]
+"""
+
+import argparse
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+# 첫 재확인까지 대기 시간과 최대 대기 시간 (업로드/프리미어 직후 자막은 보통 몇 시간 뒤에 생김)
+BACKOFF_BASE_MINUTES = 60
+BACKOFF_MAX_HOURS = 24
+
+# 발행 후 이 기간이 지나도 자막이 없으면 더 이상 확인하지 않음 (수집 대상 기간과 같음)
+MAX_AGE_DAYS = 7
+
+STATUS_WAITING = "waiting"
+STATUS_GAVE_UP = "gave_up"
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """attempts번째 "자막 없음" 이후 다음 확인까지 대기 시간"""
+    minutes = BACKOFF_BASE_MINUTES * (2 ** max(attempts - 1, 0))
+    return min(timedelta(minutes=minutes), timedelta(hours=BACKOFF_MAX_HOURS))
+
+
+def _parse_time(value) -> Optional[datetime]:
+    """ISO 문자열을 UTC datetime으로 변환 (시간대가 없으면 UTC로 간주)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class PendingTranscripts:
+    def __init__(self, db_path: str = "youtube_news.db"):
+        self.db_path = db_path
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.initialize_db()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def initialize_db(self):
+        """자막 대기열 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pending_transcripts (
+                video_id TEXT PRIMARY KEY,
+                video_info TEXT,
+                published_at TEXT,
+                status TEXT DEFAULT 'waiting',
+                attempts INTEGER DEFAULT 0,
+                first_seen_at TEXT,
+                last_checked_at TEXT,
+                next_check_at TEXT
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pending_transcripts_next
+            ON pending_transcripts (status, next_check_at)
+        ''')
+
+        conn.commit()
+        conn.close()
+        self._initialized = True
+
+    @staticmethod
+    def _from_row(row) -> Dict:
+        entry = dict(row)
+        entry['video_info'] = json.loads(entry['video_info']) if entry['video_info'] else None
+        return entry
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        """대기열 항목 조회 (없으면 None)"""
+        conn = self._connect()
+        row = conn.execute('SELECT * FROM pending_transcripts WHERE video_id = ?', (video_id,)).fetchone()
+        conn.close()
+        return self._from_row(row) if row else None
+
+    def should_check(self, video_id: str, now: datetime = None) -> bool:
+        """
+        지금 자막을 확인해도 되는지 (API 호출 전에 확인)
+        대기열에 없거나 재확인 시각이 지났으면 True, 대기 중이거나 포기한 비디오는 False
+        """
+        entry = self.get(video_id)
+        if entry is None:
+            return True
+        if entry['status'] == STATUS_GAVE_UP:
+            return False
+        now = now or datetime.now(timezone.utc)
+        return _parse_time(entry['next_check_at']) <= now
+
+    def record_missing(self, video_id: str, video_info: Dict = None, published_at: str = None,
+                       now: datetime = None) -> Dict:
+        """
+        "자막 없음" 기록 및 다음 확인 시각 계산
+        :param video_info: 재확인 때 상세 정보를 다시 조회하지 않도록 함께 저장
+        :return: 갱신된 대기열 항목
+        """
+        now = now or datetime.now(timezone.utc)
+        entry = self.get(video_id)
+        attempts = (entry['attempts'] if entry else 0) + 1
+        video_info = video_info or (entry['video_info'] if entry else None)
+        published_at = published_at or (video_info or {}).get('published_at') or (entry or {}).get('published_at')
+        first_seen_at = entry['first_seen_at'] if entry else now.isoformat()
+
+        # 발행 시각을 모르면 처음 발견한 시각부터 계산
+        started = _parse_time(published_at) or _parse_time(first_seen_at)
+        next_check = now + backoff_delay(attempts)
+        status = STATUS_GAVE_UP if next_check - started > timedelta(days=MAX_AGE_DAYS) else STATUS_WAITING
+
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO pending_transcripts
+                (video_id, video_info, published_at, status, attempts, first_seen_at, last_checked_at, next_check_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(video_id) DO UPDATE SET
+                video_info = excluded.video_info,
+                published_at = excluded.published_at,
+                status = excluded.status,
+                attempts = excluded.attempts,
+                last_checked_at = excluded.last_checked_at,
+                next_check_at = excluded.next_check_at
+        ''', (video_id, json.dumps(video_info, ensure_ascii=False) if video_info else None, published_at,
+              status, attempts, first_seen_at, now.isoformat(), next_check.isoformat()))
+        conn.commit()
+        conn.close()
+        return self.get(video_id)
+
+    def resolve(self, video_id: str) -> bool:
+        """자막을 찾은 비디오를 대기열에서 제거"""
+        conn = self._connect()
+        cursor = conn.execute('DELETE FROM pending_transcripts WHERE video_id = ?', (video_id,))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount > 0
+
+    def retry_now(self, video_id: str) -> bool:
+        """다음 실행에서 바로 다시 확인하도록 재확인 시각 초기화 (포기한 비디오 포함)"""
+        conn = self._connect()
+        cursor = conn.execute('''
+            UPDATE pending_transcripts SET status = ?, next_check_at = ? WHERE video_id = ?
+        ''', (STATUS_WAITING, datetime.now(timezone.utc).isoformat(), video_id))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount > 0
+
+    def list_entries(self, status: str = None, limit: int = 50) -> List[Dict]:
+        """대기열 항목 목록 (다음 확인 시각 순)"""
+        conn = self._connect()
+        if status:
+            rows = conn.execute('''
+                SELECT * FROM pending_transcripts WHERE status = ? ORDER BY next_check_at LIMIT ?
+            ''', (status, limit)).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM pending_transcripts ORDER BY next_check_at LIMIT ?', (limit,)).fetchall()
+        conn.close()
+        return [self._from_row(row) for row in rows]
+
+    def purge(self, older_than_days: int = 30) -> int:
+        """포기한 지 오래된 항목 삭제"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+        conn = self._connect()
+        cursor = conn.execute('''
+            DELETE FROM pending_transcripts WHERE status = ? AND last_checked_at < ?
+        ''', (STATUS_GAVE_UP, cutoff))
+        conn.commit()
+        conn.close()
+        return cursor.rowcount
+
+
+def main():
+    """자막 대기열 CLI"""
+    parser = argparse.ArgumentParser(description="자막이 없는 비디오의 재확인 대기열 관리")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    subparsers = parser.add_subparsers(dest="command", help="실행할 명령")
+
+    list_parser = subparsers.add_parser("list", help="대기열 항목 보기")
+    list_parser.add_argument("--status", choices=[STATUS_WAITING, STATUS_GAVE_UP], help="상태로 필터링")
+    list_parser.add_argument("--limit", type=int, default=50, help="표시할 항목 수")
+
+    retry_parser = subparsers.add_parser("retry", help="다음 수집 때 바로 다시 확인")
+    retry_parser.add_argument("video_id", help="비디오 ID")
+
+    purge_parser = subparsers.add_parser("purge", help="오래전에 포기한 항목 삭제")
+    purge_parser.add_argument("--days", type=int, default=30, help="마지막 확인 후 경과 일수")
+
+    args = parser.parse_args()
+    queue = PendingTranscripts(args.db)
+
+    if args.command == "retry":
+        if queue.retry_now(args.video_id):
+            print(f"비디오 {args.video_id}을(를) 다음 수집 때 다시 확인합니다.")
+        else:
+            print(f"대기열에 비디오 {args.video_id}이(가) 없습니다.")
+    elif args.command == "purge":
+        print(f"🧹 {queue.purge(args.days)}개 항목을 삭제했습니다.")
+    else:
+        entries = queue.list_entries(getattr(args, 'status', None), getattr(args, 'limit', 50))
+        print(f"\n=== 자막 대기열: {len(entries)}개 ===")
+        for entry in entries:
+            title = (entry['video_info'] or {}).get('title', '')
+            print(f"  - {entry['video_id']} [{entry['status']}] 시도 {entry['attempts']}회, "
+                  f"다음 확인 {entry['next_check_at']} {title}")
+
+
+# 전역 자막 대기열 인스턴스
+pending_transcripts = PendingTranscripts()
+
+
+if __name__ == "__main__":
+    main()
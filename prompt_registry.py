@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+분석 유형별 프롬프트 버전 등록
+분석 유형마다 모델, 프롬프트 템플릿, 생성 옵션을 등록하고 (청크 분할 방식과 함께) 해시해 버전을 만듦
+저장된 분석에는 이 버전이 기록되어, 프롬프트나 모델이 바뀌면 오래된 분석만 골라 다시 수행할 수 있음
+(템플릿은 llm_handler가 불러올 때 등록)
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from transcript_chunker import chunker_id
+
+# 분석 유형 → {'model', 'templates', 'options'}
+PROMPTS: Dict[str, Dict] = {}
+
+# 생성 토큰 수 제한이 없는 요청의 예상 응답 토큰 수 (비용 추정용)
+DEFAULT_COMPLETION_TOKENS = 1500
+
+
+def register_prompt(analysis_type: str, model: str, *templates: str, **options):
+    """
+    분석 유형의 프롬프트 등록
+    :param templates: 시스템 프롬프트와 청크/통합 요청 템플릿 (순서대로)
+    :param options: 생성 옵션 (max_tokens, temperature 등)
+    """
+    PROMPTS[analysis_type] = {'model': model, 'templates': list(templates), 'options': options}
+
+
+def registered_types() -> List[str]:
+    """프롬프트가 등록된 분석 유형 목록"""
+    return list(PROMPTS)
+
+
+def prompt_version(analysis_type: str) -> Optional[str]:
+    """분석 유형의 현재 버전 (모델, 템플릿, 옵션, 청크 분할 방식의 해시, 등록되지 않았으면 None)"""
+    entry = PROMPTS.get(analysis_type)
+    if entry is None:
+        return None
+    canonical = json.dumps([entry['model'], entry['templates'], entry['options'], chunker_id()],
+                           ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def estimate_tokens(analysis_type: str, transcript_tokens: int, chunk_count: int,
+                    count_tokens: Callable[[str], int] = None) -> Tuple[int, int]:
+    """
+    분석 한 번의 예상 (프롬프트 토큰, 응답 토큰) - 청크별 요청 + 청크가 여러 개면 통합 요청
+    응답은 생성 토큰 제한까지 채운다고 보므로 실제보다 크게 잡힘 (청크 결과 캐시 적중도 고려하지 않음)
+    """
+    entry = PROMPTS[analysis_type]
+    count_tokens = count_tokens or (lambda text: len(text) // 3)
+    chunk_count = max(chunk_count, 1)
+    template_tokens = sum(count_tokens(template) for template in entry['templates'])
+    completion = entry['options'].get('max_tokens') or DEFAULT_COMPLETION_TOKENS
+
+    prompt_tokens = transcript_tokens + chunk_count * template_tokens
+    completion_tokens = chunk_count * completion
+    if chunk_count > 1:
+        prompt_tokens += template_tokens + chunk_count * completion
+        completion_tokens += completion
+    return prompt_tokens, completion_tokens
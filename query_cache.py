@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streamlit 조회 캐시
+위젯 조작이나 st.rerun()마다 같은 SQLite 조회를 반복하지 않도록 결과를 st.cache_data에 보관하고,
+db_handler 쓰기 함수가 올리는 세대 번호(db_generation)가 바뀌면 다시 조회
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+import streamlit as st
+
+import db_handler
+
+# 다른 프로세스(워커, 스케줄러)의 쓰기를 확인하는 간격(초). 같은 프로세스의 쓰기는 즉시 반영
+GENERATION_CHECK_INTERVAL = 1.0
+
+# 세대가 바뀌지 않아도 결과를 다시 조회하는 시간(초) - "최근 N시간" 조회의 기준 시각이 밀리지 않도록
+DEFAULT_TTL = 600
+
+_registry: Dict[str, Callable] = {}
+_generation_lock = threading.Lock()
+_generation_state = {'value': None, 'checked_at': 0.0}
+
+
+def current_generation() -> Tuple[int, int]:
+    """
+    캐시 키에 넣을 세대 번호.
+    :return: (DB 세대 번호, 이 프로세스의 쓰기 횟수)
+    """
+    now = time.monotonic()
+    with _generation_lock:
+        if _generation_state['value'] is None or now - _generation_state['checked_at'] >= GENERATION_CHECK_INTERVAL:
+            _generation_state['value'] = db_handler.get_generation()
+            _generation_state['checked_at'] = now
+        db_generation = _generation_state['value']
+    return db_generation, db_handler.get_process_writes()
+
+
+@st.cache_data(show_spinner=False, max_entries=256, ttl=DEFAULT_TTL)
+def _run_cached(name: str, generation: Tuple[int, int], args: tuple, kwargs: tuple):
+    return _registry[name](*args, **dict(kwargs))
+
+
+def cached_query(func: Callable = None, name: str = None):
+    """
+    조회 함수를 세대 번호 기반 캐시로 감싸는 데코레이터.
+    인자는 해시 가능한 값(문자열, 숫자 등)이어야 합니다.
+
+    사용법:
+        @cached_query
+        def get_videos(limit=50): ...
+
+        get_all_channels = cached_query(db_handler.get_all_channels)
+    """
+    def decorator(f):
+        key = name or f"{f.__module__}.{f.__qualname__}"
+        _registry[key] = f
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            return _run_cached(key, current_generation(), args, tuple(sorted(kwargs.items())))
+
+        wrapper.uncached = f
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def clear_query_cache():
+    """모든 조회 캐시 삭제"""
+    _run_cached.clear()
+    with _generation_lock:
+        _generation_state['value'] = None
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+YouTube Data API 할당량 장부 및 비용 기반 수집 계획
+모든 API 호출의 실제 유닛 비용을 엔드포인트별로 기록하고 (태평양 시간 자정 기준 초기화),
+남은 할당량 안에서 채널별로 가장 싼 수집 방법을 고르고, 할당량을 넘는 채널 검색과 키워드 검색은 계획에서 뺌
+"""
+
+import math
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from metrics import metrics
+
+# YouTube Data API v3 엔드포인트별 유닛 비용 (그 외 읽기 호출은 1)
+QUOTA_COSTS = {
+    'search.list': 100,
+    'captions.list': 50,
+    'captions.download': 200,
+    'captions.insert': 400,
+    'videos.list': 1,
+    'channels.list': 1,
+    'playlistItems.list': 1,
+    'playlists.list': 1,
+    'subscriptions.list': 1,
+    'commentThreads.list': 1,
+}
+DEFAULT_COST = 1
+DEFAULT_DAILY_LIMIT = 10000
+
+# 할당량은 태평양 시간 자정에 초기화됨
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# videos.list는 한 번에 최대 50개 ID 조회 가능
+VIDEOS_PER_LIST_CALL = 50
+
+
+class QuotaExceededError(Exception):
+    """남은 할당량으로 감당할 수 없는 호출"""
+
+
+def quota_day(now: datetime = None) -> str:
+    """할당량 기준 날짜 (태평양 시간 YYYY-MM-DD)"""
+    now = now or datetime.now(QUOTA_TIMEZONE)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+
+def endpoint_cost(endpoint: str) -> int:
+    """엔드포인트 호출 1회의 유닛 비용"""
+    return QUOTA_COSTS.get(endpoint, DEFAULT_COST)
+
+
+class _TrackedRequest:
+    """execute() 시점에 할당량을 기록하는 HttpRequest 래퍼"""
+
+    def __init__(self, request, endpoint: str, ledger: 'QuotaLedger'):
+        self._request = request
+        self._endpoint = endpoint
+        self._ledger = ledger
+
+    def execute(self, *args, **kwargs):
+        self._ledger.check(self._endpoint)
+        result = 'error'
+        started = time.perf_counter()
+        try:
+            response = self._request.execute(*args, **kwargs)
+            result = 'ok'
+            return response
+        finally:
+            metrics.observe('youtube_api_request_seconds', time.perf_counter() - started, endpoint=self._endpoint)
+            metrics.inc('youtube_api_requests_total', endpoint=self._endpoint, result=result)
+            # 실패한 요청도 할당량이 차감되므로 항상 기록
+            self._ledger.record(self._endpoint)
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+class _TrackedResource:
+    """service.search(), service.videos() 등 리소스 래퍼"""
+
+    def __init__(self, resource, resource_name: str, ledger: 'QuotaLedger'):
+        self._resource = resource
+        self._resource_name = resource_name
+        self._ledger = ledger
+
+    def __getattr__(self, name):
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        # list_next 같은 페이지네이션 메서드는 같은 엔드포인트로 집계
+        method = name[:-5] if name.endswith('_next') else name
+        endpoint = f"{self._resource_name}.{method}"
+
+        def call(*args, **kwargs):
+            request = attr(*args, **kwargs)
+            if request is None:
+                return None
+            return _TrackedRequest(request, endpoint, self._ledger)
+
+        return call
+
+
+class TrackedService:
+    """googleapiclient 서비스 래퍼 - 모든 호출이 장부에 기록됨"""
+
+    def __init__(self, service, ledger: 'QuotaLedger'):
+        self._service = service
+        self._ledger = ledger
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def resource(*args, **kwargs):
+            return _TrackedResource(attr(*args, **kwargs), name, self._ledger)
+
+        return resource
+
+
+class QuotaLedger:
+    def __init__(self, db_path: str = "youtube_news.db", daily_limit: int = DEFAULT_DAILY_LIMIT,
+                 strict: bool = False):
+        """
+        :param strict: True이면 남은 할당량을 넘는 호출 전에 QuotaExceededError 발생
+        """
+        self.db_path = db_path
+        self.daily_limit = daily_limit
+        self.strict = strict
+        self._initialized = False
+
+    def initialize_db(self):
+        """할당량 테이블 초기화 (일별 합계는 기존 api_quota_tracking 테이블 사용)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_quota_tracking (
+                date TEXT PRIMARY KEY,
+                quota_used INTEGER DEFAULT 0,
+                quota_limit INTEGER DEFAULT 10000,
+                last_reset TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS api_quota_calls (
+                date TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                calls INTEGER DEFAULT 0,
+                units INTEGER DEFAULT 0,
+                last_called TEXT,
+                PRIMARY KEY (date, endpoint)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+        self._initialized = True
+
+    def _ensure_db(self):
+        if not self._initialized:
+            self.initialize_db()
+
+    def wrap(self, service):
+        """API 서비스를 장부 기록용 래퍼로 감쌈 (이미 감싼 경우 그대로 반환)"""
+        if service is None or isinstance(service, TrackedService):
+            return service
+        return TrackedService(service, self)
+
+    def record(self, endpoint: str, units: int = None, calls: int = 1):
+        """API 호출 기록"""
+        self._ensure_db()
+        units = endpoint_cost(endpoint) * calls if units is None else units
+        day = quota_day()
+        now = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO api_quota_calls (date, endpoint, calls, units, last_called)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(date, endpoint) DO UPDATE SET
+                calls = calls + excluded.calls,
+                units = units + excluded.units,
+                last_called = excluded.last_called
+        ''', (day, endpoint, calls, units, now))
+        cursor.execute('''
+            INSERT INTO api_quota_tracking (date, quota_used, quota_limit, last_reset)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                quota_used = quota_used + excluded.quota_used,
+                quota_limit = excluded.quota_limit
+        ''', (day, units, self.daily_limit, now))
+        conn.commit()
+        conn.close()
+
+    def used_today(self) -> int:
+        """오늘(태평양 시간) 사용한 유닛"""
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT quota_used FROM api_quota_tracking WHERE date = ?', (quota_day(),))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else 0
+
+    def remaining(self) -> int:
+        """오늘 남은 유닛"""
+        return max(self.daily_limit - self.used_today(), 0)
+
+    def can_afford(self, units: int) -> bool:
+        """주어진 유닛을 사용할 수 있는지 확인"""
+        return units <= self.remaining()
+
+    def check(self, endpoint: str):
+        """strict 모드에서 호출 전 할당량 확인"""
+        if self.strict and not self.can_afford(endpoint_cost(endpoint)):
+            raise QuotaExceededError(
+                f"할당량 부족: {endpoint} ({endpoint_cost(endpoint)} units), 남은 할당량 {self.remaining()} units"
+            )
+
+    def usage_by_endpoint(self, day: str = None) -> List[Dict]:
+        """엔드포인트별 사용량"""
+        self._ensure_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT endpoint, calls, units, last_called FROM api_quota_calls
+            WHERE date = ?
+            ORDER BY units DESC
+        ''', (day or quota_day(),))
+        rows = [
+            {'endpoint': row[0], 'calls': row[1], 'units': row[2], 'last_called': row[3]}
+            for row in cursor.fetchall()
+        ]
+        conn.close()
+        return rows
+
+    def plan_collection(self, channels: List[Dict], keywords: List[str], budget: int = None,
+                        expected_new_videos: int = 3, allow_rss: bool = True) -> Dict:
+        """
+        남은 할당량 안에서 채널과 키워드를 우선순위 순으로 다루는 가장 싼 수집 계획.
+        채널 방법별 비용:
+          - rss: 0 units (피드 조회, 상세 정보는 videos.list로 50개씩) - allow_rss일 때만
+          - playlist: playlistItems.list 1 unit (업로드 재생목록)
+          - search: search.list 100 units (채널 ID만 알고 재생목록을 모를 때)
+        채널 검색과 키워드는 search.list(100)만 가능하므로 예산을 넘으면 각각
+        skipped_channels, skipped_keywords로 빼고 나머지만 계획에 넣습니다.
+
+        :param channels: channel_id, uploads_playlist_id(선택) 를 가진 우선순위 순 채널 목록
+        :param keywords: 우선순위 순 키워드 목록
+        :param budget: 사용할 유닛 (기본값: 오늘 남은 할당량)
+        :param expected_new_videos: 채널/키워드당 예상 신규 동영상 수 (상세 조회 비용 계산용)
+        :param allow_rss: 호출하는 쪽이 RSS 피드로 채널을 수집할 수 있는지 (아니면 재생목록/검색 중에서 고름)
+        """
+        budget = self.remaining() if budget is None else budget
+        videos_cost = endpoint_cost('videos.list')
+        plan = {'channels': [], 'keywords': [], 'skipped_channels': [], 'skipped_keywords': [], 'budget': budget}
+
+        def fits(units: int) -> bool:
+            # 이 소스를 넣어도 발견한 동영상의 상세 조회까지 예산 안에 들어오는지
+            detail_units = math.ceil((new_videos + expected_new_videos) / VIDEOS_PER_LIST_CALL) * videos_cost
+            return total_units + units + detail_units <= budget
+
+        total_units = 0
+        new_videos = 0
+        for channel in channels:
+            if allow_rss and (channel.get('channel_id') or '').startswith('UC'):
+                method, units = 'rss', 0
+            elif channel.get('uploads_playlist_id') or (channel.get('channel_id') or '').startswith('UC'):
+                method, units = 'playlist', endpoint_cost('playlistItems.list')
+            else:
+                method, units = 'search', endpoint_cost('search.list')
+            if units and not fits(units):
+                plan['skipped_channels'].append(channel.get('channel_id'))
+                continue
+            plan['channels'].append({'channel_id': channel.get('channel_id'), 'method': method, 'units': units})
+            total_units += units
+            new_videos += expected_new_videos
+
+        for keyword in keywords:
+            units = endpoint_cost('search.list')
+            if not fits(units):
+                plan['skipped_keywords'].append(keyword)
+                continue
+            plan['keywords'].append({'keyword': keyword, 'units': units})
+            total_units += units
+            new_videos += expected_new_videos
+
+        detail_units = math.ceil(new_videos / VIDEOS_PER_LIST_CALL) * videos_cost if new_videos else 0
+        total_units += detail_units
+
+        plan['video_detail_units'] = detail_units
+        plan['total_units'] = total_units
+        plan['feasible'] = total_units <= budget
+        # 남은 예산으로 captions API 자막 다운로드가 가능한 동영상 수
+        per_transcript = endpoint_cost('captions.list') + endpoint_cost('captions.download')
+        plan['transcript_capacity'] = max(budget - total_units, 0) // per_transcript
+        return plan
+
+
+# 전역 인스턴스
+quota_ledger = QuotaLedger()
+
+
+def print_usage_report():
+    """오늘 할당량 사용 현황 출력"""
+    print(f"📊 YouTube API 할당량 ({quota_day()} PT): "
+          f"{quota_ledger.used_today()}/{quota_ledger.daily_limit} units 사용")
+    for row in quota_ledger.usage_by_endpoint():
+        print(f"  - {row['endpoint']}: {row['calls']}회, {row['units']} units")
+
+
+if __name__ == "__main__":
+    print_usage_report()
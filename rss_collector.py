@@ -10,9 +10,35 @@ import feedparser
 import requests
 import sqlite3
 import re
+import functools
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-import streamlit as st
+from typing import Callable, List, Dict, Optional
+
+from db_handler import bump_generation, ensure_schema
+from metrics import metrics
+
+def _notify(ui: bool, level: str, message: str):
+    """
+    Streamlit 화면(ui=True) 또는 콘솔에 메시지 표시
+    백그라운드 작업 스레드에는 ScriptRunContext가 없어 st.* 호출이 동작하지 않으므로 ui=False로 호출할 것
+    :param level: st의 메시지 함수 이름 (info, success, warning, error)
+    """
+    if ui:
+        # streamlit은 import가 무거우므로 화면에 표시할 때만 로드 (워커/CLI는 로드하지 않음)
+        import streamlit as st
+        getattr(st, level)(message)
+    else:
+        print(message)
+
+def invalidates_cache(method):
+    """쓰기 메서드 실행 후 수집기 DB의 세대 번호를 올리는 데코레이터 (UI 조회 캐시 무효화)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            bump_generation(self.db_path)
+    return wrapper
 
 class YouTubeRSSCollector:
     def __init__(self, db_path: str = "youtube_news.db"):
@@ -106,49 +132,22 @@ class YouTubeRSSCollector:
             return f"{self.base_rss_url}?user={channel_identifier}"
     
     def get_channel_id_from_handle(self, handle: str) -> str:
-        """@핸들에서 실제 채널 ID(UC...)를 추출 (웹 스크래핑)"""
-        import requests
-        import re
+        """@핸들에서 실제 채널 ID(UC...)를 추출 (캐시 → 웹 스크래핑)"""
+        from channel_resolver import ChannelResolver
+
         if handle.startswith('@'):
             handle = handle[1:]
-        
-        url = f"https://www.youtube.com/@{handle}"
-        print(f"🌐 핸들 페이지 접속: {url}")
-        
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            resp = requests.get(url, timeout=10, headers=headers)
-            print(f"📡 응답 상태: {resp.status_code}")
-            
-            if resp.status_code == 200:
-                # 여러 패턴으로 채널 ID 찾기
-                patterns = [
-                    r'"channelId":"(UC[^"]+)"',
-                    r'"externalId":"(UC[^"]+)"',
-                    r'channel_id=([^&"]+)',
-                    r'data-channel-external-id="(UC[^"]+)"'
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, resp.text)
-                    if match:
-                        channel_id = match.group(1)
-                        if channel_id.startswith('UC'):
-                            print(f"✅ 채널 ID 발견: {channel_id}")
-                            return channel_id
-                
-                print("❌ 채널 ID를 찾을 수 없습니다.")
-                return None
-            else:
-                print(f"❌ 페이지 접속 실패: {resp.status_code}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ 핸들→채널ID 변환 실패: {e}")
-            return None
+
+        print(f"🌐 핸들 변환: @{handle}")
+        info = ChannelResolver(self.db_path).resolve(f"@{handle}")
+        if info:
+            print(f"✅ 채널 ID 발견: {info['channel_id']}")
+            return info['channel_id']
+
+        print("❌ 채널 ID를 찾을 수 없습니다.")
+        return None
     
+    @invalidates_cache
     def add_channel(self, channel_url: str, title: str = None) -> bool:
         """채널 추가 (핸들 지원)"""
         try:
@@ -165,11 +164,11 @@ class YouTubeRSSCollector:
                     print(f"🔍 핸들에서 채널 ID 추출 중: {handle}")
                     channel_id = self.get_channel_id_from_handle(handle)
                     if not channel_id:
-                        st.error(f"핸들 '@{handle}'에서 채널 ID를 찾을 수 없습니다. 올바른 핸들인지 확인하세요.")
+                        _notify(True, "error", f"핸들 '@{handle}'에서 채널 ID를 찾을 수 없습니다. 올바른 핸들인지 확인하세요.")
                         return False
                     print(f"✅ 핸들 '{handle}' -> 채널 ID '{channel_id}' 변환 성공")
                 else:
-                    st.error("유효한 YouTube 채널 URL 또는 핸들을 입력하세요.")
+                    _notify(True, "error", "유효한 YouTube 채널 URL 또는 핸들을 입력하세요.")
                     return False
             
             # 핸들 추출
@@ -188,7 +187,7 @@ class YouTubeRSSCollector:
             # RSS URL 테스트
             test_feed = feedparser.parse(rss_url)
             if hasattr(test_feed, 'status') and test_feed.status == 404:
-                st.error(f"RSS 피드를 찾을 수 없습니다. 채널 URL이나 핸들을 다시 확인해주세요.")
+                _notify(True, "error", f"RSS 피드를 찾을 수 없습니다. 채널 URL이나 핸들을 다시 확인해주세요.")
                 print(f"❌ RSS URL 테스트 실패: {rss_url}")
                 return False
             
@@ -211,15 +210,16 @@ class YouTubeRSSCollector:
             conn.commit()
             conn.close()
             
-            st.success(f"✅ 채널 '{title or channel_id}'이(가) 추가되었습니다.")
+            _notify(True, "success", f"✅ 채널 '{title or channel_id}'이(가) 추가되었습니다.")
             print(f"✅ 채널 추가 완료: {channel_id} -> {rss_url}")
             return True
             
         except Exception as e:
-            st.error(f"채널 추가 실패: {str(e)}")
+            _notify(True, "error", f"채널 추가 실패: {str(e)}")
             print(f"❌ 채널 추가 오류: {str(e)}")
             return False
     
+    @invalidates_cache
     def add_keyword(self, keyword: str) -> bool:
         """키워드 추가"""
         try:
@@ -234,11 +234,11 @@ class YouTubeRSSCollector:
             conn.commit()
             conn.close()
             
-            st.success(f"✅ 키워드 '{keyword}'이(가) 추가되었습니다.")
+            _notify(True, "success", f"✅ 키워드 '{keyword}'이(가) 추가되었습니다.")
             return True
             
         except Exception as e:
-            st.error(f"키워드 추가 실패: {str(e)}")
+            _notify(True, "error", f"키워드 추가 실패: {str(e)}")
             return False
     
     def get_all_channels(self) -> List[Dict]:
@@ -298,7 +298,9 @@ class YouTubeRSSCollector:
             print(f"🔍 RSS 피드 가져오기: {channel_id} -> {rss_url}")
             
             # RSS 피드 파싱
-            feed = feedparser.parse(rss_url)
+            with metrics.timer('rss_fetch_seconds'):
+                feed = feedparser.parse(rss_url)
+            metrics.inc('rss_fetch_total', status=getattr(feed, 'status', 'unknown'))
             
             print(f"📡 RSS 피드 상태: {feed.status if hasattr(feed, 'status') else 'Unknown'}")
             print(f"📊 RSS 피드 항목 수: {len(feed.entries)}")
@@ -423,8 +425,12 @@ class YouTubeRSSCollector:
         conn.close()
         return exists
     
-    def save_videos(self, videos: List[Dict]) -> int:
-        """비디오 정보 저장"""
+    @invalidates_cache
+    def save_videos(self, videos: List[Dict], ui: bool = True) -> int:
+        """
+        비디오 정보 저장
+        :param ui: 오류를 Streamlit 화면에 표시 (백그라운드 작업이면 False)
+        """
         if not videos:
             return 0
         
@@ -456,13 +462,14 @@ class YouTubeRSSCollector:
                     saved_count += 1
                     
             except Exception as e:
-                st.warning(f"비디오 저장 실패 ({video['video_id']}): {str(e)}")
+                _notify(ui, "warning", f"비디오 저장 실패 ({video['video_id']}): {str(e)}")
         
         conn.commit()
         conn.close()
         
         return saved_count
     
+    @invalidates_cache
     def update_channel_last_checked(self, channel_id: str):
         """채널 마지막 체크 시간 업데이트"""
         conn = sqlite3.connect(self.db_path)
@@ -477,47 +484,73 @@ class YouTubeRSSCollector:
         conn.commit()
         conn.close()
     
-    def collect_all_channels(self) -> Dict:
-        """모든 채널에서 RSS 수집"""
+    def collect_all_channels(self, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                             include_pushed: bool = False) -> Dict:
+        """
+        모든 채널에서 RSS 수집
+        :param progress_callback: 채널마다 호출되는 progress_callback(처리한 채널 수, 전체 채널 수, 메시지)
+        :param include_pushed: WebSub 구독(리스)이 활성인 채널도 폴링 (기본값은 푸시로 받으므로 건너뜀)
+        progress_callback을 지정하면(백그라운드 작업) Streamlit 화면 대신 콘솔에 출력
+        """
+        from websub_handler import WebSubSubscriber
+        
+        ui = progress_callback is None
+        
         channels = self.get_all_channels()
         active_channels = [c for c in channels if c['is_active']]
+        if not include_pushed:
+            needing_poll = set(WebSubSubscriber(self.db_path).get_channels_needing_poll())
+            pushed = len(active_channels)
+            active_channels = [c for c in active_channels if c['channel_id'] in needing_poll]
+            pushed -= len(active_channels)
+            if pushed:
+                _notify(ui, "info", f"📨 WebSub 구독 중인 {pushed}개 채널은 푸시로 수신하므로 폴링하지 않습니다.")
         
         if not active_channels:
-            st.warning("활성화된 RSS 채널이 없습니다.")
+            _notify(ui, "warning", "활성화된 RSS 채널이 없습니다.")
             return {'total_channels': 0, 'total_videos': 0, 'new_videos': 0}
         
-        st.info(f"📡 {len(active_channels)}개 채널에서 RSS 피드를 수집합니다...")
+        _notify(ui, "info", f"📡 {len(active_channels)}개 채널에서 RSS 피드를 수집합니다...")
         
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        progress_bar = status_text = None
+        if ui:
+            import streamlit as st
+            progress_bar = st.progress(0)
+            status_text = st.empty()
         
         total_videos = 0
         total_new_videos = 0
         
         for i, channel in enumerate(active_channels):
-            status_text.text(f"채널 '{channel['title']}' 처리 중... ({i+1}/{len(active_channels)})")
+            if ui:
+                status_text.text(f"채널 '{channel['title']}' 처리 중... ({i+1}/{len(active_channels)})")
+            else:
+                progress_callback(i, len(active_channels), f"채널 '{channel['title']}' 처리 중")
             
             # RSS 피드 가져오기 (기본 7일)
             videos = self.fetch_channel_rss(channel['channel_id'], channel['rss_url'], days_back=7)
             
             if videos:
                 # 새 비디오 저장
-                new_videos = self.save_videos(videos)
+                new_videos = self.save_videos(videos, ui)
                 total_videos += len(videos)
                 total_new_videos += new_videos
                 
                 # 마지막 체크 시간 업데이트
                 self.update_channel_last_checked(channel['channel_id'])
                 
-                st.success(f"✅ {channel['title']}: {len(videos)}개 비디오, {new_videos}개 새 비디오")
+                _notify(ui, "success", f"✅ {channel['title']}: {len(videos)}개 비디오, {new_videos}개 새 비디오")
             else:
-                st.info(f"ℹ️ {channel['title']}: 새 비디오 없음")
+                _notify(ui, "info", f"ℹ️ {channel['title']}: 새 비디오 없음")
             
             # 진행률 업데이트
-            progress = (i + 1) / len(active_channels)
-            progress_bar.progress(progress)
+            if ui:
+                progress_bar.progress((i + 1) / len(active_channels))
         
-        status_text.text("완료!")
+        if ui:
+            status_text.text("완료!")
+        else:
+            progress_callback(len(active_channels), len(active_channels), "완료")
         
         result = {
             'total_channels': len(active_channels),
@@ -525,50 +558,65 @@ class YouTubeRSSCollector:
             'new_videos': total_new_videos
         }
         
-        st.success(f"🎉 RSS 수집 완료! {result['new_videos']}개 새 비디오 발견")
+        _notify(ui, "success", f"🎉 RSS 수집 완료! {result['new_videos']}개 새 비디오 발견")
         return result
     
-    def collect_channels_with_period(self, days_back: int = 30) -> Dict:
-        """지정된 기간 동안 모든 채널에서 RSS 수집"""
+    def collect_channels_with_period(self, days_back: int = 30,
+                                     progress_callback: Optional[Callable[[int, int, str], None]] = None) -> Dict:
+        """
+        지정된 기간 동안 모든 채널에서 RSS 수집
+        :param progress_callback: 채널마다 호출되는 progress_callback(처리한 채널 수, 전체 채널 수, 메시지)
+        progress_callback을 지정하면(백그라운드 작업) Streamlit 화면 대신 콘솔에 출력
+        """
+        ui = progress_callback is None
         channels = self.get_all_channels()
         active_channels = [c for c in channels if c['is_active']]
         
         if not active_channels:
-            st.warning("활성화된 RSS 채널이 없습니다.")
+            _notify(ui, "warning", "활성화된 RSS 채널이 없습니다.")
             return {'total_channels': 0, 'total_videos': 0, 'new_videos': 0}
         
-        st.info(f"📡 {len(active_channels)}개 채널에서 최근 {days_back}일간의 RSS 피드를 수집합니다...")
+        _notify(ui, "info", f"📡 {len(active_channels)}개 채널에서 최근 {days_back}일간의 RSS 피드를 수집합니다...")
         
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        progress_bar = status_text = None
+        if ui:
+            import streamlit as st
+            progress_bar = st.progress(0)
+            status_text = st.empty()
         
         total_videos = 0
         total_new_videos = 0
         
         for i, channel in enumerate(active_channels):
-            status_text.text(f"채널 '{channel['title']}' 처리 중... ({i+1}/{len(active_channels)})")
+            if ui:
+                status_text.text(f"채널 '{channel['title']}' 처리 중... ({i+1}/{len(active_channels)})")
+            else:
+                progress_callback(i, len(active_channels), f"채널 '{channel['title']}' 처리 중")
             
             # RSS 피드 가져오기 (지정된 기간)
             videos = self.fetch_channel_rss(channel['channel_id'], channel['rss_url'], days_back=days_back)
             
             if videos:
                 # 새 비디오 저장
-                new_videos = self.save_videos(videos)
+                new_videos = self.save_videos(videos, ui)
                 total_videos += len(videos)
                 total_new_videos += new_videos
                 
                 # 마지막 체크 시간 업데이트
                 self.update_channel_last_checked(channel['channel_id'])
                 
-                st.success(f"✅ {channel['title']}: {len(videos)}개 비디오, {new_videos}개 새 비디오")
+                _notify(ui, "success", f"✅ {channel['title']}: {len(videos)}개 비디오, {new_videos}개 새 비디오")
             else:
-                st.info(f"ℹ️ {channel['title']}: 새 비디오 없음")
+                _notify(ui, "info", f"ℹ️ {channel['title']}: 새 비디오 없음")
             
             # 진행률 업데이트
-            progress = (i + 1) / len(active_channels)
-            progress_bar.progress(progress)
+            if ui:
+                progress_bar.progress((i + 1) / len(active_channels))
         
-        status_text.text("완료!")
+        if ui:
+            status_text.text("완료!")
+        else:
+            progress_callback(len(active_channels), len(active_channels), "완료")
         
         result = {
             'total_channels': len(active_channels),
@@ -577,11 +625,15 @@ class YouTubeRSSCollector:
             'days_back': days_back
         }
         
-        st.success(f"🎉 RSS 수집 완료! 최근 {days_back}일간 {result['new_videos']}개 새 비디오 발견")
+        _notify(ui, "success", f"🎉 RSS 수집 완료! 최근 {days_back}일간 {result['new_videos']}개 새 비디오 발견")
         return result
     
-    def sync_with_main_db(self) -> Dict:
-        """RSS 수집 데이터를 메인 데이터베이스와 동기화"""
+    @invalidates_cache
+    def sync_with_main_db(self, ui: bool = True) -> Dict:
+        """
+        RSS 수집 데이터를 메인 데이터베이스와 동기화
+        :param ui: 결과를 Streamlit 화면에 표시 (백그라운드 작업이면 False)
+        """
         try:
             # RSS 비디오를 메인 videos 테이블로 복사
             conn = sqlite3.connect(self.db_path)
@@ -621,7 +673,7 @@ class YouTubeRSSCollector:
                     ))
                     synced_count += 1
                 except Exception as e:
-                    st.warning(f"비디오 동기화 실패 ({video[0]}): {str(e)}")
+                    _notify(ui, "warning", f"비디오 동기화 실패 ({video[0]}): {str(e)}")
             
             conn.commit()
             conn.close()
@@ -631,11 +683,11 @@ class YouTubeRSSCollector:
                 'synced_videos': synced_count
             }
             
-            st.success(f"✅ 메인 DB 동기화 완료! {synced_count}개 비디오 동기화됨")
+            _notify(ui, "success", f"✅ 메인 DB 동기화 완료! {synced_count}개 비디오 동기화됨")
             return result
             
         except Exception as e:
-            st.error(f"메인 DB 동기화 실패: {str(e)}")
+            _notify(ui, "error", f"메인 DB 동기화 실패: {str(e)}")
             return {'total_rss_videos': 0, 'synced_videos': 0}
     
     def get_videos_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
@@ -672,7 +724,7 @@ class YouTubeRSSCollector:
             return videos
             
         except Exception as e:
-            st.error(f"날짜 범위 검색 실패: {str(e)}")
+            _notify(True, "error", f"날짜 범위 검색 실패: {str(e)}")
             return []
     
     def get_recent_videos(self, hours: int = 24, limit: int = 50) -> List[Dict]:
@@ -745,6 +797,7 @@ class YouTubeRSSCollector:
         conn.close()
         return videos
     
+    @invalidates_cache
     def delete_channel(self, channel_id: str) -> bool:
         """채널 삭제"""
         try:
@@ -758,6 +811,7 @@ class YouTubeRSSCollector:
             print(f"채널 삭제 실패: {e}")
             return False
     
+    @invalidates_cache
     def delete_keyword(self, keyword: str) -> bool:
         """키워드 삭제"""
         try:
@@ -779,6 +833,7 @@ def main():
     print("🎯 YouTube RSS 수집기 시작")
     
     # 데이터베이스 초기화
+    ensure_schema()
     rss_collector.initialize_db()
     print("✅ 데이터베이스 초기화 완료")
     
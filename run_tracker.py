@@ -0,0 +1,404 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+수집/요약 실행 체크포인트
+실행(run)마다 발견한 비디오와 단계별 진행 상태를 기록해 중단된 실행을 이어서 처리
+사용법: python run_tracker.py report
+"""
+
+import argparse
+import json
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# 비디오 처리 단계 (순서대로 진행)
+STAGE_DISCOVERED = "discovered"
+STAGE_METADATA = "metadata"
+STAGE_TRANSCRIPT = "transcript"
+STAGE_SAVED = "saved"
+STAGE_DONE = "done"
+STAGES = [STAGE_DISCOVERED, STAGE_METADATA, STAGE_TRANSCRIPT, STAGE_SAVED, STAGE_DONE]
+
+# 단계별 상태
+ITEM_PENDING = "pending"
+ITEM_OK = "ok"
+ITEM_SKIPPED = "skipped"
+ITEM_MISSING = "missing"   # 자막 없음 등 나중에 다시 시도할 수 있는 경우
+ITEM_FAILED = "failed"
+
+# 실행 상태
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_FAILED = "failed"
+RUN_INTERRUPTED = "interrupted"
+RUN_ABANDONED = "abandoned"
+RESUMABLE_STATUSES = (RUN_RUNNING, RUN_FAILED, RUN_INTERRUPTED)
+
+
+def new_run_id() -> str:
+    """시간순 정렬이 되는 실행 ID 생성"""
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class RunTracker:
+    def __init__(self, db_path: str = "youtube_news.db"):
+        self.db_path = db_path
+        self.initialize_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def initialize_db(self):
+        """실행 추적 테이블 초기화"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS collection_runs (
+                run_id TEXT PRIMARY KEY,
+                run_type TEXT NOT NULL,
+                params TEXT,
+                status TEXT DEFAULT 'running',
+                discovery_done INTEGER DEFAULT 0,
+                started_at TEXT,
+                updated_at TEXT,
+                finished_at TEXT
+            )
+        ''')
+
+        # 발견 단계에서 처리를 마친 채널/키워드 (재개 시 다시 조회하지 않음)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_sources (
+                run_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                video_count INTEGER DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (run_id, source)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_items (
+                run_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                position INTEGER,
+                stage TEXT DEFAULT 'discovered',
+                status TEXT DEFAULT 'pending',
+                payload TEXT,
+                completed_types TEXT DEFAULT '[]',
+                error TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (run_id, video_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_run_items_stage
+            ON run_items (run_id, stage, status)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    # ----- 실행 -----
+
+    def start_run(self, run_type: str, params: Dict = None) -> str:
+        """새 실행 시작"""
+        run_id = new_run_id()
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        conn.execute('''
+            INSERT INTO collection_runs (run_id, run_type, params, status, started_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (run_id, run_type, json.dumps(params or {}, ensure_ascii=False), RUN_RUNNING, now, now))
+        conn.commit()
+        conn.close()
+        print(f"🆕 실행 시작: {run_id} ({run_type})")
+        return run_id
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """실행 정보 조회"""
+        conn = self._connect()
+        row = conn.execute('SELECT * FROM collection_runs WHERE run_id = ?', (run_id,)).fetchone()
+        conn.close()
+        return self._run_from_row(row) if row else None
+
+    def get_resumable_run(self, run_type: str) -> Optional[Dict]:
+        """완료되지 않은 가장 최근 실행 조회"""
+        conn = self._connect()
+        row = conn.execute(f'''
+            SELECT * FROM collection_runs
+            WHERE run_type = ? AND status IN ({','.join('?' for _ in RESUMABLE_STATUSES)})
+            ORDER BY started_at DESC
+            LIMIT 1
+        ''', (run_type, *RESUMABLE_STATUSES)).fetchone()
+        conn.close()
+        return self._run_from_row(row) if row else None
+
+    def resume_or_start(self, run_type: str, params: Dict = None, resume: bool = False) -> Dict:
+        """
+        resume이면 중단된 실행을 이어받고, 없거나 resume이 아니면 새 실행을 시작합니다.
+        재개한 실행은 처음 시작할 때의 파라미터를 그대로 사용합니다.
+        """
+        if resume:
+            run = self.get_resumable_run(run_type)
+            if run:
+                self._touch_run(run['run_id'], status=RUN_RUNNING)
+                counts = self.item_counts(run['run_id'])
+                print(f"⏯️ 실행 재개: {run['run_id']} (시작 {run['started_at']}, 완료 {counts.get(STAGE_DONE, 0)}/{sum(counts.values())})")
+                return run
+            print("재개할 실행이 없어 새로 시작합니다.")
+        return self.get_run(self.start_run(run_type, params))
+
+    def mark_discovery_done(self, run_id: str):
+        """발견 단계 완료 기록"""
+        conn = self._connect()
+        conn.execute('UPDATE collection_runs SET discovery_done = 1, updated_at = ? WHERE run_id = ?',
+                     (datetime.now().isoformat(), run_id))
+        conn.commit()
+        conn.close()
+
+    def finish_run(self, run_id: str, status: str = RUN_COMPLETED):
+        """실행 종료 기록 (completed/failed/interrupted/abandoned)"""
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        conn.execute('UPDATE collection_runs SET status = ?, updated_at = ?, finished_at = ? WHERE run_id = ?',
+                     (status, now, now, run_id))
+        conn.commit()
+        conn.close()
+
+    def _touch_run(self, run_id: str, status: str = None):
+        conn = self._connect()
+        if status:
+            conn.execute('UPDATE collection_runs SET status = ?, updated_at = ?, finished_at = NULL WHERE run_id = ?',
+                         (status, datetime.now().isoformat(), run_id))
+        else:
+            conn.execute('UPDATE collection_runs SET updated_at = ? WHERE run_id = ?',
+                         (datetime.now().isoformat(), run_id))
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _run_from_row(row) -> Dict:
+        run = dict(row)
+        run['params'] = json.loads(run['params'] or '{}')
+        run['discovery_done'] = bool(run['discovery_done'])
+        return run
+
+    # ----- 발견 소스 -----
+
+    def is_source_done(self, run_id: str, source: str) -> bool:
+        """채널/키워드의 발견 단계가 이미 끝났는지 확인"""
+        conn = self._connect()
+        row = conn.execute('SELECT 1 FROM run_sources WHERE run_id = ? AND source = ?', (run_id, source)).fetchone()
+        conn.close()
+        return row is not None
+
+    def mark_source_done(self, run_id: str, source: str, video_count: int = 0):
+        """채널/키워드의 발견 단계 완료 기록"""
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO run_sources (run_id, source, video_count, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', (run_id, source, video_count, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    # ----- 비디오 항목 -----
+
+    def add_items(self, run_id: str, videos: List[Dict]) -> int:
+        """
+        발견한 비디오를 실행에 추가합니다. 이미 있는 비디오는 상태를 유지합니다.
+        :param videos: video_id 키를 가진 비디오 정보 목록
+        :return: 새로 추가된 수
+        """
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(position), 0) FROM run_items WHERE run_id = ?', (run_id,))
+        position = cursor.fetchone()[0]
+
+        added = 0
+        for video in videos:
+            position += 1
+            cursor.execute('''
+                INSERT OR IGNORE INTO run_items (run_id, video_id, position, payload, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (run_id, video['video_id'], position,
+                  json.dumps(video, ensure_ascii=False, default=str), now))
+            added += cursor.rowcount
+
+        cursor.execute('UPDATE collection_runs SET updated_at = ? WHERE run_id = ?', (now, run_id))
+        conn.commit()
+        conn.close()
+        return added
+
+    def set_stage(self, run_id: str, video_id: str, stage: str, status: str = ITEM_OK,
+                  error: str = None, payload: Dict = None):
+        """비디오의 처리 단계/상태 갱신 (payload를 주면 저장된 정보도 교체)"""
+        now = datetime.now().isoformat()
+        conn = self._connect()
+        if payload is not None:
+            conn.execute('''
+                UPDATE run_items SET stage = ?, status = ?, error = ?, payload = ?, updated_at = ?
+                WHERE run_id = ? AND video_id = ?
+            ''', (stage, status, error, json.dumps(payload, ensure_ascii=False, default=str), now, run_id, video_id))
+        else:
+            conn.execute('''
+                UPDATE run_items SET stage = ?, status = ?, error = ?, updated_at = ?
+                WHERE run_id = ? AND video_id = ?
+            ''', (stage, status, error, now, run_id, video_id))
+        conn.execute('UPDATE collection_runs SET updated_at = ? WHERE run_id = ?', (now, run_id))
+        conn.commit()
+        conn.close()
+
+    def mark_type_done(self, run_id: str, video_id: str, analysis_type: str):
+        """비디오의 분석 유형 하나 완료 기록"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('SELECT completed_types FROM run_items WHERE run_id = ? AND video_id = ?', (run_id, video_id))
+        row = cursor.fetchone()
+        if row:
+            completed = json.loads(row['completed_types'] or '[]')
+            if analysis_type not in completed:
+                completed.append(analysis_type)
+            cursor.execute('''
+                UPDATE run_items SET completed_types = ?, updated_at = ?
+                WHERE run_id = ? AND video_id = ?
+            ''', (json.dumps(completed), datetime.now().isoformat(), run_id, video_id))
+        conn.commit()
+        conn.close()
+
+    def get_item(self, run_id: str, video_id: str) -> Optional[Dict]:
+        """실행 내 비디오 항목 조회"""
+        conn = self._connect()
+        row = conn.execute('SELECT * FROM run_items WHERE run_id = ? AND video_id = ?', (run_id, video_id)).fetchone()
+        conn.close()
+        return self._item_from_row(row) if row else None
+
+    def pending_items(self, run_id: str) -> List[Dict]:
+        """아직 끝나지 않은 비디오 항목 (발견 순서대로, 건너뛴 항목과 자막 대기열로 넘긴 항목 제외)"""
+        conn = self._connect()
+        rows = conn.execute('''
+            SELECT * FROM run_items
+            WHERE run_id = ? AND stage != ? AND status NOT IN (?, ?)
+            ORDER BY position
+        ''', (run_id, STAGE_DONE, ITEM_SKIPPED, ITEM_MISSING)).fetchall()
+        conn.close()
+        return [self._item_from_row(row) for row in rows]
+
+    def item_counts(self, run_id: str) -> Dict[str, int]:
+        """단계별 비디오 수"""
+        conn = self._connect()
+        rows = conn.execute('SELECT stage, COUNT(*) AS count FROM run_items WHERE run_id = ? GROUP BY stage',
+                            (run_id,)).fetchall()
+        conn.close()
+        return {row['stage']: row['count'] for row in rows}
+
+    @staticmethod
+    def _item_from_row(row) -> Dict:
+        item = dict(row)
+        item['payload'] = json.loads(item['payload'] or '{}')
+        item['completed_types'] = json.loads(item['completed_types'] or '[]')
+        return item
+
+    # ----- 보고서 -----
+
+    def report(self, stuck_minutes: int = 60, limit: int = 10) -> Dict:
+        """
+        최근 실행 현황과 멈춘/부분 처리된 비디오 목록을 반환합니다.
+        - stuck: 끝나지 않은 실행에서 stuck_minutes 이상 진행이 없는 비디오
+        - partial: 저장은 됐지만 분석이 끝나지 않았거나, 실패/자막 없음으로 멈춘 비디오
+        """
+        cutoff = (datetime.now() - timedelta(minutes=stuck_minutes)).isoformat()
+        conn = self._connect()
+
+        runs = []
+        for row in conn.execute('SELECT * FROM collection_runs ORDER BY started_at DESC LIMIT ?', (limit,)).fetchall():
+            run = self._run_from_row(row)
+            run['counts'] = {
+                r['stage']: r['count'] for r in conn.execute(
+                    'SELECT stage, COUNT(*) AS count FROM run_items WHERE run_id = ? GROUP BY stage',
+                    (run['run_id'],)
+                ).fetchall()
+            }
+            runs.append(run)
+
+        placeholders = ','.join('?' for _ in RESUMABLE_STATUSES)
+        stuck = [dict(row) for row in conn.execute(f'''
+            SELECT i.run_id, i.video_id, i.stage, i.status, i.error, i.updated_at
+            FROM run_items i JOIN collection_runs r ON r.run_id = i.run_id
+            WHERE r.status IN ({placeholders}) AND i.stage != ? AND i.status NOT IN (?, ?) AND i.updated_at < ?
+            ORDER BY i.updated_at
+        ''', (*RESUMABLE_STATUSES, STAGE_DONE, ITEM_SKIPPED, ITEM_MISSING, cutoff)).fetchall()]
+
+        partial = [dict(row) for row in conn.execute('''
+            SELECT run_id, video_id, stage, status, completed_types, error, updated_at
+            FROM run_items
+            WHERE stage != ? AND (stage = ? OR status IN (?, ?))
+            ORDER BY updated_at DESC
+        ''', (STAGE_DONE, STAGE_SAVED, ITEM_FAILED, ITEM_MISSING)).fetchall()]
+
+        conn.close()
+        return {'runs': runs, 'stuck': stuck, 'partial': partial}
+
+
+def print_run_report(tracker: RunTracker = None, stuck_minutes: int = 60, limit: int = 10):
+    """실행 현황 보고서 출력"""
+    tracker = tracker or RunTracker()
+    report = tracker.report(stuck_minutes=stuck_minutes, limit=limit)
+
+    print("\n=== 최근 실행 ===")
+    if not report['runs']:
+        print("기록된 실행이 없습니다.")
+    for run in report['runs']:
+        total = sum(run['counts'].values())
+        stages = ', '.join(f"{stage} {run['counts'][stage]}" for stage in STAGES if stage in run['counts'])
+        print(f"  - {run['run_id']} [{run['run_type']}] {run['status']} "
+              f"(비디오 {total}개: {stages or '-'}, 마지막 갱신 {run['updated_at']})")
+
+    print(f"\n=== 멈춘 비디오 ({stuck_minutes}분 이상 진행 없음): {len(report['stuck'])}개 ===")
+    for item in report['stuck']:
+        print(f"  - {item['video_id']} ({item['run_id']}) 단계 {item['stage']}/{item['status']} - {item['updated_at']}")
+
+    print(f"\n=== 부분 처리된 비디오: {len(report['partial'])}개 ===")
+    for item in report['partial']:
+        done = ', '.join(json.loads(item['completed_types'] or '[]')) or '-'
+        error = f" - {item['error'][:80]}" if item['error'] else ''
+        print(f"  - {item['video_id']} ({item['run_id']}) 단계 {item['stage']}/{item['status']}, 완료된 분석: {done}{error}")
+
+    return report
+
+
+def main():
+    """실행 추적 CLI"""
+    parser = argparse.ArgumentParser(description="수집/요약 실행 체크포인트 관리")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    subparsers = parser.add_subparsers(dest="command", help="실행할 명령")
+
+    report_parser = subparsers.add_parser("report", help="실행 현황 및 멈춘/부분 처리 비디오 보고서")
+    report_parser.add_argument("--stuck-minutes", type=int, default=60, help="멈춤으로 볼 무진행 시간(분)")
+    report_parser.add_argument("--limit", type=int, default=10, help="표시할 최근 실행 수")
+
+    abandon_parser = subparsers.add_parser("abandon", help="재개하지 않을 실행 종료")
+    abandon_parser.add_argument("run_id", help="실행 ID")
+
+    args = parser.parse_args()
+    tracker = RunTracker(args.db)
+
+    if args.command == "abandon":
+        tracker.finish_run(args.run_id, RUN_ABANDONED)
+        print(f"실행 {args.run_id}을(를) 종료했습니다.")
+    elif args.command == "report":
+        print_run_report(tracker, stuck_minutes=args.stuck_minutes, limit=args.limit)
+    else:
+        print_run_report(tracker)
+
+
+if __name__ == "__main__":
+    main()
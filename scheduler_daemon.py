@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+우선순위 큐 기반 스케줄러 데몬
+작업(채널 확인, 키워드 검색, 분석, 사설 생성)마다 주기와 마감 시간을 두고
+다음 작업 시각까지 정확히 대기했다가 실행하며, 작업 목록은 DB에 저장되어 재시작 후에도 유지됨
+"""
+
+import heapq
+import json
+import sqlite3
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from db_handler import DB_PATH
+
+# 작업 유형별 기본 주기/마감 (초)
+DEFAULT_CADENCES = {
+    'channel_poll': 3 * 3600,
+    'keyword_search': 12 * 3600,
+    'analysis': 3600,
+    'editorial': 24 * 3600,
+}
+DEFAULT_DEADLINES = {
+    'channel_poll': 1800,
+    'keyword_search': 3 * 3600,
+    'analysis': 1800,
+    'editorial': 3 * 3600,
+}
+
+
+class SchedulerDaemon:
+    def __init__(self, db_path: str = DB_PATH, max_workers: int = 2):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.handlers: Dict[str, Callable[[Dict], Optional[float]]] = {}
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._heap = []      # (next_run_at, task_key) - 대기 중인 작업
+        self._ready = []     # (deadline_at, task_key) - 실행 시각이 된 작업 (마감 순)
+        self._tasks = {}     # task_key -> 작업 정보
+        self._running = set()
+
+    def initialize_db(self):
+        """예약 작업 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_tasks (
+                task_key TEXT PRIMARY KEY,
+                task_type TEXT NOT NULL,
+                payload TEXT,
+                cadence_seconds INTEGER NOT NULL,
+                deadline_seconds INTEGER NOT NULL,
+                next_run_at TEXT NOT NULL,
+                last_run_at TEXT,
+                last_status TEXT,
+                last_error TEXT,
+                run_count INTEGER DEFAULT 0,
+                is_active BOOLEAN DEFAULT 1
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def register_handler(self, task_type: str, handler: Callable[[Dict], Optional[float]]):
+        """
+        작업 유형별 처리 함수 등록.
+        처리 함수가 초 단위 숫자를 반환하면 기본 주기 대신 그 시간 뒤로 다음 실행을 예약합니다.
+        """
+        self.handlers[task_type] = handler
+
+    def upsert_task(self, task_key: str, task_type: str, payload: Dict = None,
+                    cadence_seconds: int = None, deadline_seconds: int = None,
+                    first_run_at: datetime = None) -> bool:
+        """작업 등록 (이미 있으면 주기/페이로드만 갱신하고 예약 시각은 유지)"""
+        cadence_seconds = cadence_seconds or DEFAULT_CADENCES.get(task_type, 3600)
+        deadline_seconds = deadline_seconds or DEFAULT_DEADLINES.get(task_type, cadence_seconds // 2)
+        first_run_at = first_run_at or datetime.now()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO scheduled_tasks
+            (task_key, task_type, payload, cadence_seconds, deadline_seconds, next_run_at, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT(task_key) DO UPDATE SET
+                task_type = excluded.task_type,
+                payload = excluded.payload,
+                cadence_seconds = excluded.cadence_seconds,
+                deadline_seconds = excluded.deadline_seconds,
+                is_active = 1
+        ''', (
+            task_key,
+            task_type,
+            json.dumps(payload or {}, ensure_ascii=False),
+            cadence_seconds,
+            deadline_seconds,
+            first_run_at.isoformat()
+        ))
+        created = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return created
+
+    def seed_from_config(self, config: Dict, analysis_types: List[str] = None):
+        """
+        구성 파일의 채널/키워드와 정기 작업을 등록합니다.
+        첫 실행 시각은 주기 안에서 균등하게 분산시켜 한꺼번에 몰리지 않도록 합니다.
+        """
+        interval_seconds = int(config.get("schedule_interval", 12)) * 3600
+        now = datetime.now()
+
+        def stagger(index: int, count: int, cadence: int) -> datetime:
+            return now + timedelta(seconds=cadence * index / max(count, 1))
+
+        channels = config.get("channels", [])
+        channel_cadence = min(DEFAULT_CADENCES['channel_poll'], interval_seconds)
+        for i, channel_url in enumerate(channels):
+            self.upsert_task(f"channel:{channel_url}", 'channel_poll', {'channel_url': channel_url},
+                             cadence_seconds=channel_cadence,
+                             first_run_at=stagger(i, len(channels), channel_cadence))
+
+        keywords = config.get("keywords", [])
+        for i, keyword in enumerate(keywords):
+            self.upsert_task(f"keyword:{keyword}", 'keyword_search', {'keyword': keyword},
+                             cadence_seconds=interval_seconds,
+                             first_run_at=stagger(i, len(keywords), interval_seconds))
+
+        self.upsert_task("analysis:pending", 'analysis', {'analysis_types': analysis_types or ["summary"]})
+        self.upsert_task("editorial:daily", 'editorial', {'hours': 24},
+                         first_run_at=now + timedelta(seconds=DEFAULT_CADENCES['analysis']))
+
+        # 구성에서 빠진 채널/키워드 작업은 비활성화
+        active_keys = {f"channel:{c}" for c in channels} | {f"keyword:{k}" for k in keywords}
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_key FROM scheduled_tasks
+            WHERE task_type IN ('channel_poll', 'keyword_search') AND is_active = 1
+        ''')
+        stale = [row[0] for row in cursor.fetchall() if row[0] not in active_keys]
+        cursor.executemany('UPDATE scheduled_tasks SET is_active = 0 WHERE task_key = ?',
+                           [(key,) for key in stale])
+        conn.commit()
+        conn.close()
+
+        print(f"📅 예약 작업 등록: 채널 {len(channels)}개, 키워드 {len(keywords)}개 (비활성화 {len(stale)}개)")
+
+    def load_tasks(self):
+        """DB에 저장된 활성 작업을 힙으로 적재 (재시작 시 이어서 실행)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM scheduled_tasks WHERE is_active = 1')
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+
+        with self._lock:
+            self._heap = []
+            self._ready = []
+            self._tasks = {}
+            for row in rows:
+                row['payload'] = json.loads(row['payload'] or '{}')
+                self._tasks[row['task_key']] = row
+                heapq.heappush(self._heap, (row['next_run_at'], row['task_key']))
+
+        print(f"📋 예약 작업 {len(rows)}개 적재")
+
+    def _reschedule(self, task: Dict, override_delay: Optional[float], status: str, error: str = None):
+        """실행이 끝난 작업의 다음 실행 시각 계산 후 저장"""
+        now = datetime.now()
+        if override_delay is not None:
+            next_run = now + timedelta(seconds=max(float(override_delay), 60))
+        else:
+            # 예정 시각 기준으로 주기를 더해 시각이 밀리지 않게 하되, 오래 밀린 경우는 현재 기준
+            scheduled = datetime.fromisoformat(task['next_run_at'])
+            next_run = scheduled + timedelta(seconds=task['cadence_seconds'])
+            if next_run <= now:
+                next_run = now + timedelta(seconds=task['cadence_seconds'])
+
+        task['next_run_at'] = next_run.isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE scheduled_tasks
+            SET next_run_at = ?, last_run_at = ?, last_status = ?, last_error = ?,
+                run_count = run_count + 1
+            WHERE task_key = ?
+        ''', (task['next_run_at'], now.isoformat(), status, error, task['task_key']))
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            self._running.discard(task['task_key'])
+            if not self._stopping:
+                heapq.heappush(self._heap, (task['next_run_at'], task['task_key']))
+        self._wake.set()
+
+    def _execute(self, task: Dict):
+        """작업 하나 실행"""
+        handler = self.handlers.get(task['task_type'])
+        started = datetime.now()
+        late_seconds = (started - datetime.fromisoformat(task['next_run_at'])).total_seconds()
+        if late_seconds > task['deadline_seconds']:
+            print(f"⚠️ 마감 초과 실행: {task['task_key']} ({int(late_seconds)}초 지연)")
+
+        if not handler:
+            print(f"❌ 처리 함수가 없는 작업 유형: {task['task_type']}")
+            self._reschedule(task, None, 'skipped', 'no handler')
+            return
+
+        try:
+            print(f"▶️ 작업 시작: {task['task_key']}")
+            override_delay = handler(task['payload'])
+            elapsed = (datetime.now() - started).total_seconds()
+            print(f"✅ 작업 완료: {task['task_key']} ({elapsed:.1f}초)")
+            self._reschedule(task, override_delay, 'success')
+        except Exception as e:
+            print(f"❌ 작업 실패: {task['task_key']} - {e}")
+            traceback.print_exc()
+            self._reschedule(task, None, 'failed', str(e))
+
+    def _collect_due(self, now_iso: str):
+        """실행 시각이 된 작업을 마감 순 대기열로 이동"""
+        while self._heap and self._heap[0][0] <= now_iso:
+            next_run_at, task_key = heapq.heappop(self._heap)
+            task = self._tasks.get(task_key)
+            if not task or task['next_run_at'] != next_run_at:
+                continue  # 재예약되어 무효가 된 항목
+            deadline_at = (datetime.fromisoformat(next_run_at) +
+                           timedelta(seconds=task['deadline_seconds'])).isoformat()
+            heapq.heappush(self._ready, (deadline_at, task_key))
+
+    def run(self):
+        """데몬 메인 루프 (stop() 호출 또는 Ctrl+C까지 실행)"""
+        self.load_tasks()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
+        print(f"🕒 스케줄러 데몬 시작 (동시 실행 최대 {self.max_workers}개)")
+
+        try:
+            while True:
+                with self._lock:
+                    if self._stopping:
+                        break
+
+                    self._collect_due(datetime.now().isoformat())
+
+                    # 동시 실행 한도 내에서 마감이 가까운 작업부터 실행
+                    while self._ready and len(self._running) < self.max_workers:
+                        _, task_key = heapq.heappop(self._ready)
+                        self._running.add(task_key)
+                        executor.submit(self._execute, self._tasks[task_key])
+
+                    if self._ready:
+                        timeout = None  # 실행 중인 작업이 끝나면 깨어남
+                    elif self._heap:
+                        next_due = datetime.fromisoformat(self._heap[0][0])
+                        timeout = max((next_due - datetime.now()).total_seconds(), 0)
+                    else:
+                        timeout = None
+
+                    self._wake.clear()
+
+                if timeout is None or timeout > 0:
+                    self._wake.wait(timeout)
+        except KeyboardInterrupt:
+            print("🛑 스케줄러 데몬 종료 요청")
+        finally:
+            with self._lock:
+                self._stopping = True
+            executor.shutdown(wait=True)
+            print("🛑 스케줄러 데몬 종료")
+
+    def stop(self):
+        """데몬 종료 (실행 중인 작업은 끝날 때까지 대기)"""
+        with self._lock:
+            self._stopping = True
+        self._wake.set()
+
+    def get_status(self) -> List[Dict]:
+        """예약 작업 현황 조회"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT task_key, task_type, cadence_seconds, next_run_at, last_run_at, last_status, run_count
+            FROM scheduled_tasks
+            WHERE is_active = 1
+            ORDER BY next_run_at
+        ''')
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+
+def create_collection_daemon(credentials, analysis_types: List[str] = None, max_workers: int = 2,
+                             db_path: str = DB_PATH, use_job_queue: bool = False) -> SchedulerDaemon:
+    """
+    수집 파이프라인 처리 함수가 등록된 데몬 생성
+    :param use_job_queue: True이면 발견한 비디오를 작업 큐에 넣고 처리는 worker.py에 맡김
+    """
+    from main import collect_channel, collect_keyword
+    from config import load_config
+    from upload_rate_model import UploadRateModel
+
+    analysis_types = analysis_types or ["summary"]
+    rate_model = UploadRateModel(db_path)
+    rate_model.initialize_db()
+
+    job_queue = None
+    if use_job_queue:
+        from job_queue import JobQueue
+        job_queue = JobQueue(db_path)
+        job_queue.initialize_db()
+
+    def channel_poll(payload: Dict) -> Optional[float]:
+        result = collect_channel(payload['channel_url'], analysis_types, credentials, job_queue=job_queue)
+        if not result:
+            return None
+        # 실제 업로드 이력으로 다음 확인 시점을 채널별로 조정
+        rate_model.record_uploads(result['channel_id'], result['videos'])
+        return rate_model.next_poll_delay(result['channel_id']).total_seconds()
+
+    def keyword_search(payload: Dict) -> None:
+        collect_keyword(payload['keyword'], analysis_types, credentials, job_queue=job_queue)
+
+    def analysis(payload: Dict) -> None:
+        from collect_and_summarize import process_and_summarize
+        process_and_summarize(payload.get('analysis_types', analysis_types), limit=payload.get('limit', 10))
+
+    def editorial(payload: Dict) -> Optional[float]:
+        if job_queue is not None:
+            from job_queue import JOB_EDITORIAL
+            job_queue.enqueue(JOB_EDITORIAL, payload,
+                              idempotency_key=f"{JOB_EDITORIAL}:{datetime.now().strftime('%Y-%m-%d')}")
+            return None
+        from cost_governor import BudgetExceeded
+        from db_handler import generate_economic_news_from_recent_videos
+        try:
+            generate_economic_news_from_recent_videos(hours=payload.get('hours', 24))
+        except BudgetExceeded as e:
+            # 예산이 부족하면 다음 예산 기간에 다시 실행 (실행 예산만 부족하면 평소 주기대로)
+            print(f"💸 사설 생성을 미룹니다: {e}")
+            return e.retry_after
+        return None
+
+    daemon = SchedulerDaemon(db_path, max_workers=max_workers)
+    daemon.initialize_db()
+    daemon.register_handler('channel_poll', channel_poll)
+    daemon.register_handler('keyword_search', keyword_search)
+    daemon.register_handler('analysis', analysis)
+    daemon.register_handler('editorial', editorial)
+    daemon.seed_from_config(load_config(), analysis_types)
+    return daemon
+
+
+def main():
+    """예약 작업 현황 출력"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="스케줄러 데몬 작업 현황")
+    parser.add_argument("--db", default=DB_PATH, help="데이터베이스 경로 (기본값: 웹 앱과 같은 프로젝트 DB)")
+    args = parser.parse_args()
+
+    daemon = SchedulerDaemon(args.db)
+    daemon.initialize_db()
+    tasks = daemon.get_status()
+    print(f"📋 활성 예약 작업: {len(tasks)}개")
+    for task in tasks:
+        print(f"  - [{task['task_type']}] {task['task_key']} | 다음: {task['next_run_at']} | "
+              f"최근: {task['last_status'] or '-'} ({task['run_count']}회)")
+
+
+if __name__ == "__main__":
+    main()
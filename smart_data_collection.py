@@ -13,12 +13,18 @@ from typing import List, Dict, Optional
 import sqlite3
 import json
 
+from upload_rate_model import UploadRateModel
+from quota_ledger import QuotaLedger, endpoint_cost
+from channel_resolver import uploads_playlist_for
+
 class SmartDataCollector:
     def __init__(self, db_path: str = "youtube_news.db"):
         self.db_path = db_path
         self.api_quota_limit = 10000  # 기본 할당량
         self.api_quota_used = 0
         self.api_quota_reset_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        self.rate_model = UploadRateModel(db_path)
+        self.quota_ledger = QuotaLedger(db_path, daily_limit=self.api_quota_limit)
         
     def initialize_db(self):
         """스마트 수집을 위한 데이터베이스 초기화"""
@@ -65,6 +71,10 @@ class SmartDataCollector:
         
         conn.commit()
         conn.close()
+
+        # 업로드 이력 기반 발생률 모델 테이블
+        self.rate_model.initialize_db()
+        self.quota_ledger.initialize_db()
     
     def calculate_channel_priority(self, channel_data: Dict) -> float:
         """채널 우선순위 점수 계산"""
@@ -107,8 +117,11 @@ class SmartDataCollector:
         
         return score
     
-    def update_channel_priority(self, channel_id: str, channel_data: Dict):
-        """채널 우선순위 업데이트"""
+    def update_channel_priority(self, channel_id: str, channel_data: Dict, refit: bool = True):
+        """
+        채널 우선순위 업데이트
+        :param refit: 업로드 발생률 모델을 다시 맞춤 (방금 fit()을 호출했으면 False)
+        """
         priority_score = self.calculate_channel_priority(channel_data)
         
         conn = sqlite3.connect(self.db_path)
@@ -127,14 +140,22 @@ class SmartDataCollector:
             channel_data.get('last_upload_time'),
             priority_score,
             datetime.now().isoformat(),
-            self.calculate_next_check_time(priority_score)
+            self.calculate_next_check_time(priority_score, channel_id, refit)
         ))
         
         conn.commit()
         conn.close()
     
-    def calculate_next_check_time(self, priority_score: float) -> str:
-        """우선순위에 따른 다음 체크 시간 계산"""
+    def calculate_next_check_time(self, priority_score: float, channel_id: str = None, refit: bool = True) -> str:
+        """
+        다음 체크 시간 계산.
+        채널 ID가 주어지면 업로드 발생률 모델로 계산하고,
+        없으면 우선순위 단계별 고정 간격을 사용합니다.
+        :param refit: 계산 전에 발생률 모델을 다시 맞춤 (이미 맞췄으면 False)
+        """
+        if channel_id:
+            return self.rate_model.next_poll_time(channel_id, refit=refit).isoformat()
+
         now = datetime.now()
         
         if priority_score >= 80:  # 고우선순위
@@ -175,47 +196,16 @@ class SmartDataCollector:
         return channels
     
     def estimate_api_calls_needed(self, channels: List[Dict]) -> int:
-        """필요한 API 호출 수 추정"""
-        # 채널별 동영상 검색: 100 units
-        # 동영상 상세 정보: 1 unit per video (평균 10개 동영상)
-        total_calls = len(channels) * (100 + 10)  # 채널당 110 units
-        return total_calls
+        """필요한 API 유닛 추정 (채널별 업로드 재생목록 1회 + 동영상 상세 일괄 조회 1회)"""
+        return len(channels) * (endpoint_cost('playlistItems.list') + endpoint_cost('videos.list'))
     
     def check_quota_availability(self, needed_calls: int) -> bool:
-        """할당량 확인"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT quota_used, quota_limit FROM api_quota_tracking 
-            WHERE date = ?
-        ''', (today,))
-        
-        result = cursor.fetchone()
-        if result:
-            quota_used, quota_limit = result
-        else:
-            quota_used = 0
-            quota_limit = self.api_quota_limit
-        
-        conn.close()
-        
-        return (quota_used + needed_calls) <= quota_limit
+        """할당량 확인 (태평양 시간 기준 오늘 남은 할당량)"""
+        return self.quota_ledger.can_afford(needed_calls)
     
     def update_quota_usage(self, used_calls: int):
-        """할당량 사용량 업데이트"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        today = datetime.now().strftime('%Y-%m-%d')
-        cursor.execute('''
-            INSERT OR REPLACE INTO api_quota_tracking (date, quota_used, quota_limit)
-            VALUES (?, COALESCE((SELECT quota_used FROM api_quota_tracking WHERE date = ?), 0) + ?, ?)
-        ''', (today, today, used_calls, self.api_quota_limit))
-        
-        conn.commit()
-        conn.close()
+        """장부를 거치지 않은 호출의 할당량 사용량 수동 기록"""
+        self.quota_ledger.record('manual', units=used_calls)
     
     def log_collection(self, channel_id: str, videos_found: int, api_calls_used: int, success: bool, error_message: str = None):
         """수집 로그 기록"""
@@ -263,7 +253,8 @@ class SmartDataCollector:
             estimated_calls = self.estimate_api_calls_needed(channels_to_check)
             print(f"🔄 {len(channels_to_check)}개 채널로 조정")
         
-        # 4. 채널별 데이터 수집
+        # 4. 채널별 데이터 수집 (모든 호출은 할당량 장부에 기록)
+        youtube_service = self.quota_ledger.wrap(youtube_service)
         total_api_calls = 0
         total_videos_found = 0
         
@@ -271,34 +262,37 @@ class SmartDataCollector:
             try:
                 print(f"📺 [{i+1}/{len(channels_to_check)}] {channel['title']} 처리 중...")
                 
-                # 채널의 최신 동영상 검색 (100 units)
-                search_response = youtube_service.search().list(
-                    part="snippet",
-                    channelId=channel['channel_id'],
-                    type="video",
-                    order="date",
+                # 채널 업로드 재생목록에서 최신 동영상 조회 (search.list 100 units 대신 1 unit)
+                playlist_response = youtube_service.playlistItems().list(
+                    part="snippet,contentDetails",
+                    playlistId=uploads_playlist_for(channel['channel_id']),
                     maxResults=10
                 ).execute()
                 
-                api_calls_used = 100  # 검색 비용
-                videos_found = len(search_response.get('items', []))
+                api_calls_used = endpoint_cost('playlistItems.list')
+                items = playlist_response.get('items', [])
+                videos_found = len(items)
+
+                # 실제 업로드 시각을 발생률 모델 이력에 기록
+                self.rate_model.record_uploads(channel['channel_id'], [
+                    {
+                        'video_id': item['contentDetails']['videoId'],
+                        'published_at': item['contentDetails'].get('videoPublishedAt') or item['snippet']['publishedAt']
+                    }
+                    for item in items
+                ])
                 
-                # 동영상 상세 정보 수집 (1 unit per video)
-                for video in search_response.get('items', []):
-                    video_id = video['id']['videoId']
-                    
-                    # 동영상 상세 정보 가져오기 (1 unit)
+                # 동영상 상세 정보 일괄 수집 (최대 50개를 1 unit으로)
+                if items:
                     video_response = youtube_service.videos().list(
                         part="snippet,statistics",
-                        id=video_id
+                        id=','.join(item['contentDetails']['videoId'] for item in items)
                     ).execute()
                     
-                    api_calls_used += 1
+                    api_calls_used += endpoint_cost('videos.list')
                     
                     # 여기서 동영상 데이터를 저장하거나 처리
-                    if video_response.get('items'):
-                        video_data = video_response['items'][0]
-                        # TODO: 동영상 데이터 저장 로직
+                    # TODO: 동영상 데이터 저장 로직 (video_response['items'])
                 
                 total_api_calls += api_calls_used
                 total_videos_found += videos_found
@@ -311,14 +305,15 @@ class SmartDataCollector:
                     True
                 )
                 
-                # 채널 우선순위 업데이트
+                # 채널 우선순위 업데이트 (업로드 빈도/마지막 업로드는 실제 이력 기반)
+                model = self.rate_model.fit(channel['channel_id'])
                 channel_data = {
                     'title': channel['title'],
                     'subscriber_count': 0,  # 실제로는 API로 가져와야 함
-                    'upload_frequency': videos_found / 7,  # 주간 평균
-                    'last_upload_time': datetime.now().isoformat()
+                    'upload_frequency': model['uploads_per_day'],
+                    'last_upload_time': model['last_upload_time']
                 }
-                self.update_channel_priority(channel['channel_id'], channel_data)
+                self.update_channel_priority(channel['channel_id'], channel_data, refit=False)
                 
                 print(f"✅ {videos_found}개 동영상 발견, {api_calls_used} units 사용")
                 
@@ -335,8 +330,7 @@ class SmartDataCollector:
                     str(e)
                 )
         
-        # 5. 할당량 사용량 업데이트
-        self.update_quota_usage(total_api_calls)
+        # 5. 할당량 사용량은 장부 래퍼가 호출마다 기록함
         
         print(f"🎉 수집 완료!")
         print(f"📊 총 API 호출: {total_api_calls} units")
@@ -347,6 +341,10 @@ class SmartDataCollector:
 if __name__ == "__main__":
     collector = SmartDataCollector()
     collector.initialize_db()
+
+    # 기존 수집 데이터로 업로드 이력 초기화
+    added = collector.rate_model.sync_history_from_db()
+    print(f"📈 업로드 이력 {added}건 적재")
     
     # YouTube 서비스 객체가 필요합니다
     # from auto_oauth_setup import auto_oauth_setup
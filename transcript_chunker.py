@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+자막 청크 분할 (내용 기반 경계)
+정규화된 자막을 문장 단위로 나누고, 최근 문장 몇 개의 롤링 해시가 조건을 만족하는 곳에서 청크를 자름
+경계가 오프셋이 아니라 내용으로 정해지므로 자막 일부가 바뀌어도 바뀐 부분의 청크만 달라지고,
+나머지 청크는 같은 내용 해시를 유지해 청크별 LLM 결과를 다시 쓸 수 있음
+청크는 본문 오프셋, 토큰 수, 내용 해시, 시간 범위로 표현되어 DB(transcript_chunks)에 한 번만 저장됨
+"""
+
+import hashlib
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from caption_normalizer import NormalizedTranscript
+
+# 청크 최대 토큰 수 (넘으면 경계 조건과 관계없이 자름)
+CHUNK_MAX_TOKENS = 8000
+
+# 청크 최소 토큰 수 (이보다 작으면 경계 조건을 만족해도 자르지 않음)
+CHUNK_MIN_TOKENS = 1500
+
+# 롤링 해시 창 크기(문장 수)와 경계 조건 (해시 % BOUNDARY_DIVISOR == 0, 평균 약 32문장마다)
+ROLLING_WINDOW = 4
+BOUNDARY_DIVISOR = 32
+
+# 문장 부호가 없는 긴 구간(세그먼트 색인도 없는 경우)은 단어 해시로 나눔
+WORD_BOUNDARY_DIVISOR = 16
+MIN_UNIT_WORDS = 8
+MAX_UNIT_WORDS = 256
+
+# 분할 방식이 바뀌면 올림 (저장된 청크를 다시 계산)
+CHUNKER_VERSION = 2
+
+# 문장 끝 (마침표/물음표/느낌표 뒤 공백)
+SENTENCE_END_RE = re.compile(r'(?<=[.!?。？！])\s+')
+
+_HASH_MODULUS = (1 << 61) - 1
+_HASH_BASE = 1_000_003
+
+
+def chunker_id(max_tokens: int = CHUNK_MAX_TOKENS) -> str:
+    """저장된 청크를 만든 분할 방식 식별자"""
+    return f"v{CHUNKER_VERSION}:{max_tokens}"
+
+
+def content_hash(text: str) -> str:
+    """청크 내용 해시 (중복 탐지, 결과 캐시 키)"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+
+
+def _fingerprint(text: str) -> int:
+    """문장/단어 지문 (공백 차이는 무시)"""
+    digest = hashlib.blake2b(' '.join(text.split()).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def _default_token_counter() -> Callable[[str], int]:
+    from llm_handler import num_tokens_from_string
+    return num_tokens_from_string
+
+
+def _sentence_spans(text: str) -> List[Tuple[int, int]]:
+    spans = []
+    start = 0
+    for match in SENTENCE_END_RE.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    if start < len(text):
+        spans.append((start, len(text)))
+    return [(s, e) for s, e in spans if e > s]
+
+
+def _word_cuts(text: str, start: int, end: int) -> List[int]:
+    """단어 해시가 조건을 만족하는 곳을 자름 (내용 기반, 단위 길이는 MIN~MAX_UNIT_WORDS)"""
+    cuts = []
+    words = 0
+    for match in re.finditer(r'\S+', text[start:end]):
+        words += 1
+        if (words >= MIN_UNIT_WORDS and _fingerprint(match.group()) % WORD_BOUNDARY_DIVISOR == 0) \
+                or words >= MAX_UNIT_WORDS:
+            cuts.append(start + match.end())
+            words = 0
+    return [cut for cut in cuts if cut < end]
+
+
+def _split_span(text: str, span: Tuple[int, int], boundaries: List[int],
+                count_tokens: Callable[[str], int]) -> List[Tuple[int, int, int]]:
+    """최대 토큰 수를 넘는 문장을 세그먼트 경계(없으면 단어 해시 경계)에서 나눔"""
+    start, end = span
+    cuts = [b for b in boundaries if start < b < end] or _word_cuts(text, start, end)
+    pieces = []
+    for piece_start, piece_end in zip([start] + cuts, cuts + [end]):
+        piece_text = text[piece_start:piece_end]
+        if piece_text.strip():
+            pieces.append((piece_start, piece_end, count_tokens(piece_text)))
+    return pieces
+
+
+def build_chunks(transcript: NormalizedTranscript, max_tokens: int = CHUNK_MAX_TOKENS,
+                 count_tokens: Optional[Callable[[str], int]] = None) -> List[Dict]:
+    """
+    자막을 내용 기반 경계에서 청크로 분할
+    :param transcript: 정규화된 자막 (세그먼트 색인이 없어도 됨)
+    :param count_tokens: 토큰 계산 함수 (기본값은 llm_handler.num_tokens_from_string)
+    :return: [{'chunk_index', 'start_offset', 'end_offset', 'token_count', 'content_hash',
+              'start_ms', 'end_ms', 'text'}]
+    """
+    count_tokens = count_tokens or _default_token_counter()
+    text = transcript.text
+    boundaries = list(transcript.offsets)
+
+    units: List[Tuple[int, int, int]] = []
+    for span in _sentence_spans(text):
+        tokens = count_tokens(text[span[0]:span[1]])
+        if tokens > max_tokens:
+            units.extend(_split_span(text, span, boundaries, count_tokens))
+        else:
+            units.append((span[0], span[1], tokens))
+
+    # 최근 ROLLING_WINDOW개 문장의 롤링 해시가 경계 조건을 만족하면 자름 (최소/최대 토큰 수 안에서)
+    min_tokens = min(CHUNK_MIN_TOKENS, max_tokens // 2)
+    drop_factor = pow(_HASH_BASE, ROLLING_WINDOW - 1, _HASH_MODULUS)
+    window: List[int] = []
+    rolling = 0
+
+    groups: List[List[Tuple[int, int, int]]] = []
+    current: List[Tuple[int, int, int]] = []
+    current_tokens = 0
+    for unit in units:
+        if current and current_tokens + unit[2] > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit[2]
+
+        fingerprint = _fingerprint(text[unit[0]:unit[1]])
+        if len(window) == ROLLING_WINDOW:
+            rolling = (rolling - window.pop(0) * drop_factor) % _HASH_MODULUS
+        window.append(fingerprint)
+        rolling = (rolling * _HASH_BASE + fingerprint) % _HASH_MODULUS
+
+        if current_tokens >= min_tokens and rolling % BOUNDARY_DIVISOR == 0:
+            groups.append(current)
+            current, current_tokens = [], 0
+    if current:
+        groups.append(current)
+
+    chunks = []
+    for index, group in enumerate(groups):
+        start_offset, end_offset = group[0][0], group[-1][1]
+        chunk_text = text[start_offset:end_offset]
+        start_ms = transcript.time_at(start_offset)
+        # 끝 시각은 청크 끝 다음 세그먼트의 시작 시각 (마지막 청크는 마지막 세그먼트 시작 시각)
+        end_ms = None
+        if len(transcript):
+            next_segment = transcript.segment_at(end_offset) + 1
+            end_ms = transcript.starts[min(next_segment, len(transcript) - 1)]
+        chunks.append({
+            'chunk_index': index,
+            'start_offset': start_offset,
+            'end_offset': end_offset,
+            'token_count': sum(unit[2] for unit in group),
+            'content_hash': content_hash(chunk_text),
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'text': chunk_text,
+        })
+    return chunks
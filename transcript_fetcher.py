@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+자막 수집기
+할당량이 들지 않는 timedtext 경로(youtube-transcript-api)를 먼저 시도하고, 없으면 captions API로 대체
+호스트별 요청 속도 제한이 걸린 작업자 풀로 여러 동영상의 자막을 동시에 가져오고,
+정규화된 자막(세그먼트 색인, 언어 포함)과 "자막 없음" 결과를 디스크에 캐시함
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from caption_normalizer import NormalizedTranscript, normalize_captions, normalize_segments
+from metrics import metrics
+
+DEFAULT_LANGUAGES = ['ko', 'en']
+DEFAULT_CACHE_DIR = "transcript_cache"
+DEFAULT_MAX_WORKERS = 8
+
+# "자막 없음" 결과를 다시 확인하기 전까지 기다리는 시간 (업로드 직후에는 자막이 늦게 생김)
+NEGATIVE_TTL_HOURS = 6
+
+# 호스트별 초당 요청 수와 순간 허용량 (timedtext는 짧은 시간에 많이 요청하면 IP가 차단됨)
+HOST_RATE_LIMITS = {
+    "www.youtube.com": (2.0, 4),
+    "www.googleapis.com": (5.0, 10),
+}
+
+# 이름 → (함수, 호스트). 함수는 fetch(video_id, languages, credentials) -> (NormalizedTranscript, 언어) 또는 None
+# None은 "이 경로로는 자막이 없음", 예외는 일시적 오류(캐시하지 않음)
+BACKENDS: Dict[str, Tuple[Callable, str]] = {}
+DEFAULT_BACKENDS = ("timedtext", "captions_api")
+
+
+def transcript_backend(name: str, host: str):
+    """자막 수집 경로 등록 데코레이터"""
+    def decorator(fetch):
+        BACKENDS[name] = (fetch, host)
+        return fetch
+    return decorator
+
+
+@transcript_backend("timedtext", host="www.youtube.com")
+def fetch_timedtext(video_id: str, languages: List[str], credentials=None) -> Optional[Tuple[NormalizedTranscript, str]]:
+    """youtube-transcript-api로 공개 자막(수동/자동 생성) 조회 - API 할당량 사용 없음"""
+    from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound, TranscriptsDisabled, VideoUnavailable
+
+    try:
+        # 1.0 이전 버전은 클래스 메서드, 이후 버전은 인스턴스 메서드
+        if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+            transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        else:
+            transcript_list = YouTubeTranscriptApi().list(video_id)
+
+        try:
+            transcript = transcript_list.find_transcript(languages)
+        except NoTranscriptFound:
+            # 선호 언어가 없으면 첫 번째 자막 사용
+            transcript = next(iter(transcript_list), None)
+            if transcript is None:
+                return None
+        segments = transcript.fetch()
+    except (NoTranscriptFound, TranscriptsDisabled, VideoUnavailable):
+        return None
+
+    if hasattr(segments, "to_raw_data"):
+        segments = segments.to_raw_data()
+    if not segments:
+        return None
+    return normalize_segments(segments), transcript.language_code
+
+
+@transcript_backend("captions_api", host="www.googleapis.com")
+def fetch_captions_api(video_id: str, languages: List[str], credentials=None) -> Optional[Tuple[NormalizedTranscript, str]]:
+    """YouTube Data API captions.list + captions.download (250 units, 소유하지 않은 동영상은 대부분 거부됨)"""
+    if credentials is None:
+        return None
+    from youtube_handler import download_caption_track
+
+    transcript, lang = download_caption_track(video_id, credentials, languages)
+    if not transcript:
+        return None
+    return normalize_captions(transcript), lang
+
+
+def transcript_from_entry(entry: Dict) -> NormalizedTranscript:
+    """fetch() 결과를 본문과 세그먼트 색인으로 복원"""
+    return NormalizedTranscript.from_bytes(entry['transcript'], base64.b64decode(entry.get('segment_index') or ''))
+
+
+class HostRateLimiter:
+    """호스트별 토큰 버킷 (여러 스레드가 공유)"""
+
+    def __init__(self, limits: Dict[str, Tuple[float, int]] = None):
+        self.limits = dict(limits or HOST_RATE_LIMITS)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[float]] = {}
+
+    def acquire(self, host: str):
+        """요청 하나를 보낼 수 있을 때까지 대기"""
+        if host not in self.limits:
+            return
+        rate, burst = self.limits[host]
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated = self._buckets.get(host, (burst, now))
+                tokens = min(burst, tokens + (now - updated) * rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / rate
+            time.sleep(wait)
+
+
+class TranscriptFetcher:
+    def __init__(self, backends=DEFAULT_BACKENDS, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 max_workers: int = DEFAULT_MAX_WORKERS, negative_ttl_hours: float = NEGATIVE_TTL_HOURS,
+                 rate_limiter: HostRateLimiter = None):
+        """
+        :param backends: 시도할 수집 경로 이름 (순서대로)
+        :param cache_dir: 디스크 캐시 디렉터리 (None이면 캐시하지 않음)
+        """
+        unknown = [name for name in backends if name not in BACKENDS]
+        if unknown:
+            raise ValueError(f"알 수 없는 자막 수집 경로: {', '.join(unknown)} (사용 가능: {', '.join(BACKENDS)})")
+        self.backends = list(backends)
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.negative_ttl = timedelta(hours=negative_ttl_hours)
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self._unavailable = set()
+
+    def _cache_path(self, video_id: str, languages: List[str]) -> str:
+        return os.path.join(self.cache_dir, f"{video_id}.{'-'.join(languages)}.json.gz")
+
+    def get_cached(self, video_id: str, languages: List[str] = None) -> Optional[Dict]:
+        """
+        캐시된 결과. 자막이 있으면 {'transcript', 'segment_index', 'language', 'source', ...},
+        "자막 없음"이면 {'missing': True, ...}, 캐시가 없거나 만료되었으면 None
+        """
+        if not self.cache_dir:
+            return None
+        path = self._cache_path(video_id, languages or DEFAULT_LANGUAGES)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not entry.get('missing') and 'segment_index' not in entry:
+            # 정규화 이전 형식으로 저장된 항목
+            return None
+        if entry.get('missing'):
+            checked_at = datetime.fromisoformat(entry['checked_at'])
+            if datetime.now() - checked_at > self.negative_ttl:
+                return None
+        return entry
+
+    def _store(self, video_id: str, languages: List[str], entry: Dict):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(video_id, languages)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, video_id: str, languages: List[str] = None):
+        """캐시 항목 삭제 (자막이 새로 생겼을 때 다시 확인)"""
+        if self.cache_dir:
+            path = self._cache_path(video_id, languages or DEFAULT_LANGUAGES)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def fetch(self, video_id: str, credentials=None, languages: List[str] = None,
+              use_cache: bool = True) -> Optional[Dict]:
+        """
+        자막 하나 가져오기 (캐시 → 등록된 경로 순서대로)
+        :return: {'video_id', 'transcript', 'segment_index', 'language', 'source', 'fetched_at'} 또는 자막이 없으면 None
+                 (transcript는 정규화된 본문, segment_index는 base64 인코딩된 세그먼트 색인)
+        """
+        languages = list(languages or DEFAULT_LANGUAGES)
+
+        if use_cache:
+            cached = self.get_cached(video_id, languages)
+            if cached is not None:
+                metrics.inc('transcript_cache_total', result='missing' if cached.get('missing') else 'hit')
+                return None if cached.get('missing') else cached
+            metrics.inc('transcript_cache_total', result='miss')
+
+        transient_error = None
+        for name in self.backends:
+            if name in self._unavailable:
+                continue
+            fetch, host = BACKENDS[name]
+            self.rate_limiter.acquire(host)
+            try:
+                with metrics.timer('transcript_fetch_seconds', source=name):
+                    found = fetch(video_id, languages, credentials)
+            except ImportError as e:
+                # 선택 의존성이 없는 경로는 이 프로세스에서 다시 시도하지 않음
+                print(f"⚠️ 자막 수집 경로 '{name}'을(를) 사용할 수 없습니다: {e}")
+                self._unavailable.add(name)
+                continue
+            except Exception as e:
+                metrics.inc('transcript_fetch_total', source=name, result='error')
+                print(f"자막 수집 경로 '{name}' 오류 ({video_id}): {e}")
+                transient_error = e
+                continue
+
+            if found and found[0].text:
+                transcript, language = found
+                metrics.inc('transcript_fetch_total', source=name, result='ok')
+                entry = {
+                    'video_id': video_id,
+                    'transcript': transcript.text,
+                    'segment_index': base64.b64encode(transcript.to_bytes()).decode('ascii'),
+                    'language': language,
+                    'source': name,
+                    'fetched_at': datetime.now().isoformat(),
+                }
+                self._store(video_id, languages, entry)
+                return entry
+            metrics.inc('transcript_fetch_total', source=name, result='missing')
+
+        # 모든 경로가 "자막 없음"이라고 답한 경우만 캐시 (일시적 오류는 다음에 다시 시도)
+        if transient_error is None:
+            self._store(video_id, languages, {
+                'video_id': video_id, 'missing': True, 'checked_at': datetime.now().isoformat()
+            })
+        return None
+
+    def fetch_many(self, video_ids: List[str], credentials=None, languages: List[str] = None,
+                   use_cache: bool = True) -> Dict[str, Optional[Dict]]:
+        """
+        여러 동영상의 자막을 작업자 풀에서 동시에 가져오기
+        :return: {video_id: fetch() 결과}
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids:
+            return {}
+
+        def fetch_one(video_id):
+            try:
+                return self.fetch(video_id, credentials, languages, use_cache)
+            except Exception as e:
+                print(f"자막 가져오기 중 오류 발생 ({video_id}): {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(video_ids)),
+                                thread_name_prefix="transcript") as executor:
+            results = list(executor.map(fetch_one, video_ids))
+        return dict(zip(video_ids, results))
+
+
+def _backends_from_env() -> List[str]:
+    names = [name.strip() for name in os.getenv("TRANSCRIPT_BACKENDS", "").split(",") if name.strip()]
+    return names or list(DEFAULT_BACKENDS)
+
+
+# 전역 자막 수집기 인스턴스 (TRANSCRIPT_BACKENDS=captions_api 처럼 경로 순서 변경 가능)
+transcript_fetcher = TranscriptFetcher(backends=_backends_from_env())
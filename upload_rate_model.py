@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+채널별 업로드 발생률 추정 및 적응형 폴링 스케줄러
+실제 published_at 이력으로 요일·시간대별 포아송 발생률을 학습하고,
+목표 탐지 지연을 최소 폴링 비용으로 달성하는 다음 확인 시각을 계산
+"""
+
+import json
+import math
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+HOURS_PER_WEEK = 168
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    """ISO 문자열/datetime을 UTC 기준 naive datetime으로 변환 (naive 값은 UTC로 간주)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def hour_of_week(dt: datetime) -> int:
+    """월요일 0시 = 0 ... 일요일 23시 = 167"""
+    return dt.weekday() * 24 + dt.hour
+
+
+class UploadRateModel:
+    def __init__(self, db_path: str = "youtube_news.db",
+                 half_life_days: float = 28.0,
+                 prior_uploads_per_week: float = 1.0,
+                 prior_weeks: float = 2.0,
+                 bin_prior_weeks: float = 4.0,
+                 target_latency_hours: float = 1.0,
+                 reference_uploads_per_day: float = 3.0,
+                 min_interval_minutes: int = 15,
+                 max_interval_hours: int = 48):
+        """
+        :param half_life_days: 과거 업로드의 가중치가 절반이 되는 기간
+        :param prior_uploads_per_week: 이력이 없는 채널에 가정하는 주간 업로드 수
+        :param prior_weeks: 채널 전체 발생률의 사전분포 강도 (주 단위 관측량)
+        :param bin_prior_weeks: 시간대별 발생률을 채널 평균으로 당기는 강도
+        :param target_latency_hours: 기준 발생률 채널의 목표 평균 탐지 지연
+        :param reference_uploads_per_day: 목표 지연을 맞추는 기준 채널의 하루 업로드 수
+        """
+        self.db_path = db_path
+        self.half_life_days = half_life_days
+        self.prior_uploads_per_week = prior_uploads_per_week
+        self.prior_weeks = prior_weeks
+        self.bin_prior_weeks = bin_prior_weeks
+        self.target_latency_hours = target_latency_hours
+        self.reference_uploads_per_day = reference_uploads_per_day
+        self.min_interval = timedelta(minutes=min_interval_minutes)
+        self.max_interval = timedelta(hours=max_interval_hours)
+
+    @property
+    def poll_cost(self) -> float:
+        """
+        폴링 1회의 비용을 '업로드 1건이 1시간 늦게 탐지되는 비용' 단위로 환산한 값.
+        일정 발생률 λ에서 최적 간격은 T = sqrt(2C/λ), 평균 지연은 T/2 이므로
+        기준 발생률에서 평균 지연이 목표값이 되도록 C = 2·λ_ref·L² 로 보정합니다.
+        """
+        reference_rate = self.reference_uploads_per_day / 24.0
+        return 2.0 * reference_rate * self.target_latency_hours ** 2
+
+    def initialize_db(self):
+        """업로드 이력/모델 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS channel_upload_history (
+                channel_id TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                PRIMARY KEY (channel_id, video_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_upload_history_channel_time
+            ON channel_upload_history (channel_id, published_at)
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS channel_upload_model (
+                channel_id TEXT PRIMARY KEY,
+                hourly_rates TEXT,
+                uploads_per_day REAL,
+                effective_uploads REAL,
+                last_upload_time TEXT,
+                fitted_at TEXT
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def record_uploads(self, channel_id: str, videos: List[Dict]) -> int:
+        """수집 결과의 실제 업로드 시각을 이력에 추가 (video_id, published_at 필요)"""
+        rows = []
+        for video in videos:
+            published = parse_timestamp(video.get('published_at'))
+            if video.get('video_id') and published:
+                rows.append((channel_id, video['video_id'], published.isoformat()))
+
+        if not rows:
+            return 0
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT OR IGNORE INTO channel_upload_history (channel_id, video_id, published_at)
+            VALUES (?, ?, ?)
+        ''', rows)
+        added = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return added
+
+    def sync_history_from_db(self) -> int:
+        """이미 수집된 videos / rss_videos 테이블에서 업로드 이력 일괄 적재"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('videos', 'rss_videos')")
+        tables = [row[0] for row in cursor.fetchall()]
+
+        before = conn.total_changes
+        for table in tables:
+            id_column = 'id' if table == 'videos' else 'video_id'
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO channel_upload_history (channel_id, video_id, published_at)
+                SELECT channel_id, {id_column}, published_at FROM {table}
+                WHERE channel_id IS NOT NULL AND published_at IS NOT NULL
+            ''')
+        added = conn.total_changes - before
+
+        conn.commit()
+        conn.close()
+        return added
+
+    def fit(self, channel_id: str, now: datetime = None) -> Dict:
+        """
+        채널의 시간대별(주 168칸) 업로드 발생률 추정.
+        - 각 업로드는 경과 시간에 따라 지수 감쇠 가중치를 가짐
+        - 관측 기간(노출량)도 같은 감쇠로 계산
+        - 채널 평균은 전역 사전값으로, 시간대별 값은 채널 평균으로 수축(shrinkage)
+        """
+        now = now or datetime.utcnow()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT published_at FROM channel_upload_history
+            WHERE channel_id = ?
+        ''', (channel_id,))
+        uploads = [dt for dt in (parse_timestamp(row[0]) for row in cursor.fetchall()) if dt and dt <= now]
+        conn.close()
+
+        decay_per_day = math.log(2) / self.half_life_days
+        bin_weights = [0.0] * HOURS_PER_WEEK
+        for dt in uploads:
+            age_days = (now - dt).total_seconds() / 86400
+            bin_weights[hour_of_week(dt)] += math.exp(-decay_per_day * age_days)
+
+        # 감쇠된 관측 기간 (주 단위): ∫_0^span e^{-kt} dt
+        if uploads:
+            span_days = max((now - min(uploads)).total_seconds() / 86400, 1.0)
+            exposure_weeks = (1 - math.exp(-decay_per_day * span_days)) / decay_per_day / 7
+        else:
+            exposure_weeks = 0.0
+
+        effective_uploads = sum(bin_weights)
+        prior_uploads = self.prior_uploads_per_week * self.prior_weeks
+        mean_rate = (effective_uploads + prior_uploads) / (HOURS_PER_WEEK * (exposure_weeks + self.prior_weeks))
+
+        hourly_rates = [
+            (weight + self.bin_prior_weeks * mean_rate) / (exposure_weeks + self.bin_prior_weeks)
+            for weight in bin_weights
+        ]
+
+        model = {
+            'channel_id': channel_id,
+            'hourly_rates': hourly_rates,
+            'uploads_per_day': sum(hourly_rates) / 7,
+            'effective_uploads': effective_uploads,
+            'last_upload_time': max(uploads).isoformat() if uploads else None,
+        }
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO channel_upload_model
+            (channel_id, hourly_rates, uploads_per_day, effective_uploads, last_upload_time, fitted_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (
+            channel_id,
+            json.dumps([round(rate, 6) for rate in hourly_rates]),
+            model['uploads_per_day'],
+            effective_uploads,
+            model['last_upload_time'],
+            datetime.now().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+        return model
+
+    def get_model(self, channel_id: str) -> Optional[Dict]:
+        """저장된 모델 조회"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT hourly_rates, uploads_per_day, effective_uploads, last_upload_time
+            FROM channel_upload_model WHERE channel_id = ?
+        ''', (channel_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if not row:
+            return None
+        return {
+            'channel_id': channel_id,
+            'hourly_rates': json.loads(row[0]),
+            'uploads_per_day': row[1],
+            'effective_uploads': row[2],
+            'last_upload_time': row[3],
+        }
+
+    def next_poll_delay(self, channel_id: str, now: datetime = None, refit: bool = True) -> timedelta:
+        """
+        다음 확인까지의 대기 시간 계산.
+        발생률이 시간에 따라 변할 때 최적 폴링 밀도는 sqrt(λ(t) / 2C) 이므로,
+        현재부터 그 밀도를 적분해 1이 되는 시각을 다음 폴링 시각으로 사용합니다.
+        :param now: 기준 시각 (UTC naive, 기본값은 현재)
+        """
+        now = now or datetime.utcnow()
+        model = self.fit(channel_id, now) if refit else (self.get_model(channel_id) or self.fit(channel_id, now))
+        rates = model['hourly_rates']
+        cost = self.poll_cost
+
+        accumulated = 0.0
+        cursor_time = now
+        limit = now + self.max_interval
+        while cursor_time < limit:
+            hour_end = cursor_time.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            step_hours = (min(hour_end, limit) - cursor_time).total_seconds() / 3600
+            density = math.sqrt(rates[hour_of_week(cursor_time)] / (2 * cost))
+            if accumulated + density * step_hours >= 1.0:
+                cursor_time += timedelta(hours=(1.0 - accumulated) / density)
+                break
+            accumulated += density * step_hours
+            cursor_time = min(hour_end, limit)
+
+        return max(self.min_interval, min(cursor_time, limit) - now)
+
+    def next_poll_time(self, channel_id: str, refit: bool = True) -> datetime:
+        """다음 확인 시각 (로컬 naive datetime, 다른 테이블의 시각 형식과 동일)"""
+        return datetime.now() + self.next_poll_delay(channel_id, refit=refit)
+
+    def expected_latency_hours(self, channel_id: str) -> Optional[float]:
+        """현재 모델 기준 평균 탐지 지연 추정 (평균 발생률에서 최적 간격의 절반)"""
+        model = self.get_model(channel_id)
+        if not model or model['uploads_per_day'] <= 0:
+            return None
+        interval = math.sqrt(2 * self.poll_cost / (model['uploads_per_day'] / 24.0))
+        interval = min(max(interval, self.min_interval.total_seconds() / 3600),
+                       self.max_interval.total_seconds() / 3600)
+        return interval / 2
+
+
+# 전역 인스턴스
+upload_rate_model = UploadRateModel()
@@ -0,0 +1,632 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+YouTube WebSub(PubSubHubbub) 푸시 수신 시스템
+폴링 없이 새 업로드 알림을 수초 내에 수신 (RSS 폴링은 대체 경로로 유지)
+"""
+
+import hashlib
+import hmac
+import secrets
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs, urlencode
+
+import requests
+
+# YouTube가 사용하는 공개 허브
+DEFAULT_HUB_URL = "https://pubsubhubbub.appspot.com/subscribe"
+TOPIC_URL_TEMPLATE = "https://www.youtube.com/xml/feeds/videos.xml?channel_id={channel_id}"
+
+# 허브가 허용하는 최대 리스 기간은 약 10일이므로 5일 단위로 갱신
+DEFAULT_LEASE_SECONDS = 5 * 24 * 3600
+RENEW_MARGIN_SECONDS = 24 * 3600
+
+ATOM_NS = {
+    'atom': 'http://www.w3.org/2005/Atom',
+    'yt': 'http://www.youtube.com/xml/schemas/2015',
+    'at': 'http://purl.org/atompub/tombstones/1.0',
+}
+
+
+def build_atom_notification(video_id: str, channel_id: str, title: str = "", published: str = None) -> str:
+    """허브가 보내는 것과 같은 형식의 Atom 알림 본문 생성 (FakeHub/테스트용)"""
+    published = published or datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S+00:00')
+    return f"""<?xml version='1.0' encoding='UTF-8'?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+  <link rel="hub" href="https://pubsubhubbub.appspot.com"/>
+  <link rel="self" href="{TOPIC_URL_TEMPLATE.format(channel_id=channel_id)}"/>
+  <title>YouTube video feed</title>
+  <updated>{published}</updated>
+  <entry>
+    <id>yt:video:{video_id}</id>
+    <yt:videoId>{video_id}</yt:videoId>
+    <yt:channelId>{channel_id}</yt:channelId>
+    <title>{title}</title>
+    <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+    <published>{published}</published>
+    <updated>{published}</updated>
+  </entry>
+</feed>"""
+
+
+def compute_signature(secret: str, body: bytes, algorithm: str = "sha1") -> str:
+    """X-Hub-Signature 헤더 값 계산 ('sha1=<hex>' 형식)"""
+    digest = hmac.new(secret.encode('utf-8'), body, getattr(hashlib, algorithm)).hexdigest()
+    return f"{algorithm}={digest}"
+
+
+class WebSubSubscriber:
+    def __init__(self, db_path: str = "youtube_news.db", callback_url: str = None,
+                 hub_url: str = DEFAULT_HUB_URL):
+        self.db_path = db_path
+        self.callback_url = callback_url
+        self.hub_url = hub_url
+        # 알림마다 바로 대기열을 처리하므로 동시에 들어온 알림끼리 같은 항목을 두 번 옮기지 않도록 직렬화
+        self._drain_lock = threading.Lock()
+
+    def initialize_db(self):
+        """WebSub 구독/수신 큐 테이블 초기화"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        # 채널별 구독 상태 테이블
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS websub_subscriptions (
+                channel_id TEXT PRIMARY KEY,
+                topic_url TEXT NOT NULL,
+                callback_url TEXT NOT NULL,
+                secret TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                lease_seconds INTEGER,
+                requested_at TEXT,
+                verified_at TEXT,
+                expires_at TEXT
+            )
+        ''')
+
+        # 푸시로 받은 업로드 알림 큐 (수집 대기열)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS websub_queue (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT UNIQUE,
+                channel_id TEXT,
+                title TEXT,
+                video_url TEXT,
+                published_at TEXT,
+                updated_at TEXT,
+                received_at TEXT,
+                processed BOOLEAN DEFAULT 0
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def topic_url(self, channel_id: str) -> str:
+        """채널 ID로부터 WebSub 토픽 URL 생성"""
+        return TOPIC_URL_TEMPLATE.format(channel_id=channel_id)
+
+    def _callback_for(self, channel_id: str) -> str:
+        """채널별 콜백 URL (서명 검증 시 비밀키를 찾기 위해 채널 ID를 쿼리로 전달)"""
+        separator = '&' if '?' in self.callback_url else '?'
+        return f"{self.callback_url}{separator}{urlencode({'channel_id': channel_id})}"
+
+    def _get_subscription(self, channel_id: str) -> Optional[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM websub_subscriptions WHERE channel_id = ?', (channel_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def subscribe(self, channel_id: str, lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                  mode: str = "subscribe") -> bool:
+        """허브에 구독(또는 구독 해지) 요청 전송. 실제 활성화는 허브의 검증 요청 이후"""
+        if not self.callback_url:
+            print("❌ 콜백 URL이 설정되지 않아 WebSub 구독을 요청할 수 없습니다.")
+            return False
+
+        existing = self._get_subscription(channel_id)
+        secret = existing['secret'] if existing else secrets.token_hex(16)
+        topic = self.topic_url(channel_id)
+        callback = self._callback_for(channel_id)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO websub_subscriptions
+            (channel_id, topic_url, callback_url, secret, status, lease_seconds, requested_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(channel_id) DO UPDATE SET
+                topic_url = excluded.topic_url,
+                callback_url = excluded.callback_url,
+                status = CASE WHEN websub_subscriptions.status = 'active' AND excluded.status = 'pending'
+                              THEN 'active' ELSE excluded.status END,
+                lease_seconds = excluded.lease_seconds,
+                requested_at = excluded.requested_at
+        ''', (
+            channel_id,
+            topic,
+            callback,
+            secret,
+            'pending' if mode == 'subscribe' else 'unsubscribing',
+            lease_seconds,
+            datetime.now().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+
+        try:
+            resp = requests.post(self.hub_url, data={
+                'hub.mode': mode,
+                'hub.topic': topic,
+                'hub.callback': callback,
+                'hub.verify': 'async',
+                'hub.secret': secret,
+                'hub.lease_seconds': str(lease_seconds),
+            }, timeout=10)
+            if resp.status_code in (202, 204):
+                print(f"📨 WebSub {mode} 요청 완료: {channel_id}")
+                return True
+            print(f"❌ WebSub {mode} 요청 실패 ({channel_id}): {resp.status_code} {resp.text[:200]}")
+            return False
+        except Exception as e:
+            print(f"❌ WebSub {mode} 요청 오류 ({channel_id}): {e}")
+            return False
+
+    def unsubscribe(self, channel_id: str) -> bool:
+        """구독 해지 요청"""
+        return self.subscribe(channel_id, mode="unsubscribe")
+
+    def subscribe_all_rss_channels(self) -> Dict:
+        """rss_channels에 등록된 활성 채널(UC ID) 전체 구독"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT channel_id FROM rss_channels
+            WHERE is_active = 1 AND channel_id LIKE 'UC%'
+        ''')
+        channel_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+
+        requested = sum(1 for channel_id in channel_ids if self.subscribe(channel_id))
+        return {'total_channels': len(channel_ids), 'requested': requested}
+
+    def verify_intent(self, params: Dict[str, str]) -> Optional[str]:
+        """
+        허브의 구독 확인(GET) 요청 검증.
+        우리가 요청한 구독이면 돌려줄 challenge 문자열을, 아니면 None을 반환합니다.
+        """
+        mode = params.get('hub.mode')
+        topic = params.get('hub.topic')
+        challenge = params.get('hub.challenge')
+        channel_id = params.get('channel_id')
+
+        if not channel_id or not topic:
+            return None
+
+        subscription = self._get_subscription(channel_id)
+        if not subscription or subscription['topic_url'] != topic:
+            print(f"⚠️ 알 수 없는 토픽에 대한 검증 요청: {topic}")
+            return None
+
+        now = datetime.now()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        if mode == 'subscribe' and subscription['status'] in ('pending', 'active') and challenge:
+            lease_seconds = int(params.get('hub.lease_seconds') or subscription['lease_seconds'] or DEFAULT_LEASE_SECONDS)
+            cursor.execute('''
+                UPDATE websub_subscriptions
+                SET status = 'active', lease_seconds = ?, verified_at = ?, expires_at = ?
+                WHERE channel_id = ?
+            ''', (lease_seconds, now.isoformat(), (now + timedelta(seconds=lease_seconds)).isoformat(), channel_id))
+            print(f"✅ WebSub 구독 확인: {channel_id} (리스 {lease_seconds}초)")
+        elif mode == 'unsubscribe' and subscription['status'] == 'unsubscribing' and challenge:
+            cursor.execute('''
+                UPDATE websub_subscriptions SET status = 'unsubscribed', expires_at = NULL
+                WHERE channel_id = ?
+            ''', (channel_id,))
+            print(f"✅ WebSub 구독 해지 확인: {channel_id}")
+        elif mode == 'denied':
+            cursor.execute('''
+                UPDATE websub_subscriptions SET status = 'denied' WHERE channel_id = ?
+            ''', (channel_id,))
+            print(f"❌ 허브가 구독을 거부했습니다: {channel_id} ({params.get('hub.reason', '')})")
+            challenge = None
+        else:
+            challenge = None
+
+        conn.commit()
+        conn.close()
+        return challenge
+
+    def verify_signature(self, channel_id: str, body: bytes, signature_header: str) -> bool:
+        """X-Hub-Signature HMAC 검증"""
+        if not channel_id or not signature_header or '=' not in signature_header:
+            return False
+
+        subscription = self._get_subscription(channel_id)
+        if not subscription:
+            return False
+
+        algorithm, _, received = signature_header.partition('=')
+        algorithm = algorithm.strip().lower()
+        if algorithm not in ('sha1', 'sha256', 'sha384', 'sha512'):
+            return False
+
+        expected = compute_signature(subscription['secret'], body, algorithm)
+        return hmac.compare_digest(expected, f"{algorithm}={received.strip()}")
+
+    def parse_atom(self, body: bytes) -> List[Dict]:
+        """푸시된 Atom 본문에서 동영상 항목 추출 (삭제 알림은 무시)"""
+        try:
+            root = ET.fromstring(body)
+        except ET.ParseError as e:
+            print(f"❌ Atom 파싱 실패: {e}")
+            return []
+
+        entries = []
+        for entry in root.findall('atom:entry', ATOM_NS):
+            video_id = entry.findtext('yt:videoId', default='', namespaces=ATOM_NS)
+            if not video_id:
+                continue
+
+            link = entry.find('atom:link', ATOM_NS)
+            entries.append({
+                'video_id': video_id,
+                'channel_id': entry.findtext('yt:channelId', default='', namespaces=ATOM_NS),
+                'title': entry.findtext('atom:title', default='', namespaces=ATOM_NS),
+                'video_url': link.get('href') if link is not None else f"https://www.youtube.com/watch?v={video_id}",
+                'published_at': entry.findtext('atom:published', default='', namespaces=ATOM_NS),
+                'updated_at': entry.findtext('atom:updated', default='', namespaces=ATOM_NS),
+            })
+
+        return entries
+
+    def enqueue_entries(self, entries: List[Dict]) -> int:
+        """수신한 항목을 수집 대기열에 추가 (같은 동영상의 재알림은 무시)"""
+        if not entries:
+            return 0
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+
+        queued = 0
+        for entry in entries:
+            cursor.execute('''
+                INSERT OR IGNORE INTO websub_queue
+                (video_id, channel_id, title, video_url, published_at, updated_at, received_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                entry['video_id'],
+                entry['channel_id'],
+                entry['title'],
+                entry['video_url'],
+                entry['published_at'],
+                entry['updated_at'],
+                now
+            ))
+            if cursor.rowcount > 0:
+                queued += 1
+
+        conn.commit()
+        conn.close()
+        return queued
+
+    def handle_notification(self, channel_id: str, body: bytes, signature_header: str) -> int:
+        """푸시 알림 처리: 서명 검증 → 파싱 → 대기열 추가 → 바로 rss_videos로 저장"""
+        if not self.verify_signature(channel_id, body, signature_header):
+            print(f"⚠️ 서명 검증 실패로 알림을 무시합니다: {channel_id}")
+            return 0
+
+        entries = [e for e in self.parse_atom(body) if not e['channel_id'] or e['channel_id'] == channel_id]
+        queued = self.enqueue_entries(entries)
+        if queued:
+            print(f"📥 WebSub 알림 수신: {channel_id} -> {queued}개 새 동영상")
+            # 알림을 받은 즉시 저장 (실패하면 대기열에 남아 주기적인 유지보수 작업이 다시 처리)
+            try:
+                self.drain_queue()
+            except Exception as e:
+                print(f"❌ WebSub 대기열 처리 오류 (다음 유지보수 때 다시 시도): {e}")
+        return queued
+
+    def drain_queue(self, limit: int = 100) -> int:
+        """대기열의 동영상을 rss_videos 테이블로 옮김 (이후 처리는 RSS 수집과 동일)"""
+        with self._drain_lock:
+            return self._drain_queue(limit)
+
+    def _drain_queue(self, limit: int) -> int:
+        from rss_collector import YouTubeRSSCollector
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, video_id, channel_id, title, video_url, published_at
+            FROM websub_queue
+            WHERE processed = 0
+            ORDER BY received_at
+            LIMIT ?
+        ''', (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        if not rows:
+            return 0
+
+        videos = []
+        for row in rows:
+            published_at = row[5]
+            try:
+                published_at = datetime.fromisoformat(published_at.replace('Z', '+00:00')).replace(tzinfo=None).isoformat()
+            except (ValueError, AttributeError):
+                published_at = datetime.now().isoformat()
+
+            videos.append({
+                'video_id': row[1],
+                'channel_id': row[2],
+                'title': row[3],
+                'description': '',
+                'published_at': published_at,
+                'thumbnail_url': f"https://i.ytimg.com/vi/{row[1]}/hqdefault.jpg",
+                'video_url': row[4],
+                'duration': '',
+                'view_count': 0,
+                'like_count': 0
+            })
+
+        # 콜백 서버 스레드에서 실행되므로 Streamlit 화면 출력 없이 저장
+        saved = YouTubeRSSCollector(self.db_path).save_videos(videos, ui=False)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('UPDATE websub_queue SET processed = 1 WHERE id = ?', [(row[0],) for row in rows])
+        conn.commit()
+        conn.close()
+
+        print(f"🔄 WebSub 대기열 처리: {len(rows)}개 중 {saved}개 저장")
+        return saved
+
+    def renew_expiring_subscriptions(self, margin_seconds: int = RENEW_MARGIN_SECONDS) -> int:
+        """만료가 임박한(또는 만료된) 구독 자동 갱신"""
+        threshold = (datetime.now() + timedelta(seconds=margin_seconds)).isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT channel_id, lease_seconds FROM websub_subscriptions
+            WHERE status = 'active' AND (expires_at IS NULL OR expires_at <= ?)
+        ''', (threshold,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        renewed = 0
+        for channel_id, lease_seconds in rows:
+            if self.subscribe(channel_id, lease_seconds or DEFAULT_LEASE_SECONDS):
+                renewed += 1
+
+        if rows:
+            print(f"🔁 WebSub 구독 갱신: {renewed}/{len(rows)}개")
+        return renewed
+
+    def get_channels_needing_poll(self) -> List[str]:
+        """활성 구독이 없는 RSS 채널 목록 (폴링 대체 경로 대상, rss_collector.collect_all_channels가 사용)"""
+        self.initialize_db()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT rc.channel_id
+            FROM rss_channels rc
+            LEFT JOIN websub_subscriptions ws
+                ON ws.channel_id = rc.channel_id
+                AND ws.status = 'active'
+                AND ws.expires_at > ?
+            WHERE rc.is_active = 1 AND ws.channel_id IS NULL
+        ''', (datetime.now().isoformat(),))
+        channel_ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return channel_ids
+
+
+class WebSubCallbackHandler(BaseHTTPRequestHandler):
+    """허브의 검증(GET)과 알림(POST)을 받는 콜백 핸들러"""
+
+    subscriber: WebSubSubscriber = None
+
+    def _query_params(self) -> Dict[str, str]:
+        query = parse_qs(urlparse(self.path).query)
+        return {key: values[0] for key, values in query.items()}
+
+    def do_GET(self):
+        challenge = self.subscriber.verify_intent(self._query_params())
+        if challenge:
+            body = challenge.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        channel_id = self._query_params().get('channel_id')
+
+        try:
+            self.subscriber.handle_notification(channel_id, body, self.headers.get('X-Hub-Signature', ''))
+        except Exception as e:
+            print(f"❌ WebSub 알림 처리 오류: {e}")
+
+        # 서명이 틀려도 2xx를 반환해야 허브가 재전송하지 않음 (WebSub 명세)
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_callback_server(subscriber: WebSubSubscriber, host: str = "0.0.0.0", port: int = 8080) -> ThreadingHTTPServer:
+    """콜백 HTTP 서버 생성 (serve_forever는 호출자가 실행)"""
+    handler = type('BoundWebSubCallbackHandler', (WebSubCallbackHandler,), {'subscriber': subscriber})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def run_callback_server(subscriber: WebSubSubscriber, host: str = "0.0.0.0", port: int = 8080,
+                        maintenance_interval: int = 600):
+    """콜백 서버 실행 + 주기적인 리스 갱신/대기열 처리 (알림은 받을 때 바로 저장하고, 유지보수는 실패분만 다시 처리)"""
+    subscriber.initialize_db()
+    server = create_callback_server(subscriber, host, port)
+    stop_event = threading.Event()
+
+    def maintenance_loop():
+        while not stop_event.is_set():
+            try:
+                subscriber.renew_expiring_subscriptions()
+                subscriber.drain_queue()
+            except Exception as e:
+                print(f"❌ WebSub 유지보수 작업 오류: {e}")
+            stop_event.wait(maintenance_interval)
+
+    maintenance_thread = threading.Thread(target=maintenance_loop, daemon=True)
+    maintenance_thread.start()
+
+    print(f"🎧 WebSub 콜백 서버 시작: http://{host}:{port} (콜백 URL: {subscriber.callback_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("🛑 WebSub 콜백 서버 종료")
+    finally:
+        stop_event.set()
+        server.server_close()
+
+
+class FakeHub:
+    """오프라인 테스트용 로컬 허브 (구독 검증 및 서명된 알림 전송을 흉내냄)"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.subscriptions = {}  # (callback, topic) -> secret
+        self._lock = threading.Lock()
+        hub = self
+
+        class FakeHubHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode('utf-8'))
+                params = {key: values[0] for key, values in form.items()}
+                self.send_response(202)
+                self.end_headers()
+                threading.Thread(target=hub._verify, args=(params,), daemon=True).start()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), FakeHubHandler)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/subscribe"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _verify(self, params: Dict[str, str]):
+        """구독자 콜백에 challenge를 보내고 그대로 돌아오면 구독 등록"""
+        challenge = secrets.token_hex(8)
+        callback = params['hub.callback']
+        separator = '&' if '?' in callback else '?'
+        verify_url = callback + separator + urlencode({
+            'hub.mode': params['hub.mode'],
+            'hub.topic': params['hub.topic'],
+            'hub.challenge': challenge,
+            'hub.lease_seconds': params.get('hub.lease_seconds', DEFAULT_LEASE_SECONDS),
+        })
+        try:
+            resp = requests.get(verify_url, timeout=5)
+        except Exception as e:
+            print(f"FakeHub 검증 요청 실패: {e}")
+            return
+
+        if resp.status_code != 200 or resp.text != challenge:
+            return
+
+        key = (callback, params['hub.topic'])
+        with self._lock:
+            if params['hub.mode'] == 'subscribe':
+                self.subscriptions[key] = params.get('hub.secret', '')
+            else:
+                self.subscriptions.pop(key, None)
+
+    def publish(self, topic: str, body: str) -> int:
+        """토픽 구독자 모두에게 서명된 알림 전송, 전달 성공 수 반환"""
+        payload = body.encode('utf-8')
+        with self._lock:
+            targets = [(callback, secret) for (callback, t), secret in self.subscriptions.items() if t == topic]
+
+        delivered = 0
+        for callback, secret in targets:
+            headers = {'Content-Type': 'application/atom+xml'}
+            if secret:
+                headers['X-Hub-Signature'] = compute_signature(secret, payload)
+            try:
+                resp = requests.post(callback, data=payload, headers=headers, timeout=5)
+                if 200 <= resp.status_code < 300:
+                    delivered += 1
+            except Exception as e:
+                print(f"FakeHub 알림 전송 실패: {e}")
+        return delivered
+
+
+def main():
+    """WebSub 수신기 실행 함수"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="YouTube WebSub 푸시 수신기")
+    parser.add_argument("command", choices=["serve", "subscribe", "renew", "drain", "status"], help="실행할 명령")
+    parser.add_argument("--callback-url", help="허브가 접근할 수 있는 공개 콜백 URL")
+    parser.add_argument("--hub-url", default=DEFAULT_HUB_URL, help="WebSub 허브 URL")
+    parser.add_argument("--host", default="0.0.0.0", help="콜백 서버 바인드 주소")
+    parser.add_argument("--port", type=int, default=8080, help="콜백 서버 포트")
+    parser.add_argument("--db", default="youtube_news.db", help="데이터베이스 경로")
+    args = parser.parse_args()
+
+    subscriber = WebSubSubscriber(args.db, callback_url=args.callback_url, hub_url=args.hub_url)
+    subscriber.initialize_db()
+
+    if args.command == "serve":
+        if args.callback_url:
+            print(f"📡 RSS 채널 구독 요청: {subscriber.subscribe_all_rss_channels()}")
+        run_callback_server(subscriber, args.host, args.port)
+    elif args.command == "subscribe":
+        print(subscriber.subscribe_all_rss_channels())
+    elif args.command == "renew":
+        subscriber.renew_expiring_subscriptions()
+    elif args.command == "drain":
+        subscriber.drain_queue()
+    elif args.command == "status":
+        pending = subscriber.get_channels_needing_poll()
+        print(f"📺 폴링이 필요한 채널(활성 구독 없음): {len(pending)}개")
+        for channel_id in pending:
+            print(f"  - {channel_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+작업 큐 워커
+사용법: python worker.py --processes 4
+같은 DB 파일을 공유하면 여러 프로세스/머신에서 동시에 실행할 수 있음
+웹 인터페이스는 start_background_workers()로 같은 프로세스 안에서 워커 스레드를 띄움
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from db_handler import DB_PATH
+from metrics import metrics, start_http_server
+from job_queue import (
+    JobQueue,
+    JOB_FETCH_METADATA,
+    JOB_FETCH_TRANSCRIPT,
+    JOB_ANALYZE,
+    JOB_EDITORIAL,
+    JOB_RSS_COLLECT,
+    JOB_RSS_SYNC,
+    JOB_TYPES,
+    analysis_key,
+    default_worker_id,
+)
+
+SAVED_CREDENTIALS_FILE = "saved_google_credentials.json"
+
+# 자막 조회 작업의 최대 시도 횟수 (재확인 일정과 포기 시점은 자막 대기열이 정하므로 넉넉하게)
+TRANSCRIPT_MAX_ATTEMPTS = 20
+
+
+class RetryLater(Exception):
+    """지정한 시간 뒤에 다시 시도해야 하는 작업 (예: 아직 자막이 없는 동영상)"""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobCancelled(Exception):
+    """작업 요청자가 실행 중인 작업을 취소함"""
+
+
+def load_saved_credentials(path: str = SAVED_CREDENTIALS_FILE):
+    """Streamlit 앱에서 저장한 OAuth 자격 증명 로드"""
+    from google.oauth2.credentials import Credentials
+    from google.auth.transport.requests import Request
+
+    if not os.path.exists(path):
+        print(f"❌ 저장된 자격 증명이 없습니다: {path} (Streamlit 앱에서 로그인 후 저장하세요)")
+        return None
+
+    with open(path, 'r') as f:
+        saved = json.load(f)
+
+    if saved.get('token_type') == 'oauth2_with_refresh':
+        credentials = Credentials(
+            token=None,
+            refresh_token=saved.get('refresh_token'),
+            token_uri="https://oauth2.googleapis.com/token",
+            client_id=saved.get('client_id'),
+            client_secret=saved.get('client_secret')
+        )
+        credentials.refresh(Request())
+        return credentials
+
+    return Credentials(saved.get('access_token'))
+
+
+class WorkerContext:
+    """워커 프로세스별 공유 상태 (자격 증명은 필요할 때 한 번만 로드)"""
+
+    def __init__(self, queue: JobQueue, credentials_file: str = SAVED_CREDENTIALS_FILE):
+        self.queue = queue
+        self.credentials_file = credentials_file
+        self._credentials = None
+        # 현재 실행 중인 작업 (execute_job에서 설정)
+        self.job_id = None
+        self.worker_id = None
+
+    @property
+    def credentials(self):
+        if self._credentials is None:
+            self._credentials = load_saved_credentials(self.credentials_file)
+            if self._credentials is None:
+                raise RuntimeError("YouTube API 자격 증명을 불러올 수 없습니다.")
+        return self._credentials
+
+    def report_progress(self, progress: float, message: str = None):
+        """현재 작업의 진행률(0~1) 기록. 취소 요청을 받았으면 JobCancelled 발생"""
+        if self.job_id is None:
+            return
+        if not self.queue.update_progress(self.job_id, self.worker_id, progress, message):
+            raise JobCancelled(f"작업 #{self.job_id}이(가) 취소되었습니다.")
+
+
+def handle_fetch_metadata(payload: Dict, ctx: WorkerContext) -> Dict:
+    """동영상 상세 정보 조회 → 자막 조회 작업 추가"""
+    from youtube_handler import get_video_info
+
+    video_id = payload['video_id']
+    video_info = get_video_info(video_id, ctx.credentials)
+    if not video_info:
+        raise RuntimeError(f"비디오 ID {video_id}의 상세 정보를 가져오지 못했습니다.")
+
+    ctx.queue.enqueue(
+        JOB_FETCH_TRANSCRIPT,
+        {'video_id': video_id, 'video_info': video_info, 'analysis_types': payload.get('analysis_types')},
+        idempotency_key=f"{JOB_FETCH_TRANSCRIPT}:{video_id}",
+        max_attempts=TRANSCRIPT_MAX_ATTEMPTS
+    )
+    return {'title': video_info.get('title')}
+
+
+def handle_fetch_transcript(payload: Dict, ctx: WorkerContext) -> Dict:
+    """
+    자막 조회 및 저장 → 분석 유형별 작업 추가
+    자막이 없으면 자막 대기열의 재확인 시각에 다시 시도하고, 대기열이 포기하면 작업을 끝냄
+    """
+    from datetime import datetime, timezone
+    from youtube_handler import get_video_transcript_segments
+    from db_handler import save_video_data
+    from main import DETAILED_ANALYSIS_TYPES
+    from pending_transcripts import STATUS_GAVE_UP, pending_transcripts
+    from transcript_fetcher import transcript_fetcher
+
+    video_id = payload['video_id']
+    if pending_transcripts.get(video_id):
+        # 재확인 시각이 되어 다시 실행된 작업은 "자막 없음" 캐시와 관계없이 다시 조회
+        transcript_fetcher.invalidate(video_id)
+    transcript, lang = get_video_transcript_segments(video_id, ctx.credentials)
+    if not transcript:
+        # 업로드 직후에는 자막이 늦게 생기므로 자막 대기열의 백오프 간격으로 재시도
+        waiting = pending_transcripts.record_missing(video_id, payload.get('video_info'),
+                                                     (payload.get('video_info') or {}).get('published_at'))
+        if waiting['status'] == STATUS_GAVE_UP:
+            return {'transcript': None, 'gave_up': waiting['attempts']}
+        next_check = datetime.fromisoformat(waiting['next_check_at'])
+        retry_after = max((next_check - datetime.now(timezone.utc)).total_seconds(), 0)
+        raise RetryLater(f"비디오 ID {video_id}에 아직 자막이 없습니다. (다음 확인 {waiting['next_check_at']})",
+                         retry_after)
+    pending_transcripts.resolve(video_id)
+
+    save_video_data(payload['video_info'], transcript.text, transcript.to_bytes())
+
+    analysis_types = (payload.get('analysis_types') or ["summary"]) + DETAILED_ANALYSIS_TYPES
+    for analysis_type in analysis_types:
+        ctx.queue.enqueue(
+            JOB_ANALYZE,
+            {'video_id': video_id, 'analysis_type': analysis_type},
+            idempotency_key=analysis_key(video_id, analysis_type)
+        )
+    return {'language': lang, 'analysis_jobs': len(analysis_types)}
+
+
+def handle_analyze(payload: Dict, ctx: WorkerContext) -> Dict:
+    """저장된 자막으로 분석 유형 하나 수행"""
+    from cost_governor import ACTION_SKIP, BudgetExceeded
+    from db_handler import get_video_data
+    from main import run_analysis
+
+    video_id = payload['video_id']
+    analysis_type = payload['analysis_type']
+    video = get_video_data(video_id)
+    if not video or not video.get('transcript'):
+        raise RuntimeError(f"비디오 ID {video_id}의 자막이 데이터베이스에 없습니다.")
+
+    ctx.report_progress(0.1, f"{analysis_type} 분석 중")
+    try:
+        saved = run_analysis(video_id, video.get('title', ''), video['transcript'], analysis_type)
+    except BudgetExceeded as e:
+        # 우선순위가 낮은 유형은 건너뛰고(완료 처리), 나머지는 다음 예산 기간에 다시 시도
+        if e.action == ACTION_SKIP:
+            return {'analysis_type': analysis_type, 'skipped': str(e)}
+        raise RetryLater(str(e), e.retry_after) from e
+    if not saved:
+        raise RuntimeError(f"비디오 ID {video_id}의 {analysis_type} 분석 결과를 저장하지 못했습니다.")
+    return {'analysis_type': analysis_type}
+
+
+def handle_editorial(payload: Dict, ctx: WorkerContext) -> Optional[Dict]:
+    """최근 동영상으로 경제 뉴스 사설 생성"""
+    from cost_governor import ACTION_SKIP, BudgetExceeded
+    from db_handler import generate_economic_news_from_recent_videos
+
+    ctx.report_progress(0.1, "최근 동영상 분석 결과로 사설 작성 중")
+    try:
+        news = generate_economic_news_from_recent_videos(
+            hours=payload.get('hours', 24),
+            style=payload.get('style', 'basic'),
+            word_count=payload.get('word_count', 1000),
+            language=payload.get('language', 'ko')
+        )
+    except BudgetExceeded as e:
+        # 예산이 부족하면 다음 예산 기간(또는 다음 실행)에 다시 시도
+        if e.action == ACTION_SKIP:
+            return {'skipped': str(e)}
+        raise RetryLater(str(e), e.retry_after) from e
+    return {'title': news.get('title')} if news else None
+
+
+def handle_rss_collect(payload: Dict, ctx: WorkerContext) -> Dict:
+    """등록된 채널 RSS 수집 (채널마다 진행률 보고, 취소 가능)"""
+    from rss_collector import YouTubeRSSCollector
+
+    collector = YouTubeRSSCollector(ctx.queue.db_path)
+
+    def progress_callback(done: int, total: int, message: str):
+        ctx.report_progress(done / total if total else 1.0, f"{message} ({done}/{total})")
+
+    days_back = payload.get('days_back')
+    if days_back:
+        result = collector.collect_channels_with_period(days_back, progress_callback=progress_callback)
+    else:
+        result = collector.collect_all_channels(progress_callback=progress_callback)
+
+    if payload.get('sync') and result.get('new_videos'):
+        ctx.report_progress(1.0, "메인 DB 동기화 중")
+        result['synced_videos'] = collector.sync_with_main_db(ui=False).get('synced_videos', 0)
+    return result
+
+
+def handle_rss_sync(payload: Dict, ctx: WorkerContext) -> Dict:
+    """RSS 수집 데이터를 메인 DB와 동기화"""
+    from rss_collector import YouTubeRSSCollector
+
+    ctx.report_progress(0.1, "메인 DB 동기화 중")
+    return YouTubeRSSCollector(ctx.queue.db_path).sync_with_main_db(ui=False)
+
+
+JOB_HANDLERS = {
+    JOB_FETCH_METADATA: handle_fetch_metadata,
+    JOB_FETCH_TRANSCRIPT: handle_fetch_transcript,
+    JOB_ANALYZE: handle_analyze,
+    JOB_EDITORIAL: handle_editorial,
+    JOB_RSS_COLLECT: handle_rss_collect,
+    JOB_RSS_SYNC: handle_rss_sync,
+}
+
+# 웹 인터페이스에서 요청하고 내장 워커 스레드가 처리하는 작업 유형 (YouTube 자격 증명이 필요 없는 작업)
+UI_JOB_TYPES = [JOB_ANALYZE, JOB_EDITORIAL, JOB_RSS_COLLECT, JOB_RSS_SYNC]
+
+
+def execute_job(job: Dict, ctx: WorkerContext, worker_id: str):
+    """작업 하나 실행 (실행 중에는 주기적으로 리스를 연장)"""
+    queue = ctx.queue
+    handler = JOB_HANDLERS.get(job['job_type'])
+    if not handler:
+        queue.fail(job['id'], worker_id, f"알 수 없는 작업 유형: {job['job_type']}")
+        return
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat_loop():
+        while not stop_heartbeat.wait(queue.lease_seconds / 3):
+            if not queue.heartbeat(job['id'], worker_id):
+                print(f"⚠️ 작업 #{job['id']}의 리스를 잃었습니다.")
+                return
+
+    heartbeat_thread = threading.Thread(target=heartbeat_loop, daemon=True)
+    heartbeat_thread.start()
+
+    started = time.time()
+    ctx.job_id, ctx.worker_id = job['id'], worker_id
+    try:
+        print(f"▶️ [{worker_id}] 작업 #{job['id']} {job['job_type']} 시작 (시도 {job['attempts']}/{job['max_attempts']})")
+        ctx.report_progress(0.0, "시작")
+        result = handler(job['payload'], ctx)
+        queue.complete(job['id'], worker_id, result)
+        print(f"✅ [{worker_id}] 작업 #{job['id']} 완료 ({time.time() - started:.1f}초)")
+    except JobCancelled:
+        queue.mark_cancelled(job['id'], worker_id)
+        print(f"🛑 [{worker_id}] 작업 #{job['id']} 취소됨")
+    except RetryLater as e:
+        status = queue.fail(job['id'], worker_id, str(e), e.retry_after)
+        print(f"⏳ [{worker_id}] 작업 #{job['id']} 재시도 예정: {e} ({status})")
+    except Exception as e:
+        status = queue.fail(job['id'], worker_id, f"{e}\n{traceback.format_exc()}")
+        print(f"❌ [{worker_id}] 작업 #{job['id']} 실패: {e} ({status})")
+    finally:
+        stop_heartbeat.set()
+        ctx.job_id = ctx.worker_id = None
+
+
+def worker_loop(ctx: WorkerContext, worker_id: str, job_types: List[str] = None, poll_interval: float = 5.0,
+                max_jobs: int = None, stop_when_idle: bool = False, metrics_file: str = None,
+                stop_event: threading.Event = None) -> int:
+    """
+    작업을 가져와 실행하는 루프
+    :param stop_event: 설정되면 현재 작업을 마친 뒤 종료
+    :return: 처리한 작업 수
+    """
+    stop_event = stop_event or threading.Event()
+    processed = 0
+    while (max_jobs is None or processed < max_jobs) and not stop_event.is_set():
+        job = ctx.queue.claim(worker_id, job_types)
+        if not job:
+            if stop_when_idle:
+                break
+            stop_event.wait(poll_interval)
+            continue
+
+        with metrics.timer('job_seconds', job_type=job['job_type']):
+            execute_job(job, ctx, worker_id)
+        processed += 1
+        if metrics_file:
+            metrics.write_file(metrics_file)
+    return processed
+
+
+def start_background_workers(db_path: str = DB_PATH, threads: int = 2, job_types: List[str] = None,
+                             poll_interval: float = 1.0,
+                             credentials_file: str = SAVED_CREDENTIALS_FILE) -> threading.Event:
+    """
+    현재 프로세스 안에서 워커 스레드 실행 (Streamlit 앱에서 요청한 작업 처리용)
+    :return: 설정하면 워커 스레드가 멈추는 이벤트
+    """
+    queue = JobQueue(db_path)
+    queue.initialize_db()
+    stop_event = threading.Event()
+    job_types = job_types or UI_JOB_TYPES
+
+    for i in range(threads):
+        # 스레드마다 리스 소유자가 달라야 하므로 워커 ID와 컨텍스트를 따로 만듦
+        worker_id = f"{default_worker_id()}:thread-{i + 1}"
+        thread = threading.Thread(
+            target=worker_loop,
+            args=(WorkerContext(queue, credentials_file), worker_id, job_types, poll_interval),
+            kwargs={'stop_event': stop_event},
+            daemon=True,
+            name=f"job-worker-{i + 1}"
+        )
+        thread.start()
+    print(f"👷 백그라운드 워커 스레드 {threads}개 시작 (작업 유형: {', '.join(job_types)})")
+    return stop_event
+
+
+def run_worker(db_path: str = DB_PATH, job_types: List[str] = None, poll_interval: float = 5.0,
+               max_jobs: int = None, stop_when_idle: bool = False,
+               credentials_file: str = SAVED_CREDENTIALS_FILE, metrics_port: int = None,
+               metrics_file: str = None):
+    """
+    작업을 가져와 실행하는 워커 루프
+    :param metrics_port: 지정하면 이 프로세스의 /metrics 엔드포인트 제공
+    :param metrics_file: 지정하면 작업을 마칠 때마다 메트릭 파일 갱신
+    """
+    from db_handler import ensure_schema
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if metrics_port:
+        start_http_server(metrics_port)
+    ensure_schema()
+    queue = JobQueue(db_path)
+    queue.initialize_db()
+    ctx = WorkerContext(queue, credentials_file)
+    worker_id = default_worker_id()
+
+    print(f"👷 워커 시작: {worker_id} (작업 유형: {', '.join(job_types or JOB_TYPES)})")
+    processed = 0
+    try:
+        processed = worker_loop(ctx, worker_id, job_types, poll_interval, max_jobs, stop_when_idle,
+                                metrics_file=metrics_file)
+    except KeyboardInterrupt:
+        pass
+
+    metrics.print_summary(title=f"워커 {worker_id} 요약")
+    print(f"👷 워커 종료: {worker_id} (처리 {processed}개)")
+    return processed
+
+
+def main():
+    """워커 실행 함수"""
+    parser = argparse.ArgumentParser(description="YouTube 뉴스 작업 큐 워커")
+    parser.add_argument("--processes", type=int, default=1, help="워커 프로세스 수")
+    parser.add_argument("--types", nargs="+", choices=JOB_TYPES, help="처리할 작업 유형 (기본: 전체)")
+    parser.add_argument("--once", action="store_true", help="대기 중인 작업이 없으면 종료")
+    parser.add_argument("--max-jobs", type=int, help="프로세스당 최대 처리 작업 수")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="빈 큐 확인 간격(초)")
+    parser.add_argument("--db", default=DB_PATH, help="데이터베이스 경로 (기본값: 웹 앱과 같은 프로젝트 DB)")
+    parser.add_argument("--credentials", default=SAVED_CREDENTIALS_FILE, help="저장된 OAuth 자격 증명 파일")
+    parser.add_argument("--stats", action="store_true", help="작업 큐 현황 출력")
+    parser.add_argument("--retry-dead", action="store_true", help="실패한(dead) 작업을 다시 대기열에 추가")
+    parser.add_argument("--metrics-port", type=int, help="Prometheus /metrics 포트 (프로세스마다 1씩 증가)")
+    parser.add_argument("--metrics-file", help="Prometheus 형식 메트릭 파일 (프로세스마다 접미사 -N 추가)")
+    args = parser.parse_args()
+
+    if args.stats or args.retry_dead:
+        queue = JobQueue(args.db)
+        queue.initialize_db()
+        if args.retry_dead:
+            print(f"🔄 다시 대기열에 추가한 작업: {queue.retry_dead()}개")
+        for job_type, counts in queue.stats().items():
+            summary = ', '.join(f"{status} {count}" for status, count in sorted(counts.items()))
+            print(f"  - {job_type}: {summary}")
+        return
+
+    worker_kwargs = dict(
+        db_path=args.db,
+        job_types=args.types,
+        poll_interval=args.poll_interval,
+        max_jobs=args.max_jobs,
+        stop_when_idle=args.once,
+        credentials_file=args.credentials,
+    )
+
+    if args.processes <= 1:
+        run_worker(metrics_port=args.metrics_port, metrics_file=args.metrics_file, **worker_kwargs)
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=run_worker,
+            kwargs=dict(
+                worker_kwargs,
+                metrics_port=args.metrics_port + i if args.metrics_port else None,
+                metrics_file=f"{args.metrics_file}-{i + 1}" if args.metrics_file else None,
+            ),
+            name=f"worker-{i + 1}"
+        )
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import os
-import googleapiclient.discovery
 import googleapiclient.errors
-from google.auth.exceptions import DefaultCredentialsError
 import re
 
+from lazy_imports import lazy_import
+from quota_ledger import quota_ledger
+
+# API 클라이언트 생성 모듈은 로드가 오래 걸리므로 처음 서비스를 만들 때 로드
+# (예외 클래스만 있는 googleapiclient.errors는 바로 로드)
+lazy_import("googleapiclient.discovery")
+
 def get_youtube_service(credentials):
     """
     YouTube API 서비스 클라이언트를 반환합니다.
-    OAuth2 인증을 사용합니다.
+    OAuth2 인증을 사용하며, 모든 호출은 할당량 장부에 기록됩니다.
     """
     try:
         print("YouTube API 서비스 빌드 시도 (OAuth2)")
@@ -15,7 +20,7 @@ def get_youtube_service(credentials):
             "youtube", "v3", credentials=credentials
         )
         print("YouTube API 서비스가 성공적으로 빌드되었습니다. (OAuth2)")
-        return service
+        return quota_ledger.wrap(service)
     except Exception as e:
         print(f"YouTube API 서비스 빌드 중 오류 발생: {e}")
         return None
@@ -33,6 +38,28 @@ def get_channel_info_by_handle(handle: str, credentials):
         return None
 
     try:
+        # forHandle로 직접 조회 (1 유닛) - 실패 시에만 검색(100 유닛) 사용
+        handle_response = service.channels().list(
+            part="snippet,statistics,brandingSettings",
+            forHandle=f"@{clean_handle}"
+        ).execute()
+
+        if handle_response.get("items"):
+            item = handle_response["items"][0]
+            channel_data = item["snippet"]
+            channel_stats = item.get("statistics", {})
+            return {
+                "type": "channel",
+                "id": item["id"],
+                "title": channel_data.get("title"),
+                "description": channel_data.get("description"),
+                "custom_url": channel_data.get("customUrl"),
+                "handle_used": handle,
+                "subscriber_count": channel_stats.get("subscriberCount"),
+                "video_count": channel_stats.get("videoCount"),
+                "published_at": channel_data.get("publishedAt")
+            }
+
         # 핸들을 사용하여 채널 검색
         search_response = service.search().list(
             q=clean_handle,
@@ -223,6 +250,31 @@ def extract_video_id(url: str) -> str:
 def get_video_transcript(video_id: str, credentials, preferred_languages=None) -> tuple:
     """
     YouTube 동영상의 자막을 가져옵니다.
+    timedtext(할당량 없음)를 먼저 시도하고, 없으면 captions API를 사용합니다. (transcript_fetcher)
+    번호·타임스탬프와 자동 자막의 반복 줄을 지운 본문을 반환합니다.
+    :return: (자막, 언어), 자막이 없으면 (None, None)
+    """
+    transcript, lang = get_video_transcript_segments(video_id, credentials, preferred_languages)
+    return (transcript.text, lang) if transcript else (None, None)
+
+def get_video_transcript_segments(video_id: str, credentials, preferred_languages=None) -> tuple:
+    """
+    get_video_transcript와 같지만 세그먼트 색인(시작 ms, 본문 오프셋)이 있는 NormalizedTranscript를 반환합니다.
+    :return: (NormalizedTranscript, 언어), 자막이 없으면 (None, None)
+    """
+    from transcript_fetcher import transcript_fetcher, transcript_from_entry
+
+    result = transcript_fetcher.fetch(video_id, credentials, preferred_languages)
+    if not result:
+        print(f"동영상 {video_id}에 자막이 없습니다.")
+        return None, None
+    return transcript_from_entry(result), result['language']
+
+def download_caption_track(video_id: str, credentials, preferred_languages=None) -> tuple:
+    """
+    captions.list와 captions.download로 자막을 내려받습니다. (250 units)
+    속도 제한·서버 오류는 다시 시도할 수 있도록 예외를 그대로 올립니다.
+    :return: (SRT 자막, 언어), 자막이 없거나 권한이 없으면 (None, None)
     """
     if preferred_languages is None:
         preferred_languages = ['ko', 'en']
@@ -239,42 +291,26 @@ def get_video_transcript(video_id: str, credentials, preferred_languages=None) -
         ).execute()
 
         if not captions_response.get("items"):
-            print(f"동영상 {video_id}에 자막이 없습니다.")
             return None, None
 
-        # 선호 언어 순서대로 자막 찾기
-        for lang in preferred_languages:
-            for caption in captions_response["items"]:
-                if caption["snippet"]["language"] == lang:
-                    caption_id = caption["id"]
-                    
-                    # 자막 내용 가져오기
-                    transcript_response = service.captions().download(
-                        id=caption_id,
-                        tfmt='srt'
-                    ).execute()
-                    
-                    return transcript_response, lang
-
-        # 선호 언어가 없으면 첫 번째 자막 사용
-        first_caption = captions_response["items"][0]
-        caption_id = first_caption["id"]
-        lang = first_caption["snippet"]["language"]
-        
+        # 선호 언어 순서대로 자막 찾고, 없으면 첫 번째 자막 사용
+        caption = next(
+            (c for lang in preferred_languages for c in captions_response["items"] if c["snippet"]["language"] == lang),
+            captions_response["items"][0]
+        )
         transcript_response = service.captions().download(
-            id=caption_id,
+            id=caption["id"],
             tfmt='srt'
         ).execute()
         
-        return transcript_response, lang
+        return transcript_response, caption["snippet"]["language"]
 
     except googleapiclient.errors.HttpError as e:
+        if e.resp.status in (429, 500, 502, 503, 504):
+            raise
         error_content = e.content.decode('utf-8') if hasattr(e.content, 'decode') else str(e.content)
         print(f"자막 가져오기 중 HttpError 발생: {e} - {error_content}")
         return None, None
-    except Exception as e:
-        print(f"자막 가져오기 중 예상치 못한 오류 발생: {e}")
-        return None, None
 
 def get_video_info(video_id: str, credentials):
     """
@@ -478,4 +514,44 @@ def get_latest_videos_from_channel(channel_id: str, credentials, max_results=10)
         return None
     except Exception as e:
         print(f"채널 동영상 목록 가져오기 중 예상치 못한 오류 발생: {e}")
-        return None 
\ No newline at end of file
+        return None 
+
+def get_videos_from_uploads_playlist(uploads_playlist_id: str, credentials, max_results=15):
+    """
+    채널 업로드 재생목록에서 최신 동영상 목록을 가져옵니다.
+    search.list(100 유닛) 대신 playlistItems.list(1 유닛)를 사용하며,
+    search_videos_by_keyword와 같은 형식으로 반환합니다.
+    """
+    service = get_youtube_service(credentials)
+    if not service:
+        return None
+
+    try:
+        playlist_response = service.playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=uploads_playlist_id,
+            maxResults=max_results
+        ).execute()
+
+        videos = []
+        for item in playlist_response.get("items", []):
+            snippet = item["snippet"]
+            videos.append({
+                "video_id": snippet["resourceId"]["videoId"],
+                "title": snippet["title"],
+                "description": snippet["description"],
+                "channel_id": snippet.get("videoOwnerChannelId") or snippet["channelId"],
+                "channel_title": snippet.get("videoOwnerChannelTitle") or snippet.get("channelTitle"),
+                "published_at": item.get("contentDetails", {}).get("videoPublishedAt") or snippet["publishedAt"],
+                "thumbnails": snippet.get("thumbnails", {})
+            })
+
+        return videos
+
+    except googleapiclient.errors.HttpError as e:
+        error_content = e.content.decode('utf-8') if hasattr(e.content, 'decode') else str(e.content)
+        print(f"업로드 재생목록 조회 중 HttpError 발생 ({uploads_playlist_id}): {e} - {error_content}")
+        return None
+    except Exception as e:
+        print(f"업로드 재생목록 조회 중 예상치 못한 오류 발생 ({uploads_playlist_id}): {e}")
+        return None